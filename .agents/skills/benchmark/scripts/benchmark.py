@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+benchmark.py — Mide cómo escalan las herramientas Python del proyecto.
+
+Genera proyectos sintéticos con generar_historias.py y toma el tiempo de cada
+herramienta corriéndola como la correría alguien desde la terminal (un proceso
+nuevo por corrida, así el arranque de Python y los imports también cuentan):
+
+  - auditar            auditar.py --json --sin-cache (auditoría completa en frío)
+  - auditar-caliente   auditar.py --json con la caché ya armada por una corrida previa
+  - analizar-sw        analizar-sw.py --archivo con el historia.json de cada historia
+  - check_texts, check_opciones, check_estructura, update_md
+                       una corrida con --dir por historia (lo que hay que hacer hoy
+                       para revisar todo el catálogo)
+  - sincronizar        sincronizar.py --todo por historia: los cuatro anteriores
+                       sobre un solo modelo de historia.md
+  - sincronizar-todas  sincronizar.py --todas --todo: todo el catálogo en un solo
+                       comando, con un pool de procesos
+
+Escalas por defecto: una historia de 100, 1.000 y 10.000 escenas, y 1, 10 y 50
+historias de 100 escenas. Cada medición es la mejor de --repeticiones corridas.
+
+Los resultados se agregan a .agents/.cache/benchmark/historial.jsonl (una línea
+por corrida, fuera de git: los tiempos son de cada máquina) y cada medición se
+compara con la corrida anterior: si algo tarda más del --umbral se marca como
+regresión y el script termina con código 1.
+
+Es de SOLO LECTURA sobre el proyecto: los árboles sintéticos se crean en un
+directorio temporal que se borra al terminar. Lo único que escribe es el historial.
+
+Uso:
+  python benchmark.py                                  # Suite completa
+  python benchmark.py --escenas 100 1000 --historias   # Solo historias grandes (sin escala de catálogo)
+  python benchmark.py --herramientas auditar check_texts
+  python benchmark.py --repeticiones 5 --umbral 10     # Más corridas, regresión a partir de +10%
+  python benchmark.py --sin-guardar                    # Medir sin tocar el historial
+"""
+
+import argparse
+import io
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import generar_historias
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = generar_historias.RAIZ
+SKILLS = RAIZ / '.agents' / 'skills'
+RUTA_HISTORIAL = RAIZ / '.agents' / '.cache' / 'benchmark' / 'historial.jsonl'
+
+# Diferencias por debajo de esto son ruido del sistema, no regresiones
+MINIMO_REGRESION = 0.05
+
+
+# ─── Herramientas ───────────────────────────────────────────────────
+# Cada herramienta arma la lista de comandos de UNA corrida a partir de la raíz
+# del árbol sintético y sus carpetas de historia.
+
+def _auditar(raiz, historias, *extra):
+    # auditar.py encuentra la raíz subiendo desde su propia ubicación: corre la copia del árbol
+    return [[sys.executable, str(raiz / '.agents/skills/code-auditor/scripts/auditar.py'), '--json', *extra]]
+
+
+def _analizar_sw(raiz, historias):
+    archivos = [f'historias/{h.name}/historia.json' for h in historias]
+    return [[sys.executable, str(SKILLS / 'sw-updater/scripts/analizar-sw.py'),
+             '--sw', str(raiz / 'service-worker.js'), '--archivo', *archivos]]
+
+
+def _sincronizar_todas(raiz, historias):
+    return [[sys.executable, str(SKILLS / 'docs/scripts/sincronizar.py'), '--todas', '--raiz', str(raiz), '--todo']]
+
+
+def _por_historia(script, *extra):
+    def comandos(raiz, historias):
+        return [[sys.executable, str(SKILLS / 'docs/scripts' / script), '--dir', str(h), *extra] for h in historias]
+    return comandos
+
+
+HERRAMIENTAS = {
+    'auditar':          lambda raiz, historias: _auditar(raiz, historias, '--sin-cache'),
+    'auditar-caliente': _auditar,
+    'analizar-sw':      _analizar_sw,
+    'check_texts':      _por_historia('check_texts.py'),
+    'check_opciones':   _por_historia('check_opciones.py'),
+    'check_estructura': _por_historia('check_estructura.py'),
+    'update_md':        _por_historia('update_md.py'),
+    'sincronizar':      _por_historia('sincronizar.py', '--todo'),
+    'sincronizar-todas': _sincronizar_todas,
+}
+
+
+def preparar_arbol(raiz, historias, escenas):
+    """Genera el proyecto sintético y le copia auditar.py (con instantanea.py). Retorna las carpetas de historia."""
+    carpetas = generar_historias.generar_proyecto(raiz, historias=historias, escenas=escenas)
+    destino = raiz / '.agents' / 'skills' / 'code-auditor' / 'scripts'
+    destino.mkdir(parents=True)
+    for nombre in ('auditar.py', 'instantanea.py'):
+        shutil.copy2(SKILLS / 'code-auditor' / 'scripts' / nombre, destino / nombre)
+    return carpetas
+
+
+def correr(comandos, raiz):
+    """Corre los comandos en serie. Retorna (segundos, error o None)."""
+    inicio = time.perf_counter()
+    for cmd in comandos:
+        proceso = subprocess.run(cmd, cwd=raiz, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                 text=True, encoding='utf-8', errors='replace')
+        # auditar.py sale con 1 cuando corta por --fallar-en; acá cualquier código != 0 es un error
+        if proceso.returncode != 0:
+            ultima = (proceso.stderr.strip().splitlines() or ['(sin salida)'])[-1]
+            return time.perf_counter() - inicio, f'{Path(cmd[1]).name} salió con {proceso.returncode}: {ultima}'
+    return time.perf_counter() - inicio, None
+
+
+def medir(nombre, raiz, historias, repeticiones):
+    """Mejor tiempo de `repeticiones` corridas de una herramienta. Retorna (segundos, error)."""
+    comandos = HERRAMIENTAS[nombre](raiz, historias)
+    if nombre == 'auditar-caliente':
+        correr(comandos, raiz)  # arma la caché
+
+    mejor = None
+    for _ in range(repeticiones):
+        duracion, error = correr(comandos, raiz)
+        if error:
+            return None, error
+        mejor = duracion if mejor is None else min(mejor, duracion)
+
+    if nombre in ('update_md', 'sincronizar', 'sincronizar-todas'):
+        for h in historias:
+            (h / 'historia_nueva.md').unlink(missing_ok=True)
+    return mejor, None
+
+
+# ─── Historial ──────────────────────────────────────────────────────
+
+def _commit_actual():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def cargar_historial(ruta):
+    """Corridas anteriores, de la más vieja a la más nueva (ignora líneas corruptas)."""
+    if not ruta.exists():
+        return []
+    corridas = []
+    for linea in ruta.read_text(encoding='utf-8').splitlines():
+        try:
+            corridas.append(json.loads(linea))
+        except json.JSONDecodeError:
+            continue
+    return corridas
+
+
+def guardar_corrida(ruta, corrida):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(corrida, ensure_ascii=False) + '\n')
+
+
+def valor_anterior(corridas, escenario, herramienta):
+    """La medición más reciente de (escenario, herramienta) en el historial, con su commit."""
+    for corrida in reversed(corridas):
+        segundos = corrida.get('mediciones', {}).get(escenario, {}).get(herramienta)
+        if segundos is not None:
+            return segundos, corrida.get('commit')
+    return None, None
+
+
+# ─── Main ───────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Mide las herramientas Python del proyecto sobre historias sintéticas.')
+    parser.add_argument('--escenas', nargs='*', type=int, default=[100, 1000, 10000],
+                        help='Tamaños de una sola historia (default: 100 1000 10000)')
+    parser.add_argument('--historias', nargs='*', type=int, default=[1, 10, 50],
+                        help='Cantidades de historias para la escala de catálogo (default: 1 10 50)')
+    parser.add_argument('--escenas-por-historia', type=int, default=100,
+                        help='Escenas de cada historia en la escala de catálogo (default: 100)')
+    parser.add_argument('--herramientas', nargs='+', choices=list(HERRAMIENTAS), default=list(HERRAMIENTAS),
+                        help='Herramientas a medir (default: todas)')
+    parser.add_argument('--repeticiones', '-n', type=int, default=3,
+                        help='Corridas por medición; se guarda la más rápida (default: 3)')
+    parser.add_argument('--umbral', type=float, default=20,
+                        help='Porcentaje de aumento contra la corrida anterior que cuenta como regresión (default: 20)')
+    parser.add_argument('--historial', type=Path, default=RUTA_HISTORIAL,
+                        help='Archivo JSONL donde se acumulan las corridas')
+    parser.add_argument('--sin-guardar', action='store_true',
+                        help='No agregar esta corrida al historial (solo comparar)')
+    args = parser.parse_args()
+
+    # Escenarios como (historias, escenas por historia), sin repetir
+    escenarios = [(1, e) for e in args.escenas]
+    escenarios += [(h, args.escenas_por_historia) for h in args.historias]
+    escenarios = sorted(set(escenarios))
+
+    anteriores = cargar_historial(args.historial)
+    mediciones = {}
+    regresiones = []
+    errores = []
+
+    print(f"\n  {'Escenario':>11}  {'Herramienta':<17}  {'Tiempo':>9}  {'Anterior':>9}  {'Cambio':>8}")
+    print(f"  {'─'*11}  {'─'*17}  {'─'*9}  {'─'*9}  {'─'*8}")
+
+    for historias, escenas in escenarios:
+        escenario = f'{historias}x{escenas}'
+        with tempfile.TemporaryDirectory(prefix='bench-historias-') as tmp:
+            raiz = Path(tmp)
+            carpetas = preparar_arbol(raiz, historias, escenas)
+
+            for nombre in args.herramientas:
+                segundos, error = medir(nombre, raiz, carpetas, args.repeticiones)
+                if error:
+                    errores.append(f'{escenario} {nombre}: {error}')
+                    print(f"  {escenario:>11}  {nombre:<17}  {'ERROR':>9}")
+                    continue
+
+                mediciones.setdefault(escenario, {})[nombre] = round(segundos, 4)
+                anterior, commit = valor_anterior(anteriores, escenario, nombre)
+                cambio, marca = '', ''
+                if anterior:
+                    porcentaje = (segundos / anterior - 1) * 100
+                    cambio = f'{porcentaje:+.1f}%'
+                    if porcentaje > args.umbral and segundos - anterior > MINIMO_REGRESION:
+                        marca = '  ⚠️'
+                        regresiones.append(f'{escenario} {nombre}: {anterior:.3f}s → {segundos:.3f}s '
+                                           f'({cambio}, antes en {commit or "?"})')
+                previo = f'{anterior:.3f}s' if anterior else '—'
+                print(f"  {escenario:>11}  {nombre:<17}  {segundos:>8.3f}s  {previo:>9}  {cambio:>8}{marca}")
+
+    print()
+    for error in errores:
+        print(f'  ❌ {error}')
+    for regresion in regresiones:
+        print(f'  ⚠️  Regresión: {regresion}')
+
+    if mediciones and not args.sin_guardar:
+        guardar_corrida(args.historial, {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_actual(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeticiones': args.repeticiones,
+            'mediciones': mediciones,
+        })
+        print(f'  📄 Corrida guardada en {args.historial}')
+    print()
+
+    return 1 if regresiones or errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+generar_historias.py — Genera proyectos sintéticos con historias válidas para medir las herramientas.
+
+Arma en un directorio aparte una copia mínima del proyecto (js/, css/, biblioteca/,
+index.html, manifest.json) y le agrega N historias inventadas que respetan el
+formato de documentacion/formato_escenas.md y formato_historia.md:
+
+  - datos/escenas/*.json y datos/desafios/*.json con targets válidos, finales que
+    reinician, desafíos con recompensa y opciones con condición "tiene_X".
+  - historia.json con las listas de escenas y desafíos.
+  - historia.md con el guion en el formato que parsean los scripts de la skill docs.
+  - Las imágenes que referencian los JSONs (fondos, personajes/{id}, objetos, logo,
+    tarjeta) como placeholders de 1x1 y la música de inicio vacía.
+  - biblioteca/historias.json (con los datos que agrega generar_catalogo.py) y un
+    service-worker.js que cachea todo lo generado.
+
+El grafo queda limpio para la categoría grafo de auditar.py: todas las escenas
+son alcanzables desde INICIO sin recompensas (cada escena nueva cuelga de una
+anterior que no es final), desde cualquiera se llega a un final (toda escena que
+no es final tiene un botón hacia adelante y la última es final) y cada opción con
+condición está en la escena a la que lleva ganar el desafío que la habilita. El
+resto de los botones apuntan a escenas posteriores al azar: como en las historias
+reales, los únicos ciclos son los finales que reinician y los desafíos que al
+fallar vuelven a su escena. La misma semilla genera siempre el mismo árbol.
+
+Es de SOLO LECTURA sobre el proyecto: solo escribe dentro de --destino.
+
+Uso:
+  python generar_historias.py --destino /tmp/arbol                        # 1 historia de 100 escenas
+  python generar_historias.py --destino /tmp/arbol --escenas 10000        # Historia grande
+  python generar_historias.py --destino /tmp/arbol --historias 50         # 50 historias de 100 escenas
+  python generar_historias.py --destino /tmp/arbol --ramificacion 4 --desafios 20 --personajes 12
+"""
+
+import argparse
+import base64
+import importlib.util
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Archivos y carpetas del proyecto que se copian tal cual a cada árbol sintético
+BASE_PROYECTO = ['js', 'css', 'biblioteca', 'index.html', 'manifest.json']
+
+# WebP 1x1 válido: alcanza para los checks de existencia y para el Service Worker
+PLACEHOLDER_WEBP = base64.b64decode('UklGRhoAAABXRUJQVlA4TA0AAAAvAAAAEAcQERGIiP4HAA==')
+
+SUBTIPOS_DESAFIO = ['pregunta_real', 'minijuego_clicks', 'minijuego_observacion']
+
+LUGARES = ['un claro del bosque', 'la orilla del río', 'un puente de piedra', 'la cueva de los ecos',
+           'un jardín de hongos', 'la cima de la colina', 'un sendero de flores', 'la casa del árbol']
+SUCESOS = ['Se escucha una risa entre los árboles.', 'Una luz dorada flota sobre el agua.',
+           'El viento trae olor a lluvia.', 'Un camino nuevo aparece entre las hojas.',
+           'Alguien dejó huellas brillantes en el barro.', 'Las luciérnagas dibujan una flecha en el aire.']
+ACCIONES = ['Seguir las huellas', 'Preguntar qué pasó', 'Cruzar al otro lado', 'Esperar en silencio',
+            'Subir por las raíces', 'Buscar entre las flores', 'Volver por el sendero', 'Llamar en voz alta']
+
+
+def _cargar_generar_manifiesto():
+    """Importa sw-updater/scripts/generar-manifiesto.py (el guion impide un import normal)."""
+    ruta = RAIZ / '.agents' / 'skills' / 'sw-updater' / 'scripts' / 'generar-manifiesto.py'
+    spec = importlib.util.spec_from_file_location('generar_manifiesto', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _cargar_generar_catalogo():
+    """Importa build/scripts/generar_catalogo.py (está en otra skill, fuera del sys.path)."""
+    ruta = RAIZ / '.agents' / 'skills' / 'build' / 'scripts' / 'generar_catalogo.py'
+    spec = importlib.util.spec_from_file_location('generar_catalogo', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _escribir_json(ruta, datos):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_text(json.dumps(datos, ensure_ascii=False, indent=4), encoding='utf-8')
+
+
+def _escribir_placeholder(ruta, contenido=PLACEHOLDER_WEBP):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_bytes(contenido)
+
+
+# ─── Grafo de la historia ───────────────────────────────────────────
+
+def _armar_grafo(rng, escenas, ramificacion):
+    """
+    Decide los destinos de cada escena. Retorna (destinos, finales):
+      destinos: list[list[int]] con los índices de escena a los que apunta cada una
+      finales:  set[int] de escenas que terminan la historia (reinician a INICIO)
+    """
+    # ~1 final cada 10 escenas; la última siempre es final
+    finales = set(rng.sample(range(1, escenas), max(0, escenas // 10 - 1))) if escenas > 2 else set()
+    if escenas > 1:
+        finales.add(escenas - 1)
+
+    destinos = [[] for _ in range(escenas)]
+    abiertas = [0]  # escenas anteriores (no finales) con lugar para otro botón
+
+    # Árbol de alcance: cada escena cuelga de alguna anterior que no sea final
+    for i in range(1, escenas):
+        j = rng.randrange(len(abiertas)) if abiertas else None
+        padre = abiertas[j] if j is not None else max(k for k in range(i) if k not in finales)
+        destinos[padre].append(i)
+        if j is not None and len(destinos[padre]) >= ramificacion:
+            abiertas[j] = abiertas[-1]
+            abiertas.pop()
+        if i not in finales:
+            abiertas.append(i)
+
+    # Completar los botones libres con escenas posteriores al azar (convergencias)
+    for i in range(escenas):
+        if i in finales or escenas == 1:
+            continue
+        if not destinos[i]:
+            # Siempre hay un botón hacia adelante: como la última escena es final,
+            # desde cualquier escena se llega a algún final
+            destinos[i].append(rng.randrange(i + 1, escenas))
+        faltan = rng.randint(1, ramificacion) - len(destinos[i])
+        for _ in range(max(0, faltan)):
+            destino = rng.randrange(i + 1, escenas)
+            if destino not in destinos[i]:
+                destinos[i].append(destino)
+
+    return destinos, finales
+
+
+# ─── Historia ───────────────────────────────────────────────────────
+
+def _id_escena(i):
+    return 'INICIO' if i == 0 else f'ESCENA_{i:05d}'
+
+
+def _config_desafio(subtipo, k):
+    """configuracion mínima válida para cada subtipo."""
+    if subtipo == 'pregunta_real':
+        return {
+            'preguntas': [{
+                'pregunta': f'¿Cuántas piedras hay en el camino número {k}?',
+                'opciones': [
+                    {'texto': 'Tres', 'correcta': True},
+                    {'texto': 'Cinco', 'correcta': False},
+                ],
+            }],
+        }
+    if subtipo == 'minijuego_clicks':
+        return {
+            'ubicacion_instrucciones': 'arriba',
+            'objetivo_clicks': 3,
+            'objeto_interactivo': {'imagen': f'objeto_{k}.webp', 'x': 50, 'y': 80, 'ancho': 15},
+            'mensajes_progreso': ['¡Una vez!', '¡Dos veces!', '¡Casi listo!'],
+        }
+    return {
+        'ubicacion_instrucciones': 'arriba',
+        'elementos_interactivos': [
+            {'id': 'distractor', 'imagen': f'objeto_{k}.webp', 'x': 20, 'y': 80, 'ancho': 15},
+            {'id': 'objetivo', 'imagen': f'objeto_{k}.webp', 'x': 70, 'y': 90, 'ancho': 15, 'correcto': True},
+        ],
+    }
+
+
+def generar_historia(dir_historia, id_historia, escenas=100, desafios=4, ramificacion=3,
+                     personajes=6, rng=None):
+    """
+    Escribe una historia completa en `dir_historia`.
+
+    Retorna dict con las rutas generadas relativas a la historia, separadas en
+    'datos' e 'imagenes' (para armar los grupos del Service Worker) y 'audios'.
+    """
+    rng = rng or random.Random(0)
+    escenas = max(1, escenas)
+    desafios = max(0, min(desafios, escenas - 1))
+    ramificacion = max(1, ramificacion)
+    personajes = max(1, personajes)
+
+    destinos, finales = _armar_grafo(rng, escenas, ramificacion)
+    ids_personaje = [f'personaje_{p:02d}' for p in range(personajes)]
+    fondos = [f'fondo_{f:03d}.webp' for f in range(max(1, escenas // 5))]
+
+    # Cada desafío se intercala en un botón: escena → desafío → (éxito) destino original
+    botones = [(i, b) for i in range(escenas) if i not in finales for b in range(len(destinos[i]))]
+    por_desafio = dict(zip(rng.sample(botones, min(desafios, len(botones))), range(desafios)))
+
+    datos_desafios = []
+    for (i, b), k in sorted(por_desafio.items(), key=lambda x: x[1]):
+        subtipo = SUBTIPOS_DESAFIO[k % len(SUBTIPOS_DESAFIO)]
+        datos_desafios.append({
+            'id': f'DESAFIO_{k:04d}',
+            'tipo': 'desafio',
+            'subtipo': subtipo,
+            'instruccion': f'Superá la prueba número {k} para seguir.',
+            'fondo': fondos[k % len(fondos)],
+            'configuracion': _config_desafio(subtipo, k),
+            'resultado_exito': {'target': _id_escena(destinos[i][b]), 'recompensa': f'recompensa_{k}'},
+            'resultado_fallo': {'target': _id_escena(i), 'mensaje': '¡Casi! Probá de nuevo.'},
+        })
+
+    datos_escenas = []
+    for i in range(escenas):
+        personaje = ids_personaje[i % personajes]
+        escena = {
+            'id': _id_escena(i),
+            'tipo': 'escena',
+            'fondo': fondos[i % len(fondos)],
+            'texto': f'Llegás a {rng.choice(LUGARES)}. {rng.choice(SUCESOS)} ¿Qué querés hacer?',
+            'elementos': [{
+                'tipo': 'personaje',
+                'id': personaje,
+                'imagen': f'{personaje}.webp',
+                'estilo': {'x': 30, 'y': 100, 'ancho': 25, 'z_index': 10},
+            }],
+            'opciones': [],
+        }
+        if i in finales:
+            escena['texto'] = f'Llegás a {rng.choice(LUGARES)} y la aventura termina acá. ¡Fin!'
+            escena['opciones'].append({'texto': 'Volver a empezar', 'accion': 'reiniciar',
+                                       'target': 'INICIO', 'tipo_target': 'escena'})
+        for b, destino in enumerate(destinos[i]):
+            k = por_desafio.get((i, b))
+            escena['opciones'].append({
+                'texto': f'{rng.choice(ACCIONES)} ({b + 1})',
+                'accion': 'navegar',
+                'target': f'DESAFIO_{k:04d}' if k is not None else _id_escena(destino),
+                'tipo_target': 'desafio' if k is not None else 'escena',
+            })
+        datos_escenas.append(escena)
+
+    # La escena a la que lleva ganar un desafío esconde un botón extra que solo
+    # aparece con su recompensa (así la condición siempre se puede cumplir)
+    posicion = {e['id']: i for i, e in enumerate(datos_escenas)}
+    for desafio in datos_desafios:
+        i = posicion[desafio['resultado_exito']['target']]
+        escena = datos_escenas[i]
+        if i in finales:
+            continue
+        escena['opciones'].append({
+            'texto': 'Usar lo que encontraste',
+            'accion': 'navegar',
+            'target': _id_escena(rng.randrange(i + 1, escenas)),
+            'tipo_target': 'escena',
+            'condicion': f'tiene_{desafio["resultado_exito"]["recompensa"]}',
+        })
+
+    generados = {'datos': [], 'imagenes': [], 'audios': []}
+
+    for escena in datos_escenas:
+        rel = f'datos/escenas/{escena["id"]}.json'
+        _escribir_json(dir_historia / rel, escena)
+        generados['datos'].append(rel)
+    for desafio in datos_desafios:
+        rel = f'datos/desafios/{desafio["id"]}.json'
+        _escribir_json(dir_historia / rel, desafio)
+        generados['datos'].append(rel)
+
+    titulo = f'Historia Sintética {id_historia.rsplit("-", 1)[-1]}'
+    _escribir_json(dir_historia / 'historia.json', {
+        'id': id_historia,
+        'titulo': titulo,
+        'subtitulo': 'Generada para medir las herramientas del proyecto.',
+        'portada': f'imagenes/fondos/{fondos[0]}',
+        'tarjeta': 'imagenes/tarjeta/tarjeta.webp',
+        'logo': 'imagenes/logo/logo.webp',
+        'musica_inicio': 'inicio.mp3',
+        'escena_inicial': 'INICIO',
+        'escenas': [e['id'] for e in datos_escenas],
+        'desafios': [d['id'] for d in datos_desafios],
+    })
+    generados['datos'].insert(0, 'historia.json')
+
+    imagenes = [f'imagenes/fondos/{f}' for f in fondos]
+    imagenes += [f'imagenes/personajes/{p}/{p}.webp' for p in ids_personaje]
+    imagenes += [f'imagenes/objetos/objeto_{k}.webp' for k in range(len(datos_desafios))]
+    imagenes += ['imagenes/logo/logo.webp', 'imagenes/tarjeta/tarjeta.webp']
+    for rel in imagenes:
+        _escribir_placeholder(dir_historia / rel)
+    generados['imagenes'] = imagenes
+
+    _escribir_placeholder(dir_historia / 'audios' / 'inicio.mp3', b'')
+    generados['audios'] = ['audios/inicio.mp3']
+
+    (dir_historia / 'historia.md').write_text(
+        _guion_md(titulo, datos_escenas, {d['id']: d for d in datos_desafios}), encoding='utf-8')
+
+    return generados
+
+
+def _guion_md(titulo, escenas, desafios):
+    """historia.md en el formato de guion que leen check_texts, check_opciones y update_md."""
+    lineas = [
+        f'# **Guion y Mapa de la Historia: {titulo}**',
+        '',
+        'Este documento contiene la estructura narrativa completa, las escenas, los diálogos y las decisiones del cuento interactivo.',
+        '',
+        '---',
+        '',
+        '## **Guion Detallado**',
+        '',
+    ]
+    for escena in escenas:
+        personajes = [e['imagen'] for e in escena['elementos'] if e['tipo'] == 'personaje']
+        con = f' (con `{"`, `".join(personajes)}`)' if personajes else ''
+        lineas += [
+            f'### **ESCENA: `{escena["id"]}`**',
+            f'*   **IMAGEN:** `{escena["fondo"]}`{con}.',
+            '*   **TEXTO:**',
+            f'    > {escena["texto"]}',
+            '*   **OPCIONES:**',
+        ]
+        for n, opcion in enumerate(escena['opciones'], 1):
+            destino = 'desafío ' if opcion['tipo_target'] == 'desafio' else ''
+            condicion = f' (solo con `{opcion["condicion"]}`)' if opcion.get('condicion') else ''
+            lineas.append(f'    {n}.  **Botón {n}:** "{opcion["texto"]}" -> Va a {destino}`{opcion["target"]}`{condicion}.')
+
+        for opcion in escena['opciones']:
+            desafio = desafios.get(opcion['target']) if opcion['tipo_target'] == 'desafio' else None
+            if not desafio:
+                continue
+            exito, fallo = desafio['resultado_exito'], desafio['resultado_fallo']
+            lineas += [
+                '',
+                f'*   **DESAFÍO ({desafio["subtipo"].replace("_", " ").upper()}):**',
+                f'    *   **INSTRUCCIÓN:** "{desafio["instruccion"]}"',
+                f'    *   **RESULTADO:** Éxito -> Va a `{exito["target"]}` (recompensa `{exito["recompensa"]}`). '
+                f'Fallo -> Va a `{fallo["target"]}`.',
+            ]
+        lineas.append('')
+    lineas += ['---', '']
+    return '\n'.join(lineas)
+
+
+# ─── Proyecto ───────────────────────────────────────────────────────
+
+def generar_proyecto(destino, historias=1, escenas=100, desafios=4, ramificacion=3,
+                     personajes=6, semilla=0):
+    """
+    Crea en `destino` un proyecto con `historias` historias sintéticas.
+    Retorna la lista de carpetas de historia generadas.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    for rel in BASE_PROYECTO:
+        origen = RAIZ / rel
+        if origen.is_dir():
+            shutil.copytree(origen, destino / rel, dirs_exist_ok=True)
+        elif origen.exists():
+            shutil.copy2(origen, destino / rel)
+    # auditar.py reconoce la raíz del proyecto por AGENTS.md + js/
+    if not (destino / 'AGENTS.md').exists():
+        (destino / 'AGENTS.md').write_text('# Proyecto sintético (generar_historias.py)\n', encoding='utf-8')
+
+    rng = random.Random(semilla)
+    generadas = []
+    carpetas = []
+    for n in range(historias):
+        id_historia = f'historia-sintetica-{n:04d}'
+        dir_historia = destino / 'historias' / id_historia
+        generados = generar_historia(dir_historia, id_historia, escenas, desafios, ramificacion,
+                                     personajes, random.Random(rng.random()))
+        generadas.append((id_historia, generados))
+        carpetas.append(dir_historia)
+
+    _escribir_json(destino / 'biblioteca' / 'historias.json', {
+        'historias': [{'id': h, 'ruta': f'historias/{h}/'} for h, _ in generadas],
+    })
+    # Como en el proyecto: el catálogo trae los datos de cada tarjeta (generar_catalogo.py)
+    _cargar_generar_catalogo().generar(destino)
+
+    # El SW del proyecto con el manifiesto regenerado para este árbol: los grupos de las
+    # historias reales no existen acá y se podan, las sintéticas entran por la heurística
+    shutil.copy2(RAIZ / 'service-worker.js', destino / 'service-worker.js')
+    _cargar_generar_manifiesto().generar(destino / 'service-worker.js', podar=True)
+
+    return carpetas
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Genera un proyecto sintético con historias válidas para medir las herramientas.')
+    parser.add_argument('--destino', '-d', required=True,
+                        help='Carpeta donde crear el proyecto (se crea si no existe)')
+    parser.add_argument('--historias', type=int, default=1, help='Cantidad de historias (default: 1)')
+    parser.add_argument('--escenas', type=int, default=100, help='Escenas por historia (default: 100)')
+    parser.add_argument('--desafios', type=int, default=4, help='Desafíos por historia (default: 4)')
+    parser.add_argument('--ramificacion', type=int, default=3,
+                        help='Máximo de botones de navegación por escena (default: 3)')
+    parser.add_argument('--personajes', type=int, default=6, help='Personajes por historia (default: 6)')
+    parser.add_argument('--semilla', type=int, default=0, help='Semilla del generador (default: 0)')
+    args = parser.parse_args()
+
+    destino = Path(args.destino)
+    if (destino / 'historias').exists():
+        sys.exit(f'❌ {destino} ya tiene historias/. Elegí una carpeta vacía.')
+
+    carpetas = generar_proyecto(destino, args.historias, args.escenas, args.desafios,
+                                args.ramificacion, args.personajes, args.semilla)
+    print(f'✅ {len(carpetas)} historia(s) de {args.escenas} escenas generadas en {destino.resolve()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+empaquetar.py — Empaqueta las escenas y desafíos de una historia en un solo archivo.
+
+Junta todos los JSON de datos/escenas/ y datos/desafios/ de la historia en
+datos/paquete.jsonl, minificados, para que ContentLoader haga un solo pedido
+(o pedidos por rango) en vez de un fetch por escena. Los JSON sueltos siguen
+siendo la fuente: el paquete se regenera cada vez que cambian.
+
+Formato del paquete (JSON Lines, UTF-8):
+
+  línea 1   índice: {"formato": 1, "version": "<hash>",
+                     "entradas": {"escena:INICIO": [inicio, largo], ...}}
+  línea 2…  una escena o desafío minificado por línea
+
+`inicio` y `largo` son bytes, contados desde el final de la línea del índice.
+El script también escribe en historia.json el campo `paquete` (archivo,
+versión y tamaños) que el motor usa para decidir cómo bajarlo.
+
+Uso:
+  python empaquetar.py                                  # Todas las historias
+  python empaquetar.py --historia el-misterio-del-bosque-encantado
+  python empaquetar.py --verificar                      # Exit 1 si algún paquete está desactualizado
+  python empaquetar.py --quitar --historia ID           # Volver a los JSON sueltos
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Ruta del paquete dentro de la carpeta de la historia
+ARCHIVO_PAQUETE = 'datos/paquete.jsonl'
+FORMATO_PAQUETE = 1
+
+# Tipo de contenido de ContentLoader → carpeta dentro de datos/
+CARPETAS = {'escena': 'escenas', 'desafio': 'desafios'}
+
+
+class ErrorPaquete(Exception):
+    """Un JSON fuente no se puede empaquetar."""
+
+
+def fuentes(dir_historia):
+    """(clave, ruta) de cada escena y desafío, con la clave que usa ContentLoader ("tipo:id")."""
+    for tipo, carpeta in CARPETAS.items():
+        dir_datos = dir_historia / 'datos' / carpeta
+        if dir_datos.is_dir():
+            for ruta in sorted(dir_datos.glob('*.json')):
+                yield f'{tipo}:{ruta.stem}', ruta
+
+
+def armar_paquete(dir_historia):
+    """Contenido del paquete (bytes) y el campo `paquete` para historia.json."""
+    lineas = {}
+    for clave, ruta in fuentes(dir_historia):
+        try:
+            datos = json.loads(ruta.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ErrorPaquete(f'{ruta.relative_to(dir_historia)}: {e}') from e
+        lineas[clave] = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    entradas = {}
+    inicio = 0
+    for clave, linea in lineas.items():
+        entradas[clave] = [inicio, len(linea) - 1]  # El largo no incluye el salto de línea
+        inicio += len(linea)
+    cuerpo = b''.join(lineas.values())
+
+    version = hashlib.sha256(cuerpo).hexdigest()[:16]
+    indice = {'formato': FORMATO_PAQUETE, 'version': version, 'entradas': entradas}
+    cabecera = json.dumps(indice, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    meta = {
+        'archivo': ARCHIVO_PAQUETE,
+        'version': version,
+        'bytes_indice': len(cabecera),
+        'bytes': len(cabecera) + len(cuerpo),
+    }
+    return cabecera + cuerpo, meta
+
+
+def _escribir(ruta, contenido):
+    """Escribe con reemplazo atómico: quien lea el archivo nunca ve uno a medio escribir."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _guardar_config(ruta_config, config, texto_original):
+    """Reescribe historia.json con el mismo formato (4 espacios, sin escapar acentos)."""
+    texto = json.dumps(config, ensure_ascii=False, indent=4)
+    if texto_original.endswith('\n'):
+        texto += '\n'
+    if texto != texto_original:
+        _escribir(ruta_config, texto.encode('utf-8'))
+        return True
+    return False
+
+
+def empaquetar(dir_historia, quitar=False, verificar=False):
+    """
+    Genera (o quita, o solo verifica) el paquete de una historia.
+    Retorna una línea de estado y si había algo desactualizado.
+    """
+    ruta_config = dir_historia / 'historia.json'
+    texto_config = ruta_config.read_text(encoding='utf-8')
+    config = json.loads(texto_config)
+    ruta_paquete = dir_historia / ARCHIVO_PAQUETE
+
+    if quitar:
+        quitado = config.pop('paquete', None) is not None
+        _guardar_config(ruta_config, config, texto_config)
+        if ruta_paquete.exists():
+            ruta_paquete.unlink()
+            quitado = True
+        return ('🗑️  paquete quitado' if quitado else 'sin paquete'), False
+
+    if verificar and 'paquete' not in config and not ruta_paquete.exists():
+        return 'sin paquete (usa los JSON sueltos)', False
+
+    contenido, meta = armar_paquete(dir_historia)
+    actual = ruta_paquete.read_bytes() if ruta_paquete.exists() else None
+    al_dia = actual == contenido and config.get('paquete') == meta
+    cantidad = contenido.count(b'\n') - 1
+    resumen = f'{cantidad} entradas, {meta["bytes"] / 1024:.0f} KB (versión {meta["version"]})'
+
+    if verificar:
+        if al_dia:
+            return f'✅ al día: {resumen}', False
+        motivo = 'no existe' if actual is None else 'desactualizado'
+        return f'❌ paquete {motivo}: correr empaquetar.py --historia {dir_historia.name}', True
+
+    if al_dia:
+        return f'✅ sin cambios: {resumen}', False
+    _escribir(ruta_paquete, contenido)
+    config['paquete'] = meta
+    _guardar_config(ruta_config, config, texto_config)
+    return f'📦 empaquetado: {resumen}', False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Empaqueta escenas y desafíos de cada historia en datos/paquete.jsonl.')
+    parser.add_argument('--historia', nargs='+', metavar='ID',
+                        help='Historias a empaquetar (nombre de la carpeta; default: todas)')
+    accion = parser.add_mutually_exclusive_group()
+    accion.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si algún paquete está desactualizado '
+                             '(las historias sin paquete no cuentan)')
+    accion.add_argument('--quitar', action='store_true',
+                        help='Borrar el paquete y el campo "paquete" de historia.json (el motor vuelve a los JSON sueltos)')
+    args = parser.parse_args()
+
+    dir_historias = RAIZ / 'historias'
+    if args.historia:
+        carpetas = [dir_historias / h for h in args.historia]
+    else:
+        carpetas = sorted(d for d in dir_historias.iterdir() if (d / 'historia.json').exists())
+
+    codigo = 0
+    for dir_historia in carpetas:
+        if not (dir_historia / 'historia.json').exists():
+            print(f'  ❌ {dir_historia.name}: no existe historia.json')
+            codigo = 1
+            continue
+        try:
+            estado, pendiente = empaquetar(dir_historia, quitar=args.quitar, verificar=args.verificar)
+        except ErrorPaquete as e:
+            estado, pendiente = f'❌ no se pudo empaquetar: {e}', True
+        print(f'  {dir_historia.name}: {estado}')
+        if pendiente:
+            codigo = 1
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+empaquetar_sonidos.py — Junta los efectos de sonido cortos de una historia en sprites.
+
+Cada efecto (boing.mp3, plop.mp3, respuesta_correcta.mp3...) era un archivo: una
+entrada más en la caché del SW, un pedido y un decode en el momento en que el
+desafío lo dispara. Este script concatena los efectos que usan los campos
+`sonido*` de escenas y desafíos en uno o más MP3 (sprites), y AudioManager los
+baja y decodifica una sola vez al entrar al primer desafío para después
+reproducir cada efecto como un tramo del buffer.
+
+El corte es a nivel de cuadro MP3, sin recodificar (Python puro):
+
+  - de cada archivo se toman los cuadros de audio (Layer III), sin ID3 ni el
+    cuadro Xing/Info/VBRI;
+  - entre efecto y efecto van cuadros de silencio (cabecera válida y datos en
+    cero), así el tramo de uno nunca arranca con la cola del anterior y el
+    retardo del decodificador (~529 muestras) cae dentro del silencio;
+  - un MP3 no puede cambiar de frecuencia ni de cantidad de canales a mitad
+    del stream, así que hay un sprite por formato. Un formato con un solo
+    efecto no se empaqueta (no ahorra nada).
+
+Los efectos de más de DURACION_MAXIMA segundos, y los que también se usan como
+música (`audio`, `musica_inicio`), quedan como archivos sueltos.
+
+Formato de datos/sonidos.json (JSON minificado, UTF-8):
+
+  {"formato": 1, "version": "<hash>",
+   "sprites": ["audios/sprites/sonidos_24000.mp3", ...],
+   "sonidos": {"boing.mp3": {"sprite": 0, "inicio": 0.048, "duracion": 0.648,
+                             "huella": "<hash del original>"}, ...}}
+
+`inicio` y `duracion` están en segundos e incluyen la mitad del silencio de cada
+lado. El script también escribe en historia.json el campo `sonidos` (archivo y
+versión), que es lo que el motor mira para usarlo; generar-manifiesto.py deja
+afuera del SW los efectos empaquetados. Los MP3 sueltos siguen siendo la
+fuente: los sprites se regeneran cada vez que cambian.
+
+Uso:
+  python empaquetar_sonidos.py                                  # Todas las historias
+  python empaquetar_sonidos.py --historia el-misterio-del-bosque-encantado
+  python empaquetar_sonidos.py --verificar                      # Exit 1 si algún sprite está desactualizado
+  python empaquetar_sonidos.py --quitar --historia ID           # Volver a los efectos sueltos
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Rutas dentro de la carpeta de la historia
+ARCHIVO_SONIDOS = 'datos/sonidos.json'
+CARPETA_SPRITES = 'audios/sprites'
+FORMATO_SONIDOS = 1
+
+# Efectos más largos quedan sueltos (una música corta no es un efecto)
+DURACION_MAXIMA = 5.0
+
+# Silencio mínimo entre efectos, en segundos (se redondea a cuadros enteros)
+SILENCIO = 0.06
+
+# Bitrate (kbps) por índice de la cabecera, Layer III: MPEG-1 y MPEG-2/2.5
+BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Frecuencia (Hz) por versión (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5) e índice
+FRECUENCIAS = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# Campos de escenas y desafíos que reproducen música (no efectos)
+CAMPOS_MUSICA = ('audio', 'musica_inicio')
+
+
+class ErrorSonidos(Exception):
+    """Un efecto no se puede leer como MP3."""
+
+
+def _cabecera(palabra):
+    """(version, frecuencia, mono, tamaño del cuadro) de una cabecera MP3 Layer III, o None si no es una."""
+    if palabra >> 21 != 0x7FF:
+        return None
+    version = (palabra >> 19) & 3
+    capa = (palabra >> 17) & 3
+    indice_bitrate = (palabra >> 12) & 15
+    indice_frecuencia = (palabra >> 10) & 3
+    if version == 1 or capa != 1 or indice_bitrate in (0, 15) or indice_frecuencia == 3:
+        return None  # Versión reservada, otra capa, bitrate libre o inválido
+    bitrate = BITRATES[version == 3][indice_bitrate] * 1000
+    frecuencia = FRECUENCIAS[version][indice_frecuencia]
+    tamano = (144 if version == 3 else 72) * bitrate // frecuencia + ((palabra >> 9) & 1)
+    return version, frecuencia, (palabra >> 6) & 3 == 3, tamano
+
+
+def muestras_por_cuadro(formato):
+    return 1152 if formato[0] == 3 else 576
+
+
+def _es_cuadro_vbr(cuadro, formato):
+    """El primer cuadro de muchos encoders no es audio: trae la tabla Xing/Info (o VBRI)."""
+    version, _, mono, _ = formato
+    lateral = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+    inicio = 4 + lateral + (0 if cuadro[1] & 1 else 2)  # +2 con CRC
+    return cuadro[inicio:inicio + 4] in (b'Xing', b'Info') or cuadro[36:40] == b'VBRI'
+
+
+def leer_mp3(ruta):
+    """
+    Cuadros de audio de un MP3: (formato, [bytes de cada cuadro]).
+    formato = (version, frecuencia, mono, tamaño del primer cuadro).
+    """
+    datos = ruta.read_bytes()
+    i = 0
+    if datos[:3] == b'ID3' and len(datos) >= 10:
+        tamano = (datos[6] & 0x7F) << 21 | (datos[7] & 0x7F) << 14 | (datos[8] & 0x7F) << 7 | (datos[9] & 0x7F)
+        i = 10 + tamano + (10 if datos[5] & 0x10 else 0)
+
+    formato, cuadros = None, []
+    while i + 4 <= len(datos):
+        cabecera = _cabecera(int.from_bytes(datos[i:i + 4], 'big'))
+        if cabecera is None or i + cabecera[3] > len(datos):
+            break  # Fin del audio: ID3v1, APE o un cuadro cortado
+        if formato is None:
+            formato = cabecera
+        elif cabecera[:3] != formato[:3]:
+            raise ErrorSonidos(f'{ruta.name}: cambia de frecuencia o de canales a mitad del archivo')
+        cuadros.append(datos[i:i + cabecera[3]])
+        i += cabecera[3]
+
+    if not cuadros:
+        raise ErrorSonidos(f'{ruta.name}: no es un MP3 (Layer III) válido')
+    if _es_cuadro_vbr(cuadros[0], formato):
+        cuadros.pop(0)
+    return formato, cuadros
+
+
+def _cuadro_silencio(cuadro):
+    """
+    Cuadro con la cabecera de `cuadro` y datos en cero: se decodifica como silencio.
+    Va sin CRC ni relleno y con el bitrate más bajo (alcanza para la información lateral en cero).
+    """
+    palabra = (int.from_bytes(cuadro[:4], 'big') | 1 << 16) & ~(1 << 9) & ~(0xF << 12) | 1 << 12
+    return palabra.to_bytes(4, 'big') + bytes(_cabecera(palabra)[3] - 4)
+
+
+def _campos_sonido(valor, musica):
+    """Archivos de los campos `sonido*` a cualquier profundidad; los de música van a `musica`."""
+    if isinstance(valor, dict):
+        for clave, sub in valor.items():
+            if isinstance(sub, str) and sub:
+                if clave.startswith('sonido'):
+                    yield sub
+                elif clave in CAMPOS_MUSICA:
+                    musica.add(sub)
+            else:
+                yield from _campos_sonido(sub, musica)
+    elif isinstance(valor, list):
+        for sub in valor:
+            yield from _campos_sonido(sub, musica)
+
+
+def efectos_usados(dir_historia):
+    """Nombres de los efectos que disparan escenas y desafíos y que no se usan también como música."""
+    musica, efectos = set(), set()
+    try:
+        config = json.loads((dir_historia / 'historia.json').read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        config = {}
+    efectos.update(_campos_sonido(config, musica))
+    for carpeta in ('escenas', 'desafios'):
+        dir_datos = dir_historia / 'datos' / carpeta
+        for ruta in sorted(dir_datos.glob('*.json')) if dir_datos.is_dir() else []:
+            try:
+                efectos.update(_campos_sonido(json.loads(ruta.read_text(encoding='utf-8')), musica))
+            except (OSError, json.JSONDecodeError):
+                continue  # JSON roto: lo reporta auditar.py
+    return sorted(efectos - musica)
+
+
+def armar_sprites(dir_historia):
+    """
+    Sprites de una historia según sus efectos.
+    Retorna ({ruta del sprite: bytes}, {efecto: tramo}, avisos).
+    """
+    avisos, por_formato = [], {}
+    for nombre in efectos_usados(dir_historia):
+        ruta = dir_historia / 'audios' / nombre
+        if not ruta.is_file():
+            continue  # Audio que falta: lo reporta auditar.py
+        if ruta.suffix.lower() != '.mp3':
+            avisos.append(f'{nombre}: no es MP3, queda suelto')
+            continue
+        try:
+            formato, cuadros = leer_mp3(ruta)
+        except ErrorSonidos as e:
+            avisos.append(f'{e}, queda suelto')
+            continue
+        duracion = len(cuadros) * muestras_por_cuadro(formato) / formato[1]
+        if duracion > DURACION_MAXIMA:
+            avisos.append(f'{nombre}: dura {duracion:.1f} s (más de {DURACION_MAXIMA:g}), queda suelto')
+            continue
+        huella = hashlib.sha256(ruta.read_bytes()).hexdigest()[:16]
+        por_formato.setdefault(formato[:3], []).append((nombre, cuadros, huella))
+
+    sprites, tramos = {}, {}
+    for (version, frecuencia, mono), efectos in sorted(por_formato.items(), key=lambda item: item[0][1:]):
+        if len(efectos) < 2:
+            avisos.append(f'{efectos[0][0]}: es el único efecto de {frecuencia} Hz'
+                          f'{" mono" if mono else ""}, queda suelto')
+            continue
+        segundos = muestras_por_cuadro((version,)) / frecuencia
+        silencio = [_cuadro_silencio(efectos[0][1][0])] * math.ceil(SILENCIO / segundos)
+        margen = len(silencio) * segundos / 2
+        rel = f'{CARPETA_SPRITES}/sonidos_{frecuencia}{"_mono" if mono else ""}.mp3'
+        indice = len(sprites)
+        partes = list(silencio)
+        for nombre, cuadros, huella in efectos:
+            tramos[nombre] = {'sprite': indice,
+                              'inicio': round(len(partes) * segundos - margen, 6),
+                              'duracion': round(len(cuadros) * segundos + 2 * margen, 6),
+                              'huella': huella}
+            partes += cuadros + silencio
+        sprites[rel] = b''.join(partes)
+    return sprites, tramos, avisos
+
+
+def _contenido(sprites, tramos):
+    """Bytes de datos/sonidos.json y el campo `sonidos` de historia.json."""
+    huellas = {rel: hashlib.sha256(datos).hexdigest()[:16] for rel, datos in sprites.items()}
+    cuerpo = {'sprites': list(sprites), 'sonidos': tramos}
+    semilla = json.dumps({'huellas': huellas, **cuerpo}, sort_keys=True, separators=(',', ':'))
+    version = hashlib.sha256(semilla.encode('utf-8')).hexdigest()[:16]
+    tabla = {'formato': FORMATO_SONIDOS, 'version': version, **cuerpo}
+    contenido = json.dumps(tabla, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+    return contenido, {'archivo': ARCHIVO_SONIDOS, 'version': version}
+
+
+def _archivos_sprites(dir_historia):
+    """Rutas (relativas a la historia) de los archivos que hay en audios/sprites/."""
+    carpeta = dir_historia / CARPETA_SPRITES
+    if not carpeta.is_dir():
+        return set()
+    return {r.relative_to(dir_historia).as_posix() for r in carpeta.iterdir() if r.is_file()}
+
+
+def _escribir(ruta, contenido):
+    """Escribe con reemplazo atómico: quien lea el archivo nunca ve uno a medio escribir."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _guardar_config(ruta_config, config, texto_original):
+    """Reescribe historia.json con el mismo formato (4 espacios, sin escapar acentos)."""
+    texto = json.dumps(config, ensure_ascii=False, indent=4)
+    if texto_original.endswith('\n'):
+        texto += '\n'
+    if texto != texto_original:
+        _escribir(ruta_config, texto.encode('utf-8'))
+
+
+def generar(dir_historia, quitar=False, verificar=False):
+    """
+    Empaqueta (o quita, o solo verifica) los efectos de una historia.
+    Retorna una línea de estado y si había algo desactualizado.
+    """
+    ruta_config = dir_historia / 'historia.json'
+    texto_config = ruta_config.read_text(encoding='utf-8')
+    config = json.loads(texto_config)
+    ruta_tabla = dir_historia / ARCHIVO_SONIDOS
+
+    if quitar:
+        quitado = config.pop('sonidos', None) is not None
+        _guardar_config(ruta_config, config, texto_config)
+        if ruta_tabla.exists():
+            ruta_tabla.unlink()
+            quitado = True
+        if (dir_historia / CARPETA_SPRITES).is_dir():
+            shutil.rmtree(dir_historia / CARPETA_SPRITES)
+            quitado = True
+        return ('🗑️  sprites quitados' if quitado else 'sin sprites'), False
+
+    en_disco = _archivos_sprites(dir_historia)
+    if verificar and 'sonidos' not in config and not ruta_tabla.exists() and not en_disco:
+        return 'sin sprites (efectos sueltos)', False
+
+    sprites, tramos, avisos = armar_sprites(dir_historia)
+    contenido, meta = _contenido(sprites, tramos)
+    cambiados = [rel for rel, datos in sprites.items()
+                 if not (dir_historia / rel).is_file() or (dir_historia / rel).read_bytes() != datos]
+    sobrantes = sorted(en_disco - set(sprites))
+    actual = ruta_tabla.read_bytes() if ruta_tabla.exists() else None
+    al_dia = not cambiados and not sobrantes and actual == contenido and config.get('sonidos') == meta
+
+    bytes_sprites = sum(len(datos) for datos in sprites.values())
+    bytes_sueltos = sum((dir_historia / 'audios' / nombre).stat().st_size for nombre in tramos)
+    resumen = (f'{len(tramos)} efectos en {len(sprites)} sprite(s), {len(tramos) - len(sprites)} archivo(s) '
+               f'menos, {bytes_sprites / 1024:.0f} KB (sueltos: {bytes_sueltos / 1024:.0f} KB) '
+               f'(versión {meta["version"]})')
+    resumen += ''.join(f'\n     ⚠️  {aviso}' for aviso in avisos)
+
+    if verificar:
+        if al_dia:
+            return f'✅ al día: {resumen}', False
+        detalle = []
+        if cambiados:
+            detalle.append(f'{len(cambiados)} sprite(s) por regenerar')
+        if sobrantes:
+            detalle.append(f'{len(sobrantes)} que sobran')
+        if actual != contenido or config.get('sonidos') != meta:
+            detalle.append('tabla desactualizada')
+        return (f'❌ {", ".join(detalle)}: correr empaquetar_sonidos.py --historia {dir_historia.name}'), True
+
+    if al_dia:
+        return f'✅ sin cambios: {resumen}', False
+
+    for rel in cambiados:
+        _escribir(dir_historia / rel, sprites[rel])
+    for rel in sobrantes:
+        (dir_historia / rel).unlink()
+    if not sprites:
+        # Sin formatos con dos o más efectos: nada que empaquetar
+        if (dir_historia / CARPETA_SPRITES).is_dir() and not any((dir_historia / CARPETA_SPRITES).iterdir()):
+            (dir_historia / CARPETA_SPRITES).rmdir()
+        if ruta_tabla.exists():
+            ruta_tabla.unlink()
+        config.pop('sonidos', None)
+        _guardar_config(ruta_config, config, texto_config)
+        return f'sin efectos para empaquetar{resumen[resumen.find(chr(10)):] if avisos else ""}', False
+
+    _escribir(ruta_tabla, contenido)
+    config['sonidos'] = meta
+    _guardar_config(ruta_config, config, texto_config)
+    return f'🔊 sprites generados: {resumen}', False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Junta los efectos de sonido cortos de cada historia en sprites MP3 con una tabla de tramos.')
+    parser.add_argument('--historia', nargs='+', metavar='ID',
+                        help='Historias a procesar (nombre de la carpeta; default: todas)')
+    accion = parser.add_mutually_exclusive_group()
+    accion.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si algún sprite o tabla está desactualizado '
+                             '(las historias sin sprites no cuentan)')
+    accion.add_argument('--quitar', action='store_true',
+                        help='Borrar los sprites y el campo "sonidos" de historia.json (vuelve a los efectos sueltos)')
+    args = parser.parse_args()
+
+    dir_historias = RAIZ / 'historias'
+    if args.historia:
+        carpetas = [dir_historias / h for h in args.historia]
+    else:
+        carpetas = sorted(d for d in dir_historias.iterdir() if (d / 'historia.json').exists())
+
+    codigo = 0
+    for dir_historia in carpetas:
+        if not (dir_historia / 'historia.json').exists():
+            print(f'  ❌ {dir_historia.name}: no existe historia.json')
+            codigo = 1
+            continue
+        estado, pendiente = generar(dir_historia, quitar=args.quitar, verificar=args.verificar)
+        print(f'  {dir_historia.name}: {estado}')
+        if pendiente:
+            codigo = 1
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+generar_catalogo.py — Completa el catálogo de la biblioteca con los datos de cada historia.
+
+biblioteca/historias.json lista las historias publicadas (`id` y `ruta`, a mano).
+Este script le agrega a cada entrada lo que la pantalla de la biblioteca necesita
+para dibujar la tarjeta — `titulo`, `portada`, `tarjeta`, `logo` y `colores`,
+copiados de su historia.json — y `archivos`: hash (sha256, 16 caracteres) y
+tamaño en bytes de historia.json y de esas imágenes. Así BibliotecaManager
+arranca con un solo pedido, sin bajar el historia.json de cada historia.
+
+historia.json sigue siendo la fuente: el catálogo se regenera cada vez que
+cambia (también después de empaquetar.py, que escribe ahí el campo `paquete`).
+
+Uso:
+  python generar_catalogo.py                # Regenerar biblioteca/historias.json
+  python generar_catalogo.py --verificar    # Exit 1 si el catálogo está desactualizado
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+ARCHIVO_CATALOGO = 'biblioteca/historias.json'
+
+# Campos de historia.json que se copian al catálogo (los que usa la tarjeta y la pantalla de carga)
+CAMPOS = ('titulo', 'portada', 'tarjeta', 'logo', 'colores')
+
+# Campos que son rutas de imagen (relativas a la carpeta de la historia)
+IMAGENES = ('portada', 'tarjeta', 'logo')
+
+
+class ErrorCatalogo(Exception):
+    """Una entrada del catálogo no apunta a un historia.json válido."""
+
+
+def firma_archivo(ruta):
+    """{"hash", "bytes"} de un archivo tal como lo sirve el servidor, o None si no existe."""
+    try:
+        contenido = ruta.read_bytes()
+    except OSError:
+        return None
+    return {'hash': hashlib.sha256(contenido).hexdigest()[:16], 'bytes': len(contenido)}
+
+
+def entrada_catalogo(raiz, entrada):
+    """La entrada del catálogo con los datos precalculados de su historia."""
+    id_historia = entrada.get('id')
+    ruta = entrada.get('ruta')
+    if not id_historia or not isinstance(ruta, str):
+        raise ErrorCatalogo(f'entrada sin "id" o "ruta": {entrada}')
+    dir_historia = raiz / ruta
+    try:
+        config = json.loads((dir_historia / 'historia.json').read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ErrorCatalogo(f'{id_historia}: no se pudo leer historia.json ({e})') from e
+
+    nueva = {'id': id_historia, 'ruta': ruta}
+    nueva.update((campo, config[campo]) for campo in CAMPOS if campo in config)
+
+    # Las imágenes que faltan no se listan: las reporta auditar.py --categoria cross
+    archivos = {}
+    for archivo in ['historia.json'] + [config[c] for c in IMAGENES if isinstance(config.get(c), str)]:
+        firma = firma_archivo(dir_historia / archivo)
+        if firma is not None:
+            archivos[archivo] = firma
+    nueva['archivos'] = archivos
+    return nueva
+
+
+def armar_catalogo(raiz, catalogo):
+    """El catálogo con cada entrada regenerada (el orden y el resto de las claves se respetan)."""
+    nuevo = dict(catalogo)
+    nuevo['historias'] = [entrada_catalogo(raiz, entrada) for entrada in catalogo.get('historias', [])]
+    return nuevo
+
+
+def _escribir(ruta, contenido):
+    """Escribe con reemplazo atómico: quien lea el archivo nunca ve uno a medio escribir."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def generar(raiz, verificar=False):
+    """
+    Regenera (o solo verifica) el catálogo de `raiz`.
+    Retorna una línea de estado y si había algo desactualizado.
+    """
+    ruta_catalogo = raiz / ARCHIVO_CATALOGO
+    texto = ruta_catalogo.read_text(encoding='utf-8')
+    catalogo = json.loads(texto)
+    nuevo = json.dumps(armar_catalogo(raiz, catalogo), ensure_ascii=False, indent=4) + '\n'
+    cantidad = len(catalogo.get('historias', []))
+
+    if nuevo == texto:
+        return f'✅ al día: {cantidad} historia(s)', False
+    if verificar:
+        return '❌ catálogo desactualizado: correr generar_catalogo.py', True
+    _escribir(ruta_catalogo, nuevo.encode('utf-8'))
+    return f'📚 catálogo generado: {cantidad} historia(s), {len(nuevo.encode("utf-8")) / 1024:.1f} KB', False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Agrega a biblioteca/historias.json los datos de cada historia que usa la biblioteca.')
+    parser.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si el catálogo está desactualizado')
+    args = parser.parse_args()
+
+    if not (RAIZ / ARCHIVO_CATALOGO).exists():
+        print(f'  ❌ no existe {ARCHIVO_CATALOGO}')
+        return 1
+    try:
+        estado, pendiente = generar(RAIZ, verificar=args.verificar)
+    except (ErrorCatalogo, json.JSONDecodeError) as e:
+        estado, pendiente = f'❌ no se pudo generar: {e}', True
+    print(f'  {ARCHIVO_CATALOGO}: {estado}')
+    return 1 if pendiente else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
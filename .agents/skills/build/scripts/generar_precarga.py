@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+generar_precarga.py — Precalcula qué precargar desde cada escena y desafío de una historia.
+
+GameEngine precarga mientras se lee una escena. Sin este mapa solo mira un salto
+adelante (las opciones de la escena) y para cada una tiene que bajar su JSON
+antes de enterarse de qué imágenes pide. Con el mapa, apenas se muestra un nodo
+ya sabe los JSON y las imágenes de todo lo que está a --saltos o menos, ordenados
+por la probabilidad de necesitarlos:
+
+  - cada opción visible de una escena tiene la misma probabilidad; una opción
+    condicional (`condicion: "tiene_X"`) pesa la mitad si X se puede conseguir
+    y cero si nunca se habilita (según el recorrido de GrafoHistoria de
+    auditar.py, el mismo de la categoría `grafo`);
+  - un desafío va a `resultado_exito` o a `resultado_fallo` con la misma probabilidad;
+  - el peso de un recurso es la probabilidad más alta de llegar, dentro de los
+    saltos, a un nodo que lo pide. Las imágenes del propio nodo no se listan
+    (ya se bajaron para mostrarlo).
+
+Las imágenes salen de las mismas reglas que ImagePreloader.extraerImagenes()
+(recursos_de() en auditar.py). Los JSON sueltos siguen siendo la fuente: el mapa
+se regenera cada vez que cambian.
+
+Formato de datos/precarga.json (JSON minificado, UTF-8):
+
+  {"formato": 1, "version": "<hash>", "fuentes": "<hash>", "saltos": 2,
+   "nodos": ["escena:INICIO", ...],
+   "imagenes": ["imagenes/fondos/bosque.webp", ...],
+   "precarga": [[[nodos...], [imagenes...]], ...]}
+
+`precarga[i]` es lo que hay que precargar desde `nodos[i]`: índices en `nodos`
+(JSON) y en `imagenes` (relativas a la carpeta de la historia), de más a menos
+probable. `fuentes` es el hash de los JSON de escenas y desafíos con los que se
+generó. El script también escribe en historia.json el campo `precarga`
+(archivo y versión), que es lo que el motor mira para usarlo.
+
+Uso:
+  python generar_precarga.py                                  # Todas las historias
+  python generar_precarga.py --historia el-misterio-del-bosque-encantado
+  python generar_precarga.py --saltos 3                       # Mirar tres transiciones adelante
+  python generar_precarga.py --verificar                      # Exit 1 si algún mapa está desactualizado
+  python generar_precarga.py --quitar --historia ID           # Volver a la precarga de un salto
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Ruta del mapa dentro de la carpeta de la historia
+ARCHIVO_PRECARGA = 'datos/precarga.json'
+FORMATO_PRECARGA = 1
+
+# Transiciones hacia adelante que cubre el mapa
+SALTOS = 2
+
+# Peso relativo de una opción condicional que se puede habilitar (una sin condición pesa 1)
+PESO_CONDICIONAL = 0.5
+
+# Tipo de nodo → carpeta dentro de datos/
+CARPETAS = {'escena': 'escenas', 'desafio': 'desafios'}
+
+
+class ErrorPrecarga(Exception):
+    """La historia no tiene un grafo desde el que calcular el mapa."""
+
+
+def _cargar_auditar():
+    """Importa auditar.py de la skill code-auditor (grafo de la historia y recursos de cada nodo)."""
+    ruta = Path(__file__).resolve().parents[2] / 'code-auditor' / 'scripts' / 'auditar.py'
+    spec = importlib.util.spec_from_file_location('auditar', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def huella_fuentes(dir_historia):
+    """Hash de los JSON de escenas y desafíos (ruta y contenido), para saber si el mapa quedó viejo."""
+    partes = []
+    for carpeta in CARPETAS.values():
+        dir_datos = dir_historia / 'datos' / carpeta
+        for ruta in sorted(dir_datos.glob('*.json')) if dir_datos.is_dir() else []:
+            partes.append(f'{carpeta}/{ruta.name}:{hashlib.sha256(ruta.read_bytes()).hexdigest()[:16]}')
+    return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()[:16]
+
+
+def _transiciones(grafo, nodo):
+    """Destinos de un nodo con su probabilidad: [(nodo destino, probabilidad)]."""
+    datos = grafo.datos[nodo]
+    pesos = []
+    if grafo.nodos[nodo][0] == 'desafio':
+        for campo in ('resultado_exito', 'resultado_fallo'):
+            resultado = datos.get(campo)
+            if isinstance(resultado, dict) and resultado.get('target'):
+                pesos.append((grafo._nodo('escena', resultado['target']), 1.0))
+    else:
+        opciones = datos.get('opciones')
+        opciones = [o for o in opciones if isinstance(o, dict)] if isinstance(opciones, list) else []
+        for j, opcion in enumerate(opciones):
+            if opcion.get('accion') == 'reiniciar' or not opcion.get('target'):
+                continue
+            if not opcion.get('condicion'):
+                peso = 1.0
+            elif (nodo, j) in grafo.habilitadas or grafo.truncado:
+                peso = PESO_CONDICIONAL
+            else:
+                continue  # Nunca se habilita
+            pesos.append((grafo._nodo(opcion.get('tipo_target') or 'escena', opcion['target']), peso))
+
+    pesos = [(destino, peso) for destino, peso in pesos if destino is not None]
+    total = sum(peso for _, peso in pesos)
+    return [(destino, peso / total) for destino, peso in pesos] if total else []
+
+
+def _alcance(transiciones, origen, saltos):
+    """Probabilidad más alta de estar en cada nodo dentro de `saltos` transiciones desde `origen`."""
+    alcance = {}
+    frente = {origen: 1.0}
+    for _ in range(saltos):
+        siguiente = defaultdict(float)
+        for nodo, probabilidad in frente.items():
+            for destino, p in transiciones[nodo]:
+                siguiente[destino] += probabilidad * p
+        for nodo, probabilidad in siguiente.items():
+            if nodo != origen:
+                alcance[nodo] = max(alcance.get(nodo, 0.0), probabilidad)
+        frente = siguiente
+    return alcance
+
+
+def armar_mapa(dir_historia, saltos=SALTOS, auditar=None):
+    """Contenido del mapa (bytes) y el campo `precarga` para historia.json."""
+    auditar = auditar or _cargar_auditar()
+    raiz = dir_historia.parents[1]
+    indice = auditar.IndiceProyecto(raiz)
+    config, _ = indice.json(indice.rel(dir_historia / 'historia.json'))
+    escena_inicial = config.get('escena_inicial') if isinstance(config, dict) else None
+    if not isinstance(escena_inicial, str):
+        raise ErrorPrecarga('historia.json no tiene escena_inicial')
+
+    grafo = auditar.GrafoHistoria(indice, dir_historia)
+    inicio = grafo.cargar(escena_inicial)
+    if inicio is None:
+        raise ErrorPrecarga(f'no existe la escena inicial "{escena_inicial}"')
+    grafo.explorar(inicio)
+
+    # cargar() solo trae los nodos alcanzables; los que referencian y no existen quedan en None
+    nodos = [n for n in range(len(grafo.nodos)) if grafo.datos[n] is not None]
+    prefijo = indice.rel(dir_historia) + '/'
+    imagenes_de = {
+        n: [rel[len(prefijo):] for rel, clase in auditar.recursos_de(grafo.datos[n], prefijo) if clase == 'imagen']
+        for n in nodos
+    }
+    transiciones = {n: _transiciones(grafo, n) for n in nodos}
+
+    posicion = {n: i for i, n in enumerate(nodos)}
+    claves = [f'{tipo}:{id_nodo}' for tipo, id_nodo in (grafo.nodos[n] for n in nodos)]
+    imagenes = sorted({imagen for lista in imagenes_de.values() for imagen in lista})
+    posicion_imagen = {imagen: i for i, imagen in enumerate(imagenes)}
+
+    precarga = []
+    for origen in nodos:
+        alcance = _alcance(transiciones, origen, saltos)
+        propias = set(imagenes_de[origen])
+        pesos_imagen = {}
+        for nodo, probabilidad in alcance.items():
+            for imagen in imagenes_de[nodo]:
+                if imagen not in propias:
+                    pesos_imagen[imagen] = max(pesos_imagen.get(imagen, 0.0), probabilidad)
+        # De más a menos probable; a igual peso, por nombre (el mapa no cambia si nada cambió)
+        orden_nodos = sorted(alcance, key=lambda n: (-alcance[n], claves[posicion[n]]))
+        orden_imagenes = sorted(pesos_imagen, key=lambda i: (-pesos_imagen[i], i))
+        precarga.append([[posicion[n] for n in orden_nodos], [posicion_imagen[i] for i in orden_imagenes]])
+
+    cuerpo = {'saltos': saltos, 'nodos': claves, 'imagenes': imagenes, 'precarga': precarga}
+    version = hashlib.sha256(json.dumps(cuerpo, separators=(',', ':')).encode('utf-8')).hexdigest()[:16]
+    mapa = {'formato': FORMATO_PRECARGA, 'version': version, 'fuentes': huella_fuentes(dir_historia), **cuerpo}
+    contenido = json.dumps(mapa, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+    return contenido, {'archivo': ARCHIVO_PRECARGA, 'version': version}
+
+
+def _escribir(ruta, contenido):
+    """Escribe con reemplazo atómico: quien lea el archivo nunca ve uno a medio escribir."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _guardar_config(ruta_config, config, texto_original):
+    """Reescribe historia.json con el mismo formato (4 espacios, sin escapar acentos)."""
+    texto = json.dumps(config, ensure_ascii=False, indent=4)
+    if texto_original.endswith('\n'):
+        texto += '\n'
+    if texto != texto_original:
+        _escribir(ruta_config, texto.encode('utf-8'))
+        return True
+    return False
+
+
+def generar(dir_historia, saltos=SALTOS, quitar=False, verificar=False, auditar=None):
+    """
+    Genera (o quita, o solo verifica) el mapa de precarga de una historia.
+    Retorna una línea de estado y si había algo desactualizado.
+    """
+    ruta_config = dir_historia / 'historia.json'
+    texto_config = ruta_config.read_text(encoding='utf-8')
+    config = json.loads(texto_config)
+    ruta_mapa = dir_historia / ARCHIVO_PRECARGA
+
+    if quitar:
+        quitado = config.pop('precarga', None) is not None
+        _guardar_config(ruta_config, config, texto_config)
+        if ruta_mapa.exists():
+            ruta_mapa.unlink()
+            quitado = True
+        return ('🗑️  mapa quitado' if quitado else 'sin mapa'), False
+
+    if verificar and 'precarga' not in config and not ruta_mapa.exists():
+        return 'sin mapa (precarga de un salto)', False
+
+    contenido, meta = armar_mapa(dir_historia, saltos, auditar)
+    actual = ruta_mapa.read_bytes() if ruta_mapa.exists() else None
+    al_dia = actual == contenido and config.get('precarga') == meta
+    mapa = json.loads(contenido)
+    resumen = (f'{len(mapa["nodos"])} nodos, {len(mapa["imagenes"])} imágenes, {saltos} saltos, '
+               f'{len(contenido) / 1024:.1f} KB (versión {meta["version"]})')
+
+    if verificar:
+        if al_dia:
+            return f'✅ al día: {resumen}', False
+        motivo = 'no existe' if actual is None else 'desactualizado'
+        return f'❌ mapa {motivo}: correr generar_precarga.py --historia {dir_historia.name}', True
+
+    if al_dia:
+        return f'✅ sin cambios: {resumen}', False
+    _escribir(ruta_mapa, contenido)
+    config['precarga'] = meta
+    _guardar_config(ruta_config, config, texto_config)
+    return f'🗺️  mapa generado: {resumen}', False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Precalcula los JSON e imágenes a precargar desde cada nodo de cada historia.')
+    parser.add_argument('--historia', nargs='+', metavar='ID',
+                        help='Historias a procesar (nombre de la carpeta; default: todas)')
+    parser.add_argument('--saltos', type=int, default=SALTOS, metavar='N',
+                        help=f'Transiciones hacia adelante que cubre el mapa (default: {SALTOS})')
+    accion = parser.add_mutually_exclusive_group()
+    accion.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si algún mapa está desactualizado '
+                             '(las historias sin mapa no cuentan)')
+    accion.add_argument('--quitar', action='store_true',
+                        help='Borrar el mapa y el campo "precarga" de historia.json (el motor vuelve a mirar un salto)')
+    args = parser.parse_args()
+
+    dir_historias = RAIZ / 'historias'
+    if args.historia:
+        carpetas = [dir_historias / h for h in args.historia]
+    else:
+        carpetas = sorted(d for d in dir_historias.iterdir() if (d / 'historia.json').exists())
+
+    auditar = _cargar_auditar()
+    codigo = 0
+    for dir_historia in carpetas:
+        if not (dir_historia / 'historia.json').exists():
+            print(f'  ❌ {dir_historia.name}: no existe historia.json')
+            codigo = 1
+            continue
+        try:
+            estado, pendiente = generar(dir_historia, args.saltos, quitar=args.quitar,
+                                        verificar=args.verificar, auditar=auditar)
+        except ErrorPrecarga as e:
+            estado, pendiente = f'❌ no se pudo generar: {e}', True
+        print(f'  {dir_historia.name}: {estado}')
+        if pendiente:
+            codigo = 1
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
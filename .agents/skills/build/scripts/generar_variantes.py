@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+generar_variantes.py — Genera versiones más chicas de las imágenes de cada historia.
+
+Todas las pantallas bajaban los mismos fondos de 1920 px y personajes de
+1080×1920 que en escena ocupan un 14% del ancho. Este script genera, para cada
+imagen de fondos/, personajes/ y objetos/, una variante por escalón de pantalla
+con el ancho que de verdad ocupa ahí:
+
+  ancho de la variante = escalón × fracción del escenario que ocupa × escala
+
+  - escalón: ancho del escenario 16:9 en píxeles físicos (ESCALONES, los mismos
+    que ESCALONES_IMAGENES de js/ImagePreloader.js);
+  - fracción: 1 para los fondos; para personajes y objetos, el `ancho` (%) más
+    grande con el que aparece en escenas y desafíos (con los mismos defaults
+    que SceneRenderer, ChallengeManager y los handlers);
+  - escala: margen para las animaciones que agrandan los elementos.
+
+Las variantes van a imagenes/variantes/{escalón}/ con la misma ruta que la
+original (imagenes/variantes/640/fondos/bosque.webp) y en WebP con la calidad
+de su categoría. Si la variante no sería bastante más angosta que la original,
+no se genera: ese escalón usa la original.
+
+El resultado queda en datos/variantes.json:
+
+  {"formato": 1, "version": "<hash>", "escalones": [640, 1280, 1920],
+   "imagenes": {"fondos/bosque.webp": {"huella": "<hash original>", "fraccion": 1,
+                                       "variantes": {"640": 640, "1280": 1280}}}}
+
+y en historia.json el campo `variantes` (archivo y versión). ImagePreloader
+elige con él la variante de su escalón en resolverRuta() y el Service Worker
+precachea solo las del escalón del dispositivo. Las originales siguen siendo la
+fuente: las variantes se regeneran (solo las que cambiaron) cada vez.
+
+Generar requiere Pillow (`pip install Pillow`); --verificar y --quitar no.
+
+Uso:
+  python generar_variantes.py                                  # Todas las historias
+  python generar_variantes.py --historia el-misterio-del-bosque-encantado
+  python generar_variantes.py --verificar                      # Exit 1 si algo está desactualizado
+  python generar_variantes.py --quitar --historia ID           # Volver a las originales
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import shutil
+import struct
+import sys
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Rutas dentro de la carpeta de la historia
+ARCHIVO_VARIANTES = 'datos/variantes.json'
+CARPETA_VARIANTES = 'imagenes/variantes'
+FORMATO_VARIANTES = 1
+
+# Anchos del escenario (px físicos). Tienen que coincidir con ESCALONES_IMAGENES de js/ImagePreloader.js
+ESCALONES = (640, 1280, 1920)
+
+# Calidad WebP por categoría: los fondos toleran más compresión que los recortes con transparencia
+CALIDAD = {'fondos': 72, 'personajes': 80, 'objetos': 80}
+
+# Las animaciones agrandan personajes y objetos hasta un 15% (pulso en css/animaciones.css)
+ESCALA_ELEMENTOS = 1.15
+
+# Una variante tiene que ser al menos así de angosta (relativa a la original) para valer la pena
+MAX_PROPORCION = 0.85
+
+# Los anchos se redondean hacia arriba a este múltiplo
+MULTIPLO = 16
+
+# `ancho` (%) por defecto de cada lugar donde se dibuja una imagen (el mismo que usa el JS)
+ANCHO_ELEMENTO = 30       # SceneRenderer y ChallengeManager: estilo.ancho ?? 30
+ANCHO_INTERACTIVO = 15    # ObservacionHandler y ClicksHandler: ancho ?? 15
+
+
+class ErrorVariantes(Exception):
+    """No se pueden generar las variantes (falta Pillow o una imagen no se puede leer)."""
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ErrorVariantes('generar variantes requiere Pillow: pip install Pillow') from None
+    return Image
+
+
+def dimensiones(ruta):
+    """(ancho, alto) de un WebP o PNG leyendo solo la cabecera, o None si no se reconoce."""
+    try:
+        with open(ruta, 'rb') as f:
+            cabecera = f.read(30)
+    except OSError:
+        return None
+    if cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+        formato = cabecera[12:16]
+        if formato == b'VP8 ':
+            ancho, alto = struct.unpack('<HH', cabecera[26:30])
+            return ancho & 0x3FFF, alto & 0x3FFF
+        if formato == b'VP8L':
+            bits = int.from_bytes(cabecera[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if formato == b'VP8X':
+            return int.from_bytes(cabecera[24:27], 'little') + 1, int.from_bytes(cabecera[27:30], 'little') + 1
+    if cabecera[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack('>II', cabecera[16:24])
+    return None
+
+
+def _ruta_imagen(nombre, tipo=None, id_elem=None):
+    """Ruta relativa a imagenes/, con las mismas reglas que ImagePreloader.resolverRuta()."""
+    if tipo == 'personaje':
+        return f'personajes/{id_elem or ""}/{nombre}'
+    if tipo == 'objeto':
+        return f'objetos/{nombre}'
+    return f'fondos/{nombre}'
+
+
+def _porcentaje(valor, defecto):
+    return valor / 100 if isinstance(valor, (int, float)) and valor > 0 else defecto / 100
+
+
+def fracciones(dir_historia):
+    """Fracción más grande del ancho del escenario que ocupa cada imagen: {ruta en imagenes/: fracción}."""
+    resultado = {}
+
+    def anotar(rel, fraccion):
+        resultado[rel] = max(resultado.get(rel, 0), min(fraccion, 1))
+
+    for carpeta in ('escenas', 'desafios'):
+        dir_datos = dir_historia / 'datos' / carpeta
+        for ruta in sorted(dir_datos.glob('*.json')) if dir_datos.is_dir() else []:
+            try:
+                datos = json.loads(ruta.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                continue  # Lo reporta auditar.py
+            if not isinstance(datos, dict):
+                continue
+            if isinstance(datos.get('fondo'), str) and datos['fondo']:
+                anotar(_ruta_imagen(datos['fondo']), 1)
+            elementos = datos.get('elementos')
+            for elem in elementos if isinstance(elementos, list) else []:
+                if isinstance(elem, dict) and elem.get('imagen'):
+                    estilo = elem.get('estilo') if isinstance(elem.get('estilo'), dict) else {}
+                    fraccion = _porcentaje(estilo.get('ancho'), ANCHO_ELEMENTO)
+                    anotar(_ruta_imagen(elem['imagen'], elem.get('tipo'), elem.get('id')), fraccion)
+            config = datos.get('configuracion')
+            if not isinstance(config, dict):
+                continue
+            interactivos = config.get('elementos_interactivos')
+            objeto = config.get('objeto_interactivo')
+            for elem in (interactivos if isinstance(interactivos, list) else []) + [objeto]:
+                if not isinstance(elem, dict):
+                    continue
+                fraccion = _porcentaje(elem.get('ancho'), ANCHO_INTERACTIVO)
+                for campo in ('imagen', 'imagen_final'):
+                    if elem.get(campo):
+                        anotar(_ruta_imagen(elem[campo], elem.get('tipo') or 'objeto'), fraccion)
+    return resultado
+
+
+def _huella(ruta):
+    return hashlib.sha256(ruta.read_bytes()).hexdigest()[:16]
+
+
+def planificar(dir_historia):
+    """
+    Variantes que corresponden a cada imagen según las originales y los JSON:
+    {ruta en imagenes/: {"huella", "fraccion", "variantes": {escalón: ancho}}}.
+    Las imágenes que ningún JSON usa o que no están en disco no tienen variantes.
+    """
+    dir_imagenes = dir_historia / 'imagenes'
+    plan = {}
+    for rel, fraccion in sorted(fracciones(dir_historia).items()):
+        categoria = rel.split('/', 1)[0]
+        ruta = dir_imagenes / rel
+        tamano = dimensiones(ruta) if categoria in CALIDAD and ruta.is_file() else None
+        if tamano is None:
+            continue
+        ancho_original = tamano[0]
+        escala = 1 if categoria == 'fondos' else ESCALA_ELEMENTOS
+        variantes = {}
+        for escalon in ESCALONES:
+            ancho = math.ceil(escalon * fraccion * escala / MULTIPLO) * MULTIPLO
+            if ancho <= ancho_original * MAX_PROPORCION:
+                variantes[str(escalon)] = ancho
+        if variantes:
+            plan[rel] = {'huella': _huella(ruta), 'fraccion': round(fraccion, 4), 'variantes': variantes}
+    return plan
+
+
+def _contenido(plan):
+    """Bytes de datos/variantes.json y el campo `variantes` de historia.json."""
+    cuerpo = {'escalones': list(ESCALONES), 'imagenes': plan}
+    version = hashlib.sha256(json.dumps(cuerpo, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()[:16]
+    variantes = {'formato': FORMATO_VARIANTES, 'version': version, **cuerpo}
+    contenido = json.dumps(variantes, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+    return contenido, {'archivo': ARCHIVO_VARIANTES, 'version': version}
+
+
+def _leer_manifiesto(ruta):
+    try:
+        datos = json.loads(ruta.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    imagenes = datos.get('imagenes') if isinstance(datos, dict) else None
+    return imagenes if isinstance(imagenes, dict) else {}
+
+
+def _archivos_variantes(dir_historia):
+    """Rutas (relativas a la historia) de los archivos que hay en imagenes/variantes/."""
+    carpeta = dir_historia / CARPETA_VARIANTES
+    if not carpeta.is_dir():
+        return set()
+    return {r.relative_to(dir_historia).as_posix() for r in carpeta.rglob('*') if r.is_file()}
+
+
+def _escribir(ruta, contenido):
+    """Escribe con reemplazo atómico: quien lea el archivo nunca ve uno a medio escribir."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _guardar_config(ruta_config, config, texto_original):
+    """Reescribe historia.json con el mismo formato (4 espacios, sin escapar acentos)."""
+    texto = json.dumps(config, ensure_ascii=False, indent=4)
+    if texto_original.endswith('\n'):
+        texto += '\n'
+    if texto != texto_original:
+        _escribir(ruta_config, texto.encode('utf-8'))
+
+
+def _codificar(Image, origen, ancho, calidad):
+    """WebP de `origen` reducido a `ancho` px (el alto mantiene la proporción)."""
+    try:
+        with Image.open(origen) as imagen:
+            imagen.load()
+            alto = max(1, round(imagen.height * ancho / imagen.width))
+            reducida = imagen.resize((ancho, alto), Image.Resampling.LANCZOS)
+    except OSError as e:
+        raise ErrorVariantes(f'no se pudo leer {origen.name}: {e}') from None
+    salida = io.BytesIO()
+    reducida.save(salida, 'WEBP', quality=calidad, method=6)
+    return salida.getvalue()
+
+
+def generar(dir_historia, quitar=False, verificar=False):
+    """
+    Genera (o quita, o solo verifica) las variantes de una historia.
+    Retorna una línea de estado y si había algo desactualizado.
+    """
+    ruta_config = dir_historia / 'historia.json'
+    texto_config = ruta_config.read_text(encoding='utf-8')
+    config = json.loads(texto_config)
+    ruta_manifiesto = dir_historia / ARCHIVO_VARIANTES
+
+    if quitar:
+        quitado = config.pop('variantes', None) is not None
+        _guardar_config(ruta_config, config, texto_config)
+        if ruta_manifiesto.exists():
+            ruta_manifiesto.unlink()
+            quitado = True
+        if (dir_historia / CARPETA_VARIANTES).is_dir():
+            shutil.rmtree(dir_historia / CARPETA_VARIANTES)
+            quitado = True
+        return ('🗑️  variantes quitadas' if quitado else 'sin variantes'), False
+
+    en_disco = _archivos_variantes(dir_historia)
+    if verificar and 'variantes' not in config and not ruta_manifiesto.exists() and not en_disco:
+        return 'sin variantes (se usan las originales)', False
+
+    plan = planificar(dir_historia)
+    contenido, meta = _contenido(plan)
+    anterior = _leer_manifiesto(ruta_manifiesto)
+
+    # Variante que falta o que se generó desde otra versión de la original o con otro ancho
+    esperadas, pendientes = set(), []
+    for rel, entrada in plan.items():
+        previa = anterior.get(rel) or {}
+        for escalon, ancho in entrada['variantes'].items():
+            destino = f'{CARPETA_VARIANTES}/{escalon}/{rel}'
+            esperadas.add(destino)
+            if (destino not in en_disco or previa.get('huella') != entrada['huella']
+                    or (previa.get('variantes') or {}).get(escalon) != ancho):
+                pendientes.append((rel, destino, ancho))
+    sobrantes = sorted(en_disco - esperadas)
+
+    actual = ruta_manifiesto.read_bytes() if ruta_manifiesto.exists() else None
+    al_dia = not pendientes and not sobrantes and actual == contenido and config.get('variantes') == meta
+    cantidad = len(esperadas)
+    bytes_originales = sum((dir_historia / 'imagenes' / rel).stat().st_size for rel in plan)
+    resumen = f'{len(plan)} imágenes, {cantidad} variantes en {len(ESCALONES)} escalones (versión {meta["version"]})'
+
+    if verificar:
+        if al_dia:
+            return f'✅ al día: {resumen}', False
+        detalle = []
+        if pendientes:
+            detalle.append(f'{len(pendientes)} variante(s) por generar')
+        if sobrantes:
+            detalle.append(f'{len(sobrantes)} que sobran')
+        if actual != contenido or config.get('variantes') != meta:
+            detalle.append('manifiesto desactualizado')
+        return (f'❌ {", ".join(detalle)}: correr generar_variantes.py --historia {dir_historia.name}'), True
+
+    if al_dia:
+        return f'✅ sin cambios: {resumen}', False
+
+    if pendientes:
+        Image = _pillow()
+        for rel, destino, ancho in pendientes:
+            calidad = CALIDAD[rel.split('/', 1)[0]]
+            _escribir(dir_historia / destino, _codificar(Image, dir_historia / 'imagenes' / rel, ancho, calidad))
+    for rel in sobrantes:
+        (dir_historia / rel).unlink()
+    for carpeta in sorted((dir_historia / CARPETA_VARIANTES).rglob('*'), reverse=True):
+        if carpeta.is_dir() and not any(carpeta.iterdir()):
+            carpeta.rmdir()
+
+    _escribir(ruta_manifiesto, contenido)
+    config['variantes'] = meta
+    _guardar_config(ruta_config, config, texto_config)
+
+    # Lo que baja cada escalón contra las originales (solo las imágenes con variantes)
+    por_escalon = []
+    for escalon in map(str, ESCALONES):
+        total = sum((dir_historia / f'{CARPETA_VARIANTES}/{escalon}/{rel}').stat().st_size
+                    if escalon in entrada['variantes'] else (dir_historia / 'imagenes' / rel).stat().st_size
+                    for rel, entrada in plan.items())
+        por_escalon.append(f'{escalon}: {100 * total / (bytes_originales or 1):.0f}%')
+    return (f'🖼️  {len(pendientes)} variante(s) generada(s), {len(sobrantes)} borrada(s): {resumen}\n'
+            f'     bytes contra las originales → {", ".join(por_escalon)}'), False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Genera variantes más chicas de las imágenes de cada historia, una por escalón de pantalla.')
+    parser.add_argument('--historia', nargs='+', metavar='ID',
+                        help='Historias a procesar (nombre de la carpeta; default: todas)')
+    accion = parser.add_mutually_exclusive_group()
+    accion.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si faltan, sobran o cambiaron variantes '
+                             '(las historias sin variantes no cuentan)')
+    accion.add_argument('--quitar', action='store_true',
+                        help='Borrar las variantes y el campo "variantes" de historia.json (se usan las originales)')
+    args = parser.parse_args()
+
+    dir_historias = RAIZ / 'historias'
+    if args.historia:
+        carpetas = [dir_historias / h for h in args.historia]
+    else:
+        carpetas = sorted(d for d in dir_historias.iterdir() if (d / 'historia.json').exists())
+
+    codigo = 0
+    for dir_historia in carpetas:
+        if not (dir_historia / 'historia.json').exists():
+            print(f'  ❌ {dir_historia.name}: no existe historia.json')
+            codigo = 1
+            continue
+        try:
+            estado, pendiente = generar(dir_historia, quitar=args.quitar, verificar=args.verificar)
+        except ErrorVariantes as e:
+            estado, pendiente = f'❌ {e}', True
+        print(f'  {dir_historia.name}: {estado}')
+        if pendiente:
+            codigo = 1
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
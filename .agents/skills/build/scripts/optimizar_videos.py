@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+optimizar_videos.py — Pone el `moov` de los videos de fondo al principio del MP4 (faststart).
+
+FondoHelper crea el <video> con preload='auto' y lo muestra recién en
+`canplaythrough`. Para arrancar, el navegador necesita el `moov` (la tabla de
+cuadros: dónde está cada uno y cuánto dura). Muchos encoders lo escriben al
+final, después del `mdat` con el audio y el video: así el video no arranca
+hasta bajarse entero. Con el `moov` adelante arranca con los primeros cientos
+de KB y el resto sigue bajando mientras se reproduce.
+
+Python puro, sin ffmpeg:
+
+  - recorre las cajas (boxes) del MP4 y reporta dónde está el `moov`, la
+    duración, el bitrate y las pistas (tipo, códec, resolución, duración);
+  - para reescribirlo, mueve el `moov` antes del primer `mdat` y corre los
+    offsets de cada chunk (tablas `stco`/`co64` de cada pista) lo que se
+    corrieron sus datos. Si un offset deja de entrar en 32 bits, la tabla
+    `stco` pasa a `co64`. El resto de las cajas se copia byte a byte;
+  - los MP4 fragmentados (`moof`) y los que ya tienen el `moov` adelante no se tocan.
+
+Los videos no están en el repo (se suben aparte, ver generar-manifiesto.py):
+el script revisa los que haya en historias/{id}/videos/ y, con --archivo,
+cualquier MP4 antes de subirlo. `auditar.py --categoria peso` avisa de los
+videos de las historias que tienen el `moov` al final.
+
+Uso:
+  python optimizar_videos.py                                  # Todas las historias
+  python optimizar_videos.py --historia el-misterio-del-bosque-encantado
+  python optimizar_videos.py --archivo ~/exportados/zona_rio_720.mp4
+  python optimizar_videos.py --verificar                      # Exit 1 si algún video tiene el moov al final
+"""
+
+import argparse
+import bisect
+import io
+import os
+import struct
+import sys
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Carpeta de videos dentro de la historia y extensiones que se revisan
+CARPETA_VIDEOS = 'videos'
+EXTENSIONES = ('.mp4', '.m4v', '.mov')
+
+# Cajas que contienen otras cajas en el camino moov → ... → stco/co64
+CONTENEDORES = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts'}
+
+# Tramo de copia al reescribir (los videos no se cargan enteros en memoria)
+TRAMO_COPIA = 1 << 20
+
+
+class ErrorMP4(Exception):
+    """El archivo no es un MP4 que se pueda analizar o reescribir."""
+
+
+def cajas_de_archivo(f, tamano):
+    """
+    Cajas de primer nivel de un MP4 abierto: [(tipo, inicio, largo)]. Lee solo
+    las cabeceras (8 o 16 bytes por caja), no el contenido.
+    """
+    cajas = []
+    pos = 0
+    while pos + 8 <= tamano:
+        f.seek(pos)
+        cabecera = f.read(16)
+        largo, tipo = struct.unpack('>I4s', cabecera[:8])
+        if largo == 1:
+            if len(cabecera) < 16:
+                raise ErrorMP4(f'caja {tipo!r} cortada en el byte {pos}')
+            largo = struct.unpack('>Q', cabecera[8:16])[0]
+        elif largo == 0:
+            largo = tamano - pos  # Hasta el final del archivo
+        if largo < 8 or pos + largo > tamano:
+            raise ErrorMP4(f'caja {tipo!r} con largo inválido ({largo}) en el byte {pos}')
+        cajas.append((tipo, pos, largo))
+        pos += largo
+    return cajas
+
+
+def _hijas(datos, desde=0, hasta=None):
+    """Cajas dentro de `datos[desde:hasta]`: [(tipo, inicio, largo, inicio del contenido)]."""
+    hasta = len(datos) if hasta is None else hasta
+    pos = desde
+    while pos + 8 <= hasta:
+        largo, tipo = struct.unpack_from('>I4s', datos, pos)
+        cabecera = 8
+        if largo == 1:
+            largo = struct.unpack_from('>Q', datos, pos + 8)[0]
+            cabecera = 16
+        elif largo == 0:
+            largo = hasta - pos
+        if largo < cabecera or pos + largo > hasta:
+            raise ErrorMP4(f'caja {tipo!r} con largo inválido dentro del moov')
+        yield tipo, pos, largo, pos + cabecera
+        pos += largo
+
+
+def _buscar(datos, desde, hasta, tipo):
+    """Contenido [inicio, fin) de la primera caja hija de ese tipo, o None."""
+    for hija, inicio, largo, contenido in _hijas(datos, desde, hasta):
+        if hija == tipo:
+            return contenido, inicio + largo
+    return None
+
+
+def _ruta(datos, desde, hasta, *tipos):
+    """Baja por las cajas hijas con esos tipos; None si falta alguna."""
+    rango = (desde, hasta)
+    for tipo in tipos:
+        rango = _buscar(datos, *rango, tipo)
+        if rango is None:
+            return None
+    return rango
+
+
+def _tiempo(datos, pos):
+    """(escala, duración) de un mvhd o mdhd a partir de su contenido (versión 0 o 1)."""
+    if datos[pos] == 1:
+        return struct.unpack_from('>IQ', datos, pos + 20)
+    return struct.unpack_from('>II', datos, pos + 12)
+
+
+def _pista(datos, desde, hasta):
+    """Datos de una pista (trak) para el reporte."""
+    pista = {'id': None, 'tipo': '?', 'codec': '?', 'duracion': None, 'ancho': 0, 'alto': 0, 'chunks': 0}
+    tkhd = _buscar(datos, desde, hasta, b'tkhd')
+    if tkhd:
+        pos = tkhd[0]
+        version = datos[pos]
+        pista['id'] = struct.unpack_from('>I', datos, pos + (20 if version == 1 else 12))[0]
+        # Ancho y alto en 16.16 al final del tkhd
+        ancho, alto = struct.unpack_from('>II', datos, tkhd[1] - 8)
+        pista['ancho'], pista['alto'] = ancho >> 16, alto >> 16
+    mdia = _buscar(datos, desde, hasta, b'mdia')
+    if mdia:
+        mdhd = _buscar(datos, *mdia, b'mdhd')
+        if mdhd:
+            escala, duracion = _tiempo(datos, mdhd[0])
+            pista['duracion'] = duracion / escala if escala else None
+        hdlr = _buscar(datos, *mdia, b'hdlr')
+        if hdlr:
+            pista['tipo'] = datos[hdlr[0] + 8:hdlr[0] + 12].decode('latin-1')
+        stbl = _ruta(datos, *mdia, b'minf', b'stbl')
+        if stbl:
+            stsd = _buscar(datos, *stbl, b'stsd')
+            if stsd and stsd[1] - stsd[0] >= 16:
+                pista['codec'] = datos[stsd[0] + 12:stsd[0] + 16].decode('latin-1')
+            for tipo in (b'stco', b'co64'):
+                tabla = _buscar(datos, *stbl, tipo)
+                if tabla:
+                    pista['chunks'] = struct.unpack_from('>I', datos, tabla[0] + 4)[0]
+    return pista
+
+
+def analizar(ruta):
+    """
+    Estructura de un MP4: dict con `tamano`, `cajas` [(tipo, inicio, largo)],
+    `moov_adelante`, `fragmentado`, `duracion` (s), `bitrate` (bits/s), `pistas`
+    y `bytes_para_arrancar` (lo que hay que bajar antes del primer cuadro).
+    """
+    ruta = Path(ruta)
+    tamano = ruta.stat().st_size
+    with open(ruta, 'rb') as f:
+        cajas = cajas_de_archivo(f, tamano)
+        tipos = [tipo for tipo, _, _ in cajas]
+        if b'moov' not in tipos:
+            raise ErrorMP4('no tiene caja moov (¿es un MP4?)')
+        _, inicio_moov, largo_moov = cajas[tipos.index(b'moov')]
+        f.seek(inicio_moov)
+        moov = f.read(largo_moov)
+
+    contenido_moov = next(_hijas(moov))[3]
+    mvhd = _buscar(moov, contenido_moov, len(moov), b'mvhd')
+    escala, duracion = _tiempo(moov, mvhd[0]) if mvhd else (0, 0)
+    segundos = duracion / escala if escala else None
+    pistas = [_pista(moov, contenido, inicio + largo)
+              for tipo, inicio, largo, contenido in _hijas(moov, contenido_moov) if tipo == b'trak']
+
+    primer_mdat = tipos.index(b'mdat') if b'mdat' in tipos else len(tipos)
+    moov_adelante = tipos.index(b'moov') < primer_mdat
+    return {
+        'tamano': tamano,
+        'cajas': cajas,
+        'moov_adelante': moov_adelante,
+        'fragmentado': b'moof' in tipos or _buscar(moov, contenido_moov, len(moov), b'mvex') is not None,
+        'duracion': segundos,
+        'bitrate': tamano * 8 / segundos if segundos else None,
+        'pistas': pistas,
+        'bytes_para_arrancar': inicio_moov + largo_moov if moov_adelante else tamano,
+    }
+
+
+def _caja(tipo, contenido):
+    """Bytes de una caja con su cabecera (largo de 64 bits solo si hace falta)."""
+    if len(contenido) + 8 <= 0xFFFFFFFF:
+        return struct.pack('>I4s', len(contenido) + 8, tipo) + contenido
+    return struct.pack('>I4sQ', 1, tipo, len(contenido) + 16) + contenido
+
+
+def _reescribir_moov(moov, corrimiento, en_64):
+    """
+    El moov con los offsets de chunk corridos: corrimiento(offset) da el offset
+    nuevo. Las tablas stco cuya clave (posición en el moov original) está en
+    `en_64` salen como co64. Retorna (bytes, claves de stco que no entran en 32 bits).
+    """
+    desbordadas = set()
+
+    def armar(desde, hasta):
+        partes = []
+        for tipo, inicio, largo, contenido in _hijas(moov, desde, hasta):
+            if tipo in CONTENEDORES:
+                partes.append(_caja(tipo, armar(contenido, inicio + largo)))
+            elif tipo in (b'stco', b'co64'):
+                cantidad = struct.unpack_from('>I', moov, contenido + 4)[0]
+                formato = f'>{cantidad}{"I" if tipo == b"stco" else "Q"}'
+                nuevos = [corrimiento(offset) for offset in struct.unpack_from(formato, moov, contenido + 8)]
+                version_flags = moov[contenido:contenido + 4]
+                if tipo == b'stco' and inicio not in en_64:
+                    if nuevos and max(nuevos) > 0xFFFFFFFF:
+                        desbordadas.add(inicio)
+                        nuevos = [offset & 0xFFFFFFFF for offset in nuevos]  # Se descarta: hay otra vuelta
+                    tabla = struct.pack(f'>{cantidad}I', *nuevos)
+                    partes.append(_caja(b'stco', version_flags + struct.pack('>I', cantidad) + tabla))
+                else:
+                    tabla = struct.pack(f'>{cantidad}Q', *nuevos)
+                    partes.append(_caja(b'co64', version_flags + struct.pack('>I', cantidad) + tabla))
+            else:
+                partes.append(moov[inicio:inicio + largo])
+        return b''.join(partes)
+
+    tipo, inicio, largo, contenido = next(_hijas(moov))
+    return _caja(tipo, armar(contenido, largo)), desbordadas
+
+
+def plan_faststart(ruta, analisis=None):
+    """
+    Cómo queda el archivo con el moov adelante: (orden de las cajas originales,
+    bytes del moov nuevo), o None si no hace falta (o no se puede) moverlo.
+    """
+    analisis = analisis or analizar(ruta)
+    if analisis['moov_adelante'] or analisis['fragmentado']:
+        return None
+    cajas = analisis['cajas']
+    tipos = [tipo for tipo, _, _ in cajas]
+    indice_moov = tipos.index(b'moov')
+    primer_mdat = tipos.index(b'mdat')
+    _, inicio_moov, largo_moov = cajas[indice_moov]
+    with open(ruta, 'rb') as f:
+        f.seek(inicio_moov)
+        moov = f.read(largo_moov)
+
+    # Las cajas antes del primer mdat (ftyp, free...), el moov y después el resto, en su orden
+    orden = [c for i, c in enumerate(cajas) if i < primer_mdat and i != indice_moov]
+    resto = [c for i, c in enumerate(cajas) if i >= primer_mdat and i != indice_moov]
+    inicios = [inicio for _, inicio, _ in cajas]
+
+    en_64 = set()
+    while True:
+        # El largo del moov nuevo depende de qué tablas son co64; con un largo de prueba se
+        # calcula el corrimiento de cada caja y, con el moov armado, se confirma el largo.
+        largo_nuevo = largo_moov
+        for _ in range(3):
+            corrimientos = {}
+            pos = 0
+            for tipo, inicio, largo in orden:
+                corrimientos[inicio] = pos - inicio
+                pos += largo
+            pos += largo_nuevo
+            for tipo, inicio, largo in resto:
+                corrimientos[inicio] = pos - inicio
+                pos += largo
+
+            def corrimiento(offset):
+                caja = bisect.bisect_right(inicios, offset) - 1
+                if caja < 0 or cajas[caja][0] == b'moov':
+                    raise ErrorMP4(f'un chunk apunta al byte {offset}, fuera de los datos')
+                return offset + corrimientos[inicios[caja]]
+
+            nuevo_moov, desbordadas = _reescribir_moov(moov, corrimiento, en_64)
+            if len(nuevo_moov) == largo_nuevo:
+                break
+            largo_nuevo = len(nuevo_moov)
+        else:
+            raise ErrorMP4('el largo del moov no se estabiliza')
+        if not desbordadas:
+            return orden + [(b'moov', None, len(nuevo_moov))] + resto, nuevo_moov
+        en_64 |= desbordadas
+
+
+def escribir_faststart(ruta, destino=None, analisis=None):
+    """
+    Reescribe el MP4 con el moov adelante (en `destino`, o sobre el mismo archivo
+    con reemplazo atómico). Retorna False si no hacía falta.
+    """
+    ruta = Path(ruta)
+    plan = plan_faststart(ruta, analisis)
+    if plan is None:
+        return False
+    orden, nuevo_moov = plan
+    destino = Path(destino) if destino else ruta
+    temporal = destino.with_name(destino.name + '.tmp')
+    try:
+        with open(ruta, 'rb') as origen, open(temporal, 'wb') as salida:
+            for tipo, inicio, largo in orden:
+                if inicio is None:
+                    salida.write(nuevo_moov)
+                    continue
+                origen.seek(inicio)
+                pendiente = largo
+                while pendiente:
+                    tramo = origen.read(min(TRAMO_COPIA, pendiente))
+                    if not tramo:
+                        raise ErrorMP4('el archivo cambió mientras se reescribía')
+                    salida.write(tramo)
+                    pendiente -= len(tramo)
+        os.replace(temporal, destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+    return True
+
+
+def formato_bytes(n):
+    """Tamaño legible: 850 B, 312 KB, 1.4 MB."""
+    if n < 1024:
+        return f'{n} B'
+    if n < 1024 * 1024:
+        return f'{n / 1024:.0f} KB'
+    return f'{n / (1024 * 1024):.1f} MB'
+
+
+def describir(analisis):
+    """Líneas del reporte de un video: duración, bitrate, pistas y orden de las cajas."""
+    duracion = f'{analisis["duracion"]:.1f} s' if analisis['duracion'] else 'duración desconocida'
+    bitrate = f'{analisis["bitrate"] / 1000:.0f} kbps' if analisis['bitrate'] else '? kbps'
+    lineas = [f'{formato_bytes(analisis["tamano"])}, {duracion}, {bitrate}']
+    for pista in analisis['pistas']:
+        detalle = f'pista {pista["id"]}: {pista["tipo"]} {pista["codec"]}'
+        if pista['ancho'] and pista['alto']:
+            detalle += f' {pista["ancho"]}x{pista["alto"]}'
+        if pista['duracion'] is not None:
+            detalle += f', {pista["duracion"]:.1f} s'
+        lineas.append(f'{detalle}, {pista["chunks"]} chunks')
+    orden = ' '.join(tipo.decode('latin-1') for tipo, _, _ in analisis['cajas'])
+    lineas.append(f'cajas: {orden}')
+    return lineas
+
+
+def procesar(ruta, verificar=False):
+    """
+    Analiza un video y, si hace falta y no es --verificar, lo reescribe.
+    Retorna una línea de estado (con el detalle) y si quedó algo pendiente.
+    """
+    try:
+        analisis = analizar(ruta)
+    except (OSError, ErrorMP4, struct.error) as e:
+        return f'❌ no se pudo leer: {e}', True
+    detalle = ''.join(f'\n       {linea}' for linea in describir(analisis))
+    arranque = formato_bytes(analisis['bytes_para_arrancar'])
+
+    if analisis['moov_adelante']:
+        return f'✅ faststart: arranca con los primeros {arranque}{detalle}', False
+    if analisis['fragmentado']:
+        return f'⚠️  MP4 fragmentado con el moov al final: reexportarlo con faststart{detalle}', True
+    if verificar:
+        return (f'❌ moov al final: no arranca hasta bajar {arranque}; correr optimizar_videos.py'
+                f'{detalle}'), True
+
+    try:
+        escribir_faststart(ruta, analisis=analisis)
+        nuevo = analizar(ruta)
+    except (OSError, ErrorMP4, struct.error) as e:
+        return f'❌ no se pudo reescribir: {e}', True
+    detalle = ''.join(f'\n       {linea}' for linea in describir(nuevo))
+    return (f'🎬 moov movido adelante: arranca con los primeros {formato_bytes(nuevo["bytes_para_arrancar"])} '
+            f'(antes {arranque}){detalle}'), False
+
+
+def videos_de(dir_historia):
+    """Videos de la carpeta videos/ de una historia, ordenados."""
+    carpeta = dir_historia / CARPETA_VIDEOS
+    if not carpeta.is_dir():
+        return []
+    return sorted(r for r in carpeta.iterdir() if r.is_file() and r.suffix.lower() in EXTENSIONES)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Analiza los MP4 de las historias y mueve el moov al principio (faststart) sin recodificar.')
+    destino = parser.add_mutually_exclusive_group()
+    destino.add_argument('--historia', nargs='+', metavar='ID',
+                         help='Historias a procesar (nombre de la carpeta; default: todas)')
+    destino.add_argument('--archivo', nargs='+', metavar='RUTA', type=Path,
+                         help='MP4 sueltos (ej: antes de subirlos), en vez de los de las historias')
+    parser.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si algún video tiene el moov al final')
+    args = parser.parse_args()
+
+    if args.archivo:
+        grupos = [('', args.archivo)]
+    else:
+        dir_historias = RAIZ / 'historias'
+        if args.historia:
+            carpetas = [dir_historias / h for h in args.historia]
+        else:
+            carpetas = sorted(d for d in dir_historias.iterdir() if (d / 'historia.json').exists())
+        grupos = [(dir_historia.name, videos_de(dir_historia)) for dir_historia in carpetas]
+
+    codigo = 0
+    for nombre, videos in grupos:
+        if nombre:
+            print(f'  {nombre}: {len(videos)} video(s)' if videos else f'  {nombre}: sin videos en {CARPETA_VIDEOS}/')
+        for ruta in videos:
+            estado, pendiente = procesar(ruta, verificar=args.verificar)
+            print(f'    {ruta.name}: {estado}')
+            if pendiente:
+                codigo = 1
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,8 @@ Detecta mecánicamente: magic numbers, hardcodeos, !important, z-index literales
 inconsistencias de naming, schema JSON incompleto, anti-voseo, sincronización SW,
 rutas de imágenes huérfanas y más.
 
-Es de SOLO LECTURA — no modifica ningún archivo del proyecto.
+Es de SOLO LECTURA — no modifica ningún archivo del proyecto. Lo único que
+escribe es su caché de resultados en .agents/.cache/ (ver CacheAuditoria).
 
 Uso:
   python auditar.py                           # Auditoría completa
@@ -15,18 +16,34 @@ Uso:
   python auditar.py --categoria json          # Solo JSONs de escenas/desafíos
   python auditar.py --categoria pwa           # Solo Service Worker / PWA
   python auditar.py --categoria cross         # Solo checks transversales
+  python auditar.py --categoria grafo         # Solo el grafo de navegación de las historias
+  python auditar.py --categoria peso          # Solo el peso de primera pintura de cada escena
   python auditar.py --archivo js/GameEngine.js  # Archivo específico
   python auditar.py --resumen                 # Solo conteo por categoría/severidad
+  python auditar.py --jobs 4                  # Repartir el trabajo en 4 procesos
+  python auditar.py --sin-cache               # Ignorar la caché y re-auditar todo
+  python auditar.py --desde main              # Solo lo afectado por los cambios desde main
+  python auditar.py --ndjson                  # Un hallazgo JSON por línea, apenas aparece
+  python auditar.py --fallar-en ALTA          # Cortar (exit 1) en el primer hallazgo ALTA o CRITICA
+  python auditar.py --watch                   # Re-auditar en cada guardado y mostrar la diferencia
+  python auditar.py --perfil                  # Tiempos por categoría, regla y archivo
 """
 
 import argparse
+import bisect
+import hashlib
+import importlib.util
 import io
 import json
 import os
 import re
+import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # Forzar UTF-8 en stdout/stderr (Windows usa cp1252 por defecto)
 if sys.stdout.encoding != 'utf-8':
@@ -53,13 +70,35 @@ def encontrar_raiz():
 
 RAIZ = encontrar_raiz()
 
+
+def _cargar_instantanea():
+    """Importa instantanea.py de esta carpeta (auditar.py también se importa desde otras skills, fuera del sys.path)."""
+    ruta = Path(__file__).resolve().parent / 'instantanea.py'
+    spec = importlib.util.spec_from_file_location('instantanea', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# El recorrido del proyecto (IndiceProyecto.instantanea y --watch) lo comparte analizar-sw.py
+_instantanea = _cargar_instantanea()
+instantanea_archivos = _instantanea.instantanea_archivos
+CARPETAS_NO_VIGILADAS = _instantanea.CARPETAS_NO_VIGILADAS
+
+# Caché persistente de resultados (ver CacheAuditoria)
+CARPETA_CACHE = _instantanea.CARPETA_CACHE
+RUTA_CACHE = RAIZ / CARPETA_CACHE / 'auditar.json'
+
+# Versión del set de reglas: cualquier cambio en este script invalida la caché
+VERSION_REGLAS = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
 # ─── Helpers ────────────────────────────────────────────────────────
 
 class Hallazgo:
     def __init__(self, categoria, severidad, tipo, archivo, linea, descripcion, sugerencia):
-        self.categoria = categoria      # js | css | json | pwa | cross
+        self.categoria = categoria      # js | css | json | pwa | cross | grafo | peso (ver CATEGORIAS)
         self.severidad = severidad      # CRITICA | ALTA | MEDIA | BAJA
-        self.tipo = tipo                # bug | hardcodeo | magic_number | inconsistencia | refactor | dead_code | pwa
+        self.tipo = tipo                # bug | hardcodeo | magic_number | inconsistencia | refactor | dead_code | pwa | rendimiento
         self.archivo = archivo          # ruta relativa
         self.linea = linea              # número de línea (0 = no aplica)
         self.descripcion = descripcion
@@ -77,218 +116,994 @@ class Hallazgo:
         }
 
 
-def leer_archivo(ruta_relativa):
-    """Lee un archivo y devuelve sus líneas. Retorna [] si no existe."""
-    ruta = RAIZ / ruta_relativa
-    if not ruta.exists():
-        return []
-    try:
-        return ruta.read_text(encoding='utf-8').splitlines()
-    except Exception:
-        return []
+# Orden de gravedad (menor = más grave), para --fallar-en
+ORDEN_SEVERIDAD = {'CRITICA': 0, 'ALTA': 1, 'MEDIA': 2, 'BAJA': 3}
 
 
-def ruta_relativa(ruta_abs):
-    """Convierte Path absoluto a string relativo al proyecto."""
-    try:
-        return str(Path(ruta_abs).relative_to(RAIZ)).replace('\\', '/')
-    except ValueError:
-        return str(ruta_abs).replace('\\', '/')
+class CorteAuditoria(Exception):
+    """Se alcanzó el umbral de --fallar-en: la auditoría se corta acá."""
 
-# ─── CHECKS: JavaScript ────────────────────────────────────────────
+    def __init__(self, hallazgo):
+        super().__init__(f'[{hallazgo.severidad}] {hallazgo.archivo}: {hallazgo.descripcion}')
+        self.hallazgo = hallazgo
 
-def check_js(archivos_filtro=None):
-    """Ejecuta checks sobre archivos JavaScript."""
-    hallazgos = []
 
-    # Recopilar archivos JS
-    rutas_js = []
-    for carpeta in ['js', 'js/challenges']:
-        dir_js = RAIZ / carpeta
-        if dir_js.is_dir():
-            for f in sorted(dir_js.glob('*.js')):
-                rel = ruta_relativa(f)
-                if archivos_filtro and rel not in archivos_filtro:
+class ColectorHallazgos:
+    """
+    Recibe los hallazgos a medida que se producen (ver IndiceProyecto.al_producir).
+
+    Con `ndjson` escribe cada uno en stdout como una línea JSON apenas llega.
+    Con `umbral` (una severidad) lanza CorteAuditoria en el primer hallazgo de
+    esa severidad o más grave; a partir de ahí cualquier otro aporte también
+    lanza, para que las categorías que corren en paralelo se detengan.
+    Cada hallazgo se procesa una sola vez aunque llegue de nuevo dentro de la
+    lista que retorna su categoría.
+    """
+
+    def __init__(self, ndjson=False, umbral=None):
+        self.ndjson = ndjson
+        self.umbral = ORDEN_SEVERIDAD[umbral] if umbral else None
+        self.hallazgos = []
+        self.corte = None
+        self._vistos = set()
+        self._lock = threading.Lock()
+
+    def agregar(self, hallazgos):
+        with self._lock:
+            if self.corte is not None:
+                raise CorteAuditoria(self.corte)
+            for h in hallazgos:
+                if id(h) in self._vistos:
                     continue
-                rutas_js.append((rel, f))
+                self._vistos.add(id(h))
+                self.hallazgos.append(h)
+                if self.ndjson:
+                    sys.stdout.write(json.dumps(h.to_dict(), ensure_ascii=False) + '\n')
+                    sys.stdout.flush()
+                if self.umbral is not None and ORDEN_SEVERIDAD.get(h.severidad, 99) <= self.umbral:
+                    self.corte = h
+                    raise CorteAuditoria(h)
 
-    # También el service-worker.js si no hay filtro o está explícito
-    sw = RAIZ / 'service-worker.js'
-    if sw.exists():
-        rel_sw = 'service-worker.js'
-        if not archivos_filtro or rel_sw in archivos_filtro:
-            # SW se audita en pwa, no acá
-            pass
 
-    for rel, ruta in rutas_js:
-        lineas = leer_archivo(rel)
+def _cargar_json(ruta):
+    """Carga y parsea un JSON. Retorna (datos, error)."""
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f), None
+    except json.JSONDecodeError as e:
+        return None, str(e)
+    except Exception as e:
+        return None, str(e)
 
-        for i, linea in enumerate(lineas, 1):
-            stripped = linea.strip()
 
-            # Ignorar comentarios
-            if stripped.startswith('//') or stripped.startswith('*') or stripped.startswith('/*'):
-                continue
+def _muestra(items, n=5):
+    """Los primeros `n` elementos separados por coma, y cuántos más hay (para las descripciones)."""
+    return ', '.join(items[:n]) + (f' y {len(items) - n} más' if len(items) > n else '')
+
+# ─── Perfil (--perfil) ──────────────────────────────────────────────
+
+# Perfil activo. Solo existe con --perfil: sin el flag, cada punto de medición
+# se reduce a un `PERFIL is not None` por archivo.
+PERFIL = None
+
+
+def _contar_nodos(datos):
+    """Cantidad de nodos (objetos, listas y valores) de un JSON decodificado."""
+    if datos is None:
+        return 0
+    total = 0
+    pila = [datos]
+    while pila:
+        nodo = pila.pop()
+        total += 1
+        if isinstance(nodo, dict):
+            pila.extend(nodo.values())
+        elif isinstance(nodo, list):
+            pila.extend(nodo)
+    return total
+
+
+class Perfil:
+    """Tiempos y contadores de una corrida: por categoría, regla, tarea y archivo."""
+
+    def __init__(self):
+        self.categorias = {}                              # categoría → segundos
+        self.reglas = defaultdict(lambda: [0.0, 0, 0])    # regla → [segundos, evaluaciones, aciertos]
+        self.tareas = defaultdict(lambda: [0.0, 0])       # función → [segundos, ejecuciones]
+        self.archivos = defaultdict(float)                # archivo → segundos
+        self.tipos = defaultdict(int)                     # tipo → hallazgos
+        self.lineas = 0
+        self.nodos_json = 0
+
+    def sumar_regla(self, nombre, segundos, evaluaciones, aciertos):
+        regla = self.reglas[nombre]
+        regla[0] += segundos
+        regla[1] += evaluaciones
+        regla[2] += aciertos
+
+    def medir_tarea(self, indice, fn, args):
+        """
+        Ejecuta una tarea midiendo su tiempo. Si es por archivo, se atribuye también
+        al primer argumento de texto (la ruta); las de todo el proyecto (el SW, una
+        historia) quedan solo en las tareas.
+        """
+        inicio = time.perf_counter()
+        hallazgos = fn(indice, *args)
+        duracion = time.perf_counter() - inicio
+        tarea = self.tareas[fn.__name__]
+        tarea[0] += duracion
+        tarea[1] += 1
+        archivo = next((a for a in args if isinstance(a, str)), None)
+        if archivo is not None:
+            self.archivos[archivo] += duracion
+        return hallazgos
 
-            # --- Magic numbers en setTimeout / delay ---
-            match_timeout = re.search(r'setTimeout\s*\(\s*(?:.*?,\s*)(\d{3,5})\s*\)', linea)
-            if match_timeout:
-                valor = match_timeout.group(1)
-                hallazgos.append(Hallazgo(
-                    'js', 'BAJA', 'magic_number', rel, i,
-                    f'Magic number {valor} en setTimeout',
-                    'Extraer a una constante nombrada (ej: DELAY_FEEDBACK = ' + valor + ')'
-                ))
+    def contar_tipos(self, hallazgos):
+        for h in hallazgos:
+            self.tipos[h.tipo] += 1
 
-            match_delay = re.search(r'#?delay\s*\(\s*(\d{3,5})\s*\)', linea)
-            if match_delay:
-                valor = match_delay.group(1)
-                hallazgos.append(Hallazgo(
-                    'js', 'BAJA', 'magic_number', rel, i,
-                    f'Magic number {valor} en delay()',
-                    'Extraer a una constante nombrada'
-                ))
+    def to_dict(self, top=10):
+        return {
+            'categorias': {nombre: round(seg, 6) for nombre, seg in self.categorias.items()},
+            'reglas': {nombre: {'segundos': round(seg, 6), 'evaluaciones': ev, 'aciertos': ac}
+                       for nombre, (seg, ev, ac) in sorted(self.reglas.items(), key=lambda x: -x[1][0])},
+            'tareas': {nombre: {'segundos': round(seg, 6), 'ejecuciones': n}
+                       for nombre, (seg, n) in sorted(self.tareas.items(), key=lambda x: -x[1][0])},
+            'archivos_mas_lentos': [{'archivo': archivo, 'segundos': round(seg, 6)}
+                                    for archivo, seg in self._mas_lentos(top)],
+            'lineas': self.lineas,
+            'nodos_json': self.nodos_json,
+            'hallazgos_por_tipo': dict(self.tipos),
+        }
 
-            # --- Magic numbers en volume ---
-            match_vol = re.search(r'\.volume\s*=\s*(0\.\d+)', linea)
-            if match_vol:
-                valor = match_vol.group(1)
-                hallazgos.append(Hallazgo(
-                    'js', 'BAJA', 'magic_number', rel, i,
-                    f'Volumen hardcodeado: {valor}',
-                    'Extraer a constante (ej: VOLUMEN_BGM, VOLUMEN_SFX)'
-                ))
+    def _mas_lentos(self, top):
+        return sorted(self.archivos.items(), key=lambda x: -x[1])[:top]
+
+    def imprimir(self, salida=None, top=10):
+        salida = salida or sys.stdout
+        escribir = lambda texto='': print(texto, file=salida)
+        ms = lambda seg: f'{seg * 1000:9.2f} ms'
+
+        escribir(f"  ── PERFIL {'─'*59}")
+        escribir(f"  Total: {ms(sum(self.categorias.values())).strip()} · {self.lineas} líneas · "
+                 f"{self.nodos_json} nodos JSON\n")
+
+        escribir(f"  {'Categoría':<38}{'Tiempo':>12}")
+        for nombre, seg in self.categorias.items():
+            escribir(f"  {nombre:<38}{ms(seg):>12}")
+
+        escribir(f"\n  {'Regla':<38}{'Tiempo':>12}{'Evaluac.':>10}{'Hallazgos':>11}")
+        for nombre, (seg, ev, ac) in sorted(self.reglas.items(), key=lambda x: -x[1][0]):
+            escribir(f"  {nombre:<38}{ms(seg):>12}{ev:>10}{ac:>11}")
+
+        escribir(f"\n  {'Tarea':<38}{'Tiempo':>12}{'Ejecuc.':>10}")
+        for nombre, (seg, n) in sorted(self.tareas.items(), key=lambda x: -x[1][0]):
+            escribir(f"  {nombre:<38}{ms(seg):>12}{n:>10}")
+
+        escribir(f"\n  Archivos más lentos:")
+        for archivo, seg in self._mas_lentos(top):
+            escribir(f"  {ms(seg)}  {archivo}")
+
+        escribir(f"\n  Hallazgos por tipo:" + ''.join(f"  {tipo}={n}" for tipo, n in sorted(self.tipos.items())))
+        escribir()
+
+# ─── Índice del proyecto ────────────────────────────────────────────
+
+class IndiceProyecto:
+    """
+    Índice en memoria del proyecto, compartido por todas las categorías.
+
+    Se construye una sola vez por corrida: el recorrido de carpetas se hace al
+    crearlo y el contenido de cada archivo (texto, líneas, JSON decodificado)
+    se lee la primera vez que alguna categoría lo pide y queda memoizado.
+    Así `check_json`, `check_cross` y `check_pwa` no vuelven a leer ni a
+    decodificar los mismos archivos.
+
+    `existe`, `estado`, `tamano` y `archivos_con_extension` salen de una sola
+    instantánea del proyecto (instantanea_archivos(): un recorrido con os.scandir
+    con el mtime y el tamaño de cada archivo), que se toma la primera vez que
+    alguno de ellos la necesita. Así los huérfanos y los archivos sin cachear del
+    SW cuestan un acceso a un dict por ruta, haya una historia o cincuenta.
+
+    Si recibe un `pool` (modo --jobs), `ejecutar()` reparte el trabajo por
+    archivo entre procesos; cada proceso arma su propio índice de la raíz.
+
+    Si se le asigna `al_producir` (un callable), `ejecutar()` le pasa los
+    hallazgos de cada tarea apenas están, sin esperar al resto (--ndjson,
+    --fallar-en).
+
+    Si recibe una `cache`, `ejecutar()` reutiliza los hallazgos de las tareas
+    cuyas dependencias no cambiaron. Para eso, mientras corre una tarea, cada
+    acceso al proyecto (`texto`, `lineas`, `json`, `existe`, `subcarpetas`,
+    `archivos_sw`, `archivos_con_extension`, `listar_json`, `tamano`,
+    `huella_publicada`, `cajas_mp4`) queda registrado como dependencia.
+    """
+
+    def __init__(self, raiz, pool=None, jobs=1, cache=None, dependencias=None):
+        self.raiz = Path(raiz)
+        self.pool = pool
+        self.jobs = jobs
+        self.cache = cache
+        self.al_producir = None
+        self.dependencias = cache is not None if dependencias is None else dependencias
+        self._textos = {}
+        self._lineas = {}
+        self._json = {}
+        self._existe = {}
+        self._subcarpetas = {}
+        self._archivos_sw = None
+        self._huellas_sw = None
+        self._archivos_ext = {}
+        self._listados = {}
+        self._estados = {}
+        self._huellas = {}
+        self._huellas_bytes = {}
+        self._cajas_mp4 = {}
+        self._instantanea = None
+        self._hilo = threading.local()
+        self._listar()
+
+    def _listar(self):
+        """Recorre las carpetas del proyecto y arma los listados de archivos a auditar."""
+        # Archivos JS y CSS del motor
+        self.archivos_js = []
+        for carpeta in ['js', 'js/challenges']:
+            dir_js = self.raiz / carpeta
+            if dir_js.is_dir():
+                self.archivos_js.extend((self.rel(f), f) for f in sorted(dir_js.glob('*.js')))
+
+        dir_css = self.raiz / 'css'
+        self.archivos_css = []
+        if dir_css.is_dir():
+            self.archivos_css = [(self.rel(f), f) for f in sorted(dir_css.glob('*.css'))]
+
+        # Historias: escenas, desafíos e historia.json de cada carpeta
+        self.historias = []
+        dir_historias = self.raiz / 'historias'
+        if dir_historias.is_dir():
+            for historia_dir in sorted(dir_historias.iterdir()):
+                if not historia_dir.is_dir():
+                    continue
+                historia_json = historia_dir / 'historia.json'
+                self.historias.append({
+                    'dir': historia_dir,
+                    'escenas': self._listar_json(historia_dir / 'datos' / 'escenas'),
+                    'desafios': self._listar_json(historia_dir / 'datos' / 'desafios'),
+                    'historia_json': historia_json if historia_json.exists() else None,
+                })
+
+        # Los archivos listados existen: evita un stat() por cada target
+        for historia in self.historias:
+            for rel, _ in historia['escenas'] + historia['desafios']:
+                self._existe[rel] = True
+
+    def invalidar(self, rels, relistar=False, instantanea=None):
+        """
+        Olvida lo memoizado de esos archivos para que se vuelvan a leer (modo
+        --watch). Con `relistar` (se agregaron o borraron archivos) también
+        rehace los listados de carpetas. `instantanea` es la del proyecto ya
+        cambiado, si quien llama la tiene (si no, se vuelve a tomar cuando haga falta).
+        """
+        self._instantanea = instantanea
+        for rel in rels:
+            for memo in (self._textos, self._lineas, self._json, self._existe,
+                         self._estados, self._huellas, self._huellas_bytes, self._cajas_mp4):
+                memo.pop(rel, None)
+        if 'service-worker.js' in rels:
+            self._archivos_sw = None
+            self._huellas_sw = None
+        if relistar:
+            self._subcarpetas.clear()
+            self._archivos_ext.clear()
+            self._listados.clear()
+            self._listar()
+
+    def _listar_json(self, carpeta):
+        if not carpeta.is_dir():
+            return []
+        return [(self.rel(f), f) for f in sorted(carpeta.glob('*.json'))]
+
+    def rel(self, ruta_abs):
+        """Convierte Path absoluto a string relativo al proyecto."""
+        try:
+            return str(Path(ruta_abs).relative_to(self.raiz)).replace('\\', '/')
+        except ValueError:
+            return str(ruta_abs).replace('\\', '/')
+
+    def instantanea(self):
+        """Ruta relativa → (mtime_ns, tamaño) de cada archivo del proyecto (ver instantanea_archivos)."""
+        if self._instantanea is None:
+            self._instantanea = instantanea_archivos(self.raiz)
+        return self._instantanea
+
+    def existe(self, rel):
+        """Indica si existe un archivo del proyecto (memoizado)."""
+        if rel not in self._existe:
+            # Fuera de la instantánea quedan las carpetas y lo que no se recorre (.git, la caché)
+            self._existe[rel] = rel in self.instantanea() or (self.raiz / rel).exists()
+        self._registrar('existe', rel, self._existe[rel])
+        return self._existe[rel]
+
+    def subcarpetas(self, carpeta):
+        """Nombres de las subcarpetas de `carpeta` (memoizado). Vacío si no existe."""
+        if carpeta not in self._subcarpetas:
+            self._subcarpetas[carpeta] = (
+                {d.name for d in carpeta.iterdir() if d.is_dir()} if carpeta.is_dir() else set())
+        if self._registro() is not None:
+            self._registrar('subcarpetas', self.rel(carpeta), sorted(self._subcarpetas[carpeta]))
+        return self._subcarpetas[carpeta]
+
+    def texto(self, rel):
+        """Contenido completo de un archivo. Retorna None si no existe o no se puede leer."""
+        if rel not in self._textos:
+            self._leer(rel)
+        self._registrar_texto(rel)
+        return self._textos[rel]
+
+    def _leer(self, rel):
+        if self.dependencias:
+            # El stat va antes de la lectura: si el archivo cambia en el medio,
+            # la firma queda vieja y la próxima corrida lo vuelve a auditar
+            self.estado(rel)
+        try:
+            self._textos[rel] = (self.raiz / rel).read_text(encoding='utf-8')
+        except Exception:
+            self._textos[rel] = None
+        return self._textos[rel]
+
+    def lineas(self, rel):
+        """Líneas de un archivo. Retorna [] si no existe."""
+        if rel not in self._lineas:
+            texto = self.texto(rel)
+            self._lineas[rel] = texto.splitlines() if texto is not None else []
+            if PERFIL is not None:
+                PERFIL.lineas += len(self._lineas[rel])
+        self._registrar_texto(rel)
+        return self._lineas[rel]
+
+    def json(self, rel):
+        """JSON decodificado de un archivo. Retorna (datos, error)."""
+        if rel not in self._json:
+            texto = self.texto(rel)
+            if texto is None:
+                self._json[rel] = _cargar_json(self.raiz / rel)
+            else:
+                try:
+                    self._json[rel] = (json.loads(texto), None)
+                except json.JSONDecodeError as e:
+                    self._json[rel] = (None, str(e))
+            if PERFIL is not None:
+                PERFIL.nodos_json += _contar_nodos(self._json[rel][0])
+        self._registrar_texto(rel)
+        return self._json[rel]
+
+    def archivos_sw(self):
+        """Conjunto de rutas listadas en RUTAS_CACHE del service-worker.js."""
+        if self._archivos_sw is None:
+            self._archivos_sw = _parsear_archivos_sw('\n'.join(self.lineas('service-worker.js')))
+        self._registrar_texto('service-worker.js')
+        return self._archivos_sw
+
+    def huellas_sw(self):
+        """Ruta → huella del manifiesto de RUTAS_CACHE (generar-manifiesto.py); {} si el SW no lo tiene."""
+        if self._huellas_sw is None:
+            self._huellas_sw = _parsear_huellas_sw('\n'.join(self.lineas('service-worker.js')))
+        self._registrar_texto('service-worker.js')
+        return self._huellas_sw
+
+    def archivos_con_extension(self, extensiones):
+        """
+        Rutas relativas de todos los archivos del proyecto con esas extensiones
+        (memoizado). Excluye la caché del auditor, que no es parte del proyecto.
+        """
+        clave = ','.join(sorted(extensiones))
+        if clave not in self._archivos_ext:
+            extensiones = set(extensiones)
+            self._archivos_ext[clave] = sorted(
+                rel for rel in self.instantanea() if os.path.splitext(rel)[1] in extensiones)
+        if self._registro() is not None:
+            self._registrar('archivos', clave, _huella_lista(self._archivos_ext[clave]))
+        return self._archivos_ext[clave]
+
+    def listar_json(self, carpeta):
+        """Rutas relativas de los *.json de `carpeta`, ordenadas (memoizado). Vacío si no existe."""
+        rel = self.rel(carpeta)
+        if rel not in self._listados:
+            nombres = sorted(n for n in os.listdir(carpeta) if n.endswith('.json')) if carpeta.is_dir() else []
+            self._listados[rel] = [f'{rel}/{n}' for n in nombres]
+        if self._registro() is not None:
+            self._registrar('listado', rel, _huella_lista(self._listados[rel]))
+        return self._listados[rel]
+
+    def tamano(self, rel):
+        """Tamaño en bytes de un archivo, o None si no existe."""
+        estado = self.estado(rel)
+        tamano = estado[1] if estado is not None else None
+        self._registrar('tamano', rel, tamano)
+        return tamano
+
+    def huella_publicada(self, rel):
+        """{"hash", "bytes"} de los bytes tal cual están en disco (como en generar_catalogo.py), o None."""
+        if rel not in self._huellas_bytes:
+            try:
+                contenido = (self.raiz / rel).read_bytes()
+                digest = hashlib.sha256(contenido).hexdigest()
+                self._huellas_bytes[rel] = {'hash': digest[:16], 'bytes': len(contenido)}
+                if rel not in self._huellas and rel not in self._textos and not _es_utf8(contenido):
+                    # Binario: huella() llegaría al mismo hash después de fallar al leerlo como texto
+                    self._huellas[rel] = digest
+            except OSError:
+                self._huellas_bytes[rel] = None
+        self._registrar_texto(rel)
+        return self._huellas_bytes[rel]
+
+    def cajas_mp4(self, rel):
+        """
+        Tipos de las cajas de primer nivel de un MP4, en orden (ver _cajas_mp4),
+        o None si no se puede leer (memoizado). Depende del mtime y el tamaño:
+        pasar a faststart no cambia el tamaño del archivo.
+        """
+        if rel not in self._cajas_mp4:
+            # El stat va antes de la lectura, como en _leer()
+            self.estado(rel)
+            self._cajas_mp4[rel] = _cajas_mp4(self.raiz / rel)
+        self._registrar('estado', rel, self.estado(rel))
+        return self._cajas_mp4[rel]
+
+    # --- Dependencias (para la caché) ---
+
+    def estado(self, rel):
+        """(mtime_ns, tamaño) de un archivo, o None si no existe (memoizado)."""
+        if rel not in self._estados:
+            estado = self.instantanea().get(rel)
+            if estado is not None:
+                self._estados[rel] = list(estado)
+            else:
+                try:
+                    st = (self.raiz / rel).stat()
+                    self._estados[rel] = [st.st_mtime_ns, st.st_size]
+                except OSError:
+                    self._estados[rel] = None
+        return self._estados[rel]
+
+    def huella(self, rel):
+        """Hash del contenido de un archivo, o None si no existe (memoizado)."""
+        if rel not in self._huellas:
+            texto = self._textos[rel] if rel in self._textos else self._leer(rel)
+            if texto is not None:
+                contenido = texto.encode('utf-8')
+            else:
+                try:
+                    contenido = (self.raiz / rel).read_bytes()
+                except OSError:
+                    contenido = None
+            self._huellas[rel] = hashlib.sha256(contenido).hexdigest() if contenido is not None else None
+        return self._huellas[rel]
+
+    def firma(self, rel):
+        """Firma de un archivo: [mtime_ns, tamaño, hash], o None si no existe."""
+        estado = self.estado(rel)
+        return None if estado is None else estado + [self.huella(rel)]
+
+    def dependencia_vigente(self, tipo, clave, valor):
+        """Indica si una dependencia registrada sigue valiendo lo mismo que ahora."""
+        if tipo == 'texto':
+            estado = self.estado(clave)
+            if estado is None or valor is None:
+                return estado is None and valor is None
+            # Mismo mtime y tamaño: no hace falta leerlo. Si cambiaron, decide el hash
+            return estado == valor[:2] or self.huella(clave) == valor[2]
+        if tipo == 'existe':
+            return self.existe(clave) == valor
+        if tipo == 'subcarpetas':
+            return sorted(self.subcarpetas(self.raiz / clave)) == valor
+        if tipo == 'archivos':
+            return _huella_lista(self.archivos_con_extension(clave.split(','))) == valor
+        if tipo == 'listado':
+            return _huella_lista(self.listar_json(self.raiz / clave)) == valor
+        if tipo == 'tamano':
+            return self.tamano(clave) == valor
+        if tipo == 'estado':
+            return self.estado(clave) == valor
+        return False
+
+    def _registro(self):
+        return getattr(self._hilo, 'registro', None)
+
+    def _registrar(self, tipo, clave, valor):
+        registro = self._registro()
+        if registro is not None:
+            registro[(tipo, clave)] = valor
+
+    def _registrar_texto(self, rel):
+        registro = self._registro()
+        if registro is not None and ('texto', rel) not in registro:
+            registro[('texto', rel)] = self.firma(rel)
+
+    # --- Ejecución de tareas ---
+
+    def clave_tarea(self, fn, args):
+        """Identificador estable de una tarea `(fn, *args)` para la caché."""
+        partes = [fn.__name__] + [self.rel(a) if isinstance(a, Path) else str(a) for a in args]
+        return ':'.join(partes)
+
+    def correr(self, fn, *args):
+        """Ejecuta una tarea y retorna (hallazgos, dependencias registradas)."""
+        if PERFIL is not None:
+            return PERFIL.medir_tarea(self, fn, args), None
+        if not self.dependencias:
+            return fn(self, *args), None
+        self._hilo.registro = {}
+        try:
+            hallazgos = fn(self, *args)
+        finally:
+            registro, self._hilo.registro = self._hilo.registro, None
+        return hallazgos, [[tipo, clave, valor] for (tipo, clave), valor in registro.items()]
+
+    def ejecutar(self, tareas):
+        """
+        Ejecuta tareas `(fn, *args)` como `fn(indice, *args)` y concatena sus hallazgos.
+
+        Las tareas vigentes en la caché no se ejecutan. El resultado respeta el
+        orden de `tareas` aunque se repartan entre procesos, así el reporte es
+        idéntico al de una corrida serial.
+        """
+        resultados = [None] * len(tareas)
+        claves = [None] * len(tareas)
+        pendientes = []
+        for i, (fn, *args) in enumerate(tareas):
+            if self.cache is not None:
+                claves[i] = self.clave_tarea(fn, args)
+                resultados[i] = self.cache.buscar(self, claves[i])
+            if resultados[i] is None:
+                pendientes.append(i)
+            else:
+                self._producir(resultados[i])
+
+        if self.pool is None or len(pendientes) < 2:
+            # Generador: cada tarea se reporta apenas termina
+            corridas = (self.correr(*tareas[i]) for i in pendientes)
+        else:
+            tamano_lote = max(1, len(pendientes) // (self.jobs * 4))
+            corridas = self.pool.map(_ejecutar_tarea, [tareas[i] for i in pendientes],
+                                     chunksize=tamano_lote)
+
+        for i, (hallazgos, deps) in zip(pendientes, corridas):
+            resultados[i] = hallazgos
+            if self.cache is not None:
+                self.cache.guardar(claves[i], deps, hallazgos)
+            self._producir(hallazgos)
+
+        return [h for hallazgos in resultados for h in hallazgos]
+
+    def _producir(self, hallazgos):
+        if self.al_producir is not None and hallazgos:
+            self.al_producir(hallazgos)
+
+
+def _cajas_mp4(ruta):
+    """
+    Tipos de las cajas de primer nivel de un MP4 ('ftyp', 'moov', 'mdat'...),
+    leyendo solo las cabeceras; None si no se puede leer o no es un MP4.
+    """
+    tipos = []
+    try:
+        tamano = ruta.stat().st_size
+        with open(ruta, 'rb') as f:
+            pos = 0
+            while pos + 8 <= tamano:
+                f.seek(pos)
+                cabecera = f.read(16)
+                largo = int.from_bytes(cabecera[:4], 'big')
+                if largo == 1 and len(cabecera) == 16:
+                    largo = int.from_bytes(cabecera[8:16], 'big')  # Largo de 64 bits
+                elif largo == 0:
+                    largo = tamano - pos  # Hasta el final del archivo
+                if largo < 8:
+                    return None
+                tipos.append(cabecera[4:8].decode('latin-1'))
+                pos += largo
+    except OSError:
+        return None
+    return tipos if 'moov' in tipos else None
+
+
+def _huella_lista(rutas):
+    """Hash de una lista de rutas (para dependencias sobre listados de carpetas)."""
+    return hashlib.sha256('\n'.join(rutas).encode('utf-8')).hexdigest()
+
+
+# Índice propio de cada proceso del pool (lo crea _iniciar_proceso)
+_INDICE_PROCESO = None
+
+
+def _iniciar_proceso(raiz, dependencias=False):
+    """Inicializador de los procesos del pool: arma el índice local."""
+    global _INDICE_PROCESO
+    _INDICE_PROCESO = IndiceProyecto(raiz, dependencias=dependencias)
+
+
+def _ejecutar_tarea(tarea):
+    """Ejecuta una tarea `(fn, *args)` dentro de un proceso del pool."""
+    fn, *args = tarea
+    return _INDICE_PROCESO.correr(fn, *args)
+
+
+# ─── Caché persistente ──────────────────────────────────────────────
+
+class CacheAuditoria:
+    """
+    Caché en disco de los hallazgos de cada tarea, entre corridas.
+
+    Cada entrada guarda los hallazgos de una tarea y las dependencias que
+    registró el índice mientras corría: la firma (mtime, tamaño, hash) de cada
+    archivo que leyó, cada chequeo de existencia, cada listado de carpeta.
+    Una entrada se reutiliza solo si todas sus dependencias siguen iguales, así
+    que cambios en otros archivos (un target que se borra, una carpeta de
+    personaje nueva, un archivo que se agrega al SW) invalidan lo que
+    corresponde aunque el archivo auditado no haya cambiado.
+
+    Toda la caché se descarta si cambia VERSION_REGLAS. Con `ruta=None` vive
+    solo en memoria (--watch con --sin-cache).
+    """
+
+    def __init__(self, ruta, version=VERSION_REGLAS):
+        self.ruta = Path(ruta) if ruta is not None else None
+        self.version = version
+        self.tareas = {}
+        self.usadas = set()
+        self.consultas = 0
+        self.aciertos = 0
+        self._modificada = False
+
+        try:
+            datos = json.loads(self.ruta.read_text(encoding='utf-8')) if self.ruta else None
+        except (OSError, ValueError):
+            datos = None
+        if isinstance(datos, dict) and datos.get('version') == version:
+            self.tareas = datos.get('tareas', {})
+
+    def buscar(self, indice, clave):
+        """Hallazgos guardados de la tarea si siguen vigentes; None si hay que correrla."""
+        self.usadas.add(clave)
+        self.consultas += 1
+        entrada = self.tareas.get(clave)
+        if entrada is None:
+            return None
+        for tipo, dep, valor in entrada['deps']:
+            if not indice.dependencia_vigente(tipo, dep, valor):
+                return None
+            if tipo == 'texto' and valor is not None and valor[:2] != indice.estado(dep):
+                # Contenido igual con otro mtime (checkout, touch): actualizar la firma
+                valor[:2] = indice.estado(dep)
+                self._modificada = True
+        self.aciertos += 1
+        return [Hallazgo(**h) for h in entrada['hallazgos']]
+
+    def guardar(self, clave, deps, hallazgos):
+        """Guarda el resultado de una tarea recién ejecutada."""
+        self.usadas.add(clave)
+        self.tareas[clave] = {'deps': deps, 'hallazgos': [h.to_dict() for h in hallazgos]}
+        self._modificada = True
+
+    def escribir(self, podar=False):
+        """
+        Persiste la caché (reemplazo atómico). Con `podar`, descarta las tareas
+        que no se usaron en esta corrida (archivos borrados o renombrados).
+        """
+        if podar:
+            obsoletas = set(self.tareas) - self.usadas
+            for clave in obsoletas:
+                del self.tareas[clave]
+            self._modificada = self._modificada or bool(obsoletas)
+        if not self._modificada or self.ruta is None:
+            return
+
+        try:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_suffix('.tmp')
+            temporal.write_text(json.dumps({'version': self.version, 'tareas': self.tareas},
+                                           ensure_ascii=False), encoding='utf-8')
+            os.replace(temporal, self.ruta)
+            self._modificada = False
+        except OSError as e:
+            print(f"AVISO: no se pudo escribir la caché ({e})", file=sys.stderr)
+
+
+def _es_utf8(contenido):
+    try:
+        contenido.decode('utf-8')
+        return True
+    except UnicodeDecodeError:
+        return False
 
-            # --- innerHTML sin sanitizar ---
-            if '.innerHTML' in linea and 'textContent' not in linea:
-                # Verificar si hay interpolación de variables
-                if re.search(r'\.innerHTML\s*=.*(\$\{|\.replace|\+\s*\w)', linea):
-                    hallazgos.append(Hallazgo(
-                        'js', 'MEDIA', 'bug', rel, i,
-                        'Uso de .innerHTML con contenido dinámico (riesgo de inyección)',
-                        'Considerar sanitizar el contenido o usar .textContent donde sea posible'
-                    ))
-
-            # --- console.log residuales ---
-            if re.search(r'console\.(log|debug|info)\s*\(', linea):
-                hallazgos.append(Hallazgo(
-                    'js', 'BAJA', 'refactor', rel, i,
-                    'console.log/debug/info residual (no es console.error/warn)',
-                    'Eliminar o reemplazar por console.warn/error si es manejo de errores'
-                ))
 
-            # --- Hardcodeo de IDs de escena en JS ---
-            match_id = re.search(r"['\"]([A-Z][A-Z0-9_]{3,})['\"]", linea)
-            if match_id:
-                id_val = match_id.group(1)
-                # Excluir constantes de storage, DOM IDs comunes y el propio nombre
-                excluidos = {'STORAGE_PREFIX', 'GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'}
-                if id_val not in excluidos and not id_val.startswith('CACHE_'):
-                    # Verificar si parece un ID de escena (patrón típico)
-                    if re.match(r'^[A-Z][A-Z0-9]+(_[A-Z0-9]+)+$', id_val):
-                        hallazgos.append(Hallazgo(
-                            'js', 'ALTA', 'hardcodeo', rel, i,
-                            f'ID de escena/desafío hardcodeado en JS: "{id_val}"',
-                            'Mover a configuración JSON. La lógica narrativa no debe estar en JS (regla de AGENTS.md)'
-                        ))
-
-            # --- TODO / FIXME / HACK ---
-            if re.search(r'//\s*(TODO|FIXME|HACK|XXX)\b', linea, re.IGNORECASE):
-                hallazgos.append(Hallazgo(
-                    'js', 'MEDIA', 'dead_code', rel, i,
-                    f'Marcador pendiente encontrado: {stripped[:80]}',
-                    'Resolver o documentar formalmente como feature incompleto'
-                ))
+def _parsear_huellas_sw(contenido_sw):
+    """Ruta → huella (o None) de cada entrada del manifiesto del SW."""
+    m = re.search(r'MANIFIESTO:INICIO(.*?)MANIFIESTO:FIN', contenido_sw, re.DOTALL)
+    if not m:
+        return {}
+    return {ruta: huella or None
+            for ruta, huella in re.findall(r"'([^']+)'\s*:\s*(?:'([0-9a-f]+)'|null)", m.group(1))}
 
-            # --- animationend (documentado como problemático) ---
-            if 'animationend' in linea:
-                hallazgos.append(Hallazgo(
-                    'js', 'MEDIA', 'bug', rel, i,
-                    'Uso de "animationend" — documentado como problemático por event bubbling',
-                    'Evaluar si se puede reemplazar por setTimeout sincronizado con la duración CSS'
-                ))
 
-    return hallazgos
+def _parsear_archivos_sw(contenido_sw):
+    """Extrae las rutas de archivo que lista el Service Worker."""
+    archivos_en_sw = set()
 
-# ─── CHECKS: CSS ────────────────────────────────────────────────────
+    # Resolver constantes de ruta (ej: RUTA_EMBE = 'historias/...')
+    constantes_ruta = {}
+    for match in re.finditer(r"const\s+(\w+)\s*=\s*'([^']+)'", contenido_sw):
+        nombre, valor = match.group(1), match.group(2)
+        if '/' in valor and not valor.startswith('cache-'):
+            constantes_ruta[nombre] = valor
 
-def check_css(archivos_filtro=None):
-    """Ejecuta checks sobre archivos CSS."""
-    hallazgos = []
+    # Buscar strings entre comillas simples que parecen rutas de archivo
+    for match in re.finditer(r"'([^']+\.[a-zA-Z0-9]{2,5})'", contenido_sw):
+        ruta_str = match.group(1)
+        # Ignorar cache names, URLs externas, fragmentos parciales (empiezan con /)
+        if ruta_str.startswith('cache-') or '://' in ruta_str or ruta_str.startswith('/'):
+            continue
+        archivos_en_sw.add(ruta_str)
+
+    # Buscar concatenaciones con constantes de ruta (ej: RUTA_EMBE + '/datos/...')
+    for nombre_const, valor_const in constantes_ruta.items():
+        for match in re.finditer(rf"{nombre_const}\s*\+\s*'([^']+)'", contenido_sw):
+            archivos_en_sw.add(valor_const + match.group(1))
 
-    # Z-index válidos del sistema (valores numéricos definidos en variables.css)
-    z_validos = {0, 1, 5, 10, 100, 200, 300, 1000, 1050, 1100, 1200}
+    # Eliminar './' (es la raíz)
+    archivos_en_sw.discard('./')
+    return archivos_en_sw
+
+# ─── Motor de reglas por línea (JS y CSS) ───────────────────────────
+
+class ReglaLinea:
+    """
+    Regla declarativa para los checks línea por línea de JS y CSS.
+
+    - `literales`: palabras clave de las que al menos una tiene que aparecer en
+      la línea para que se evalúe `patron` (prefiltro; ver MotorReglas).
+    - `patron`: regex que se busca en la línea sin espacios de los bordes.
+    - `condicion(m, stripped, rel)`: opcional, decide si el match es un hallazgo.
+    - `descripcion` / `sugerencia`: plantillas de str.format con `m` (el match)
+      y `stripped` (la línea), ej: 'Magic number {m[1]}' o '{stripped:.80}'.
+    """
+
+    def __init__(self, nombre, severidad, tipo, literales, patron, descripcion, sugerencia,
+                 condicion=None, flags=0):
+        self.nombre = nombre
+        self.severidad = severidad
+        self.tipo = tipo
+        self.literales = tuple(literales)
+        self.patron = re.compile(patron, flags)
+        self.descripcion = descripcion
+        self.sugerencia = sugerencia
+        self.condicion = condicion
+
+
+class MotorReglas:
+    """
+    Compila una tabla de ReglaLinea en un único prefiltro de palabras clave.
+
+    El prefiltro es una sola regex con todos los literales de todas las reglas:
+    recorre el archivo entero una vez y marca qué literales aparecen en qué
+    líneas. Solo esas líneas se procesan, y en cada una solo se evalúan las
+    reglas cuyos literales aparecieron, en el orden de la tabla. Agregar una
+    regla suma un literal al prefiltro, no otra pasada sobre cada línea.
+    """
+
+    def __init__(self, categoria, reglas, ignorar_linea=None):
+        self.categoria = categoria
+        self.reglas = list(reglas)
+        self.ignorar_linea = ignorar_linea
+
+        literales = sorted({lit for regla in self.reglas for lit in regla.literales},
+                           key=lambda lit: (-len(lit), lit))
+        # Lookahead: reporta todas las posiciones aunque los literales se solapen.
+        # En cada posición gana el más largo; los más cortos que empiezan ahí son
+        # prefijos suyos y se resuelven con el mapa de abajo.
+        self.prefiltro = re.compile('(?=(' + '|'.join(re.escape(lit) for lit in literales) + '))')
+        self.reglas_por_literal = {
+            encontrado: frozenset(i for i, regla in enumerate(self.reglas)
+                                  if any(lit in encontrado for lit in regla.literales))
+            for encontrado in literales
+        }
 
-    dir_css = RAIZ / 'css'
-    if not dir_css.is_dir():
+    def _candidatas(self, lineas):
+        """Pasada del prefiltro: número de línea (base 0) → índices de reglas a evaluar."""
+        texto = '\n'.join(lineas)
+        inicios = []
+        posicion = 0
+        for linea in lineas:
+            inicios.append(posicion)
+            posicion += len(linea) + 1
+
+        candidatas = defaultdict(set)
+        for match in self.prefiltro.finditer(texto):
+            n = bisect.bisect_right(inicios, match.start()) - 1
+            candidatas[n] |= self.reglas_por_literal[match.group(1)]
+        return candidatas
+
+    def _hallazgo(self, regla, m, stripped, rel, n):
+        return Hallazgo(self.categoria, regla.severidad, regla.tipo, rel, n + 1,
+                        regla.descripcion.format(m=m, stripped=stripped),
+                        regla.sugerencia.format(m=m, stripped=stripped))
+
+    def escanear(self, rel, lineas):
+        """Aplica todas las reglas a las líneas de un archivo. Retorna la lista de hallazgos."""
+        if PERFIL is not None:
+            return self._escanear_perfilado(rel, lineas, PERFIL)
+
+        hallazgos = []
+        candidatas = self._candidatas(lineas)
+        for n in sorted(candidatas):
+            stripped = lineas[n].strip()
+            if self.ignorar_linea and self.ignorar_linea(stripped):
+                continue
+            for i in sorted(candidatas[n]):
+                regla = self.reglas[i]
+                m = regla.patron.search(stripped)
+                if not m or (regla.condicion and not regla.condicion(m, stripped, rel)):
+                    continue
+                hallazgos.append(self._hallazgo(regla, m, stripped, rel, n))
         return hallazgos
 
-    for f in sorted(dir_css.glob('*.css')):
-        rel = ruta_relativa(f)
-        if archivos_filtro and rel not in archivos_filtro:
-            continue
-        lineas = leer_archivo(rel)
-
-        # Track si estamos dentro de un @keyframes (z-index ahí puede ser intencional)
-        en_keyframes = False
-        en_root = False
-
-        for i, linea in enumerate(lineas, 1):
-            stripped = linea.strip()
-
-            # Detectar bloques especiales
-            if '@keyframes' in stripped:
-                en_keyframes = True
-            if ':root' in stripped:
-                en_root = True
-            if stripped == '}' and (en_keyframes or en_root):
-                # Heurística simple: el cierre a nivel 0 cierra el bloque
-                pass
-
-            # --- !important ---
-            if '!important' in stripped and not stripped.startswith('/*'):
-                hallazgos.append(Hallazgo(
-                    'css', 'MEDIA', 'refactor', rel, i,
-                    f'Uso de !important: {stripped[:80]}',
-                    'Resolver el problema de especificidad sin !important'
-                ))
+    def _escanear_perfilado(self, rel, lineas, perfil):
+        """Igual que escanear(), midiendo el prefiltro y cada regla (--perfil)."""
+        inicio = time.perf_counter()
+        candidatas = self._candidatas(lineas)
+        perfil.sumar_regla(f'{self.categoria}:(prefiltro)', time.perf_counter() - inicio, 1, 0)
 
-            # --- z-index literal (no variable) ---
-            match_z = re.search(r'z-index\s*:\s*(-?\d+)', stripped)
-            if match_z and 'var(--z-' not in stripped:
-                valor = int(match_z.group(1))
-                # Ignorar 0 y 1 en keyframes/partículas (uso legítimo)
-                if valor not in {0, 1, -1} or 'variables.css' in rel:
-                    if 'variables.css' not in rel:  # No reportar las definiciones
-                        hallazgos.append(Hallazgo(
-                            'css', 'MEDIA', 'inconsistencia', rel, i,
-                            f'z-index literal ({valor}) en lugar de variable CSS',
-                            f'Usar var(--z-*) del sistema de capas definido en variables.css'
-                        ))
-
-            # --- Breakpoint inconsistente ---
-            if '@media' in stripped:
-                # El breakpoint estándar es (max-width: 900px), (max-height: 600px)
-                if 'max-width' in stripped or 'max-height' in stripped:
-                    if '900px' not in stripped and '600px' not in stripped:
-                        hallazgos.append(Hallazgo(
-                            'css', 'MEDIA', 'inconsistencia', rel, i,
-                            f'Breakpoint no estándar: {stripped[:80]}',
-                            'El breakpoint del proyecto es (max-width: 900px), (max-height: 600px)'
-                        ))
-
-            # --- Colores hardcodeados (no variables) ---
-            if re.search(r'(?:color|background|border|shadow)\s*:.*#[0-9a-fA-F]{3,8}', stripped):
-                if 'var(--' not in stripped and 'variables.css' not in rel:
-                    # No reportar en gradientes donde puede ser intencional
-                    if 'gradient' not in stripped:
-                        hallazgos.append(Hallazgo(
-                            'css', 'BAJA', 'refactor', rel, i,
-                            f'Color hex literal en lugar de variable CSS: {stripped[:60]}',
-                            'Considerar usar un token de variables.css si el color pertenece a la paleta'
-                        ))
+        hallazgos = []
+        for n in sorted(candidatas):
+            stripped = lineas[n].strip()
+            if self.ignorar_linea and self.ignorar_linea(stripped):
+                continue
+            for i in sorted(candidatas[n]):
+                regla = self.reglas[i]
+                inicio = time.perf_counter()
+                m = regla.patron.search(stripped)
+                acierto = bool(m) and (not regla.condicion or regla.condicion(m, stripped, rel))
+                perfil.sumar_regla(f'{self.categoria}:{regla.nombre}',
+                                   time.perf_counter() - inicio, 1, int(acierto))
+                if acierto:
+                    hallazgos.append(self._hallazgo(regla, m, stripped, rel, n))
+        return hallazgos
 
-    return hallazgos
+# ─── CHECKS: JavaScript ────────────────────────────────────────────
+
+def check_js(indice, archivos_filtro=None):
+    """Ejecuta checks sobre archivos JavaScript."""
+    # Recopilar archivos JS (el service-worker.js se audita en pwa, no acá)
+    return indice.ejecutar([(_check_js_archivo, rel) for rel, _ in indice.archivos_js
+                            if not archivos_filtro or rel in archivos_filtro])
+
+
+def _check_js_archivo(indice, rel):
+    """Escanea línea por línea un archivo JavaScript."""
+    return MOTOR_JS.escanear(rel, indice.lineas(rel))
+
+
+def _es_comentario_js(stripped):
+    return stripped.startswith('//') or stripped.startswith('*') or stripped.startswith('/*')
+
+
+# Strings en mayúsculas que no son IDs de escena/desafío
+IDS_NO_ESCENA = {'STORAGE_PREFIX', 'GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'}
+PATRON_ID_ESCENA = re.compile(r'^[A-Z][A-Z0-9]+(_[A-Z0-9]+)+$')
+
+
+def _es_id_escena(m, stripped, rel):
+    id_val = m.group(1)
+    return (id_val not in IDS_NO_ESCENA and not id_val.startswith('CACHE_')
+            and PATRON_ID_ESCENA.match(id_val) is not None)
+
+
+REGLAS_JS = [
+    # --- Magic numbers en setTimeout / delay ---
+    ReglaLinea('timeout', 'BAJA', 'magic_number', ['setTimeout'],
+               r'setTimeout\s*\(\s*(?:.*?,\s*)(\d{3,5})\s*\)',
+               'Magic number {m[1]} en setTimeout',
+               'Extraer a una constante nombrada (ej: DELAY_FEEDBACK = {m[1]})'),
+    ReglaLinea('delay', 'BAJA', 'magic_number', ['delay'],
+               r'#?delay\s*\(\s*(\d{3,5})\s*\)',
+               'Magic number {m[1]} en delay()',
+               'Extraer a una constante nombrada'),
+    # --- Magic numbers en volume ---
+    ReglaLinea('volumen', 'BAJA', 'magic_number', ['.volume'],
+               r'\.volume\s*=\s*(0\.\d+)',
+               'Volumen hardcodeado: {m[1]}',
+               'Extraer a constante (ej: VOLUMEN_BGM, VOLUMEN_SFX)'),
+    # --- innerHTML sin sanitizar (con interpolación de variables) ---
+    ReglaLinea('inner_html', 'MEDIA', 'bug', ['.innerHTML'],
+               r'\.innerHTML\s*=.*(\$\{|\.replace|\+\s*\w)',
+               'Uso de .innerHTML con contenido dinámico (riesgo de inyección)',
+               'Considerar sanitizar el contenido o usar .textContent donde sea posible',
+               condicion=lambda m, stripped, rel: 'textContent' not in stripped),
+    # --- console.log residuales ---
+    ReglaLinea('console_log', 'BAJA', 'refactor', ['console.'],
+               r'console\.(log|debug|info)\s*\(',
+               'console.log/debug/info residual (no es console.error/warn)',
+               'Eliminar o reemplazar por console.warn/error si es manejo de errores'),
+    # --- Hardcodeo de IDs de escena en JS ---
+    ReglaLinea('id_escena', 'ALTA', 'hardcodeo', ["'", '"'],
+               r"['\"]([A-Z][A-Z0-9_]{3,})['\"]",
+               'ID de escena/desafío hardcodeado en JS: "{m[1]}"',
+               'Mover a configuración JSON. La lógica narrativa no debe estar en JS (regla de AGENTS.md)',
+               condicion=_es_id_escena),
+    # --- TODO / FIXME / HACK ---
+    ReglaLinea('marcador', 'MEDIA', 'dead_code', ['//'],
+               r'//\s*(TODO|FIXME|HACK|XXX)\b',
+               'Marcador pendiente encontrado: {stripped:.80}',
+               'Resolver o documentar formalmente como feature incompleto',
+               flags=re.IGNORECASE),
+    # --- animationend (documentado como problemático) ---
+    ReglaLinea('animationend', 'MEDIA', 'bug', ['animationend'],
+               r'animationend',
+               'Uso de "animationend" — documentado como problemático por event bubbling',
+               'Evaluar si se puede reemplazar por setTimeout sincronizado con la duración CSS'),
+]
+
+MOTOR_JS = MotorReglas('js', REGLAS_JS, ignorar_linea=_es_comentario_js)
+
+# ─── CHECKS: CSS ────────────────────────────────────────────────────
+
+def check_css(indice, archivos_filtro=None):
+    """Ejecuta checks sobre archivos CSS."""
+    return indice.ejecutar([(_check_css_archivo, rel) for rel, _ in indice.archivos_css
+                            if not archivos_filtro or rel in archivos_filtro])
+
+
+def _check_css_archivo(indice, rel):
+    """Escanea línea por línea un archivo CSS."""
+    return MOTOR_CSS.escanear(rel, indice.lineas(rel))
+
+
+def _es_z_index_literal(m, stripped, rel):
+    # Ignorar 0, 1 y -1 (uso legítimo en keyframes/partículas) y las
+    # definiciones de variables.css
+    return ('var(--z-' not in stripped and int(m.group(1)) not in {0, 1, -1}
+            and 'variables.css' not in rel)
+
+
+def _es_breakpoint_no_estandar(m, stripped, rel):
+    # El breakpoint estándar es (max-width: 900px), (max-height: 600px)
+    return '900px' not in stripped and '600px' not in stripped
+
+
+def _es_color_literal(m, stripped, rel):
+    # No reportar en gradientes donde puede ser intencional
+    return 'var(--' not in stripped and 'variables.css' not in rel and 'gradient' not in stripped
+
+
+REGLAS_CSS = [
+    # --- !important ---
+    ReglaLinea('important', 'MEDIA', 'refactor', ['!important'],
+               r'!important',
+               'Uso de !important: {stripped:.80}',
+               'Resolver el problema de especificidad sin !important',
+               condicion=lambda m, stripped, rel: not stripped.startswith('/*')),
+    # --- z-index literal (no variable) ---
+    ReglaLinea('z_index', 'MEDIA', 'inconsistencia', ['z-index'],
+               r'z-index\s*:\s*(-?\d+)',
+               'z-index literal ({m[1]}) en lugar de variable CSS',
+               'Usar var(--z-*) del sistema de capas definido en variables.css',
+               condicion=_es_z_index_literal),
+    # --- Breakpoint inconsistente ---
+    ReglaLinea('breakpoint', 'MEDIA', 'inconsistencia', ['@media'],
+               r'max-width|max-height',
+               'Breakpoint no estándar: {stripped:.80}',
+               'El breakpoint del proyecto es (max-width: 900px), (max-height: 600px)',
+               condicion=_es_breakpoint_no_estandar),
+    # --- Colores hardcodeados (no variables) ---
+    ReglaLinea('color_literal', 'BAJA', 'refactor', ['color', 'background', 'border', 'shadow'],
+               r'(?:color|background|border|shadow)\s*:.*#[0-9a-fA-F]{3,8}',
+               'Color hex literal en lugar de variable CSS: {stripped:.60}',
+               'Considerar usar un token de variables.css si el color pertenece a la paleta',
+               condicion=_es_color_literal),
+]
+
+MOTOR_CSS = MotorReglas('css', REGLAS_CSS)
 
 # ─── CHECKS: JSON (escenas y desafíos) ─────────────────────────────
 
@@ -305,62 +1120,37 @@ ANTI_VOSEO = re.compile(
 TIPOS_EFECTO_VALIDOS = {'luciérnagas', 'polvo_hadas', 'nieve', 'destellos', 'sparkles'}
 
 
-def check_json(archivos_filtro=None):
+def check_json(indice, archivos_filtro=None):
     """Ejecuta checks sobre JSONs de escenas y desafíos."""
-    hallazgos = []
-
-    # Buscar todas las historias
-    dir_historias = RAIZ / 'historias'
-    if not dir_historias.is_dir():
-        return hallazgos
-
-    for historia_dir in sorted(dir_historias.iterdir()):
-        if not historia_dir.is_dir():
-            continue
+    tareas = []
 
+    for historia in indice.historias:
         # Escenas
-        dir_escenas = historia_dir / 'datos' / 'escenas'
-        if dir_escenas.is_dir():
-            for f in sorted(dir_escenas.glob('*.json')):
-                rel = ruta_relativa(f)
-                if archivos_filtro and rel not in archivos_filtro:
-                    continue
-                hallazgos.extend(_check_escena_json(rel, f))
+        for rel, f in historia['escenas']:
+            if archivos_filtro and rel not in archivos_filtro:
+                continue
+            tareas.append((_check_escena_json, rel, f))
 
         # Desafíos
-        dir_desafios = historia_dir / 'datos' / 'desafios'
-        if dir_desafios.is_dir():
-            for f in sorted(dir_desafios.glob('*.json')):
-                rel = ruta_relativa(f)
-                if archivos_filtro and rel not in archivos_filtro:
-                    continue
-                hallazgos.extend(_check_desafio_json(rel, f))
+        for rel, f in historia['desafios']:
+            if archivos_filtro and rel not in archivos_filtro:
+                continue
+            tareas.append((_check_desafio_json, rel, f))
 
         # historia.json
-        historia_json = historia_dir / 'historia.json'
-        if historia_json.exists():
-            rel = ruta_relativa(historia_json)
+        historia_json = historia['historia_json']
+        if historia_json:
+            rel = indice.rel(historia_json)
             if not archivos_filtro or rel in archivos_filtro:
-                hallazgos.extend(_check_historia_json(rel, historia_json))
-
-    return hallazgos
+                tareas.append((_check_historia_json, rel, historia_json))
 
-
-def _cargar_json(ruta):
-    """Carga y parsea un JSON. Retorna (datos, error)."""
-    try:
-        with open(ruta, 'r', encoding='utf-8') as f:
-            return json.load(f), None
-    except json.JSONDecodeError as e:
-        return None, str(e)
-    except Exception as e:
-        return None, str(e)
+    return indice.ejecutar(tareas)
 
 
-def _check_escena_json(rel, ruta):
+def _check_escena_json(indice, rel, ruta):
     """Valida un JSON de escena."""
     hallazgos = []
-    datos, error = _cargar_json(ruta)
+    datos, error = indice.json(rel)
 
     if error:
         hallazgos.append(Hallazgo('json', 'CRITICA', 'bug', rel, 0,
@@ -434,10 +1224,11 @@ def _check_escena_json(rel, ruta):
                     target_path = base_historia / 'desafios' / f'{target}.json'
                 else:
                     target_path = base_historia / 'escenas' / f'{target}.json'
-                if not target_path.exists():
+                rel_target = indice.rel(target_path)
+                if not indice.existe(rel_target):
                     hallazgos.append(Hallazgo('json', 'ALTA', 'bug', rel, 0,
                                               f'Target "{target}" ({tipo_target}) referencia archivo inexistente',
-                                              f'Crear {ruta_relativa(target_path)} o corregir el target'))
+                                              f'Crear {rel_target} o corregir el target'))
 
     # Efectos: validar tipos
     efectos = datos.get('efectos', [])
@@ -456,10 +1247,10 @@ def _check_escena_json(rel, ruta):
     return hallazgos
 
 
-def _check_desafio_json(rel, ruta):
+def _check_desafio_json(indice, rel, ruta):
     """Valida un JSON de desafío."""
     hallazgos = []
-    datos, error = _cargar_json(ruta)
+    datos, error = indice.json(rel)
 
     if error:
         hallazgos.append(Hallazgo('json', 'CRITICA', 'bug', rel, 0,
@@ -520,10 +1311,10 @@ def _check_desafio_json(rel, ruta):
     return hallazgos
 
 
-def _check_historia_json(rel, ruta):
+def _check_historia_json(indice, rel, ruta):
     """Valida un historia.json."""
     hallazgos = []
-    datos, error = _cargar_json(ruta)
+    datos, error = indice.json(rel)
 
     if error:
         hallazgos.append(Hallazgo('json', 'CRITICA', 'bug', rel, 0,
@@ -541,7 +1332,7 @@ def _check_historia_json(rel, ruta):
     escena_ini = datos.get('escena_inicial')
     if escena_ini:
         dir_escenas = ruta.parent / 'datos' / 'escenas'
-        if not (dir_escenas / f'{escena_ini}.json').exists():
+        if not indice.existe(indice.rel(dir_escenas / f'{escena_ini}.json')):
             hallazgos.append(Hallazgo('json', 'CRITICA', 'bug', rel, 0,
                                       f'escena_inicial "{escena_ini}" no existe en datos/escenas/',
                                       f'Crear {escena_ini}.json o corregir el campo'))
@@ -575,12 +1366,16 @@ def _check_campos_snake_case(datos, rel, path_prefix=''):
 
 # ─── CHECKS: PWA / Service Worker ──────────────────────────────────
 
-def check_pwa(archivos_filtro=None):
+# Extensiones de los recursos que deberían estar en algún grupo de caché del SW
+EXTENSIONES_CACHE = {'.html', '.css', '.js', '.json', '.webp', '.png', '.mp3',
+                     '.jpg', '.jpeg', '.svg', '.ico', '.woff2'}
+
+
+def check_pwa(indice, archivos_filtro=None):
     """Ejecuta checks sobre Service Worker y manifest."""
     hallazgos = []
 
-    sw_path = RAIZ / 'service-worker.js'
-    if not sw_path.exists():
+    if not indice.existe('service-worker.js'):
         hallazgos.append(Hallazgo('pwa', 'CRITICA', 'bug', 'service-worker.js', 0,
                                   'service-worker.js no encontrado', 'Crear el Service Worker'))
         return hallazgos
@@ -588,47 +1383,38 @@ def check_pwa(archivos_filtro=None):
     if archivos_filtro and 'service-worker.js' not in archivos_filtro and 'manifest.json' not in archivos_filtro:
         return hallazgos
 
-    lineas_sw = leer_archivo('service-worker.js')
-    contenido_sw = '\n'.join(lineas_sw)
-
-    # --- Extraer archivos listados en RUTAS_CACHE ---
-    archivos_en_sw = set()
-
-    # Resolver constantes de ruta (ej: RUTA_EMBE = 'historias/...')
-    constantes_ruta = {}
-    for match in re.finditer(r"const\s+(\w+)\s*=\s*'([^']+)'", contenido_sw):
-        nombre, valor = match.group(1), match.group(2)
-        if '/' in valor and not valor.startswith('cache-'):
-            constantes_ruta[nombre] = valor
+    return indice.ejecutar([(_check_service_worker,)])
 
-    # Buscar strings entre comillas simples que parecen rutas de archivo
-    for match in re.finditer(r"'([^']+\.[a-zA-Z]{2,5})'", contenido_sw):
-        ruta_str = match.group(1)
-        # Ignorar cache names, URLs externas, fragmentos parciales (empiezan con /)
-        if ruta_str.startswith('cache-') or '://' in ruta_str or ruta_str.startswith('/'):
-            continue
-        archivos_en_sw.add(ruta_str)
 
-    # Buscar concatenaciones con constantes de ruta (ej: RUTA_EMBE + '/datos/...')
-    for nombre_const, valor_const in constantes_ruta.items():
-        for match in re.finditer(rf"{nombre_const}\s*\+\s*'([^']+)'", contenido_sw):
-            archivos_en_sw.add(valor_const + match.group(1))
+def _check_service_worker(indice):
+    """Huérfanos, archivos no cacheados, íconos del manifest y versiones de grupos."""
+    hallazgos = []
+    lineas_sw = indice.lineas('service-worker.js')
 
-    # Eliminar './' (es la raíz)
-    archivos_en_sw.discard('./')
+    # --- Archivos listados en RUTAS_CACHE (parseados una vez en el índice) ---
+    archivos_en_sw = indice.archivos_sw()
 
     # --- Buscar archivos huérfanos (en SW pero no en filesystem) ---
     for archivo_sw in sorted(archivos_en_sw):
-        ruta_real = RAIZ / archivo_sw
-        if not ruta_real.exists():
+        if not indice.existe(archivo_sw):
             hallazgos.append(Hallazgo('pwa', 'ALTA', 'pwa', 'service-worker.js', 0,
                                       f'Archivo huérfano en SW (no existe): {archivo_sw}',
                                       f'Eliminar la entrada del SW o crear el archivo'))
 
-    # --- Buscar archivos reales no cacheados ---
-    extensiones_cache = {'.html', '.css', '.js', '.json', '.webp', '.png', '.mp3',
-                         '.jpg', '.jpeg', '.svg', '.ico', '.woff2'}
+    # --- Manifiesto con huellas: archivos que cambiaron sin regenerarlo ---
+    desactualizados = []
+    for archivo, huella in indice.huellas_sw().items():
+        actual = indice.huella_publicada('index.html' if archivo == './' else archivo)
+        if actual is not None and actual['hash'] != huella:
+            desactualizados.append(archivo)  # Incluye los que no tenían huella y ya existen
+    if desactualizados:
+        muestra = _muestra(desactualizados)
+        hallazgos.append(Hallazgo('pwa', 'ALTA', 'pwa', 'service-worker.js', 0,
+                                  f'Manifiesto del SW desactualizado: {len(desactualizados)} archivo(s) '
+                                  f'cambiaron y los usuarios siguen con la versión cacheada: {muestra}',
+                                  'Correr python .agents/skills/sw-updater/scripts/generar-manifiesto.py'))
 
+    # --- Buscar archivos reales no cacheados ---
     # Carpetas y patrones a ignorar en el check de archivos no cacheados
     ignorar_carpetas = {
         '.agents/', 'node_modules/', 'documentacion/', '.git/',
@@ -640,38 +1426,72 @@ def check_pwa(archivos_filtro=None):
         'service-worker.js',  # El SW no se cachea a sí mismo
     }
 
-    for ext in extensiones_cache:
-        for f in RAIZ.rglob(f'*{ext}'):
-            rel = ruta_relativa(f)
-            # Ignorar carpetas de desarrollo/documentación
-            if any(seg in rel for seg in ignorar_carpetas):
-                continue
-            if rel in ignorar_archivos:
-                continue
-            # Ignorar archivos .md (documentación, no recurso web)
-            if rel.endswith('.md'):
-                continue
-            # Ignorar archivos de narrativa/concepto dentro de historias
-            # (solo datos/, imagenes/ y audios/ necesitan caché)
-            if 'historias/' in rel:
-                partes = rel.split('/')
-                if len(partes) >= 3:
-                    subcarpeta = partes[1]  # id de la historia
-                    # Solo auditar recursos que deberían estar cacheados
-                    # Las subcarpetas válidas son: datos/, imagenes/, audios/, y historia.json
-                    resto = '/'.join(partes[2:])
-                    carpetas_validas = ('datos/', 'imagenes/', 'audios/', 'historia.json')
-                    if not any(resto.startswith(cv) for cv in carpetas_validas):
-                        continue
-            if rel not in archivos_en_sw:
-                hallazgos.append(Hallazgo('pwa', 'MEDIA', 'pwa', 'service-worker.js', 0,
-                                          f'Archivo no cacheado en SW: {rel}',
-                                          'Agregar al grupo de caché correspondiente o verificar si es necesario offline'))
+    # Historias empaquetadas: el SW cachea el paquete en vez de cada JSON de datos/
+    empaquetados = []
+    for historia in indice.historias:
+        paquete = _paquete_de(indice, historia['dir']) if historia['historia_json'] else None
+        if paquete is None:
+            continue
+        prefijo = indice.rel(historia['dir'])
+        empaquetados += [f'{prefijo}/datos/escenas/', f'{prefijo}/datos/desafios/']
+        rel_paquete = f'{prefijo}/{paquete.get("archivo")}'
+        if indice.existe(rel_paquete) and rel_paquete not in archivos_en_sw:
+            hallazgos.append(Hallazgo('pwa', 'ALTA', 'pwa', 'service-worker.js', 0,
+                                      f'Paquete de datos no cacheado en SW: {rel_paquete}',
+                                      'Agregarlo al grupo de datos de la historia (reemplaza a sus JSON sueltos)'))
+    empaquetados = tuple(empaquetados)
+
+    # Efectos en sprites: el SW cachea los sprites en vez de cada efecto
+    en_sprites = set()
+    for historia in indice.historias:
+        sonidos, tabla = _sonidos_de(indice, historia['dir']) if historia['historia_json'] else (None, None)
+        if tabla is None or tabla.get('version') != sonidos.get('version'):
+            continue
+        prefijo = indice.rel(historia['dir'])
+        en_sprites.update(f'{prefijo}/audios/{nombre}' for nombre in tabla['sonidos'])
+        for ruta in tabla.get('sprites') or []:
+            rel_sprite = f'{prefijo}/{ruta}'
+            if indice.existe(rel_sprite) and rel_sprite not in archivos_en_sw:
+                hallazgos.append(Hallazgo('pwa', 'ALTA', 'pwa', 'service-worker.js', 0,
+                                          f'Sprite de efectos no cacheado en SW: {rel_sprite}',
+                                          'Correr python .agents/skills/sw-updater/scripts/generar-manifiesto.py'))
+
+    for rel in indice.archivos_con_extension(EXTENSIONES_CACHE):
+        if rel.startswith(empaquetados) or rel in en_sprites:
+            continue
+        # Ignorar carpetas de desarrollo/documentación
+        if any(seg in rel for seg in ignorar_carpetas):
+            continue
+        if rel in ignorar_archivos:
+            continue
+        # Ignorar archivos .md (documentación, no recurso web)
+        if rel.endswith('.md'):
+            continue
+        # Ignorar archivos de narrativa/concepto dentro de historias
+        # (solo datos/, imagenes/ y audios/ necesitan caché)
+        if 'historias/' in rel:
+            partes = rel.split('/')
+            if len(partes) >= 3:
+                subcarpeta = partes[1]  # id de la historia
+                # Solo auditar recursos que deberían estar cacheados
+                # Las subcarpetas válidas son: datos/, imagenes/, audios/, y historia.json
+                resto = '/'.join(partes[2:])
+                carpetas_validas = ('datos/', 'imagenes/', 'audios/', 'historia.json')
+                if not any(resto.startswith(cv) for cv in carpetas_validas):
+                    continue
+        if rel not in archivos_en_sw and '/imagenes/variantes/' in rel:
+            # ImagePreloader la pide en vez de la original: offline, ese escalón se queda sin imagen
+            hallazgos.append(Hallazgo('pwa', 'ALTA', 'pwa', 'service-worker.js', 0,
+                                      f'Variante de imagen no cacheada en SW: {rel}',
+                                      'Correr python .agents/skills/sw-updater/scripts/generar-manifiesto.py'))
+        elif rel not in archivos_en_sw:
+            hallazgos.append(Hallazgo('pwa', 'MEDIA', 'pwa', 'service-worker.js', 0,
+                                      f'Archivo no cacheado en SW: {rel}',
+                                      'Agregar al grupo de caché correspondiente o verificar si es necesario offline'))
 
     # --- Verificar manifest.json ---
-    manifest = RAIZ / 'manifest.json'
-    if manifest.exists():
-        datos_manifest, error = _cargar_json(manifest)
+    if indice.existe('manifest.json'):
+        datos_manifest, error = indice.json('manifest.json')
         if error:
             hallazgos.append(Hallazgo('pwa', 'CRITICA', 'bug', 'manifest.json', 0,
                                       f'manifest.json inválido: {error}', 'Corregir sintaxis'))
@@ -717,76 +1537,36 @@ def check_pwa(archivos_filtro=None):
 
 # ─── CHECKS: Cross-cutting ──────────────────────────────────────────
 
-def check_cross(archivos_filtro=None):
+def check_cross(indice, archivos_filtro=None):
     """Checks transversales que involucran múltiples tipos de archivo."""
     hallazgos = []
 
     # --- 1. Verificar que IDs de personaje en JSONs coincidan con carpetas ---
-    dir_historias = RAIZ / 'historias'
-    if dir_historias.is_dir():
-        for historia_dir in sorted(dir_historias.iterdir()):
-            if not historia_dir.is_dir():
+    tareas = []
+    for historia in indice.historias:
+        for rel, f in historia['escenas']:
+            if archivos_filtro and rel not in archivos_filtro:
                 continue
+            tareas.append((_check_cross_escena, rel, historia['dir']))
+        # El paquete depende de todos los JSON de la historia
+        prefijo = indice.rel(historia['dir']) + '/'
+        if historia['historia_json'] and (
+                not archivos_filtro or any(rel.startswith(prefijo) for rel in archivos_filtro)):
+            tareas.append((_check_cross_paquete, historia['dir']))
+            tareas.append((_check_cross_precarga, historia['dir']))
+            tareas.append((_check_cross_variantes, historia['dir']))
+            tareas.append((_check_cross_sonidos, historia['dir']))
+    hallazgos.extend(indice.ejecutar(tareas))
+    hallazgos.extend(indice.ejecutar([(_check_cross_global,), (_check_cross_catalogo,)]))
+    return hallazgos
 
-            dir_personajes = historia_dir / 'imagenes' / 'personajes'
-            carpetas_personajes = set()
-            if dir_personajes.is_dir():
-                carpetas_personajes = {d.name for d in dir_personajes.iterdir() if d.is_dir()}
-
-            # Revisar escenas
-            dir_escenas = historia_dir / 'datos' / 'escenas'
-            if dir_escenas.is_dir():
-                for f in sorted(dir_escenas.glob('*.json')):
-                    rel = ruta_relativa(f)
-                    if archivos_filtro and rel not in archivos_filtro:
-                        continue
-                    datos, _ = _cargar_json(f)
-                    if not datos:
-                        continue
 
-                    # Verificar elementos de tipo personaje
-                    elementos = datos.get('elementos', [])
-                    if isinstance(elementos, list):
-                        for elem in elementos:
-                            if isinstance(elem, dict) and elem.get('tipo') == 'personaje':
-                                id_personaje = elem.get('id', '')
-                                if id_personaje and carpetas_personajes and id_personaje not in carpetas_personajes:
-                                    hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
-                                                              f'Personaje "{id_personaje}" no tiene carpeta en imagenes/personajes/',
-                                                              f'Crear carpeta imagenes/personajes/{id_personaje}/ o corregir el ID'))
-
-                                # Verificar que la imagen existe
-                                imagen = elem.get('imagen', '')
-                                if imagen and id_personaje:
-                                    ruta_img = dir_personajes / id_personaje / imagen
-                                    if not ruta_img.exists():
-                                        hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
-                                                                  f'Imagen "{imagen}" de personaje "{id_personaje}" no existe',
-                                                                  f'Agregar {ruta_relativa(ruta_img)} o corregir nombre'))
-
-                    # Verificar elementos de tipo objeto
-                    if isinstance(elementos, list):
-                        for elem in elementos:
-                            if isinstance(elem, dict) and elem.get('tipo') == 'objeto':
-                                imagen = elem.get('imagen', '')
-                                if imagen:
-                                    ruta_img = historia_dir / 'imagenes' / 'objetos' / imagen
-                                    if not ruta_img.exists():
-                                        hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
-                                                                  f'Imagen de objeto "{imagen}" no existe',
-                                                                  f'Agregar {ruta_relativa(ruta_img)} o corregir nombre'))
-
-                    # Verificar fondo
-                    fondo = datos.get('fondo', '')
-                    if fondo:
-                        ruta_fondo = historia_dir / 'imagenes' / 'fondos' / fondo
-                        if not ruta_fondo.exists():
-                            hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
-                                                      f'Fondo "{fondo}" no existe',
-                                                      f'Agregar {ruta_relativa(ruta_fondo)} o corregir nombre'))
+def _check_cross_global(indice):
+    """Transición JS ↔ CSS y catálogo de historias contra las carpetas reales."""
+    hallazgos = []
 
     # --- 2. Verificar sincronización de duración de transición JS ↔ CSS ---
-    lineas_sr = leer_archivo('js/SceneRenderer.js')
+    lineas_sr = indice.lineas('js/SceneRenderer.js')
     duracion_js = None
     for i, linea in enumerate(lineas_sr, 1):
         match = re.search(r'#DURACION_TRANSICION\s*=\s*(\d+)', linea)
@@ -794,7 +1574,7 @@ def check_cross(archivos_filtro=None):
             duracion_js = int(match.group(1))
             break
 
-    lineas_vars = leer_archivo('css/variables.css')
+    lineas_vars = indice.lineas('css/variables.css')
     duracion_css = None
     for linea in lineas_vars:
         match = re.search(r'--transicion-escena\s*:\s*(\d+)ms', linea)
@@ -815,9 +1595,8 @@ def check_cross(archivos_filtro=None):
                                   'Considerar leer el valor desde la custom property CSS para mantener una sola fuente'))
 
     # --- 3. Verificar que biblioteca/historias.json tenga todas las historias ---
-    historias_json_path = RAIZ / 'biblioteca' / 'historias.json'
-    if historias_json_path.exists():
-        datos_bib, _ = _cargar_json(historias_json_path)
+    if indice.existe('biblioteca/historias.json'):
+        datos_bib, _ = indice.json('biblioteca/historias.json')
         if datos_bib:
             ids_registrados = set()
             historias_list = datos_bib.get('historias', [])
@@ -826,17 +1605,1031 @@ def check_cross(archivos_filtro=None):
                     ids_registrados.add(h['id'])
 
             # Verificar vs carpetas reales
-            if dir_historias.is_dir():
-                for d in sorted(dir_historias.iterdir()):
-                    if d.is_dir() and (d / 'historia.json').exists():
-                        if d.name not in ids_registrados:
-                            hallazgos.append(Hallazgo('cross', 'ALTA', 'inconsistencia',
-                                                      'biblioteca/historias.json', 0,
-                                                      f'Historia "{d.name}" tiene historia.json pero no está en el catálogo',
-                                                      'Agregar entrada en biblioteca/historias.json'))
+            for nombre in sorted(indice.subcarpetas(indice.raiz / 'historias')):
+                if indice.existe(f'historias/{nombre}/historia.json') and nombre not in ids_registrados:
+                    hallazgos.append(Hallazgo('cross', 'ALTA', 'inconsistencia',
+                                              'biblioteca/historias.json', 0,
+                                              f'Historia "{nombre}" tiene historia.json pero no está en el catálogo',
+                                              'Agregar entrada en biblioteca/historias.json'))
 
     return hallazgos
 
+
+# Campos de historia.json que generar_catalogo.py copia a biblioteca/historias.json
+CAMPOS_CATALOGO = ('titulo', 'portada', 'tarjeta', 'logo', 'colores')
+IMAGENES_CATALOGO = ('portada', 'tarjeta', 'logo')
+
+
+def _check_cross_catalogo(indice):
+    """Los datos precalculados de biblioteca/historias.json coinciden con cada historia.json."""
+    hallazgos = []
+    rel_catalogo = 'biblioteca/historias.json'
+    datos, _ = indice.json(rel_catalogo)
+    entradas = datos.get('historias') if isinstance(datos, dict) else None
+    if not isinstance(entradas, list):
+        return hallazgos
+
+    sugerencia = 'Correr python .agents/skills/build/scripts/generar_catalogo.py'
+    sin_generar, campos_viejos, firmas_viejas = [], [], []
+    for entrada in entradas:
+        if not isinstance(entrada, dict) or not isinstance(entrada.get('ruta'), str):
+            continue
+        prefijo = entrada['ruta'].rstrip('/')
+        config, _ = indice.json(f'{prefijo}/historia.json')
+        if not isinstance(config, dict):
+            continue  # Historia inexistente o JSON roto: lo reporta check_json
+        id_historia = entrada.get('id', prefijo)
+        if 'archivos' not in entrada:
+            sin_generar.append(id_historia)
+            continue
+
+        esperados = {c: config[c] for c in CAMPOS_CATALOGO if c in config}
+        if {c: entrada[c] for c in CAMPOS_CATALOGO if c in entrada} != esperados:
+            campos_viejos.append(id_historia)
+            continue
+        firmas = {}
+        for archivo in ['historia.json'] + [config[c] for c in IMAGENES_CATALOGO if isinstance(config.get(c), str)]:
+            firma = indice.huella_publicada(f'{prefijo}/{archivo}')
+            if firma is not None:
+                firmas[archivo] = firma
+        if entrada['archivos'] != firmas:
+            firmas_viejas.append(id_historia)
+
+    if campos_viejos:
+        hallazgos.append(Hallazgo('cross', 'ALTA', 'inconsistencia', rel_catalogo, 0,
+                                  f'Catálogo desactualizado: la biblioteca muestra título o imágenes viejos '
+                                  f'de {", ".join(campos_viejos)}',
+                                  sugerencia))
+    if firmas_viejas:
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'inconsistencia', rel_catalogo, 0,
+                                  f'Catálogo desactualizado: hash o tamaño de historia.json o de sus imágenes '
+                                  f'cambiaron en {", ".join(firmas_viejas)}',
+                                  sugerencia))
+    if sin_generar:
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'rendimiento', rel_catalogo, 0,
+                                  f'{len(sin_generar)} historia(s) sin datos precalculados en el catálogo: '
+                                  'la biblioteca pide su historia.json antes de mostrar las tarjetas',
+                                  sugerencia))
+    return hallazgos
+
+
+def _check_cross_escena(indice, rel, historia_dir):
+    """Verifica personajes, objetos y fondo de una escena contra el filesystem."""
+    hallazgos = []
+    dir_personajes = historia_dir / 'imagenes' / 'personajes'
+    carpetas_personajes = indice.subcarpetas(dir_personajes)
+
+    datos, _ = indice.json(rel)
+    if not datos:
+        return hallazgos
+
+    # Verificar elementos de tipo personaje
+    elementos = datos.get('elementos', [])
+    if isinstance(elementos, list):
+        for elem in elementos:
+            if isinstance(elem, dict) and elem.get('tipo') == 'personaje':
+                id_personaje = elem.get('id', '')
+                if id_personaje and carpetas_personajes and id_personaje not in carpetas_personajes:
+                    hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
+                                              f'Personaje "{id_personaje}" no tiene carpeta en imagenes/personajes/',
+                                              f'Crear carpeta imagenes/personajes/{id_personaje}/ o corregir el ID'))
+
+                # Verificar que la imagen existe
+                imagen = elem.get('imagen', '')
+                if imagen and id_personaje:
+                    rel_img = indice.rel(dir_personajes / id_personaje / imagen)
+                    if not indice.existe(rel_img):
+                        hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
+                                                  f'Imagen "{imagen}" de personaje "{id_personaje}" no existe',
+                                                  f'Agregar {rel_img} o corregir nombre'))
+
+    # Verificar elementos de tipo objeto
+    if isinstance(elementos, list):
+        for elem in elementos:
+            if isinstance(elem, dict) and elem.get('tipo') == 'objeto':
+                imagen = elem.get('imagen', '')
+                if imagen:
+                    rel_img = indice.rel(historia_dir / 'imagenes' / 'objetos' / imagen)
+                    if not indice.existe(rel_img):
+                        hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
+                                                  f'Imagen de objeto "{imagen}" no existe',
+                                                  f'Agregar {rel_img} o corregir nombre'))
+
+    # Verificar fondo
+    fondo = datos.get('fondo', '')
+    if fondo:
+        rel_fondo = indice.rel(historia_dir / 'imagenes' / 'fondos' / fondo)
+        if not indice.existe(rel_fondo):
+            hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel, 0,
+                                      f'Fondo "{fondo}" no existe',
+                                      f'Agregar {rel_fondo} o corregir nombre'))
+
+    return hallazgos
+
+
+def _paquete_de(indice, historia_dir):
+    """Campo `paquete` del historia.json (dict), o None si la historia usa los JSON sueltos."""
+    config, _ = indice.json(indice.rel(historia_dir / 'historia.json'))
+    paquete = config.get('paquete') if isinstance(config, dict) else None
+    return paquete if isinstance(paquete, dict) else None
+
+
+def _check_cross_paquete(indice, historia_dir):
+    """El paquete de datos (empaquetar.py) coincide con los JSON sueltos y con historia.json."""
+    hallazgos = []
+    paquete = _paquete_de(indice, historia_dir)
+    if paquete is None:
+        return hallazgos
+
+    rel_historia = indice.rel(historia_dir / 'historia.json')
+    id_historia = historia_dir.name
+    sugerencia = f'Correr python .agents/skills/build/scripts/empaquetar.py --historia {id_historia}'
+    rel_paquete = indice.rel(historia_dir / str(paquete.get('archivo', '')))
+    lineas = indice.lineas(rel_paquete) if paquete.get('archivo') else []
+    try:
+        cabecera = json.loads(lineas[0]) if lineas else None
+    except json.JSONDecodeError:
+        cabecera = None
+    if not isinstance(cabecera, dict) or not isinstance(cabecera.get('entradas'), dict):
+        hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel_historia, 0,
+                                  f'historia.json declara el paquete "{paquete.get("archivo")}" pero no existe '
+                                  'o no tiene índice: el motor vuelve a los JSON sueltos',
+                                  sugerencia))
+        return hallazgos
+
+    if cabecera.get('version') != paquete.get('version'):
+        hallazgos.append(Hallazgo('cross', 'ALTA', 'inconsistencia', rel_paquete, 0,
+                                  f'Versión del paquete ({cabecera.get("version")}) distinta de la de '
+                                  f'historia.json ({paquete.get("version")}): el motor lo descarta',
+                                  sugerencia))
+
+    # Las entradas están en el orden de sus offsets: una por línea después del índice
+    entradas = sorted(cabecera['entradas'].items(), key=lambda item: item[1][0] if item[1] else 0)
+    empaquetadas = {clave: linea for (clave, _), linea in zip(entradas, lineas[1:])}
+    cambiadas, faltan = [], []
+    for tipo, carpeta in (('escena', 'escenas'), ('desafio', 'desafios')):
+        for rel in indice.listar_json(historia_dir / 'datos' / carpeta):
+            clave = f'{tipo}:{Path(rel).stem}'
+            datos, _ = indice.json(rel)
+            if clave not in empaquetadas:
+                faltan.append(clave)
+                continue
+            try:
+                if json.loads(empaquetadas.pop(clave)) != datos:
+                    cambiadas.append(clave)
+            except json.JSONDecodeError:
+                cambiadas.append(clave)
+    sobran = sorted(empaquetadas)
+
+    for problema, claves in (('cambiaron desde el último empaquetado', cambiadas),
+                             ('no están en el paquete', faltan),
+                             ('están en el paquete pero ya no existen', sobran)):
+        if claves:
+            ids = [clave.split(':', 1)[1] for clave in claves]
+            muestra = _muestra(ids)
+            hallazgos.append(Hallazgo('cross', 'ALTA', 'inconsistencia', rel_paquete, 0,
+                                      f'Paquete desactualizado: {len(ids)} escena(s)/desafío(s) {problema}: {muestra}',
+                                      sugerencia))
+    return hallazgos
+
+
+def _check_cross_precarga(indice, historia_dir):
+    """El mapa de precarga (generar_precarga.py) existe, coincide con historia.json y con los JSON sueltos."""
+    hallazgos = []
+    config, _ = indice.json(indice.rel(historia_dir / 'historia.json'))
+    precarga = config.get('precarga') if isinstance(config, dict) else None
+    if not isinstance(precarga, dict):
+        return hallazgos
+
+    rel_historia = indice.rel(historia_dir / 'historia.json')
+    sugerencia = f'Correr python .agents/skills/build/scripts/generar_precarga.py --historia {historia_dir.name}'
+    rel_mapa = indice.rel(historia_dir / str(precarga.get('archivo', '')))
+    mapa, _ = indice.json(rel_mapa) if precarga.get('archivo') else (None, None)
+    if not isinstance(mapa, dict) or not isinstance(mapa.get('precarga'), list):
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'rendimiento', rel_historia, 0,
+                                  f'historia.json declara el mapa de precarga "{precarga.get("archivo")}" pero no '
+                                  'existe o no es válido: el motor solo precarga un salto adelante',
+                                  sugerencia))
+        return hallazgos
+
+    if mapa.get('version') != precarga.get('version'):
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'inconsistencia', rel_mapa, 0,
+                                  f'Versión del mapa de precarga ({mapa.get("version")}) distinta de la de '
+                                  f'historia.json ({precarga.get("version")}): el motor lo descarta',
+                                  sugerencia))
+        return hallazgos
+
+    # Mismo hash que huella_fuentes() de generar_precarga.py
+    partes = []
+    for carpeta in ('escenas', 'desafios'):
+        for rel in indice.listar_json(historia_dir / 'datos' / carpeta):
+            huella = indice.huella_publicada(rel)
+            partes.append(f'{carpeta}/{Path(rel).name}:{huella["hash"] if huella else ""}')
+    fuentes = hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()[:16]
+    if mapa.get('fuentes') != fuentes:
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'rendimiento', rel_mapa, 0,
+                                  'Mapa de precarga desactualizado: las escenas o desafíos cambiaron desde que se '
+                                  'generó, así que puede precargar de más o de menos',
+                                  sugerencia))
+    return hallazgos
+
+
+def _check_cross_variantes(indice, historia_dir):
+    """Las variantes de imágenes (generar_variantes.py) existen y salieron de las originales actuales."""
+    hallazgos = []
+    config, _ = indice.json(indice.rel(historia_dir / 'historia.json'))
+    variantes = config.get('variantes') if isinstance(config, dict) else None
+    if not isinstance(variantes, dict):
+        return hallazgos
+
+    rel_historia = indice.rel(historia_dir / 'historia.json')
+    sugerencia = f'Correr python .agents/skills/build/scripts/generar_variantes.py --historia {historia_dir.name}'
+    rel_manifiesto = indice.rel(historia_dir / str(variantes.get('archivo', '')))
+    manifiesto, _ = indice.json(rel_manifiesto) if variantes.get('archivo') else (None, None)
+    if not isinstance(manifiesto, dict) or not isinstance(manifiesto.get('imagenes'), dict):
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'rendimiento', rel_historia, 0,
+                                  f'historia.json declara las variantes "{variantes.get("archivo")}" pero el '
+                                  'archivo no existe o no es válido: todos los dispositivos bajan las originales',
+                                  sugerencia))
+        return hallazgos
+
+    if manifiesto.get('version') != variantes.get('version'):
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'inconsistencia', rel_manifiesto, 0,
+                                  f'Versión de las variantes ({manifiesto.get("version")}) distinta de la de '
+                                  f'historia.json ({variantes.get("version")}): el motor usa las originales',
+                                  sugerencia))
+        return hallazgos
+
+    # Los escalones tienen que ser los mismos que elige escalonDePantalla() en el JS
+    texto_js = '\n'.join(indice.lineas('js/ImagePreloader.js'))
+    m = re.search(r'ESCALONES_IMAGENES\s*=\s*\[([^\]]*)\]', texto_js)
+    escalones_js = [int(n) for n in re.findall(r'\d+', m.group(1))] if m else None
+    if escalones_js is not None and escalones_js != manifiesto.get('escalones'):
+        hallazgos.append(Hallazgo('cross', 'MEDIA', 'inconsistencia', rel_manifiesto, 0,
+                                  f'Escalones de las variantes ({manifiesto.get("escalones")}) distintos de '
+                                  f'ESCALONES_IMAGENES en js/ImagePreloader.js ({escalones_js}): los dispositivos '
+                                  'de los escalones que no coinciden bajan las originales',
+                                  'Igualar ESCALONES en generar_variantes.py y ESCALONES_IMAGENES, y regenerar'))
+
+    prefijo = indice.rel(historia_dir)
+    faltan, cambiaron = [], []
+    for rel, entrada in sorted(manifiesto['imagenes'].items()):
+        if not isinstance(entrada, dict):
+            continue
+        original = indice.huella_publicada(f'{prefijo}/imagenes/{rel}')
+        if original is not None and original['hash'] != entrada.get('huella'):
+            cambiaron.append(rel)
+        for escalon in entrada.get('variantes') or {}:
+            if not indice.existe(f'{prefijo}/imagenes/variantes/{escalon}/{rel}'):
+                faltan.append(f'{escalon}/{rel}')
+
+    for severidad, tipo, problema, rutas in (
+            ('ALTA', 'bug', 'no existen (esos dispositivos piden una imagen que no está)', faltan),
+            ('ALTA', 'inconsistencia', 'salieron de una versión vieja de la original '
+                                       '(esos dispositivos ven la imagen anterior)', cambiaron)):
+        if rutas:
+            muestra = _muestra(rutas)
+            hallazgos.append(Hallazgo('cross', severidad, tipo, rel_manifiesto, 0,
+                                      f'Variantes desactualizadas: {len(rutas)} {problema}: {muestra}',
+                                      sugerencia))
+    return hallazgos
+
+
+def _sonidos_de(indice, historia_dir):
+    """(campo `sonidos` de historia.json, tabla de datos/sonidos.json), o (None, None) si no hay sprites."""
+    config, _ = indice.json(indice.rel(historia_dir / 'historia.json'))
+    sonidos = config.get('sonidos') if isinstance(config, dict) else None
+    if not isinstance(sonidos, dict):
+        return None, None
+    tabla, _ = indice.json(indice.rel(historia_dir / str(sonidos.get('archivo', '')))) \
+        if sonidos.get('archivo') else (None, None)
+    if not isinstance(tabla, dict) or not isinstance(tabla.get('sonidos'), dict):
+        tabla = None
+    return sonidos, tabla
+
+
+def _check_cross_sonidos(indice, historia_dir):
+    """Los sprites de efectos (empaquetar_sonidos.py) existen y salieron de los efectos actuales."""
+    hallazgos = []
+    sonidos, tabla = _sonidos_de(indice, historia_dir)
+    if sonidos is None:
+        return hallazgos
+
+    rel_historia = indice.rel(historia_dir / 'historia.json')
+    sugerencia = f'Correr python .agents/skills/build/scripts/empaquetar_sonidos.py --historia {historia_dir.name}'
+    if tabla is None:
+        hallazgos.append(Hallazgo('cross', 'ALTA', 'bug', rel_historia, 0,
+                                  f'historia.json declara los sprites de efectos "{sonidos.get("archivo")}" pero '
+                                  'la tabla no existe o no es válida: los efectos se piden sueltos y el SW no los '
+                                  'tiene', sugerencia))
+        return hallazgos
+
+    rel_tabla = indice.rel(historia_dir / sonidos['archivo'])
+    if tabla.get('version') != sonidos.get('version'):
+        hallazgos.append(Hallazgo('cross', 'ALTA', 'inconsistencia', rel_tabla, 0,
+                                  f'Versión de los sprites de efectos ({tabla.get("version")}) distinta de la de '
+                                  f'historia.json ({sonidos.get("version")}): el motor pide los efectos sueltos',
+                                  sugerencia))
+        return hallazgos
+
+    prefijo = indice.rel(historia_dir)
+    sprites = tabla.get('sprites') or []
+    faltan = [ruta for ruta in sprites if not indice.existe(f'{prefijo}/{ruta}')]
+    cambiaron = []
+    for nombre, tramo in sorted(tabla['sonidos'].items()):
+        original = indice.huella_publicada(f'{prefijo}/audios/{nombre}')
+        if isinstance(tramo, dict) and original is not None and original['hash'] != tramo.get('huella'):
+            cambiaron.append(nombre)
+
+    for severidad, tipo, problema, nombres in (
+            ('ALTA', 'bug', 'sprite(s) no existen (sus efectos no suenan)', faltan),
+            ('ALTA', 'inconsistencia', 'efecto(s) cambiaron desde el último empaquetado '
+                                       '(suena la versión anterior)', cambiaron)):
+        if nombres:
+            muestra = _muestra(nombres)
+            hallazgos.append(Hallazgo('cross', severidad, tipo, rel_tabla, 0,
+                                      f'Sprites de efectos desactualizados: {len(nombres)} {problema}: {muestra}',
+                                      sugerencia))
+    return hallazgos
+
+
+# ─── CHECKS: Grafo de la historia ───────────────────────────────────
+
+# Tope de estados (escena, recompensas) por historia; pasado el tope el reporte es parcial
+MAX_ESTADOS_GRAFO = 1_000_000
+
+# Destino de una opción "reiniciar": termina la partida
+FINAL = -1
+
+
+def check_grafo(indice, archivos_filtro=None):
+    """Recorre el grafo de navegación de cada historia (alcance, finales, salidas, condiciones)."""
+    tareas = []
+    for historia in indice.historias:
+        if not historia['historia_json']:
+            continue
+        # El grafo es de toda la historia: cualquier archivo suyo la vuelve a auditar
+        prefijo = indice.rel(historia['dir']) + '/'
+        if archivos_filtro and not any(rel.startswith(prefijo) for rel in archivos_filtro):
+            continue
+        tareas.append((_check_grafo_historia, historia['dir']))
+    return indice.ejecutar(tareas)
+
+
+class GrafoHistoria:
+    """
+    Grafo de navegación de una historia: nodos escena/desafío unidos por
+    `opciones[].target` y por los `resultado_exito`/`resultado_fallo` de los
+    desafíos, a partir de `escena_inicial`.
+
+    `explorar()` recorre en anchura los estados (nodo, recompensas) como lo haría
+    el motor: una opción con `condicion: "tiene_X"` solo se ve si ya se obtuvo X
+    (igual que `StateManager.evaluarCondicion`; cualquier otra condición nunca se
+    cumple) y ganar un desafío otorga su recompensa. Cada conjunto de
+    recompensas es un bitset (int) y un estado es `bits * len(nodos) + nodo`,
+    así los estados repetidos se descartan con un set de enteros.
+
+    Para que los estados no se multipliquen sin necesidad, solo tienen bit las
+    recompensas que alguna condición consulta, y al entrar a un nodo se borran
+    los bits que ya no consulta ningún nodo alcanzable desde ahí (las
+    recompensas nunca se pierden, así que esos bits no cambian nada de lo que
+    queda por recorrer).
+    """
+
+    def __init__(self, indice, historia_dir):
+        self.indice = indice
+        self.dir = historia_dir
+        self._prefijo = indice.rel(historia_dir)
+        self.nodos = []        # (tipo, id) por índice de nodo
+        self.datos = []        # JSON de cada nodo (None si no existe o es inválido)
+        self._indices = {}     # (tipo, id) → índice de nodo
+        self.bits = {}         # recompensa → máscara de un bit
+        self.otorgadas = set() # recompensas que algún desafío alcanzable otorga
+
+        self.alcanzados = set()     # nodos visitados en algún estado
+        self.habilitadas = set()    # (nodo, j) de opciones condicionales que se vieron
+        self.sin_salida = set()     # nodos a los que se llega sin ninguna opción visible
+        self.atrapados = []         # nodos desde los que no se llega a ningún final
+        self.hay_final = False
+        self.truncado = False
+
+    def rel(self, nodo):
+        tipo, id_nodo = self.nodos[nodo]
+        carpeta = 'desafios' if tipo == 'desafio' else 'escenas'
+        return f'{self._prefijo}/datos/{carpeta}/{id_nodo}.json'
+
+    def _nodo(self, tipo, id_nodo):
+        """Índice del nodo, cargando su JSON la primera vez. None si el archivo no existe."""
+        clave = (tipo, id_nodo)
+        if clave not in self._indices:
+            self._indices[clave] = len(self.nodos)
+            self.nodos.append(clave)
+            rel = self.rel(len(self.nodos) - 1)
+            datos = self.indice.json(rel)[0] if self.indice.existe(rel) else None
+            self.datos.append(datos if isinstance(datos, dict) else None)
+        nodo = self._indices[clave]
+        return nodo if self.datos[nodo] is not None else None
+
+    @staticmethod
+    def _opciones(datos):
+        opciones = datos.get('opciones')
+        return [o for o in opciones if isinstance(o, dict)] if isinstance(opciones, list) else []
+
+    def _destinos(self, nodo):
+        """Destinos (tipo, id) de un nodo, sin mirar condiciones."""
+        datos = self.datos[nodo]
+        if self.nodos[nodo][0] == 'desafio':
+            for campo in ('resultado_exito', 'resultado_fallo'):
+                resultado = datos.get(campo)
+                if isinstance(resultado, dict) and resultado.get('target'):
+                    yield 'escena', resultado['target']
+            return
+        for opcion in self._opciones(datos):
+            if opcion.get('accion') != 'reiniciar' and opcion.get('target'):
+                yield opcion.get('tipo_target') or 'escena', opcion['target']
+
+    def cargar(self, escena_inicial):
+        """
+        Carga todos los nodos alcanzables ignorando las condiciones y asigna los
+        bits de recompensa. Retorna el nodo inicial, o None si no existe.
+        """
+        inicio = self._nodo('escena', escena_inicial)
+        if inicio is None:
+            return None
+        pendientes = [inicio]
+        vistos = {inicio}
+        condiciones = set()
+        while pendientes:
+            nodo = pendientes.pop()
+            datos = self.datos[nodo]
+            if self.nodos[nodo][0] == 'desafio':
+                exito = datos.get('resultado_exito')
+                if isinstance(exito, dict) and exito.get('recompensa'):
+                    self.otorgadas.add(exito['recompensa'])
+            else:
+                for opcion in self._opciones(datos):
+                    condicion = opcion.get('condicion')
+                    if isinstance(condicion, str) and condicion.startswith('tiene_'):
+                        condiciones.add(condicion[len('tiene_'):])
+            for tipo, id_nodo in self._destinos(nodo):
+                destino = self._nodo(tipo, id_nodo)
+                if destino is not None and destino not in vistos:
+                    vistos.add(destino)
+                    pendientes.append(destino)
+
+        for i, recompensa in enumerate(sorted(condiciones & self.otorgadas)):
+            self.bits[recompensa] = 1 << i
+        return inicio
+
+    def _requisito(self, condicion):
+        """Máscara que debe estar en los bits para ver la opción; None si nunca se ve."""
+        if not condicion:
+            return 0
+        if isinstance(condicion, str) and condicion.startswith('tiene_'):
+            return self.bits.get(condicion[len('tiene_'):])
+        return None
+
+    def _compilar(self):
+        """
+        Transiciones de cada nodo cargado:
+          escena:  [(j, requisito, destino)] con destino = nodo, FINAL o None (no existe)
+          desafío: (destino_exito, bit_recompensa, destino_fallo)
+        """
+        transiciones = []
+        for nodo, datos in enumerate(self.datos):
+            if datos is None:
+                transiciones.append(None)
+            elif self.nodos[nodo][0] == 'desafio':
+                exito = datos.get('resultado_exito') if isinstance(datos.get('resultado_exito'), dict) else {}
+                fallo = datos.get('resultado_fallo') if isinstance(datos.get('resultado_fallo'), dict) else {}
+                transiciones.append((
+                    self._nodo('escena', exito['target']) if exito.get('target') else None,
+                    self.bits.get(exito.get('recompensa'), 0),
+                    self._nodo('escena', fallo['target']) if fallo.get('target') else None,
+                ))
+            else:
+                opciones = []
+                for j, opcion in enumerate(self._opciones(datos)):
+                    if opcion.get('accion') == 'reiniciar':
+                        destino = FINAL
+                    elif opcion.get('target'):
+                        destino = self._nodo(opcion.get('tipo_target') or 'escena', opcion['target'])
+                    else:
+                        destino = None
+                    opciones.append((j, self._requisito(opcion.get('condicion')), destino))
+                transiciones.append(opciones)
+        return transiciones
+
+    def _vivas(self, transiciones):
+        """Por nodo, máscara de las recompensas que consulta él o algún nodo alcanzable desde él."""
+        n = len(self.nodos)
+        vivas = [0] * n
+        previos = [[] for _ in range(n)]
+        for nodo, trans in enumerate(transiciones):
+            if trans is None:
+                continue
+            if self.nodos[nodo][0] == 'desafio':
+                destinos = (trans[0], trans[2])
+            else:
+                destinos = [destino for _, requisito, destino in trans]
+                for _, requisito, _ in trans:
+                    vivas[nodo] |= requisito or 0
+            for destino in destinos:
+                if destino is not None and destino != FINAL:
+                    previos[destino].append(nodo)
+
+        # Punto fijo hacia atrás: vivas[p] incluye las de cada sucesor
+        pendientes = [nodo for nodo in range(n) if vivas[nodo]]
+        while pendientes:
+            nodo = pendientes.pop()
+            for previo in previos[nodo]:
+                if vivas[nodo] & ~vivas[previo]:
+                    vivas[previo] |= vivas[nodo]
+                    pendientes.append(previo)
+        return vivas
+
+    def explorar(self, inicio):
+        """BFS sobre (nodo, recompensas) desde el nodo inicial sin recompensas."""
+        transiciones = self._compilar()
+        vivas = self._vivas(transiciones)
+        n = len(self.nodos)
+        vistos = {inicio}
+        cola = deque([inicio])
+        previos = defaultdict(list)   # estado → estados que llevan a él
+        con_final = []                # estados con una opción de reinicio visible
+
+        while cola:
+            estado = cola.popleft()
+            bits, nodo = divmod(estado, n)
+            self.alcanzados.add(nodo)
+            trans = transiciones[nodo]
+
+            siguientes = []
+            if self.nodos[nodo][0] == 'desafio':
+                exito, recompensa, fallo = trans
+                if exito is not None:
+                    siguientes.append(((bits | recompensa) & vivas[exito]) * n + exito)
+                if fallo is not None:
+                    siguientes.append((bits & vivas[fallo]) * n + fallo)
+            else:
+                visibles = 0
+                for j, requisito, destino in trans:
+                    if requisito is None or bits & requisito != requisito:
+                        continue
+                    visibles += 1
+                    if requisito:
+                        self.habilitadas.add((nodo, j))
+                    if destino == FINAL:
+                        con_final.append(estado)
+                    elif destino is not None:
+                        siguientes.append((bits & vivas[destino]) * n + destino)
+                if not visibles:
+                    self.sin_salida.add(nodo)
+
+            for siguiente in siguientes:
+                previos[siguiente].append(estado)
+                if siguiente not in vistos:
+                    if len(vistos) >= MAX_ESTADOS_GRAFO:
+                        self.truncado = True
+                        continue
+                    vistos.add(siguiente)
+                    cola.append(siguiente)
+
+        # Hacia atrás desde los finales: los estados que no llegan a ninguno están atrapados
+        self.hay_final = bool(con_final)
+        if self.hay_final and not self.truncado:
+            llegan = set(con_final)
+            pendientes = list(con_final)
+            while pendientes:
+                for previo in previos.get(pendientes.pop(), ()):
+                    if previo not in llegan:
+                        llegan.add(previo)
+                        pendientes.append(previo)
+            atrapados = {estado % n for estado in vistos - llegan}
+            self.atrapados = sorted(atrapados - self.sin_salida, key=lambda nodo: self.nodos[nodo])
+
+
+def _check_grafo_historia(indice, historia_dir):
+    """Alcance de escenas, finales, estados sin salida y opciones que nunca se habilitan."""
+    hallazgos = []
+    rel_historia = indice.rel(historia_dir / 'historia.json')
+    config, _ = indice.json(rel_historia)
+    escena_inicial = config.get('escena_inicial') if isinstance(config, dict) else None
+    if not escena_inicial:
+        return hallazgos  # check_json ya lo reporta
+
+    grafo = GrafoHistoria(indice, historia_dir)
+    inicio = grafo.cargar(escena_inicial)
+    if inicio is None:
+        return hallazgos  # escena_inicial inexistente: check_json ya lo reporta
+    grafo.explorar(inicio)
+
+    if grafo.truncado:
+        hallazgos.append(Hallazgo('grafo', 'BAJA', 'refactor', rel_historia, 0,
+                                  f'Exploración cortada en {MAX_ESTADOS_GRAFO} estados (escena, recompensas): '
+                                  'los resultados del grafo son parciales',
+                                  'Revisar si tantas combinaciones de recompensas son necesarias'))
+
+    # --- Escenas, desafíos y finales inalcanzables ---
+    alcanzados = {grafo.nodos[nodo] for nodo in grafo.alcanzados}
+    for tipo, carpeta in (('escena', 'escenas'), ('desafio', 'desafios')):
+        for rel in indice.listar_json(historia_dir / 'datos' / carpeta):
+            id_nodo = Path(rel).stem
+            if (tipo, id_nodo) in alcanzados:
+                continue
+            datos, _ = indice.json(rel)
+            es_final = tipo == 'escena' and isinstance(datos, dict) and any(
+                o.get('accion') == 'reiniciar' for o in GrafoHistoria._opciones(datos))
+            if es_final:
+                hallazgos.append(Hallazgo('grafo', 'ALTA', 'bug', rel, 0,
+                                          f'Final "{id_nodo}" inalcanzable desde "{escena_inicial}"',
+                                          'Agregar un camino que lleve a este final o eliminarlo'))
+            else:
+                nombre = 'Desafío' if tipo == 'desafio' else 'Escena'
+                hallazgos.append(Hallazgo('grafo', 'MEDIA', 'inconsistencia', rel, 0,
+                                          f'{nombre} "{id_nodo}" inalcanzable desde "{escena_inicial}"',
+                                          'Agregar una opción que lleve acá o eliminar el archivo'))
+
+    # --- Estados sin salida ---
+    for nodo in sorted(grafo.sin_salida, key=lambda nodo: grafo.nodos[nodo]):
+        condiciones = [str(o['condicion']) for o in GrafoHistoria._opciones(grafo.datos[nodo]) if o.get('condicion')]
+        if condiciones:
+            detalle = f'hay caminos que llegan sin cumplir ninguna condición ({", ".join(condiciones)})'
+        else:
+            detalle = 'no tiene opciones'
+        hallazgos.append(Hallazgo('grafo', 'ALTA', 'bug', grafo.rel(nodo), 0,
+                                  f'Escena sin salida: {detalle}',
+                                  'Agregar una opción sin condición (o "reiniciar" si es un final)'))
+
+    if grafo.atrapados:
+        ids = [grafo.nodos[nodo][1] for nodo in grafo.atrapados]
+        muestra = _muestra(ids)
+        hallazgos.append(Hallazgo('grafo', 'ALTA', 'bug', rel_historia, 0,
+                                  f'{len(ids)} nodo(s) desde los que no se llega a ningún final: {muestra}',
+                                  'Agregar una salida del ciclo hacia un final'))
+
+    # --- Opciones que nunca se habilitan ---
+    for nodo in sorted(grafo.alcanzados, key=lambda nodo: grafo.nodos[nodo]):
+        if grafo.nodos[nodo][0] != 'escena':
+            continue
+        for j, opcion in enumerate(GrafoHistoria._opciones(grafo.datos[nodo])):
+            condicion = opcion.get('condicion')
+            if not condicion or (nodo, j) in grafo.habilitadas:
+                continue
+            if not (isinstance(condicion, str) and condicion.startswith('tiene_')):
+                motivo = f'condición "{condicion}" no reconocida (StateManager la evalúa como falsa)'
+                sugerencia = 'Usar el formato "tiene_<recompensa>"'
+            elif condicion[len('tiene_'):] not in grafo.otorgadas:
+                motivo = f'ningún desafío alcanzable otorga "{condicion[len("tiene_"):]}"'
+                sugerencia = 'Corregir el nombre de la recompensa o agregar el desafío que la otorga'
+            else:
+                motivo = f'"{condicion}" no se cumple en ningún camino que llegue a esta escena'
+                sugerencia = 'Revisar el orden de la historia: la recompensa se obtiene después'
+            hallazgos.append(Hallazgo('grafo', 'MEDIA', 'bug', grafo.rel(nodo), 0,
+                                      f'Opción #{j+1} ("{opcion.get("texto", "")}") nunca se habilita: {motivo}',
+                                      sugerencia))
+
+    return hallazgos
+
+
+# ─── CHECKS: Peso de primera pintura ────────────────────────────────
+
+# Bytes que una escena o desafío puede hacer esperar antes de mostrarse (--presupuesto-kb)
+PRESUPUESTO_KB = 1024
+
+# Videos de fondo que se revisan (build/scripts/optimizar_videos.py)
+EXTENSIONES_VIDEO = {'.mp4', '.m4v', '.mov'}
+
+
+def check_peso(indice, archivos_filtro=None):
+    """
+    Bytes que cada escena y desafío hace esperar antes de mostrarse, contra el
+    presupuesto, y videos de fondo que no arrancan hasta bajarse enteros.
+    """
+    tareas = []
+    videos = indice.archivos_con_extension(EXTENSIONES_VIDEO)
+    for historia in indice.historias:
+        for rel, _ in historia['escenas'] + historia['desafios']:
+            if archivos_filtro and rel not in archivos_filtro:
+                continue
+            # El presupuesto va en los argumentos: forma parte de la clave de la caché
+            tareas.append((_check_peso_nodo, rel, historia['dir'], PRESUPUESTO_KB))
+        carpeta_videos = indice.rel(historia['dir']) + '/videos/'
+        for rel in videos:
+            if rel.startswith(carpeta_videos) and (not archivos_filtro or rel in archivos_filtro):
+                tareas.append((_check_peso_video, rel, historia['dir']))
+    return indice.ejecutar(tareas)
+
+
+def _ruta_imagen(prefijo, nombre, tipo='fondo', id_elem=None):
+    """Ruta relativa de una imagen, igual que ImagePreloader.resolverRuta()."""
+    if tipo == 'personaje':
+        return f'{prefijo}imagenes/personajes/{id_elem or ""}/{nombre}'
+    if tipo == 'objeto':
+        return f'{prefijo}imagenes/objetos/{nombre}'
+    return f'{prefijo}imagenes/fondos/{nombre}'  # fondo y cualquier otro tipo
+
+
+def _sonidos(valor):
+    """Archivos de los campos `sonido*` de una configuración de desafío (a cualquier profundidad)."""
+    if isinstance(valor, dict):
+        for clave, sub in valor.items():
+            if clave.startswith('sonido') and isinstance(sub, str) and sub:
+                yield sub
+            else:
+                yield from _sonidos(sub)
+    elif isinstance(valor, list):
+        for sub in valor:
+            yield from _sonidos(sub)
+
+
+def recursos_de(datos, prefijo):
+    """
+    Recursos que pide una escena o desafío, como lista de (rel, clase) sin
+    repetidos. `prefijo` es la carpeta de la historia relativa a la raíz, con
+    "/" final.
+
+    Las imágenes (clase "imagen") salen de las mismas reglas que
+    ImagePreloader.extraerImagenes(): son, junto con el JSON, lo que
+    GameEngine espera antes de renderizar. El video (FondoHelper) y los audios
+    (fondo y efectos de los desafíos) arrancan después y no bloquean.
+    """
+    recursos = []
+
+    def agregar(rel, clase):
+        if rel not in vistos:
+            vistos.add(rel)
+            recursos.append((rel, clase))
+
+    vistos = set()
+    if datos.get('fondo'):
+        agregar(_ruta_imagen(prefijo, datos['fondo']), 'imagen')
+    elementos = datos.get('elementos')
+    for elem in elementos if isinstance(elementos, list) else []:
+        if isinstance(elem, dict) and elem.get('imagen'):
+            agregar(_ruta_imagen(prefijo, elem['imagen'], elem.get('tipo'), elem.get('id')), 'imagen')
+    config = datos.get('configuracion')
+    if isinstance(config, dict):
+        interactivos = config.get('elementos_interactivos')
+        for elem in interactivos if isinstance(interactivos, list) else []:
+            if not isinstance(elem, dict):
+                continue
+            for campo in ('imagen', 'imagen_final'):
+                if elem.get(campo):
+                    agregar(_ruta_imagen(prefijo, elem[campo], elem.get('tipo') or 'objeto'), 'imagen')
+        objeto = config.get('objeto_interactivo')
+        if isinstance(objeto, dict) and objeto.get('imagen'):
+            agregar(_ruta_imagen(prefijo, objeto['imagen'], objeto.get('tipo') or 'objeto'), 'imagen')
+
+    if isinstance(datos.get('video'), str) and datos['video']:
+        agregar(f"{prefijo}videos/{datos['video']}", 'video')
+    if isinstance(datos.get('audio'), str) and datos['audio']:
+        agregar(f"{prefijo}audios/{datos['audio']}", 'audio')
+    for sonido in _sonidos(config):
+        agregar(f'{prefijo}audios/{sonido}', 'audio')
+    return recursos
+
+
+def peso_nodo(indice, rel, prefijo):
+    """
+    Peso de una escena o desafío: dict con `bloqueantes` (bytes que se esperan
+    antes de mostrarlo: su JSON más las imágenes), `diferidos` (video y audios),
+    `imagenes` ({rel: bytes}) y `recursos` [(rel, clase, bytes)]. None si el
+    JSON no se puede leer. Los archivos que no existen cuentan 0 bytes.
+    """
+    datos, _ = indice.json(rel)
+    if not isinstance(datos, dict):
+        return None
+    recursos = [(r, clase, indice.tamano(r) or 0) for r, clase in recursos_de(datos, prefijo)]
+    imagenes = {r: tamano for r, clase, tamano in recursos if clase == 'imagen'}
+    return {
+        'bloqueantes': (indice.tamano(rel) or 0) + sum(imagenes.values()),
+        'diferidos': sum(tamano for _, clase, tamano in recursos if clase != 'imagen'),
+        'imagenes': imagenes,
+        'recursos': recursos,
+    }
+
+
+def formato_bytes(n):
+    """Tamaño legible: 850 B, 312 KB, 1.4 MB."""
+    if n < 1024:
+        return f'{n} B'
+    if n < 1024 * 1024:
+        return f'{n / 1024:.0f} KB'
+    return f'{n / (1024 * 1024):.1f} MB'
+
+
+def _check_peso_nodo(indice, rel, historia_dir, presupuesto_kb):
+    """Avisa si una escena o desafío bloquea más bytes que el presupuesto antes de mostrarse."""
+    hallazgos = []
+    peso = peso_nodo(indice, rel, indice.rel(historia_dir) + '/')
+    if peso is None or peso['bloqueantes'] <= presupuesto_kb * 1024:
+        return hallazgos
+
+    pesadas = sorted(peso['imagenes'].items(), key=lambda item: -item[1])[:3]
+    detalle = ', '.join(f'{Path(r).name} {formato_bytes(t)}' for r, t in pesadas)
+    hallazgos.append(Hallazgo('peso', 'MEDIA', 'rendimiento', rel, 0,
+                              f'Bloquea {formato_bytes(peso["bloqueantes"])} antes de mostrarse '
+                              f'(presupuesto: {formato_bytes(presupuesto_kb * 1024)}): {detalle}',
+                              'Comprimir o achicar las imágenes más pesadas; el detalle por escena '
+                              'y por transición está en peso_escenas.py'))
+    return hallazgos
+
+
+def _check_peso_video(indice, rel, historia_dir):
+    """
+    Avisa si un video tiene el `moov` (la tabla de cuadros) después del `mdat`:
+    el navegador no puede arrancarlo hasta bajar el archivo entero.
+    """
+    cajas = indice.cajas_mp4(rel)
+    if cajas is None or 'mdat' not in cajas or 'moof' in cajas:
+        return []  # Ilegible o fragmentado: optimizar_videos.py da el detalle
+    if cajas.index('moov') < cajas.index('mdat'):
+        return []
+    return [Hallazgo('peso', 'MEDIA', 'rendimiento', rel, 0,
+                     f'El video tiene el moov al final: no arranca hasta bajar los '
+                     f'{formato_bytes(indice.tamano(rel) or 0)} enteros',
+                     f'Pasarlo a faststart (sin recodificar) con '
+                     f'build/scripts/optimizar_videos.py --historia {historia_dir.name}')]
+
+
+# ─── Alcance por cambios (--desde) ──────────────────────────────────
+
+def archivos_cambiados(ref):
+    """
+    Rutas relativas a la raíz que cambiaron respecto de `ref` (commit, rama o tag):
+    modificadas, agregadas o borradas en el working tree, más las nuevas sin trackear.
+    """
+    comandos = [
+        ['git', 'diff', '--name-only', '--no-renames', '--relative', '-z', ref, '--'],
+        ['git', 'ls-files', '--others', '--exclude-standard', '-z'],
+    ]
+    cambiados = set()
+    for comando in comandos:
+        try:
+            salida = subprocess.run(comando, cwd=RAIZ, capture_output=True, text=True,
+                                    encoding='utf-8', check=True).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            detalle = (getattr(e, 'stderr', None) or str(e)).strip()
+            print(f"ERROR: no se pudieron obtener los cambios desde '{ref}': {detalle}", file=sys.stderr)
+            sys.exit(1)
+        cambiados.update(ruta for ruta in salida.split('\0') if ruta)
+    return cambiados
+
+
+def _referencias_de(datos, historia_dir):
+    """Rutas absolutas de los archivos que referencia una escena o desafío."""
+    dir_datos = historia_dir / 'datos'
+    dir_imagenes = historia_dir / 'imagenes'
+
+    # Targets de opciones y de resultados de desafíos
+    opciones = datos.get('opciones')
+    for opcion in opciones if isinstance(opciones, list) else []:
+        if isinstance(opcion, dict) and opcion.get('target'):
+            carpeta = 'desafios' if opcion.get('tipo_target', 'escena') == 'desafio' else 'escenas'
+            yield dir_datos / carpeta / f"{opcion['target']}.json"
+    for campo in ('resultado_exito', 'resultado_fallo'):
+        resultado = datos.get(campo)
+        if isinstance(resultado, dict) and resultado.get('target'):
+            yield dir_datos / 'escenas' / f"{resultado['target']}.json"
+
+    # Carpetas de personaje
+    elementos = datos.get('elementos')
+    for elem in elementos if isinstance(elementos, list) else []:
+        if isinstance(elem, dict) and elem.get('tipo') == 'personaje' and elem.get('id'):
+            yield dir_imagenes / 'personajes' / elem['id']
+
+    # Imágenes, video y audios (los mismos que pesa la categoría peso)
+    for ruta, _ in recursos_de(datos, f'{historia_dir.as_posix()}/'):
+        yield Path(ruta)
+
+
+def referencias_inversas(indice):
+    """
+    Índice inverso de referencias: ruta → archivos cuyos checks dependen de ella.
+
+      - escena o desafío     → escenas y desafíos que lo usan como target
+      - imagen, video, audio → escenas y desafíos que lo usan
+      - carpeta de personaje → escenas donde aparece ese personaje
+    """
+    inversas = defaultdict(set)
+    for historia in indice.historias:
+        for rel, _ in historia['escenas'] + historia['desafios']:
+            datos, _ = indice.json(rel)
+            if not isinstance(datos, dict):
+                continue
+            for destino in _referencias_de(datos, historia['dir']):
+                inversas[indice.rel(destino)].add(rel)
+    return inversas
+
+
+def alcance_desde(indice, ref):
+    """
+    Archivos a auditar para los cambios desde `ref`: los cambiados, los que los
+    referencian (un target o una imagen borrada rompe a quien la usa) y el
+    service-worker.js si alguno está —o debería estar— en un grupo de caché.
+
+    Alcanza con un salto: ningún check depende de los referentes de un referente.
+    """
+    cambiados = archivos_cambiados(ref)
+    inversas = referencias_inversas(indice)
+    archivos_sw = indice.archivos_sw()
+
+    alcance = set(cambiados)
+    for ruta in cambiados:
+        # La ruta y cada carpeta que la contiene (ej: imagenes/personajes/<id>)
+        partes = ruta.split('/')
+        for i in range(len(partes), 0, -1):
+            alcance.update(inversas.get('/'.join(partes[:i]), ()))
+        if ruta in archivos_sw or Path(ruta).suffix in EXTENSIONES_CACHE:
+            alcance.add('service-worker.js')
+    return alcance
+
+
+# ─── Modo vigilancia (--watch) ──────────────────────────────────────
+
+ICONOS_SEVERIDAD = {'CRITICA': '🔴', 'ALTA': '🟠', 'MEDIA': '🟡', 'BAJA': '🔵'}
+
+def _correr_categorias(indice, categorias, archivos_filtro):
+    hallazgos = []
+    for fn in categorias:
+        hallazgos.extend(fn(indice, archivos_filtro))
+    return hallazgos
+
+
+def _clave_hallazgo(h):
+    return (h.categoria, h.severidad, h.tipo, h.archivo, h.linea, h.descripcion)
+
+
+def _imprimir_delta(nuevos, resueltos, ndjson):
+    for estado, hallazgos in (('nuevo', nuevos), ('resuelto', resueltos)):
+        for h in sorted(hallazgos, key=lambda x: (x.categoria, x.severidad, x.archivo, x.linea)):
+            if ndjson:
+                print(json.dumps({'estado': estado, **h.to_dict()}, ensure_ascii=False), flush=True)
+                continue
+            ubicacion = f'{h.archivo}:{h.linea}' if h.linea else h.archivo
+            marca = '+' if estado == 'nuevo' else '✓'
+            print(f"  {marca} {ICONOS_SEVERIDAD.get(h.severidad, '⚪')} [{h.severidad}] [{h.tipo}] {ubicacion}")
+            print(f"     {h.descripcion}")
+
+
+def vigilar(indice, categorias, archivos_filtro, intervalo=0.5, ndjson=False):
+    """
+    Audita una vez y después re-audita en cada cambio del proyecto, hasta Ctrl+C.
+
+    Los cambios se detectan comparando instantáneas de (mtime, tamaño), sin
+    dependencias externas. El índice queda en memoria entre vueltas: solo se
+    olvida lo de los archivos que cambiaron, y la caché del índice (con las
+    dependencias de cada tarea) hace que solo se re-ejecuten los checks
+    afectados. Se imprime la diferencia: hallazgos nuevos y resueltos.
+    """
+    def auditar():
+        return {_clave_hallazgo(h): h for h in _correr_categorias(indice, categorias, archivos_filtro)}
+
+    actuales = auditar()
+    instantanea = indice.instantanea()
+    indice.cache.escribir()
+    if not ndjson:
+        print(f"\n  Vigilando {indice.raiz} — {len(actuales)} hallazgo(s). Ctrl+C para salir.\n")
+    _imprimir_delta(list(actuales.values()), [], ndjson)
+
+    try:
+        while True:
+            time.sleep(intervalo)
+            nueva = instantanea_archivos(indice.raiz)
+            if nueva == instantanea:
+                continue
+            # Esperar a que el editor termine de escribir (guardados en varios pasos)
+            while True:
+                time.sleep(0.05)
+                estable = instantanea_archivos(indice.raiz)
+                if estable == nueva:
+                    break
+                nueva = estable
+
+            cambiados = {rel for rel in nueva.keys() | instantanea.keys()
+                         if nueva.get(rel) != instantanea.get(rel)}
+            indice.invalidar(cambiados, relistar=nueva.keys() != instantanea.keys(), instantanea=nueva)
+            instantanea = nueva
+
+            inicio = time.perf_counter()
+            previos, actuales = actuales, auditar()
+            duracion = time.perf_counter() - inicio
+            nuevos = [h for clave, h in actuales.items() if clave not in previos]
+            resueltos = [h for clave, h in previos.items() if clave not in actuales]
+
+            if not ndjson:
+                print(f"  [{time.strftime('%H:%M:%S')}] {len(cambiados)} archivo(s) cambiado(s) → "
+                      f"{len(nuevos)} nuevo(s), {len(resueltos)} resuelto(s), "
+                      f"{len(actuales)} en total ({duracion:.2f} s)")
+            _imprimir_delta(nuevos, resueltos, ndjson)
+            indice.cache.escribir()
+    except KeyboardInterrupt:
+        indice.cache.escribir()
+        if not ndjson:
+            print("\n  Vigilancia terminada.")
+
+
 # ─── Ejecución principal ────────────────────────────────────────────
 
 CATEGORIAS = {
@@ -845,10 +2638,14 @@ CATEGORIAS = {
     'json': check_json,
     'pwa': check_pwa,
     'cross': check_cross,
+    'grafo': check_grafo,
+    'peso': check_peso,
 }
+NOMBRES_CATEGORIA = {fn: nombre for nombre, fn in CATEGORIAS.items()}
 
 
 def main():
+    global PRESUPUESTO_KB
     parser = argparse.ArgumentParser(
         description='Auditoría automática de código para La Biblioteca del Tío Pier.\n'
                     'Detecta bugs, hardcodeos, magic numbers, inconsistencias y más.\n'
@@ -861,12 +2658,29 @@ Categorías disponibles:
   json   JSONs de escenas y desafíos (schema, voseo, targets)
   pwa    Service Worker y manifest (caché, huérfanos, íconos)
   cross  Checks transversales (rutas de imágenes, transiciones, catálogo)
+  grafo  Grafo de cada historia (escenas inalcanzables, sin salida, condiciones)
+  peso   Bytes que cada escena/desafío espera antes de mostrarse (--presupuesto-kb)
 
 Ejemplos:
   python auditar.py                            # Todo
   python auditar.py --categoria js             # Solo JavaScript
   python auditar.py --archivo js/GameEngine.js # Archivo específico
   python auditar.py --resumen                  # Solo conteo
+  python auditar.py --jobs 0                   # Paralelo, un proceso por núcleo
+  python auditar.py --sin-cache                # Re-auditar todo sin usar la caché
+  python auditar.py --desde main               # Solo lo afectado por los cambios desde main
+  python auditar.py --ndjson --fallar-en ALTA  # Streaming; exit 1 en el primer ALTA/CRITICA
+  python auditar.py --watch -c json            # Re-auditar escenas en cada guardado
+  python auditar.py --perfil --json            # Perfil de tiempos en formato JSON
+
+La caché (.agents/.cache/auditar.json) guarda los hallazgos de cada archivo
+junto con sus dependencias; en la corrida siguiente solo se re-audita lo que
+cambió o lo que depende de algo que cambió.
+
+--desde REF audita los archivos cambiados respecto de REF (git) más los que
+los referencian: escenas que apuntan a una escena cambiada o borrada, escenas
+y desafíos que usan una imagen, video, audio o carpeta de personaje tocada, y
+el Service Worker si el archivo está (o debería estar) en un grupo de caché.
 """)
     parser.add_argument('--categoria', '-c', choices=list(CATEGORIAS.keys()),
                         help='Auditar solo una categoría específica')
@@ -874,9 +2688,38 @@ Ejemplos:
                         help='Auditar archivo(s) específico(s) (rutas relativas)')
     parser.add_argument('--resumen', '-r', action='store_true',
                         help='Mostrar solo el resumen de conteos')
-    parser.add_argument('--json', '-j', action='store_true',
-                        help='Salida en formato JSON para consumo programático')
+    formato = parser.add_mutually_exclusive_group()
+    formato.add_argument('--json', '-j', action='store_true',
+                         help='Salida en formato JSON para consumo programático')
+    formato.add_argument('--ndjson', action='store_true',
+                         help='Un hallazgo JSON por línea, escrito apenas se detecta (para editores y CI)')
+    parser.add_argument('--fallar-en', choices=list(ORDEN_SEVERIDAD), metavar='SEVERIDAD',
+                        help='Cortar en el primer hallazgo de esa severidad o más grave '
+                             '(CRITICA, ALTA, MEDIA, BAJA) y salir con código 1')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='Procesos para repartir categorías y archivos (0 = uno por núcleo). '
+                             'El orden de los hallazgos es el mismo que en modo serial')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='No leer ni escribir la caché de resultados')
+    parser.add_argument('--desde', metavar='REF',
+                        help='Auditar solo lo afectado por los cambios respecto de REF '
+                             '(commit, rama o tag de git), incluidos los archivos que los referencian')
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='Quedarse vigilando el proyecto: re-audita solo lo afectado por cada '
+                             'cambio y muestra los hallazgos nuevos y resueltos (Ctrl+C para salir)')
+    parser.add_argument('--intervalo', type=float, default=0.5, metavar='SEG',
+                        help='Segundos entre revisiones de cambios en --watch (default: 0.5)')
+    parser.add_argument('--presupuesto-kb', type=int, default=PRESUPUESTO_KB, metavar='KB',
+                        help='Máximo de KB que una escena o desafío puede hacer esperar antes de '
+                             f'mostrarse (categoría peso, default: {PRESUPUESTO_KB})')
+    parser.add_argument('--perfil', action='store_true',
+                        help='Medir tiempos por categoría, regla, tarea y archivo, líneas y nodos JSON '
+                             'recorridos y hallazgos por tipo. Corre en serie y sin caché')
     args = parser.parse_args()
+    if args.perfil and (args.jobs != 1 or args.watch):
+        parser.error('--perfil mide una corrida serial: no admite --jobs ni --watch')
+    if args.watch and (args.jobs != 1 or args.fallar_en or args.json):
+        parser.error('--watch corre en serie y no admite --jobs, --fallar-en ni --json (sí --ndjson)')
 
     # Normalizar archivos
     archivos_filtro = None
@@ -887,25 +2730,97 @@ Ejemplos:
             normalizado = a.replace('\\', '/')
             archivos_filtro.add(normalizado)
 
-    # Ejecutar checks
+    # Ejecutar checks (todas las categorías comparten el mismo índice)
+    categorias = [CATEGORIAS[args.categoria]] if args.categoria else list(CATEGORIAS.values())
     todos_hallazgos = []
 
-    if args.categoria:
-        fn = CATEGORIAS[args.categoria]
-        todos_hallazgos.extend(fn(archivos_filtro))
-    else:
-        for nombre, fn in CATEGORIAS.items():
-            todos_hallazgos.extend(fn(archivos_filtro))
+    PRESUPUESTO_KB = args.presupuesto_kb
+
+    if args.perfil:
+        global PERFIL
+        PERFIL = Perfil()
+
+    # --perfil mide una corrida real: sin caché todas las tareas se ejecutan
+    cache = None if args.sin_cache or args.perfil else CacheAuditoria(RUTA_CACHE)
+    if args.watch and cache is None:
+        cache = CacheAuditoria(None)  # En memoria: es la que decide qué re-auditar
+    indice = IndiceProyecto(RAIZ, cache=cache)
+
+    if args.desde:
+        archivos_filtro = (archivos_filtro or set()) | alcance_desde(indice, args.desde)
+        if not archivos_filtro:
+            categorias = []  # Sin cambios: no hay nada que auditar
+
+    if args.watch:
+        vigilar(indice, categorias, archivos_filtro, intervalo=args.intervalo, ndjson=args.ndjson)
+        return
+
+    # Los hallazgos pasan por el colector a medida que se producen (streaming y corte)
+    colector = ColectorHallazgos(ndjson=args.ndjson, umbral=args.fallar_en)
+    indice.al_producir = colector.agregar
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    try:
+        if jobs == 1:
+            for fn in categorias:
+                inicio = time.perf_counter()
+                hallazgos = fn(indice, archivos_filtro)
+                if PERFIL is not None:
+                    PERFIL.categorias[NOMBRES_CATEGORIA[fn]] = time.perf_counter() - inicio
+                colector.agregar(hallazgos)  # Los que la categoría agrega fuera de ejecutar()
+                todos_hallazgos.extend(hallazgos)
+        else:
+            # Las categorías corren en hilos y comparten el pool de procesos para el
+            # trabajo por archivo; el reporte las junta en el orden de la corrida serial
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_iniciar_proceso,
+                                     initargs=(RAIZ, cache is not None)) as pool:
+                indice.pool, indice.jobs = pool, jobs
+                with ThreadPoolExecutor(max_workers=max(1, len(categorias))) as hilos:
+                    futuros = [hilos.submit(fn, indice, archivos_filtro) for fn in categorias]
+                    wait(futuros, return_when=FIRST_EXCEPTION)
+                    if colector.corte is not None:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        raise CorteAuditoria(colector.corte)
+                    for futuro in futuros:
+                        hallazgos = futuro.result()
+                        colector.agregar(hallazgos)
+                        todos_hallazgos.extend(hallazgos)
+    except CorteAuditoria:
+        # El reporte muestra lo encontrado hasta el corte, en orden de llegada
+        todos_hallazgos = colector.hallazgos
+
+    if cache is not None:
+        # Solo una corrida completa sabe qué tareas ya no existen
+        completa = not args.categoria and archivos_filtro is None and colector.corte is None
+        cache.escribir(podar=completa)
+
+    # Con --fallar-en, exit 1 si algún hallazgo llegó al umbral
+    codigo_salida = 1 if colector.corte is not None else 0
+
+    if PERFIL is not None:
+        PERFIL.contar_tipos(todos_hallazgos)
 
     # --- Salida ---
+    if args.ndjson:
+        # Los hallazgos ya se escribieron a medida que aparecían
+        if colector.corte is not None:
+            print(f"Auditoría cortada en el primer hallazgo {colector.corte.severidad}: "
+                  f"{colector.corte.archivo}", file=sys.stderr)
+        if PERFIL is not None:
+            PERFIL.imprimir(salida=sys.stderr)
+        sys.exit(codigo_salida)
+
     if args.json:
         resultado = {
             'raiz': str(RAIZ),
             'total': len(todos_hallazgos),
+            **({'desde': args.desde, 'alcance': sorted(archivos_filtro)} if args.desde else {}),
+            **({'cortada': colector.corte is not None} if args.fallar_en else {}),
+            **({'perfil': PERFIL.to_dict()} if PERFIL is not None else {}),
             'hallazgos': [h.to_dict() for h in todos_hallazgos],
         }
         print(json.dumps(resultado, ensure_ascii=False, indent=2))
-        return
+        sys.exit(codigo_salida)
 
     # Resumen
     conteo_cat = defaultdict(int)
@@ -920,11 +2835,17 @@ Ejemplos:
     print(f"  AUDITORÍA AUTOMÁTICA — La Biblioteca del Tío Pier")
     print(f"  Raíz: {RAIZ}")
     print(f"  Total de hallazgos: {len(todos_hallazgos)}")
+    if args.desde:
+        print(f"  Alcance: {len(archivos_filtro)} archivo(s) afectados por los cambios desde {args.desde}")
+    if cache is not None:
+        print(f"  Caché: {cache.aciertos}/{cache.consultas} tareas reutilizadas")
+    if colector.corte is not None:
+        print(f"  Cortada en el primer hallazgo {colector.corte.severidad} (--fallar-en {args.fallar_en})")
     print(f"{'='*70}\n")
 
     # Conteos
     print("  Por categoría:", end='')
-    for cat in ['js', 'css', 'json', 'pwa', 'cross']:
+    for cat in CATEGORIAS:
         if conteo_cat[cat]:
             print(f"  {cat}={conteo_cat[cat]}", end='')
     print()
@@ -936,13 +2857,16 @@ Ejemplos:
     print()
 
     print("  Por tipo:     ", end='')
-    for tipo in ['bug', 'hardcodeo', 'magic_number', 'inconsistencia', 'refactor', 'dead_code', 'pwa']:
+    for tipo in ['bug', 'hardcodeo', 'magic_number', 'inconsistencia', 'refactor', 'dead_code', 'pwa',
+                 'rendimiento']:
         if conteo_tipo[tipo]:
             print(f"  {tipo}={conteo_tipo[tipo]}", end='')
     print('\n')
 
     if args.resumen:
-        return
+        if PERFIL is not None:
+            PERFIL.imprimir()
+        sys.exit(codigo_salida)
 
     # Detalle
     cat_actual = ''
@@ -955,14 +2879,22 @@ Ejemplos:
         if h.linea:
             ubicacion += f':{h.linea}'
 
-        sev_icons = {'CRITICA': '🔴', 'ALTA': '🟠', 'MEDIA': '🟡', 'BAJA': '🔵'}
-        icono = sev_icons.get(h.severidad, '⚪')
+        icono = ICONOS_SEVERIDAD.get(h.severidad, '⚪')
 
         print(f"  {icono} [{h.severidad}] [{h.tipo}] {ubicacion}")
         print(f"     {h.descripcion}")
         print(f"     → {h.sugerencia}")
         print()
 
+    if PERFIL is not None:
+        PERFIL.imprimir()
+    sys.exit(codigo_salida)
+
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # El que lee la salida (ej: `--ndjson | head`) cerró el pipe: terminar sin traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+benchmark_indice.py — Mide el ahorro del índice compartido de auditar.py.
+
+Genera copias sintéticas del proyecto con las escenas y desafíos de cada
+historia replicados N veces (con los targets reescritos para que sigan siendo
+válidos dentro de cada copia) y compara dos formas de correr todas las
+categorías de CATEGORIAS:
+
+  - compartido:    un solo IndiceProyecto para toda la corrida (lo que hace main()).
+  - por categoría: un IndiceProyecto nuevo por categoría, que equivale a que
+                   cada check lea y decodifique los archivos por su cuenta.
+
+Es de SOLO LECTURA sobre el proyecto: los árboles sintéticos se crean en un
+directorio temporal que se borra al terminar.
+
+Uso:
+  python benchmark_indice.py                       # Escalas 1x, 10x y 100x
+  python benchmark_indice.py --factores 10 100     # Escalas específicas
+  python benchmark_indice.py --repeticiones 5      # Mejor tiempo de 5 corridas
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import auditar
+
+# Archivos y carpetas del proyecto que se copian tal cual a cada árbol sintético
+BASE_PROYECTO = ['js', 'css', 'service-worker.js', 'manifest.json', 'biblioteca/historias.json']
+
+
+def _sufijar(target, sufijo):
+    return f'{target}{sufijo}' if target else target
+
+
+def _replicar_datos(origen, destino, factor):
+    """Copia datos/escenas y datos/desafíos replicando cada archivo `factor` veces."""
+    for carpeta in ('escenas', 'desafios'):
+        dir_origen = origen / 'datos' / carpeta
+        if not dir_origen.is_dir():
+            continue
+        dir_destino = destino / 'datos' / carpeta
+        dir_destino.mkdir(parents=True, exist_ok=True)
+
+        for f in sorted(dir_origen.glob('*.json')):
+            texto = f.read_text(encoding='utf-8')
+            for copia in range(factor):
+                sufijo = f'_C{copia}' if copia else ''
+                try:
+                    datos = json.loads(texto)
+                except json.JSONDecodeError:
+                    (dir_destino / f'{f.stem}{sufijo}.json').write_text(texto, encoding='utf-8')
+                    continue
+
+                datos['id'] = f'{f.stem}{sufijo}'
+                for opcion in datos.get('opciones', []) or []:
+                    if isinstance(opcion, dict):
+                        opcion['target'] = _sufijar(opcion.get('target'), sufijo)
+                for campo in ('resultado_exito', 'resultado_fallo'):
+                    resultado = datos.get(campo)
+                    if isinstance(resultado, dict):
+                        resultado['target'] = _sufijar(resultado.get('target'), sufijo)
+
+                (dir_destino / f'{datos["id"]}.json').write_text(
+                    json.dumps(datos, ensure_ascii=False, indent=4), encoding='utf-8')
+
+
+def generar_arbol(destino, factor):
+    """Crea en `destino` una copia del proyecto con las escenas multiplicadas por `factor`."""
+    for rel in BASE_PROYECTO:
+        origen = auditar.RAIZ / rel
+        if origen.is_dir():
+            shutil.copytree(origen, destino / rel)
+        elif origen.exists():
+            (destino / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(origen, destino / rel)
+
+    for historia_dir in sorted((auditar.RAIZ / 'historias').iterdir()):
+        if not historia_dir.is_dir():
+            continue
+        historia_destino = destino / 'historias' / historia_dir.name
+        historia_destino.mkdir(parents=True)
+        if (historia_dir / 'historia.json').exists():
+            shutil.copy2(historia_dir / 'historia.json', historia_destino / 'historia.json')
+        if (historia_dir / 'imagenes').is_dir():
+            shutil.copytree(historia_dir / 'imagenes', historia_destino / 'imagenes')
+        _replicar_datos(historia_dir, historia_destino, factor)
+
+
+def correr_compartido(raiz):
+    """Todas las categorías sobre un único índice. Retorna archivos leídos."""
+    indice = auditar.IndiceProyecto(raiz)
+    for fn in auditar.CATEGORIAS.values():
+        fn(indice)
+    return len(indice._textos)
+
+
+def correr_por_categoria(raiz):
+    """Cada categoría con su propio índice (cada una relee todo). Retorna archivos leídos."""
+    lecturas = 0
+    for fn in auditar.CATEGORIAS.values():
+        indice = auditar.IndiceProyecto(raiz)
+        fn(indice)
+        lecturas += len(indice._textos)
+    return lecturas
+
+
+def medir(fn, raiz, repeticiones):
+    """Mejor tiempo de `repeticiones` corridas. Retorna (segundos, lecturas)."""
+    mejor = None
+    lecturas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        lecturas = fn(raiz)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, lecturas
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compara auditar.py con índice compartido vs. una lectura por categoría.')
+    parser.add_argument('--factores', '-f', nargs='+', type=int, default=[1, 10, 100],
+                        help='Multiplicadores de la cantidad actual de escenas (default: 1 10 100)')
+    parser.add_argument('--repeticiones', '-n', type=int, default=3,
+                        help='Corridas por medición; se reporta la más rápida (default: 3)')
+    args = parser.parse_args()
+
+    print(f"\n  {'Escala':>7}  {'Escenas':>8}  {'Compartido':>11}  {'Por categoría':>14}  {'Ahorro':>7}  {'Lecturas':>13}")
+    print(f"  {'─'*7}  {'─'*8}  {'─'*11}  {'─'*14}  {'─'*7}  {'─'*13}")
+
+    for factor in args.factores:
+        with tempfile.TemporaryDirectory(prefix='bench-auditar-') as tmp:
+            raiz = Path(tmp)
+            generar_arbol(raiz, factor)
+            escenas = len(list(raiz.glob('historias/*/datos/escenas/*.json')))
+
+            t_comp, l_comp = medir(correr_compartido, raiz, args.repeticiones)
+            t_cat, l_cat = medir(correr_por_categoria, raiz, args.repeticiones)
+
+        ahorro = (1 - t_comp / t_cat) * 100 if t_cat else 0
+        print(f"  {f'{factor}x':>7}  {escenas:>8}  {t_comp:>10.3f}s  {t_cat:>13.3f}s  "
+              f"{ahorro:>6.1f}%  {f'{l_comp} / {l_cat}':>13}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+instantanea.py — Un recorrido del proyecto con el mtime y el tamaño de cada archivo.
+
+Lo usan auditar.py (IndiceProyecto y el modo --watch) y analizar-sw.py de la
+skill sw-updater (huérfanos, tamaños y huellas del SW). Está aparte para que
+analizar-sw.py no tenga que importar el auditor entero: este módulo no tiene
+efectos al importarlo.
+
+No es un script: los dos lo cargan por ruta (auditar.py también se importa desde
+otras skills, donde esta carpeta no está en el sys.path).
+"""
+
+import os
+
+# Caché del auditor y de los scripts de docs: no es parte del proyecto
+CARPETA_CACHE = '.agents/.cache'
+
+# Carpetas que no se recorren (no las lee ningún check)
+CARPETAS_NO_VIGILADAS = {'.git', 'node_modules', '__pycache__'}
+
+
+def instantanea_archivos(raiz):
+    """(mtime_ns, tamaño) de cada archivo del proyecto, salvo .git y la caché del auditor."""
+    raiz = str(raiz)
+    corte = len(raiz) + 1
+    estado = {}
+    pendientes = [raiz]
+    while pendientes:
+        carpeta = pendientes.pop()
+        try:
+            entradas = os.scandir(carpeta)
+        except OSError:
+            continue
+        with entradas:
+            for entrada in entradas:
+                rel = entrada.path[corte:].replace(os.sep, '/')
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        if entrada.name not in CARPETAS_NO_VIGILADAS and rel != CARPETA_CACHE:
+                            pendientes.append(entrada.path)
+                    elif entrada.is_file():
+                        st = entrada.stat()
+                        estado[rel] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue  # Borrado mientras se recorría
+    return estado
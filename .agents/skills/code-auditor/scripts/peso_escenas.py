@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+peso_escenas.py — Reporte de peso de primera pintura por escena y por transición.
+
+Para cada escena y desafío resuelve los recursos que pide con las mismas reglas
+que ImagePreloader.extraerImagenes()/resolverRuta() (ver recursos_de() en
+auditar.py) y calcula:
+
+  - bloquea:   bytes que GameEngine espera antes de renderizar (el JSON y las
+               imágenes; #cargarEscena/#cargarDesafio hacen await de ambos).
+  - diferido:  bytes que arrancan después del render (video de fondo, audio de
+               fondo y efectos de los desafíos).
+  - por transición A → B: cuántos de los bytes de B ya se bajaron para A
+               (imágenes repetidas, que el preloader no vuelve a pedir) y
+               cuántos son nuevos, y si B se precarga en segundo plano mientras
+               se lee o se juega A (#precargarSiguientes): con el mapa de
+               precarga (datos/precarga.json, skill build) solo si el mapa lista
+               B desde A; sin mapa, todas las opciones y los resultados de un
+               desafío.
+
+Es de SOLO LECTURA. La categoría `peso` de auditar.py usa el mismo cálculo
+para avisar qué escenas superan el presupuesto.
+
+Uso:
+  python peso_escenas.py                              # Todas las historias
+  python peso_escenas.py --historia el-misterio-del-bosque-encantado
+  python peso_escenas.py --presupuesto-kb 512         # Marcar lo que bloquea más de 512 KB
+  python peso_escenas.py --transiciones 0             # Listar todas las transiciones
+  python peso_escenas.py --json                       # Salida completa en JSON
+"""
+
+import argparse
+import io
+import json
+import sys
+
+import auditar
+from auditar import formato_bytes
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+
+def _salidas(tipo, datos):
+    """Destinos de un nodo como (tipo, id)."""
+    if tipo == 'escena':
+        opciones = datos.get('opciones')
+        for opcion in opciones if isinstance(opciones, list) else []:
+            if isinstance(opcion, dict) and opcion.get('target') and opcion.get('accion') != 'reiniciar':
+                yield opcion.get('tipo_target') or 'escena', opcion['target']
+    else:
+        for campo in ('resultado_exito', 'resultado_fallo'):
+            resultado = datos.get(campo)
+            if isinstance(resultado, dict) and resultado.get('target'):
+                yield 'escena', resultado['target']
+
+
+def mapa_precarga(indice, historia_dir):
+    """
+    Nodos que el motor precarga desde cada nodo según datos/precarga.json:
+    {(tipo, id): {(tipo, id), ...}}. None si la historia no tiene mapa o el motor
+    lo descartaría (versión distinta de la de historia.json, como
+    ContentLoader.siguientesDe): entonces precarga un salto.
+    """
+    config, _ = indice.json(indice.rel(historia_dir / 'historia.json'))
+    precarga = config.get('precarga') if isinstance(config, dict) else None
+    if not isinstance(precarga, dict) or not precarga.get('archivo'):
+        return None
+    mapa, _ = indice.json(indice.rel(historia_dir / str(precarga['archivo'])))
+    if (not isinstance(mapa, dict) or mapa.get('version') != precarga.get('version')
+            or not isinstance(mapa.get('nodos'), list) or not isinstance(mapa.get('precarga'), list)):
+        return None
+    nodos = [tuple(clave.split(':', 1)) for clave in mapa['nodos']]
+    return {nodos[i]: {nodos[n] for n in entrada[0]} for i, entrada in enumerate(mapa['precarga'])}
+
+
+def analizar_historia(indice, historia, presupuesto_kb):
+    """Peso de cada nodo y de cada transición de una historia."""
+    prefijo = indice.rel(historia['dir']) + '/'
+    nodos = {}
+    for tipo, archivos in (('escena', historia['escenas']), ('desafio', historia['desafios'])):
+        for rel, f in archivos:
+            peso = auditar.peso_nodo(indice, rel, prefijo)
+            if peso is not None:
+                datos, _ = indice.json(rel)
+                nodos[(tipo, f.stem)] = dict(peso, rel=rel, datos=datos)
+
+    mapa = mapa_precarga(indice, historia['dir'])
+    transiciones = []
+    for (tipo, id_nodo), origen in nodos.items():
+        vistas = set()  # Dos opciones al mismo destino son una sola transición
+        # Un nodo que no está en el mapa precarga un salto, como sin mapa
+        precargados = mapa.get((tipo, id_nodo)) if mapa is not None else None
+        for tipo_destino, id_destino in _salidas(tipo, origen['datos']):
+            destino = nodos.get((tipo_destino, id_destino))
+            if destino is None or (tipo_destino, id_destino) in vistas:
+                continue  # Target roto (lo reporta auditar.py --categoria json) o repetido
+            vistas.add((tipo_destino, id_destino))
+            compartidos = sum(t for r, t in destino['imagenes'].items() if r in origen['imagenes'])
+            transiciones.append({
+                'desde': id_nodo,
+                'hacia': id_destino,
+                'precargada': precargados is None or (tipo_destino, id_destino) in precargados,
+                'compartidos': compartidos,
+                'nuevos': destino['bloqueantes'] - compartidos,
+            })
+
+    # Peor caso de llegada a cada nodo: la transición que más bytes nuevos le deja
+    peor_entrada = {}
+    for t in transiciones:
+        peor_entrada[t['hacia']] = max(peor_entrada.get(t['hacia'], 0), t['nuevos'])
+
+    limite = presupuesto_kb * 1024
+    filas = []
+    for (tipo, id_nodo), peso in sorted(nodos.items(), key=lambda item: -item[1]['bloqueantes']):
+        filas.append({
+            'id': id_nodo,
+            'tipo': tipo,
+            'archivo': peso['rel'],
+            'bloquea': peso['bloqueantes'],
+            'diferido': peso['diferidos'],
+            'peor_entrada': peor_entrada.get(id_nodo),
+            'excede': peso['bloqueantes'] > limite,
+            'recursos': [{'archivo': r, 'clase': clase, 'bytes': t} for r, clase, t in peso['recursos']],
+        })
+    transiciones.sort(key=lambda t: (t['precargada'], -t['nuevos']))
+    return {'historia': historia['dir'].name, 'nodos': filas, 'transiciones': transiciones}
+
+
+def imprimir(reporte, presupuesto_kb, max_transiciones):
+    nodos = reporte['nodos']
+    excedidos = sum(1 for n in nodos if n['excede'])
+    print(f"\n  📦 {reporte['historia']} — {len(nodos)} nodos, {excedidos} sobre el presupuesto "
+          f"de {formato_bytes(presupuesto_kb * 1024)}\n")
+
+    print(f"  {'':2} {'Nodo':<34}  {'Bloquea':>9}  {'Diferido':>9}  {'Peor llegada':>12}")
+    print(f"  {'':2} {'─'*34}  {'─'*9}  {'─'*9}  {'─'*12}")
+    for n in nodos:
+        marca = '⚠️' if n['excede'] else '  '
+        nombre = n['id'] if n['tipo'] == 'escena' else f"{n['id']} (desafío)"
+        llegada = formato_bytes(n['peor_entrada']) if n['peor_entrada'] is not None else '—'
+        print(f"  {marca} {nombre:<34}  {formato_bytes(n['bloquea']):>9}  "
+              f"{formato_bytes(n['diferido']):>9}  {llegada:>12}")
+
+    transiciones = reporte['transiciones']
+    if max_transiciones:
+        transiciones = transiciones[:max_transiciones]
+    if not transiciones:
+        return
+    print(f"\n  Transiciones (primero las que no se precargan, después por bytes nuevos):\n")
+    print(f"  {'Desde':<28}  {'Hacia':<28}  {'Compartido':>10}  {'Nuevo':>9}  Precarga")
+    print(f"  {'─'*28}  {'─'*28}  {'─'*10}  {'─'*9}  {'─'*8}")
+    for t in transiciones:
+        precarga = 'sí' if t['precargada'] else 'no'
+        print(f"  {t['desde']:<28}  {t['hacia']:<28}  {formato_bytes(t['compartidos']):>10}  "
+              f"{formato_bytes(t['nuevos']):>9}  {precarga}")
+    if len(transiciones) < len(reporte['transiciones']):
+        print(f"  … y {len(reporte['transiciones']) - len(transiciones)} más (--transiciones 0 para verlas todas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Peso de primera pintura por escena y por transición (solo lectura).')
+    parser.add_argument('--historia', metavar='ID',
+                        help='Analizar solo esta historia (nombre de la carpeta en historias/)')
+    parser.add_argument('--presupuesto-kb', type=int, default=auditar.PRESUPUESTO_KB, metavar='KB',
+                        help=f'KB que una escena puede hacer esperar antes de mostrarse '
+                             f'(default: {auditar.PRESUPUESTO_KB})')
+    parser.add_argument('--transiciones', type=int, default=20, metavar='N',
+                        help='Transiciones a listar por historia (0 = todas, default: 20)')
+    parser.add_argument('--json', '-j', action='store_true',
+                        help='Salida en formato JSON (incluye los recursos de cada nodo)')
+    args = parser.parse_args()
+
+    indice = auditar.IndiceProyecto(auditar.RAIZ)
+    historias = [h for h in indice.historias if not args.historia or h['dir'].name == args.historia]
+    if not historias:
+        print(f"ERROR: no existe la historia '{args.historia}'", file=sys.stderr)
+        return 1
+
+    reportes = [analizar_historia(indice, h, args.presupuesto_kb) for h in historias]
+    if args.json:
+        print(json.dumps({'presupuesto_kb': args.presupuesto_kb, 'historias': reportes},
+                         ensure_ascii=False, indent=2))
+        return 0
+
+    for reporte in reportes:
+        imprimir(reporte, args.presupuesto_kb, args.transiciones)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+servidor.py — Servidor HTTP local del proyecto, con el comportamiento del hosting.
+
+`python -m http.server` alcanza para abrir la app, pero habla HTTP/1.0 (una
+conexión por pedido), no entiende Range ni ETag y nunca comprime. El navegador
+se porta distinto que contra GitHub Pages: el audio y los videos no se pueden
+adelantar, la emulación de Range del Service Worker nunca se prueba contra un
+servidor real y cualquier medición de carga da otra cosa que en producción.
+
+Este servidor:
+
+  - atiende varias conexiones a la vez (un hilo por conexión) con HTTP/1.1 y
+    keep-alive;
+  - responde Range de un solo tramo (`bytes=a-b`, `bytes=a-`, `bytes=-n`) con
+    206, 416 si el tramo empieza después del final del archivo (o pide 0 bytes
+    del final) e If-Range. Un Range inválido (`bytes=5-2`, varios tramos, otra
+    unidad) se ignora y se responde el archivo completo con 200;
+  - manda ETag y Last-Modified y responde 304 a If-None-Match / If-Modified-Since;
+  - con Accept-Encoding, sirve `archivo.br` o `archivo.gz` si están al lado del
+    original y no son más viejos (Content-Encoding y Vary: Accept-Encoding). Un
+    pedido con Range siempre recibe el original, sin comprimir;
+  - manda Cache-Control según el perfil:
+
+      desarrollo  no-cache: el navegador revalida cada archivo (304 si no
+                  cambió), así los cambios se ven al recargar.
+      pages       como GitHub Pages: max-age=600 para todo y gzip al vuelo para
+                  los archivos de texto que no tienen .gz/.br. Con --base se
+                  sirve bajo la misma subruta que en producción.
+
+Uso:
+  python servidor.py                                   # http://localhost:8000, perfil desarrollo
+  python servidor.py --puerto 8001
+  python servidor.py --perfil pages --base /cuentos-interactivos/
+"""
+
+import argparse
+import email.utils
+import gzip
+import io
+import os
+import re
+import sys
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Cache-Control y compresión al vuelo de cada perfil
+PERFILES = {
+    'desarrollo': {'cache': 'no-cache', 'gzip_al_vuelo': False},
+    'pages': {'cache': 'max-age=600', 'gzip_al_vuelo': True},
+}
+
+# Codificación de Accept-Encoding → extensión del archivo precomprimido, en orden de preferencia
+PRECOMPRIMIDOS = (('br', '.br'), ('gzip', '.gz'))
+
+# Tipos que vale la pena comprimir (las imágenes, el audio y el video ya vienen comprimidos)
+TIPOS_TEXTO = ('text/', 'application/javascript', 'application/json', 'application/manifest+json',
+               'application/x-ndjson', 'image/svg+xml')
+
+# Tipos que mimetypes no conoce (o que conoce distinto según el sistema)
+TIPOS = {
+    '.js': 'application/javascript',
+    '.mjs': 'application/javascript',
+    '.json': 'application/json',
+    '.jsonl': 'application/x-ndjson',
+    '.webmanifest': 'application/manifest+json',
+    '.webp': 'image/webp',
+    '.mp3': 'audio/mpeg',
+    '.mp4': 'video/mp4',
+    '.woff2': 'font/woff2',
+    '.svg': 'image/svg+xml',
+}
+
+BLOQUE = 64 * 1024
+
+RANGO = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+def etag(stat, codificacion=None):
+    """ETag fuerte de una representación: fecha de modificación y tamaño (y la codificación)."""
+    sufijo = {'br': '-br', 'gzip': '-gz'}.get(codificacion, '')
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{sufijo}"'
+
+
+def coincide_etag(encabezado, valor):
+    """If-None-Match (comparación débil: W/"x" coincide con "x")."""
+    valor = valor.removeprefix('W/')
+    etiquetas = [e.strip().removeprefix('W/') for e in encabezado.split(',')]
+    return '*' in etiquetas or valor in etiquetas
+
+
+def codificaciones_aceptadas(encabezado):
+    """Codificaciones de Accept-Encoding con q > 0."""
+    aceptadas = set()
+    for parte in encabezado.split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        m = re.search(r'q=([\d.]+)', parametros)
+        if nombre and not (m and float(m.group(1)) == 0):
+            aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+def tramo(encabezado, tamano):
+    """
+    (inicio, fin) inclusive de un Range de un solo tramo, None si no aplica (se responde
+    completo: sintaxis desconocida, varios tramos o un fin antes del inicio) o False si
+    no se puede satisfacer (416).
+    """
+    m = RANGO.match(encabezado.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if not m.group(1):
+        largo = int(m.group(2))  # bytes=-n: los últimos n
+        if largo == 0 or tamano == 0:
+            return False
+        return max(0, tamano - largo), tamano - 1
+    inicio = int(m.group(1))
+    if m.group(2) and int(m.group(2)) < inicio:
+        return None  # bytes=5-2 es un Range inválido: se ignora (RFC 7233)
+    if inicio >= tamano:
+        return False
+    fin = min(int(m.group(2)), tamano - 1) if m.group(2) else tamano - 1
+    return inicio, fin
+
+
+class _GzipAlVuelo:
+    """Caché de archivos de texto comprimidos con gzip, por ruta y ETag (perfil pages)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def comprimido(self, ruta, etiqueta):
+        with self._lock:
+            guardado = self._cache.get(ruta)
+        if guardado and guardado[0] == etiqueta:
+            return guardado[1]
+        with open(ruta, 'rb') as f:
+            datos = gzip.compress(f.read(), compresslevel=6, mtime=0)
+        with self._lock:
+            self._cache[ruta] = (etiqueta, datos)
+        return datos
+
+
+class Manejador(SimpleHTTPRequestHandler):
+    """Archivos estáticos con Range, ETag/304, precomprimidos y Cache-Control por perfil."""
+
+    protocol_version = 'HTTP/1.1'
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, **TIPOS}
+
+    def __init__(self, *args, perfil, base, gzip_al_vuelo, **kwargs):
+        self.perfil = perfil
+        self.base = base
+        self.gzip_al_vuelo = gzip_al_vuelo
+        super().__init__(*args, **kwargs)
+
+    # --- Pedidos ---
+
+    def do_GET(self):
+        self._responder(cuerpo=True)
+
+    def do_HEAD(self):
+        self._responder(cuerpo=False)
+
+    def _responder(self, cuerpo):
+        camino = urlsplit(self.path).path
+        if self.base != '/':
+            if camino + '/' == self.base or camino == '/':
+                return self._redirigir(self.base)
+            if not camino.startswith(self.base):
+                return self.send_error(HTTPStatus.NOT_FOUND)
+            camino = '/' + camino[len(self.base):]
+
+        ruta = self.translate_path(camino)
+        if os.path.isdir(ruta):
+            if not camino.endswith('/'):
+                return self._redirigir(self.path.split('?', 1)[0] + '/')
+            ruta = os.path.join(ruta, 'index.html')
+        if not os.path.isfile(ruta):
+            return self.send_error(HTTPStatus.NOT_FOUND)
+
+        stat = os.stat(ruta)
+        tipo = self.guess_type(ruta)
+        es_texto = tipo.startswith(TIPOS_TEXTO)
+        rango = self.headers.get('Range')
+
+        # Representación: el original o una versión comprimida (nunca para un Range)
+        codificacion, archivo, datos = None, ruta, None
+        if rango is None:
+            aceptadas = codificaciones_aceptadas(self.headers.get('Accept-Encoding', ''))
+            for nombre, extension in PRECOMPRIMIDOS:
+                candidato = ruta + extension
+                if (nombre in aceptadas and os.path.isfile(candidato)
+                        and os.stat(candidato).st_mtime_ns >= stat.st_mtime_ns):
+                    codificacion, archivo = nombre, candidato
+                    break
+            if codificacion is None and es_texto and self.gzip_al_vuelo and 'gzip' in aceptadas:
+                codificacion = 'gzip'
+                datos = self.gzip_al_vuelo.comprimido(ruta, etag(stat))
+        etiqueta = etag(stat, codificacion)
+        tamano = len(datos) if datos is not None else os.stat(archivo).st_size
+
+        # Pedidos condicionales
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            no_cambio = coincide_etag(if_none_match, etiqueta)
+        else:
+            no_cambio = self._no_modificado(stat)
+        if no_cambio:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._encabezados_comunes(stat, etiqueta, es_texto or codificacion)
+            self.send_header('Content-Length', '0')
+            return self.end_headers()
+
+        # Range (If-Range: solo si la representación es la misma que tiene el cliente)
+        inicio, fin = 0, tamano - 1
+        estado = HTTPStatus.OK
+        if rango is not None:
+            if_range = self.headers.get('If-Range')
+            pedido = tramo(rango, tamano) if if_range in (None, etiqueta) else None
+            if pedido is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{tamano}')
+                self._encabezados_comunes(stat, etiqueta, False)
+                self.send_header('Content-Length', '0')
+                return self.end_headers()
+            if pedido:
+                inicio, fin = pedido
+                estado = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(estado)
+        self.send_header('Content-Type', tipo)
+        self._encabezados_comunes(stat, etiqueta, es_texto or codificacion)
+        if codificacion:
+            self.send_header('Content-Encoding', codificacion)
+        if estado == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header('Content-Range', f'bytes {inicio}-{fin}/{tamano}')
+        self.send_header('Content-Length', str(fin - inicio + 1))
+        self.end_headers()
+        if not cuerpo:
+            return
+
+        try:
+            if datos is not None:
+                self.wfile.write(datos[inicio:fin + 1])
+                return
+            with open(archivo, 'rb') as f:
+                f.seek(inicio)
+                restante = fin - inicio + 1
+                while restante > 0:
+                    bloque = f.read(min(BLOQUE, restante))
+                    if not bloque:
+                        break
+                    self.wfile.write(bloque)
+                    restante -= len(bloque)
+        except (BrokenPipeError, ConnectionResetError):
+            # El navegador cortó (ej: adelantar un video): no es un error del servidor
+            self.close_connection = True
+
+    # --- Auxiliares ---
+
+    def _encabezados_comunes(self, stat, etiqueta, varia):
+        self.send_header('ETag', etiqueta)
+        self.send_header('Last-Modified', email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header('Cache-Control', self.perfil['cache'])
+        self.send_header('Accept-Ranges', 'bytes')
+        if varia:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def _no_modificado(self, stat):
+        """If-Modified-Since (solo se mira si no vino If-None-Match)."""
+        encabezado = self.headers.get('If-Modified-Since')
+        if not encabezado:
+            return False
+        try:
+            fecha = email.utils.parsedate_to_datetime(encabezado)
+        except (TypeError, ValueError):
+            return False
+        return fecha is not None and int(stat.st_mtime) <= fecha.timestamp()
+
+    def _redirigir(self, destino):
+        self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+        self.send_header('Location', destino)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Sin la fecha de BaseHTTPRequestHandler: la terminal ya muestra el orden
+        sys.stderr.write(f'  {self.address_string()} {format % args}\n')
+
+
+class Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def crear_servidor(raiz=RAIZ, puerto=8000, perfil='desarrollo', base='/', host=''):
+    """Servidor listo para serve_forever() (puerto 0: uno libre, ver server_address)."""
+    base = '/' + base.strip('/') + '/' if base.strip('/') else '/'
+    config = PERFILES[perfil]
+    manejador = partial(Manejador, directory=str(raiz), perfil=config, base=base,
+                        gzip_al_vuelo=_GzipAlVuelo() if config['gzip_al_vuelo'] else None)
+    return Servidor((host, puerto), manejador)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Servidor HTTP local del proyecto con Range, ETag/304, compresión y Cache-Control.')
+    parser.add_argument('--puerto', type=int, default=8000, help='Puerto (default: 8000)')
+    parser.add_argument('--perfil', choices=sorted(PERFILES), default='desarrollo',
+                        help='desarrollo: revalidar todo (default); pages: caché y gzip como GitHub Pages')
+    parser.add_argument('--base', default='/', metavar='RUTA',
+                        help='Servir bajo una subruta, ej: /cuentos-interactivos/ (como en GitHub Pages)')
+    parser.add_argument('--host', default='', help='Interfaz (default: todas)')
+    args = parser.parse_args()
+
+    try:
+        servidor = crear_servidor(RAIZ, args.puerto, args.perfil, args.base, args.host)
+    except OSError as e:
+        print(f'  ❌ No se pudo abrir el puerto {args.puerto}: {e}')
+        return 1
+    base = servidor.RequestHandlerClass.keywords['base']
+    print(f'  🌐 Sirviendo {RAIZ.name} en http://localhost:{servidor.server_address[1]}{base} '
+          f'(perfil {args.perfil}). Ctrl+C para cortar.')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,50 +1,21 @@
-import os
-import json
-import re
 import argparse
+import sys
 
-def main():
-    parser = argparse.ArgumentParser(description="Compara las escenas y desafíos declarados en historia.json contra historia.md y los archivos JSON físicos.")
-    parser.add_argument("--dir", required=True, help="Ruta absoluta al directorio de la historia (ej: d:/.../historias/el-misterio-del-bosque-encantado)")
-    args = parser.parse_args()
+import lote
+from modelo_historia import DIFERENCIAS, ERROR, OK, cargar
 
-    dir_base = args.dir
-    historia_json_path = os.path.join(dir_base, "historia.json")
-    historia_md_path = os.path.join(dir_base, "historia.md")
-    dir_escenas = os.path.join(dir_base, "datos", "escenas")
-    dir_desafios = os.path.join(dir_base, "datos", "desafios")
-
-    if not os.path.exists(historia_json_path) or not os.path.exists(historia_md_path):
-        print(f"Error: No se encontró {historia_json_path} o {historia_md_path}.")
-        return
-
-    # Leer historia.json
-    with open(historia_json_path, "r", encoding="utf-8") as f:
-        data_json = json.load(f)
-        escenas_json = set(data_json.get("escenas", []))
-        desafios_json = set(data_json.get("desafios", []))
-
-    # Leer historia.md
-    with open(historia_md_path, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    escenas_md = set()
-    for line in md_content.split("\n"):
-        match_escena = re.match(r"### \*\*ESCENA: `(.+)`\*\*", line)
-        if match_escena:
-            escenas_md.add(match_escena.group(1).strip())
-
-    escenas_archivos = set()
-    if os.path.exists(dir_escenas):
-        for f in os.listdir(dir_escenas):
-            if f.endswith(".json"):
-                escenas_archivos.add(f.replace(".json", ""))
-
-    desafios_archivos = set()
-    if os.path.exists(dir_desafios):
-        for f in os.listdir(dir_desafios):
-            if f.endswith(".json"):
-                desafios_archivos.add(f.replace(".json", ""))
+
+def revisar(modelo):
+    """Imprime las diferencias de estructura. Retorna OK, DIFERENCIAS o ERROR (faltan archivos)."""
+    if modelo.faltantes(modelo.ruta_json, modelo.ruta_md):
+        print(f"Error: No se encontró {modelo.ruta_json} o {modelo.ruta_md}.")
+        return ERROR
+
+    escenas_json = set(modelo.config.get("escenas", []))
+    desafios_json = set(modelo.config.get("desafios", []))
+    escenas_md = set(modelo.ids_md)
+    escenas_archivos = modelo.archivos_escenas
+    desafios_archivos = modelo.archivos_desafios
 
     diferencias = False
 
@@ -60,7 +31,7 @@ def main():
         diferencias = True
 
     # 2. Escenas en historia.json vs archivos reales
-    if os.path.exists(dir_escenas):
+    if escenas_archivos is not None:
         faltan_archivos_esc = escenas_json - escenas_archivos
         sobran_archivos_esc = escenas_archivos - escenas_json
 
@@ -72,7 +43,7 @@ def main():
             diferencias = True
 
     # 3. Desafíos en historia.json vs archivos reales
-    if os.path.exists(dir_desafios):
+    if desafios_archivos is not None:
         faltan_archivos_des = desafios_json - desafios_archivos
         sobran_archivos_des = desafios_archivos - desafios_json
 
@@ -87,6 +58,17 @@ def main():
         print("✅ Todo correcto: Las escenas y desafíos en historia.json coinciden con historia.md y los archivos físicos.")
     else:
         print("\n⚠️ Se encontraron discrepancias que deben ser corregidas.")
+    return DIFERENCIAS if diferencias else OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara las escenas y desafíos declarados en historia.json contra historia.md y los archivos JSON físicos.")
+    lote.agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    if args.todas:
+        return lote.correr(args, [("estructura", revisar)])
+    return revisar(cargar(args.dir))
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
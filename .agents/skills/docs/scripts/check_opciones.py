@@ -1,68 +1,28 @@
-import os
-import json
-import re
 import argparse
+import sys
 
-def main():
-    parser = argparse.ArgumentParser(description="Compara los botones/opciones de los JSON con historia.md.")
-    parser.add_argument("--dir", required=True, help="Ruta absoluta al directorio de la historia (ej: d:/.../historias/el-misterio-del-bosque-encantado)")
-    args = parser.parse_args()
-
-    dir_base = args.dir
-    dir_escenas = os.path.join(dir_base, "datos", "escenas")
-    historia_md = os.path.join(dir_base, "historia.md")
+import lote
+from modelo_historia import DIFERENCIAS, ERROR, OK, cargar
 
-    if not os.path.exists(dir_escenas) or not os.path.exists(historia_md):
-        print(f"Error: No se encontró {dir_escenas} o {historia_md}.")
-        return
 
-    with open(historia_md, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    escenas = {}
-    for filename in os.listdir(dir_escenas):
-        if filename.endswith(".json"):
-            with open(os.path.join(dir_escenas, filename), "r", encoding="utf-8") as f:
-                data = json.load(f)
-                escenas[data["id"]] = data
-
-    current_escena = None
-    in_opciones = False
-    md_opciones = {}
-
-    for line in lines:
-        match_escena = re.match(r"### \*\*ESCENA: `(.+)`\*\*", line)
-        if match_escena:
-            current_escena = match_escena.group(1)
-            in_opciones = False
-            md_opciones[current_escena] = []
-            continue
-        
-        if current_escena:
-            if line.strip() == "*   **OPCIONES:**":
-                in_opciones = True
-                continue
-            elif line.startswith("### **ESCENA") or line.strip() == "---":
-                in_opciones = False
-                continue
-                
-            if in_opciones:
-                # Formato: 1.  **Botón 1:** "Salir a explorar" -> Va a `ENCUENTRO_PADRES`.
-                match_btn = re.match(r"\s*\d+\.\s+\*\*Botón \d+.*?\*\*\s+\"(.*?)\"", line)
-                if match_btn:
-                    md_opciones[current_escena].append(match_btn.group(1))
+def revisar(modelo):
+    """Imprime las opciones que difieren. Retorna OK, DIFERENCIAS o ERROR (faltan archivos)."""
+    if modelo.faltantes(modelo.dir_escenas, modelo.ruta_md):
+        print(f"Error: No se encontró {modelo.dir_escenas} o {modelo.ruta_md}.")
+        return ERROR
 
     diffs_found = False
-    for esc_id, data in escenas.items():
+    for esc_id, data in modelo.escenas.items():
         if not "opciones" in data: continue
         json_btns = [o.get("texto", "") for o in data["opciones"]]
-        md_btns = md_opciones.get(esc_id, [])
-        
+        bloque = modelo.escenas_md.get(esc_id)
+        md_btns = bloque["opciones"] if bloque else []
+
         if len(json_btns) != len(md_btns):
             diffs_found = True
             print(f"[{esc_id}] Diferente cantidad de opciones: json {len(json_btns)} vs md {len(md_btns)}")
             continue
-            
+
         for i in range(len(json_btns)):
             if json_btns[i].strip() != md_btns[i].strip():
                 diffs_found = True
@@ -72,6 +32,17 @@ def main():
         print("✅ Todo correcto: Las opciones coinciden.")
     else:
         print("⚠️ Hay discrepancias en las opciones (NOTA: A veces MD incluye información de desafíos que no está en el JSON de la escena, procede con cuidado).")
+    return DIFERENCIAS if diffs_found else OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los botones/opciones de los JSON con historia.md.")
+    lote.agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    if args.todas:
+        return lote.correr(args, [("opciones", revisar)])
+    return revisar(cargar(args.dir))
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+lote.py — Modo --todas de los scripts de docs: todas las historias del catálogo a la vez.
+
+Las historias salen de biblioteca/historias.json (la `ruta` de cada entrada). Cada
+una se revisa en un proceso del pool (--jobs, por defecto uno por núcleo) con su
+propio modelo (ver modelo_historia.py). La salida de cada historia se junta y se
+imprime en el orden del catálogo, seguida de un resumen con el código de cada
+comando por historia:
+
+  0  en sincronía
+  1  hay diferencias
+  2  error (faltan archivos, un JSON que no se puede leer)
+
+El script sale con el peor código.
+
+No es un script: lo importan los scripts de esta carpeta.
+"""
+
+import io
+import json
+import os
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from modelo_historia import DIFERENCIAS, ERROR, OK, RAIZ, cargar
+
+ARCHIVO_CATALOGO = 'biblioteca/historias.json'
+
+ICONOS = {OK: '✅', DIFERENCIAS: '❌', ERROR: '💥'}
+
+
+def agregar_argumentos(parser):
+    """--dir o --todas (uno de los dos), y las opciones de --todas."""
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--dir", help="Ruta absoluta al directorio de la historia (ej: d:/.../historias/el-misterio-del-bosque-encantado)")
+    destino.add_argument("--todas", action="store_true", help=f"Revisar todas las historias de {ARCHIVO_CATALOGO}, en paralelo")
+    parser.add_argument("--jobs", type=int, default=0, metavar="N", help="Con --todas: procesos (default: 0 = uno por núcleo)")
+    parser.add_argument("--raiz", type=Path, default=RAIZ, help="Con --todas: proyecto cuyo catálogo se lee (default: este)")
+
+
+def historias_del_catalogo(raiz):
+    """[(id, carpeta)] de las historias del catálogo, en su orden."""
+    datos = json.loads((Path(raiz) / ARCHIVO_CATALOGO).read_text(encoding='utf-8'))
+    historias = []
+    for entrada in datos.get('historias', []):
+        if isinstance(entrada, dict) and isinstance(entrada.get('ruta'), str):
+            historias.append((entrada.get('id') or entrada['ruta'], Path(raiz) / entrada['ruta']))
+    return historias
+
+
+def revisar_historia(dir_historia, comandos, usar_cache=True):
+    """
+    Corre los comandos [(nombre, función)] sobre el modelo de una historia, con la
+    salida capturada. Retorna ({nombre: código}, salida). Corre en un proceso del pool.
+    """
+    modelo = cargar(dir_historia, usar_cache)
+    salida = io.StringIO()
+    codigos = {}
+    with redirect_stdout(salida):
+        for nombre, funcion in comandos:
+            if len(comandos) > 1:
+                print(f"── {nombre} ──")
+            try:
+                codigos[nombre] = funcion(modelo)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Un JSON roto o un historia.md ilegible no frenan al resto del catálogo
+                print(f"Error: {e}")
+                codigos[nombre] = ERROR
+    return codigos, salida.getvalue()
+
+
+def correr(args, comandos, usar_cache=True):
+    """Modo --todas: revisa cada historia del catálogo e imprime el reporte. Retorna el peor código."""
+    try:
+        historias = historias_del_catalogo(args.raiz)
+    except (OSError, ValueError) as e:
+        print(f"Error: no se pudo leer {Path(args.raiz) / ARCHIVO_CATALOGO} ({e}).")
+        return ERROR
+    if not historias:
+        print(f"No hay historias en {Path(args.raiz) / ARCHIVO_CATALOGO}.")
+        return OK
+
+    jobs = min(args.jobs if args.jobs > 0 else (os.cpu_count() or 1), len(historias))
+    if jobs == 1:
+        resultados = [revisar_historia(carpeta, comandos, usar_cache) for _, carpeta in historias]
+    else:
+        # Recién acá: importarlo le suma ~60 ms a cada corrida con --dir
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futuros = [pool.submit(revisar_historia, carpeta, comandos, usar_cache) for _, carpeta in historias]
+            resultados = [futuro.result() for futuro in futuros]
+
+    for (id_historia, _), (codigos, salida) in zip(historias, resultados):
+        print(f"\n══ {id_historia} ══")
+        print(salida.rstrip())
+
+    nombres = [nombre for nombre, _ in comandos]
+    ancho = max(len(id_historia) for id_historia, _ in historias)
+    print(f"\n📚 Resumen: {len(historias)} historia(s), {jobs} proceso(s)")
+    print(f"  {'historia':{ancho}s}  " + "  ".join(f"{nombre:>10s}" for nombre in nombres))
+    for (id_historia, _), (codigos, _) in zip(historias, resultados):
+        columnas = "  ".join(f"{ICONOS[codigos[nombre]] + ' ' + str(codigos[nombre]):>9s}" for nombre in nombres)
+        print(f"  {id_historia:{ancho}s}  {columnas}")
+    print("  Códigos: 0 = en sincronía, 1 = hay diferencias, 2 = error")
+    return max(max(codigos.values()) for codigos, _ in resultados)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+modelo_historia.py — Modelo compartido de historia.md y los JSON de una historia.
+
+check_estructura, check_texts, check_opciones y update_md trabajan sobre el mismo
+modelo en vez de releer cada uno historia.md y datos/escenas/ con su propia
+máquina de estados:
+
+  - bloques: los `### **ESCENA: `ID`**` de historia.md, armados en una sola
+    pasada. Cada bloque tiene su rango en el texto (siempre de principio a
+    principio de línea), el TEXTO (las citas `>` de `*   **TEXTO:**`), el rango
+    de esa cita (el que reemplaza update_md) y los botones de OPCIONES.
+  - config, escenas, archivos_escenas, archivos_desafios: historia.json, los JSON
+    de datos/escenas/ y los nombres de archivo de datos/escenas/ y datos/desafios/.
+    Se leen recién la primera vez que un chequeo los pide, y una sola vez.
+
+Los bloques se guardan en .agents/.cache/historia_md/ con el sha256 de
+historia.md: mientras el archivo no cambie, no se vuelve a parsear. Solo se
+cachean las historias que están dentro del proyecto (las de un árbol sintético
+de la skill benchmark se parsean siempre).
+
+No es un script: lo importan los scripts de esta carpeta.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from functools import cached_property
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[4]
+CARPETA_CACHE = RAIZ / '.agents' / '.cache' / 'historia_md'
+
+# Cambiarla cuando cambie lo que guarda parsear_md(): invalida toda la caché
+VERSION_MODELO = 1
+
+# Lo que devuelve cada chequeo (y el código de salida de los scripts)
+OK, DIFERENCIAS, ERROR = 0, 1, 2
+
+# Todo lo que delimita bloques y secciones sale de una sola búsqueda sobre el texto
+# (con un '\n' adelante, así cada marca empieza con un literal y re salta de una a
+# la otra; un `^` con re.M probaría en cada línea):
+#   escena   `### **ESCENA: `ID`**`
+#   sangría  un ítem `*   **` (sangría '' = de primer nivel, termina el TEXTO)
+#   item     TEXTO u OPCIONES si el ítem es solo eso
+#   (nada)   un `---` o un título `#`/`##`: corta el bloque
+PATRON_MARCA = re.compile(
+    r"\n(?:### \*\*ESCENA: `(?P<escena>.+)`\*\*"
+    r"|(?P<sangria>[ \t]*)\*   \*\*(?:(?P<item>TEXTO|OPCIONES):\*\*[ \t]*(?=\n|\Z))?"
+    r"|[ \t]*---[ \t]*(?=\n|\Z)|##? )")
+# Solo los encabezados (ModeloHistoria.ids_md)
+PATRON_ESCENA = re.compile(r"\n### \*\*ESCENA: `(.+)`\*\*")
+# Las líneas `>` seguidas al ítem TEXTO (las que reemplaza update_md) y el texto de cada cita
+PATRON_CITAS_SEGUIDAS = re.compile(r"(?:\n[ \t]*>[^\n]*)*")
+PATRON_CITA = re.compile(r"\n[ \t]*> ?(.*)")
+# Formato: 1.  **Botón 1:** "Salir a explorar" -> Va a `ENCUENTRO_PADRES`.
+PATRON_BOTON = re.compile(r"\n[ \t]*\d+\.[ \t]+\*\*Botón \d+.*?\*\*[ \t]+\"(.*?)\"")
+
+
+def parsear_md(texto):
+    """
+    Bloques de escena de historia.md, en orden. Cada bloque es un dict; las
+    posiciones son índices en `texto` (ModeloHistoria.texto_md) y caen siempre
+    al principio de una línea:
+
+      id        ID de la escena
+      inicio    el encabezado
+      fin       donde termina el bloque: el encabezado siguiente, un `---`, un
+                título `#`/`##` o el final del archivo
+      texto     las citas del TEXTO sin el `>`, hasta el ítem siguiente (None
+                si la escena no tiene TEXTO)
+      cita      [desde, hasta) de las líneas `>` seguidas al ítem TEXTO
+      opciones  textos de los botones de OPCIONES
+    """
+    # Con el '\n' agregado, una marca en la posición p del documento es la línea que
+    # empieza en p del texto original: los índices se traducen sin restar nada.
+    documento = '\n' + texto
+    total = len(texto)
+    bloques = []
+    bloque = None
+
+    def cerrar(fin):
+        if secciones['texto'] is not None:
+            desde = secciones['texto']
+            hasta = PATRON_CITAS_SEGUIDAS.match(documento, desde, fin).end()
+            bloque['cita'] = [min(desde, total), min(hasta, total)]
+            citas = PATRON_CITA.findall(documento, desde, secciones['fin_texto'] or fin)
+            bloque['texto'] = '\n'.join(cita.rstrip() for cita in citas).strip()
+        if secciones['opciones'] is not None:
+            bloque['opciones'] = PATRON_BOTON.findall(documento, secciones['opciones'], fin)
+        bloque['fin'] = min(fin, total)
+
+    for marca in PATRON_MARCA.finditer(documento):
+        escena, sangria, item = marca.group('escena', 'sangria', 'item')
+        if escena is not None:
+            if bloque:
+                cerrar(marca.start())
+            bloque = {'id': escena.strip(), 'inicio': marca.start(), 'fin': None,
+                      'texto': None, 'cita': None, 'opciones': []}
+            secciones = {'texto': None, 'fin_texto': None, 'opciones': None}
+            bloques.append(bloque)
+            continue
+        if bloque is None:
+            continue
+        if sangria is None:
+            cerrar(marca.start())
+            bloque = None
+            continue
+
+        if (secciones['texto'] is not None and secciones['fin_texto'] is None
+                and (item or not sangria)):
+            secciones['fin_texto'] = marca.start()
+        if item == 'TEXTO' and secciones['texto'] is None:
+            secciones['texto'] = marca.end()
+        elif item == 'OPCIONES' and secciones['opciones'] is None:
+            secciones['opciones'] = marca.end()
+
+    if bloque:
+        cerrar(len(documento))
+    return bloques
+
+
+class CacheBloques:
+    """
+    Bloques parseados de cada historia.md con el sha256 del contenido del que
+    salieron: un archivo por historia en .agents/.cache/historia_md/, así los
+    procesos de --todas (ver lote.py) escriben cada uno el suyo sin pisarse.
+    """
+
+    def __init__(self, carpeta=CARPETA_CACHE, version=VERSION_MODELO):
+        self.carpeta = Path(carpeta)
+        self.version = version
+
+    @staticmethod
+    def clave(ruta_md):
+        """Ruta relativa al proyecto; None si historia.md está afuera (no se cachea)."""
+        try:
+            return Path(ruta_md).resolve().relative_to(RAIZ).as_posix()
+        except ValueError:
+            return None
+
+    def _ruta(self, clave):
+        return self.carpeta / (clave.replace('/', '__') + '.json')
+
+    def buscar(self, clave, huella):
+        try:
+            datos = json.loads(self._ruta(clave).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if (isinstance(datos, dict) and datos.get('version') == self.version
+                and datos.get('clave') == clave and datos.get('huella') == huella):
+            return datos.get('bloques')
+        return None
+
+    def guardar(self, clave, huella, bloques):
+        """Escribe la entrada de una historia (reemplazo atómico)."""
+        ruta = self._ruta(clave)
+        try:
+            self.carpeta.mkdir(parents=True, exist_ok=True)
+            temporal = ruta.with_name(f'{ruta.name}.{os.getpid()}.tmp')
+            temporal.write_text(json.dumps({'version': self.version, 'clave': clave, 'huella': huella,
+                                            'bloques': bloques}, ensure_ascii=False), encoding='utf-8')
+            os.replace(temporal, ruta)
+        except OSError as e:
+            print(f"AVISO: no se pudo escribir la caché ({e})", file=sys.stderr)
+
+
+class ModeloHistoria:
+    """historia.md y los datos de una historia, leídos a demanda y una sola vez."""
+
+    def __init__(self, dir_historia, cache=None):
+        self.dir = Path(dir_historia)
+        self.ruta_md = self.dir / 'historia.md'
+        self.ruta_json = self.dir / 'historia.json'
+        self.dir_escenas = self.dir / 'datos' / 'escenas'
+        self.dir_desafios = self.dir / 'datos' / 'desafios'
+        self.cache = cache
+
+    @cached_property
+    def _contenido_md(self):
+        return self.ruta_md.read_bytes()
+
+    @cached_property
+    def huella_md(self):
+        """sha256 de historia.md."""
+        return hashlib.sha256(self._contenido_md).hexdigest()
+
+    @cached_property
+    def texto_md(self):
+        """historia.md con los fines de línea normalizados a '\\n' (como al abrirlo en modo texto)."""
+        return self._contenido_md.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+    @cached_property
+    def fin_de_linea(self):
+        """'\\r\\n' si historia.md los usa, si no '\\n' (para escribirlo como estaba)."""
+        return '\r\n' if b'\r\n' in self._contenido_md else '\n'
+
+    @cached_property
+    def bloques(self):
+        clave = self.cache.clave(self.ruta_md) if self.cache else None
+        if clave:
+            bloques = self.cache.buscar(clave, self.huella_md)
+            if bloques is not None:
+                return bloques
+        bloques = parsear_md(self.texto_md)
+        if clave:
+            self.cache.guardar(clave, self.huella_md, bloques)
+        return bloques
+
+    @cached_property
+    def ids_md(self):
+        """IDs de los encabezados de escena, en orden (sin parsear los bloques si no hace falta)."""
+        if 'bloques' in self.__dict__:
+            return [bloque['id'] for bloque in self.bloques]
+        return [escena.strip() for escena in PATRON_ESCENA.findall('\n' + self.texto_md)]
+
+    @cached_property
+    def escenas_md(self):
+        """ID → bloque (si una escena está dos veces, vale la última)."""
+        return {bloque['id']: bloque for bloque in self.bloques}
+
+    @cached_property
+    def config(self):
+        with open(self.ruta_json, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @cached_property
+    def escenas(self):
+        """ID → JSON de cada archivo de datos/escenas/."""
+        carpeta = str(self.dir_escenas)
+        escenas = {}
+        for nombre in sorted(self.archivos_escenas or ()):
+            ruta = os.path.join(carpeta, nombre + '.json')
+            with open(ruta, 'rb') as f:
+                try:
+                    data = json.loads(f.read())
+                except ValueError as e:
+                    raise ValueError(f'{ruta}: {e}') from e
+            escenas[data['id']] = data
+        return escenas
+
+    @staticmethod
+    def _nombres_json(carpeta):
+        if not carpeta.is_dir():
+            return None
+        return {nombre[:-5] for nombre in os.listdir(carpeta) if nombre.endswith('.json')}
+
+    @cached_property
+    def archivos_escenas(self):
+        """Nombres (sin .json) de datos/escenas/; None si la carpeta no existe."""
+        return self._nombres_json(self.dir_escenas)
+
+    @cached_property
+    def archivos_desafios(self):
+        """Nombres (sin .json) de datos/desafios/; None si la carpeta no existe."""
+        return self._nombres_json(self.dir_desafios)
+
+    def linea(self, pos):
+        """Número de línea (desde 1) de una posición de texto_md, para los mensajes."""
+        return self.texto_md.count('\n', 0, pos) + 1
+
+    def faltantes(self, *rutas):
+        """Las rutas del modelo que no existen (para el mensaje de error de cada chequeo)."""
+        return [ruta for ruta in rutas if not ruta.exists()]
+
+
+def cargar(dir_historia, usar_cache=True):
+    """Modelo de la historia en `dir_historia` (con la caché de bloques del proyecto)."""
+    return ModeloHistoria(dir_historia, CacheBloques() if usar_cache else None)
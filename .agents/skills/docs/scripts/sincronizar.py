@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+sincronizar.py — Corre los chequeos de sincronización de una historia sobre un solo modelo.
+
+Cada script de esta carpeta se puede correr suelto, pero así cada uno arma su
+propio modelo (ver modelo_historia.py). Acá los comandos pedidos comparten el
+mismo: historia.md se parsea una vez y los JSON de datos/escenas/ se leen una vez.
+
+  estructura   check_estructura.py — historia.json vs historia.md y archivos
+  textos       check_texts.py      — TEXTO de historia.md vs `texto` de los JSON
+  opciones     check_opciones.py   — OPCIONES de historia.md vs botones de los JSON
+  actualizar   update_md.py        — reescribe los TEXTO con los textos de los JSON
+
+Con --todas corre sobre todas las historias del catálogo, en paralelo (ver lote.py).
+Sale con el peor código: 0 en sincronía, 1 hay diferencias, 2 error.
+
+Uso:
+  python sincronizar.py --dir <ruta-historia> --todo                 # Los tres chequeos y actualizar
+  python sincronizar.py --dir <ruta-historia> textos opciones        # Solo esos chequeos
+  python sincronizar.py --dir <ruta-historia> --todo --in-place      # Actualizar pisa historia.md
+  python sincronizar.py --dir <ruta-historia> actualizar --dry-run   # Solo el diff de lo que cambiaría
+  python sincronizar.py --todas estructura textos opciones           # Todo el catálogo, un proceso por núcleo
+"""
+
+import argparse
+import io
+import sys
+from functools import partial
+
+import check_estructura
+import check_opciones
+import check_texts
+import lote
+import update_md
+from modelo_historia import cargar
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+# En el orden del flujo de la skill: verificar antes de actualizar
+COMANDOS = ('estructura', 'textos', 'opciones', 'actualizar')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='sincronizar.py',
+        description='Corre los chequeos de historia.md contra los JSON de una historia con un solo parseo.')
+    lote.agregar_argumentos(parser)
+    parser.add_argument('comandos', nargs='*', metavar='COMANDO',
+                        help=f'Qué correr: {", ".join(COMANDOS)}')
+    parser.add_argument('--todo', action='store_true', help='Correr los cuatro, en orden')
+    salida = parser.add_mutually_exclusive_group()
+    salida.add_argument('--in-place', action='store_true', help='actualizar sobreescribe historia.md (reemplazo atómico)')
+    salida.add_argument('--dry-run', action='store_true', help='actualizar solo muestra el diff, sin escribir nada')
+    parser.add_argument('--sin-cache', action='store_true', help='Parsear historia.md aunque no haya cambiado')
+    args = parser.parse_args()
+
+    # choices= con nargs='*' rechaza la lista vacía en Python < 3.12: se valida a mano
+    desconocidos = set(args.comandos) - set(COMANDOS)
+    if desconocidos:
+        parser.error(f'comando desconocido: {", ".join(sorted(desconocidos))} (opciones: {", ".join(COMANDOS)})')
+    pedidos = list(COMANDOS) if args.todo else [c for c in COMANDOS if c in args.comandos]
+    if not pedidos:
+        parser.error('indicá al menos un COMANDO o --todo')
+
+    funciones = {
+        'estructura': check_estructura.revisar,
+        'textos': check_texts.revisar,
+        'opciones': check_opciones.revisar,
+        'actualizar': partial(update_md.actualizar, in_place=args.in_place, dry_run=args.dry_run),
+    }
+    comandos = [(comando, funciones[comando]) for comando in pedidos]
+    if args.todas:
+        return lote.correr(args, comandos, usar_cache=not args.sin_cache)
+
+    modelo = cargar(args.dir, usar_cache=not args.sin_cache)
+    codigos = []
+    for comando, funcion in comandos:
+        print(f'\n── {comando} ──')
+        codigos.append(funcion(modelo))
+    return max(codigos)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,85 +1,128 @@
-import os
-import json
-import re
 import argparse
+import os
 import shutil
+import sys
+from functools import partial
+
+import lote
+from modelo_historia import ERROR, OK, cargar
+
+
+def cita_de(json_text):
+    """Las líneas `>` que corresponden al texto de un JSON (lo que update_md escribe en la cita)."""
+    if not json_text:
+        return ""
+    return "".join(f"    > {t_line}\n" for t_line in json_text.split("\n"))
+
+
+def cambios(modelo):
+    """
+    Los bloques cuya cita no es la del texto de su JSON: [(bloque, cita nueva)], en
+    orden. Las demás escenas no se tocan.
+    """
+    texto = modelo.texto_md
+    resultado = []
+    for bloque in modelo.bloques:
+        escena = modelo.escenas.get(bloque["id"])
+        if bloque["cita"] is None or escena is None:
+            continue
+        desde, hasta = bloque["cita"]
+        nueva = cita_de(escena.get("texto", ""))
+        if texto[desde:hasta] != nueva:
+            resultado.append((bloque, nueva))
+    return resultado
+
+
+def aplicar(texto, parches):
+    """`texto` con cada cita reemplazada; los tramos entre parches se copian tal cual."""
+    partes = []
+    anterior = 0
+    for bloque, nueva in parches:
+        desde, hasta = bloque["cita"]
+        partes.append(texto[anterior:desde])
+        partes.append(nueva)
+        anterior = hasta
+    partes.append(texto[anterior:])
+    return "".join(partes)
+
+
+def imprimir_diff(modelo, parches):
+    """Diff unificado sin contexto (como `diff -U0`) de las citas que cambian."""
+    print(f"--- a/{modelo.ruta_md.name}")
+    print(f"+++ b/{modelo.ruta_md.name}")
+    corrimiento = 0
+    for bloque, nueva in parches:
+        desde, hasta = bloque["cita"]
+        viejas = modelo.texto_md[desde:hasta].splitlines()
+        nuevas = nueva.splitlines()
+        linea = modelo.linea(desde)
+        # Sin líneas de un lado, el rango apunta a la línea anterior (convención de diff)
+        inicio_viejo = linea if viejas else linea - 1
+        inicio_nuevo = linea + corrimiento if nuevas else linea + corrimiento - 1
+        print(f"@@ -{inicio_viejo},{len(viejas)} +{inicio_nuevo},{len(nuevas)} @@ ESCENA: {bloque['id']}")
+        for t_line in viejas:
+            print(f"-{t_line}")
+        for t_line in nuevas:
+            print(f"+{t_line}")
+        corrimiento += len(nuevas) - len(viejas)
+
+
+def escribir_atomico(ruta, contenido):
+    """Escribe en un temporal al lado y lo renombra encima: nunca queda un archivo a medias."""
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    try:
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        if ruta.exists():
+            shutil.copymode(ruta, temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+
+
+def actualizar(modelo, in_place=False, dry_run=False):
+    """
+    Reescribe la cita de TEXTO de las escenas cuyo texto cambió en el JSON. Si
+    ninguna cambió no escribe nada. Retorna OK o ERROR (faltan archivos).
+    """
+    if modelo.faltantes(modelo.dir_escenas, modelo.ruta_md):
+        print(f"Error: No se encontró {modelo.dir_escenas} o {modelo.ruta_md}.")
+        return ERROR
+
+    parches = cambios(modelo)
+    if not parches:
+        print(f"✅ {modelo.ruta_md.name} ya está al día: no se escribió nada.")
+        return OK
+
+    if dry_run:
+        imprimir_diff(modelo, parches)
+        print(f"\n{len(parches)} escena(s) cambiarían. No se escribió nada (--dry-run).")
+        return OK
+
+    output_md = modelo.ruta_md if in_place else modelo.dir / "historia_nueva.md"
+    nuevo = aplicar(modelo.texto_md, parches)
+    # Respetar los fines de línea del archivo original
+    escribir_atomico(output_md, nuevo.replace("\n", modelo.fin_de_linea).encode("utf-8"))
+
+    print(f"✅ {len(parches)} escena(s) actualizada(s). Archivo guardado correctamente en {output_md}")
+    if not in_place:
+        print("Para aplicar los cambios definitivos puedes renombrarlo manualmente o correr el script con --in-place.")
+    return OK
+
 
 def main():
     parser = argparse.ArgumentParser(description="Actualiza el texto narrativo de historia.md utilizando los valores de los JSON de escenas.")
-    parser.add_argument("--dir", required=True, help="Ruta absoluta al directorio de la historia (ej: d:/.../historias/el-misterio-del-bosque-encantado)")
-    parser.add_argument("--in-place", action="store_true", help="Sobreescribe historia.md directamente en lugar de crear historia_nueva.md")
+    lote.agregar_argumentos(parser)
+    salida = parser.add_mutually_exclusive_group()
+    salida.add_argument("--in-place", action="store_true", help="Sobreescribe historia.md directamente (reemplazo atómico) en lugar de crear historia_nueva.md")
+    salida.add_argument("--dry-run", action="store_true", help="Muestra el diff de las escenas que cambiarían, sin escribir nada")
     args = parser.parse_args()
 
-    dir_base = args.dir
-    dir_escenas = os.path.join(dir_base, "datos", "escenas")
-    historia_md = os.path.join(dir_base, "historia.md")
-
-    if not os.path.exists(dir_escenas) or not os.path.exists(historia_md):
-        print(f"Error: No se encontró {dir_escenas} o {historia_md}.")
-        return
-
-    output_md = historia_md if args.in_place else os.path.join(dir_base, "historia_nueva.md")
-    
-    # Manejar backup por seguridad
-    if args.in_place:
-        shutil.copy2(historia_md, historia_md + ".bak")
-        print(f"Backup creado en {historia_md}.bak")
-
-    with open(historia_md, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    escenas = {}
-    for filename in os.listdir(dir_escenas):
-        if filename.endswith(".json"):
-            with open(os.path.join(dir_escenas, filename), "r", encoding="utf-8") as f:
-                data = json.load(f)
-                escenas[data["id"]] = data
-
-    new_lines = []
-    current_escena = None
-    in_texto = False
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        
-        match_escena = re.match(r"### \*\*ESCENA: `(.+)`\*\*", line)
-        if match_escena:
-            current_escena = match_escena.group(1)
-            new_lines.append(line)
-            in_texto = False
-            i += 1
-            continue
-        
-        if current_escena:
-            if line.strip() == "*   **TEXTO:**":
-                new_lines.append(line)
-                in_texto = True
-                
-                # Escribir el nuevo texto del JSON
-                json_text = escenas[current_escena].get("texto", "")
-                if json_text:
-                    for t_line in json_text.split("\n"):
-                        new_lines.append(f"    > {t_line}\n")
-                
-                # Saltar lineas originales del texto en md
-                i += 1
-                while i < len(lines) and lines[i].strip().startswith(">"):
-                    i += 1
-                continue
-                
-            elif in_texto and line.startswith("*   **"):
-                in_texto = False
-            
-        new_lines.append(line)
-        i += 1
-
-    with open(output_md, "w", encoding="utf-8") as f:
-        f.writelines(new_lines)
-
-    print(f"✅ Archivo guardado correctamente en {output_md}")
-    if not args.in_place:
-        print("Para aplicar los cambios definitivos puedes renombrarlo manualmente o correr el script con --in-place.")
+    funcion = partial(actualizar, in_place=args.in_place, dry_run=args.dry_run)
+    if args.todas:
+        return lote.correr(args, [("actualizar", funcion)])
+    return funcion(cargar(args.dir))
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,10 +2,14 @@
 analizar-sw.py — Analizador del Service Worker para La Biblioteca del Tío Pier.
 
 Compara los archivos modificados/nuevos (git) con las entradas del service-worker.js
-para identificar qué cachés necesitan bump de versión, qué archivos nuevos no tienen
+para identificar qué cachés se ven afectadas, qué archivos nuevos no tienen
 caché asignada, y qué entradas del SW apuntan a archivos que ya no existen en disco
 (entradas huérfanas).
 
+Si el SW tiene manifiesto de huellas (generar-manifiesto.py), además compara la huella
+de cada archivo en disco con la del manifiesto: los que difieren cuentan como
+modificados aunque git no los muestre.
+
 COMPORTAMIENTO SEGÚN RAMA:
   - Si la rama actual es `main`: analiza solo los cambios sin commitear (git status).
   - Si la rama actual es otra: analiza los cambios sin commitear MÁS todos los cambios
@@ -16,6 +20,10 @@ USO:
   python analizar-sw.py                          # Análisis completo via git
   python analizar-sw.py --archivo a.json b.webp  # Analizar archivos específicos (sin git)
   python analizar-sw.py --sw /ruta/sw.js         # Usar un SW custom
+  python analizar-sw.py --costo                  # Qué baja cada cliente en la próxima actualización
+  python analizar-sw.py --costo --limite-mb 20   # Exit 1 si baja más de 20 MB
+  python analizar-sw.py --costo --escalon 640    # Lo mismo para un dispositivo de ese escalón
+  python analizar-sw.py --escalones              # Qué precachea cada escalón de pantalla
   python analizar-sw.py --help                   # Mostrar esta ayuda
 
 NOTAS:
@@ -25,6 +33,9 @@ NOTAS:
 """
 
 import argparse
+import hashlib
+import importlib.util
+import json
 import os
 import re
 import subprocess
@@ -48,6 +59,84 @@ CYAN   = lambda t: c(t, "36")
 DIM    = lambda t: c(t, "2")
 
 
+# ──────────────────────────────────────────────────────────
+# ARCHIVOS EN DISCO Y RUTAS DEL SW
+# ──────────────────────────────────────────────────────────
+
+def _cargar_instantanea():
+    """Importa instantanea.py de la skill code-auditor (recorre el proyecto como el auditor, sin importarlo)."""
+    ruta = Path(__file__).resolve().parents[2] / "code-auditor" / "scripts" / "instantanea.py"
+    spec = importlib.util.spec_from_file_location("instantanea", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+_INSTANTANEAS = {}  # raiz → instantánea
+
+
+def archivos_en_disco(raiz: Path):
+    """
+    Ruta relativa → (mtime_ns, tamaño) de cada archivo del proyecto: un solo recorrido
+    con os.scandir (el mismo que check_pwa en auditar.py, ver instantanea.py) en vez de un stat() por entrada
+    del SW. Se toma la primera vez que se pide y sirve para toda la corrida.
+    """
+    if raiz not in _INSTANTANEAS:
+        _INSTANTANEAS[raiz] = _cargar_instantanea().instantanea_archivos(raiz)
+    return _INSTANTANEAS[raiz]
+
+
+def existe_en_disco(raiz: Path, archivo: str) -> bool:
+    """Si el archivo está en disco. Lo que no está en la instantánea (carpetas, .git) se pregunta al sistema."""
+    return archivo in archivos_en_disco(raiz) or (raiz / archivo).exists()
+
+
+class ArbolRutas:
+    """
+    Árbol de prefijos de rutas (un nodo por carpeta) con el grupo de caché de cada
+    archivo del SW. Cada nodo guarda además los grupos que tienen algún archivo debajo,
+    en el orden de RUTAS_CACHE: "qué grupos cachean algo de historias/{id}/" es bajar
+    por las carpetas de la ruta, sin recorrer los archivos de cada grupo.
+    """
+
+    __slots__ = ("hijos", "grupos", "grupo")
+
+    def __init__(self, grupos=()):
+        self.hijos = {}
+        self.grupos = {}  # nombre → None (conjunto ordenado)
+        self.grupo = None
+        for grupo in grupos:
+            for archivo in grupo["archivos"]:
+                self.agregar(archivo, grupo["nombre_resuelto"])
+
+    def agregar(self, ruta: str, grupo: str):
+        nodo = self
+        nodo.grupos.setdefault(grupo)
+        for parte in ruta.split("/"):
+            nodo = nodo.hijos.setdefault(parte, ArbolRutas())
+            nodo.grupos.setdefault(grupo)
+        if nodo.grupo is None:
+            nodo.grupo = grupo  # Si está en dos grupos, vale el primero (como archivo_a_grupo)
+
+    def _nodo(self, ruta: str):
+        nodo = self
+        for parte in ruta.strip("/").split("/"):
+            nodo = nodo.hijos.get(parte)
+            if nodo is None:
+                return None
+        return nodo
+
+    def grupo_de(self, ruta: str):
+        """Grupo que cachea ese archivo, o None."""
+        nodo = self._nodo(ruta)
+        return nodo.grupo if nodo is not None else None
+
+    def grupos_bajo(self, carpeta: str) -> list:
+        """Grupos con algún archivo dentro de `carpeta`, en el orden de RUTAS_CACHE."""
+        nodo = self._nodo(carpeta)
+        return list(nodo.grupos) if nodo is not None else []
+
+
 # ──────────────────────────────────────────────────────────
 # PARSEO DEL SERVICE WORKER
 # ──────────────────────────────────────────────────────────
@@ -87,9 +176,15 @@ def parsear_sw(ruta_sw: Path):
       - Variables de versión de caché (nombre → valor)
       - Grupos de caché (nombre_resuelto → lista de archivos)
 
+    Entiende los dos formatos de RUTAS_CACHE: el manifiesto con huellas que escribe
+    generar-manifiesto.py (`archivos: {'ruta': 'huella', ...}`) y el anterior, con
+    `archivos: [...]` y una variable CACHE_X por grupo (sirve para migrar).
+
     Retorna: (version_app, versiones_vars, grupos)
       versiones_vars: dict[var_name, value]  ej. {"CACHE_BIBLIOTECA": "1", ...}
-      grupos: list[dict] con keys: nombre_template, nombre_resuelto, variable, archivos
+      grupos: list[dict] con keys: nombre_template, nombre_resuelto, variable, archivos,
+              huellas (dict ruta → huella o None; None si el grupo no tiene manifiesto),
+              prioridad (int; None si el grupo no la declara)
     """
     contenido = ruta_sw.read_text(encoding="utf-8")
 
@@ -116,9 +211,9 @@ def parsear_sw(ruta_sw: Path):
     grupos = []
 
     # Buscar cada objeto del array RUTAS_CACHE
-    # Estrategia: encontrar cada bloque que tiene `nombre:` + `archivos:`
+    # Estrategia: encontrar cada bloque que tiene `nombre:` + `archivos:` (lista o manifiesto)
     bloque_pattern = re.compile(
-        r'\{\s*nombre\s*:\s*`([^`]+)`\s*,\s*archivos\s*:\s*\[(.*?)\]',
+        r"""\{\s*nombre\s*:\s*[`'"]([^`'"]+)[`'"]\s*,(?:\s*prioridad\s*:\s*(\d+)\s*,)?\s*archivos\s*:\s*(\[.*?\]|\{.*?\})""",
         re.DOTALL
     )
 
@@ -127,7 +222,18 @@ def parsear_sw(ruta_sw: Path):
 
     for m in bloque_pattern.finditer(contenido):
         nombre_template = m.group(1)
-        archivos_raw    = m.group(2)
+        prioridad       = int(m.group(2)) if m.group(2) else None
+        archivos_raw    = m.group(3)
+
+        # Manifiesto: 'ruta': 'huella' (o null si el archivo no estaba en disco al generarlo)
+        huellas = None
+        if archivos_raw.startswith("{"):
+            huellas = {
+                ruta: huella or None
+                for ruta, huella in re.findall(
+                    r"""['"]([^'"]+)['"]\s*:\s*(?:['"]([0-9a-f]+)['"]|null)""", archivos_raw)
+            }
+            archivos_raw = ", ".join(f"'{ruta}'" for ruta in huellas)
 
         # Resolver concatenaciones: RUTA_X + '/algo'
         archivos_resueltos = []
@@ -165,6 +271,8 @@ def parsear_sw(ruta_sw: Path):
             "nombre_resuelto":  resolver_nombre(nombre_template),
             "variable":         var_usada,
             "archivos":         archivos_finales,
+            "huellas":          huellas,
+            "prioridad":        prioridad,
         })
 
     return version_app, versiones_vars, grupos
@@ -280,12 +388,340 @@ def obtener_archivos_git(raiz_proyecto: Path):
     return rama, modificados, nuevos
 
 
+# ──────────────────────────────────────────────────────────
+# PAQUETES DE DATOS (build/scripts/empaquetar.py)
+# ──────────────────────────────────────────────────────────
+
+def paquete_de_historia(raiz: Path, historia_id: str):
+    """Ruta del paquete de datos de una historia (según su historia.json), o None si no tiene."""
+    try:
+        config = json.loads((raiz / "historias" / historia_id / "historia.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    paquete = config.get("paquete") if isinstance(config, dict) else None
+    if isinstance(paquete, dict) and paquete.get("archivo"):
+        return f"historias/{historia_id}/{paquete['archivo']}"
+    return None
+
+
+def agrupar_en_paquetes(raiz: Path, archivos: set):
+    """
+    En las historias empaquetadas el SW cachea el paquete y no cada escena:
+    reemplaza sus JSON de datos/escenas y datos/desafios por el paquete.
+    Retorna (archivos, ids de historias que hay que volver a empaquetar).
+    """
+    resultado, reempaquetar = set(), set()
+    paquetes = {}  # historia_id → paquete (un solo historia.json leído por historia)
+    for archivo in archivos:
+        m = re.match(r'historias/([^/]+)/datos/(?:escenas|desafios)/[^/]+\.json$', archivo)
+        if m and m.group(1) not in paquetes:
+            paquetes[m.group(1)] = paquete_de_historia(raiz, m.group(1))
+        paquete = paquetes[m.group(1)] if m else None
+        if paquete:
+            resultado.add(paquete)
+            reempaquetar.add(m.group(1))
+        else:
+            resultado.add(archivo)
+    return resultado, reempaquetar
+
+
+# ──────────────────────────────────────────────────────────
+# SPRITES DE EFECTOS (build/scripts/empaquetar_sonidos.py)
+# ──────────────────────────────────────────────────────────
+
+def sprites_de_historia(raiz: Path, historia_id: str):
+    """{efecto: ruta de su sprite} de una historia (según datos/sonidos.json), vacío si no tiene."""
+    try:
+        config = json.loads((raiz / "historias" / historia_id / "historia.json").read_text(encoding="utf-8"))
+        sonidos = config.get("sonidos") if isinstance(config, dict) else None
+        if not isinstance(sonidos, dict) or not sonidos.get("archivo"):
+            return {}
+        tabla = json.loads((raiz / "historias" / historia_id / sonidos["archivo"]).read_text(encoding="utf-8"))
+        sprites, tramos = tabla["sprites"], tabla["sonidos"]
+        return {f"historias/{historia_id}/audios/{nombre}": f"historias/{historia_id}/{sprites[tramo['sprite']]}"
+                for nombre, tramo in tramos.items()}
+    except (OSError, json.JSONDecodeError, KeyError, IndexError, TypeError):
+        return {}
+
+
+def agrupar_en_sprites(raiz: Path, archivos: set):
+    """
+    El SW cachea los sprites y no cada efecto empaquetado: reemplaza esos efectos por su sprite.
+    Retorna (archivos, ids de historias cuyos sprites hay que volver a generar).
+    """
+    resultado, reempaquetar = set(), set()
+    sprites = {}  # historia_id → {efecto: sprite}
+    for archivo in archivos:
+        m = re.match(r'historias/([^/]+)/audios/(?!sprites/)', archivo)
+        if m and m.group(1) not in sprites:
+            sprites[m.group(1)] = sprites_de_historia(raiz, m.group(1))
+        sprite = sprites[m.group(1)].get(archivo) if m else None
+        if sprite:
+            resultado.add(sprite)
+            reempaquetar.add(m.group(1))
+        else:
+            resultado.add(archivo)
+    return resultado, reempaquetar
+
+
+# ──────────────────────────────────────────────────────────
+# VARIANTES DE IMÁGENES (build/scripts/generar_variantes.py)
+# ──────────────────────────────────────────────────────────
+
+# Variante de una imagen: historias/{id}/imagenes/variantes/{escalón}/...
+VARIANTE = re.compile(r'/imagenes/variantes/(\d+)/')
+
+
+def escalones_del_sw(grupos: list):
+    """Escalones con variantes en el manifiesto, de menor a mayor."""
+    return sorted({int(m.group(1)) for g in grupos for a in g["archivos"] if (m := VARIANTE.search(a))})
+
+
+def archivos_del_escalon(grupo: dict, escalon, todos: set):
+    """
+    Archivos de un grupo que precachea un dispositivo de ese escalón (None: sin escalón),
+    con la misma regla que archivosDe() del SW: las variantes de su escalón y las
+    originales que no tienen variante en ese escalón. `todos` son los archivos del manifiesto.
+    """
+    resultado = []
+    for archivo in grupo["archivos"]:
+        m = VARIANTE.search(archivo)
+        if m:
+            if escalon is not None and int(m.group(1)) == escalon:
+                resultado.append(archivo)
+        elif not (escalon is not None and "/imagenes/" in archivo
+                  and archivo.replace("/imagenes/", f"/imagenes/variantes/{escalon}/", 1) in todos):
+            resultado.append(archivo)
+    return resultado
+
+
+def historias_con_variantes(raiz: Path, archivos: set):
+    """Ids de las historias con variantes (campo `variantes` de historia.json) a las que se les tocó una imagen original."""
+    ids = set()
+    for archivo in archivos:
+        m = re.match(r'historias/([^/]+)/imagenes/(?!variantes/)', archivo)
+        if not m or m.group(1) in ids:
+            continue
+        try:
+            config = json.loads((raiz / "historias" / m.group(1) / "historia.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if isinstance(config, dict) and isinstance(config.get("variantes"), dict):
+            ids.add(m.group(1))
+    return ids
+
+
+def imprimir_escalones(raiz: Path, grupos: list):
+    """Por escalón de pantalla: archivos y bytes que precachea un dispositivo, antes de activar y en total."""
+    todos = {a for g in grupos for a in g["archivos"]}
+    print()
+    print(BOLD("🖼️  Precarga por escalón de pantalla (variantes de imágenes)"))
+    print("=" * 50)
+    escalones = escalones_del_sw(grupos)
+    if not escalones:
+        print(DIM("  El manifiesto no tiene variantes: todos los dispositivos bajan las originales."))
+        print(DIM("  Generalas con python .agents/skills/build/scripts/generar_variantes.py"))
+        print()
+        return
+    base = None
+    for escalon in [None] + escalones:
+        criticos = _costo(raiz, [a for g in grupos if not (g.get("prioridad") or 0) > 0
+                                 for a in archivos_del_escalon(g, escalon, todos)])
+        total = _costo(raiz, [a for g in grupos for a in archivos_del_escalon(g, escalon, todos)])
+        base = base or total["bytes"] or 1
+        etiqueta = f"{escalon} px" if escalon else "sin escalón (originales)"
+        porcentaje = f"({100 * total['bytes'] / base:.0f}%)"
+        print(f"  • {etiqueta:26s} antes de activar {formato_bytes(criticos['bytes']):>9s}  "
+              f"total {formato_bytes(total['bytes']):>9s} / {total['pedidos']:>3d} archivos  {DIM(porcentaje)}")
+    print(DIM("  El escalón lo elige escalonDePantalla() (js/ImagePreloader.js) y llega al SW en ?escalon=N."))
+    print()
+
+
+def catalogo_generado(raiz: Path):
+    """Indica si biblioteca/historias.json trae datos precalculados (build/scripts/generar_catalogo.py)."""
+    try:
+        catalogo = json.loads((raiz / "biblioteca" / "historias.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    historias = catalogo.get("historias") if isinstance(catalogo, dict) else None
+    return isinstance(historias, list) and any(isinstance(h, dict) and "archivos" in h for h in historias)
+
+
+def huellas_desactualizadas(raiz: Path, grupos: list):
+    """
+    Archivos del manifiesto (generar-manifiesto.py) cuyo contenido ya no coincide con su huella,
+    incluidos los que no tenían huella y ahora existen. Los que no están en disco son huérfanos.
+    """
+    desactualizados = set()
+    en_disco = archivos_en_disco(raiz)
+    for grupo in grupos:
+        for archivo, huella in (grupo["huellas"] or {}).items():
+            ruta = "index.html" if archivo == "./" else archivo
+            if ruta not in en_disco:
+                continue
+            try:
+                with open(os.path.join(raiz, ruta), "rb") as f:
+                    contenido = f.read()
+            except OSError:
+                continue
+            if hashlib.sha256(contenido).hexdigest()[:16] != huella:
+                desactualizados.add(archivo)
+    return desactualizados
+
+
+# ──────────────────────────────────────────────────────────
+# SIMULADOR DEL COSTO DE ACTUALIZACIÓN (--costo)
+# ──────────────────────────────────────────────────────────
+
+def tamano_en_disco(raiz: Path, archivo: str):
+    """Bytes del archivo tal como lo sirve el servidor ('./' es index.html), o None si no está en disco."""
+    estado = archivos_en_disco(raiz).get("index.html" if archivo == "./" else archivo)
+    return estado[1] if estado is not None else None
+
+
+def formato_bytes(n):
+    """Tamaño legible: 850 B, 312 KB, 1.4 MB."""
+    if n < 1024:
+        return f"{n} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.0f} KB"
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def _costo(raiz: Path, archivos):
+    """Pedidos y bytes de bajar esos archivos; los que no están en disco cuentan aparte (sin_tamano)."""
+    costo = {"pedidos": 0, "bytes": 0, "sin_tamano": 0}
+    for archivo in archivos:
+        costo["pedidos"] += 1
+        tamano = tamano_en_disco(raiz, archivo)
+        if tamano is None:
+            costo["sin_tamano"] += 1
+        else:
+            costo["bytes"] += tamano
+    return costo
+
+
+def _carpeta(archivo: str) -> str:
+    return archivo.rsplit("/", 1)[0] if "/" in archivo else "."
+
+
+def simular_costo(raiz: Path, grupos: list, cambios: set, escalon=None, arbol=None):
+    """
+    Lo que baja en la próxima instalación del SW cada cliente que ya tiene la app, según
+    cómo se invalide la caché:
+      - todo:        el SW anterior al manifiesto, que en cada install volvía a bajar todo
+      - por_grupo:   subir la variable CACHE_X de cada grupo con algún cambio
+      - por_carpeta: la mejor partición en grupos: cada grupo afectado separado por carpeta,
+                     se baja solo la carpeta que cambió
+      - por_archivo: el manifiesto con huellas, se baja solo lo que cambió
+
+    `cambios` son los archivos nuevos o modificados respecto de lo publicado; los nuevos van
+    al grupo que sugiere sugerir_cache() y los que no corresponden a ningún grupo no cuentan.
+    Solo cuentan los archivos que precachea un dispositivo de `escalon` (ver archivos_del_escalon).
+    `arbol` es el ArbolRutas de `grupos` (se arma si no viene).
+    Retorna {"grupos": [...], "totales": {modelo: costo}, "sw": costo del propio service-worker.js}.
+    """
+    todos = {a for g in grupos for a in g["archivos"]}
+    miembros = {g["nombre_resuelto"]: archivos_del_escalon(g, escalon, todos) for g in grupos}
+    arbol = arbol or ArbolRutas(grupos)
+
+    cambiados = {}  # nombre del grupo → archivos que cambian
+    for archivo in sorted(cambios):
+        nombre = arbol.grupo_de(archivo)
+        if nombre is None:
+            nombre = sugerir_cache(archivo, grupos, arbol).split(" (")[0]
+            if not nombre.startswith("cache-"):
+                continue
+            miembros.setdefault(nombre, []).append(archivo)
+        if archivo in todos and archivo not in miembros[nombre]:
+            continue  # Variante de otro escalón, u original reemplazada por su variante
+        cambiados.setdefault(nombre, []).append(archivo)
+
+    detalle = []
+    for nombre, archivos in cambiados.items():
+        carpetas = {_carpeta(a) for a in archivos}
+        detalle.append({
+            "nombre":      nombre,
+            "archivos":    archivos,
+            "carpetas":    sorted(carpetas),
+            "por_grupo":   _costo(raiz, miembros[nombre]),
+            "por_carpeta": _costo(raiz, [a for a in miembros[nombre] if _carpeta(a) in carpetas]),
+            "por_archivo": _costo(raiz, archivos),
+        })
+    detalle.sort(key=lambda g: g["por_grupo"]["bytes"], reverse=True)
+
+    totales = {"todo": _costo(raiz, [a for archivos in miembros.values() for a in archivos] if cambiados else [])}
+    for modelo in ("por_grupo", "por_carpeta", "por_archivo"):
+        totales[modelo] = {clave: sum(g[modelo][clave] for g in detalle) for clave in ("pedidos", "bytes", "sin_tamano")}
+    sw = _costo(raiz, ["service-worker.js"] if cambiados else [])
+    return {"grupos": detalle, "totales": totales, "sw": sw}
+
+
+def imprimir_costo(simulacion, manifiesto):
+    """Reporte del simulador: costo por grupo, total por modelo y la partición que lo minimiza."""
+    def texto(costo):
+        sin_tamano = f" +{costo['sin_tamano']} sin tamaño" if costo["sin_tamano"] else ""
+        return f"{formato_bytes(costo['bytes']):>9s} / {costo['pedidos']:>3d} pedidos{sin_tamano}"
+
+    print()
+    print(BOLD("💸 Costo de la próxima actualización (por cliente que ya tiene la app)"))
+    print("=" * 50)
+    if not simulacion["grupos"]:
+        print(GREEN("  Ningún archivo cacheado cambia: los clientes no bajan nada más que el SW."))
+        print()
+        return
+
+    print(BOLD("📦 POR GRUPO AFECTADO:"))
+    for grupo in simulacion["grupos"]:
+        cantidad = f"{len(grupo['archivos'])} archivo(s) cambian"
+        print(f"  • {YELLOW(grupo['nombre'])}  {DIM(cantidad)}")
+        print(f"      Grupo entero (CACHE_X):  {texto(grupo['por_grupo'])}")
+        print(f"      Solo carpetas tocadas:   {texto(grupo['por_carpeta'])}")
+        print(f"      Solo archivos (huellas): {texto(grupo['por_archivo'])}")
+    print()
+
+    actual = "por_archivo" if manifiesto else "todo"
+    etiquetas = {
+        "todo":        "SW sin manifiesto (install baja todo)",
+        "por_grupo":   "Bump de CACHE_X por grupo",
+        "por_carpeta": "Grupos partidos por carpeta",
+        "por_archivo": "Manifiesto con huellas",
+    }
+    print(BOLD("📊 TOTAL POR MODELO DE INVALIDACIÓN:"))
+    for modelo, etiqueta in etiquetas.items():
+        marcador = CYAN("  ← este SW") if modelo == actual else ""
+        print(f"  • {etiqueta:38s} {texto(simulacion['totales'][modelo])}{marcador}")
+    print(f"  {DIM('+ service-worker.js: ' + formato_bytes(simulacion['sw']['bytes']) + ', 1 pedido, en todos los modelos')}")
+    sin_tamano = max(costo["sin_tamano"] for costo in simulacion["totales"].values())
+    if sin_tamano:
+        print(DIM(f"  {sin_tamano} archivo(s) no están en disco (ej: videos que se suben aparte): no suman bytes"))
+    print()
+
+    # Mejor partición: separar por carpeta los grupos donde eso ahorra bytes
+    ahorros = [g for g in simulacion["grupos"] if g["por_carpeta"]["bytes"] < g["por_grupo"]["bytes"]]
+    print(BOLD("✂️  MEJOR PARTICIÓN DE GRUPOS:"))
+    if manifiesto:
+        print(GREEN("  Con el manifiesto cada archivo es su propia unidad: ya se baja el mínimo."))
+    elif ahorros:
+        for grupo in ahorros:
+            ahorro = grupo["por_grupo"]["bytes"] - grupo["por_carpeta"]["bytes"]
+            print(f"  • {grupo['nombre']}: separar {', '.join(grupo['carpetas'])} "
+                  f"{DIM(f'(ahorra {formato_bytes(ahorro)})')}")
+        print(DIM("  El mínimo es por archivo: generar-manifiesto.py migra el SW a huellas."))
+    else:
+        print(GREEN("  Partir los grupos afectados no ahorra nada."))
+    print()
+
+
 # ──────────────────────────────────────────────────────────
 # SUGERENCIA DE CACHÉ PARA ARCHIVOS NUEVOS
 # ──────────────────────────────────────────────────────────
 
-def sugerir_cache(archivo: str, grupos: list) -> str:
-    """Heurística para sugerir a qué caché pertenece un archivo nuevo."""
+def sugerir_cache(archivo: str, grupos: list, arbol=None) -> str:
+    """
+    Heurística para sugerir a qué caché pertenece un archivo nuevo. `arbol` es el
+    ArbolRutas de `grupos`: pasarlo cuando se sugiere para muchos archivos.
+    """
     a = archivo.lower()
 
     # Por extensión y ruta
@@ -306,10 +742,11 @@ def sugerir_cache(archivo: str, grupos: list) -> str:
         historia_id = m.group(1)  # ej: "el-misterio-del-bosque-encantado"
         subruta     = m.group(2)
 
-        # Buscar si ya existe una caché para esa historia buscando en sus archivos
-        nombre_datos  = next((g["nombre_resuelto"] for g in grupos if any(historia_id in arch for arch in g["archivos"]) and "datos" in g["nombre_resuelto"]), None)
-        nombre_audios = next((g["nombre_resuelto"] for g in grupos if any(historia_id in arch for arch in g["archivos"]) and "audio" in g["nombre_resuelto"]), None)
-        nombre_imag   = next((g["nombre_resuelto"] for g in grupos if any(historia_id in arch for arch in g["archivos"]) and "imagen" in g["nombre_resuelto"]), None)
+        # Buscar si ya existe una caché para esa historia: los grupos con archivos en su carpeta
+        de_historia   = (arbol or ArbolRutas(grupos)).grupos_bajo(f"historias/{historia_id}")
+        nombre_datos  = next((nombre for nombre in de_historia if "datos" in nombre), None)
+        nombre_audios = next((nombre for nombre in de_historia if "audio" in nombre), None)
+        nombre_imag   = next((nombre for nombre in de_historia if "imagen" in nombre), None)
 
         # Abreviatura para nombre de caché nueva: primeras letras de cada palabra del id
         siglas = "".join(p[0] for p in historia_id.split("-") if p)
@@ -344,8 +781,7 @@ def detectar_huerfanos(grupos: list, raiz: Path) -> list:
         for archivo in grupo["archivos"]:
             if archivo in ("./",):
                 continue
-            ruta = raiz / archivo
-            if not ruta.exists():
+            if not existe_en_disco(raiz, archivo):
                 huerfanos.append({
                     "archivo": archivo,
                     "cache":   grupo["nombre_resuelto"],
@@ -358,8 +794,12 @@ def detectar_huerfanos(grupos: list, raiz: Path) -> list:
 # REPORTE
 # ──────────────────────────────────────────────────────────
 
-def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, huerfanos, raiz, rama="main"):
-    """Imprime el análisis completo en la terminal."""
+def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, huerfanos, raiz, rama="main",
+                     manifiesto=False, arbol=None):
+    """
+    Imprime el análisis completo en la terminal.
+    Con `manifiesto` (RUTAS_CACHE con huellas) no hay versiones que subir: se regenera el manifiesto.
+    """
     print()
     print(BOLD("🔍 Análisis del Service Worker"))
     print("=" * 50)
@@ -388,7 +828,8 @@ def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, h
             caches_afectadas[nombre]["archivos"].append(archivo)
 
     if caches_afectadas:
-        print(BOLD(YELLOW("📦 CACHÉS AFECTADAS (archivos modificados en git):")))
+        origen = "huella distinta a la del manifiesto" if manifiesto else "archivos modificados en git"
+        print(BOLD(YELLOW(f"📦 CACHÉS AFECTADAS ({origen}):")))
         for nombre, datos in caches_afectadas.items():
             var = datos["grupo"]["variable"]
             val = versiones_vars.get(var, "?") if var else "?"
@@ -410,7 +851,7 @@ def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, h
     if nuevos_sin_cache:
         print(BOLD("🆕 ARCHIVOS NUEVOS (sin caché asignada):"))
         for archivo in nuevos_sin_cache:
-            sugerencia = sugerir_cache(archivo, grupos)
+            sugerencia = sugerir_cache(archivo, grupos, arbol)
             print(f"  • {archivo}")
             print(f"      → Sugerencia: {CYAN(sugerencia)}")
         print()
@@ -423,7 +864,8 @@ def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, h
     if nuevos_ya_en_sw:
         print(DIM("ℹ️  Archivos nuevos en git pero ya registrados en el SW:"))
         for a in nuevos_ya_en_sw:
-            print(f"  • {a}  {DIM('[ya en caché, bump recomendado]')}")
+            nota = "[ya en el manifiesto]" if manifiesto else "[ya en caché, bump recomendado]"
+            print(f"  • {a}  {DIM(nota)}")
         print()
 
     # ── Entradas huérfanas
@@ -438,9 +880,20 @@ def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, h
         print(GREEN("👻 Sin entradas huérfanas."))
         print()
 
-    # ── Resumen de versiones
-    print(BOLD("📋 VERSIONES ACTUALES DE CACHÉ:"))
-    for grupo in grupos:
+    # ── Resumen de versiones (con manifiesto: archivos por grupo)
+    if manifiesto:
+        print(BOLD("📋 GRUPOS DEL MANIFIESTO:"))
+        for grupo in grupos:
+            afectada = caches_afectadas.get(grupo["nombre_resuelto"])
+            marker = YELLOW(f" ← {len(afectada['archivos'])} a regenerar") if afectada else ""
+            cantidad = f"{len(grupo['archivos'])} archivos"
+            if grupo["prioridad"] is not None:
+                cantidad += f", prioridad {grupo['prioridad']}"
+            print(f"  • {grupo['nombre_resuelto']:35s}  {DIM(cantidad)}{marker}")
+        print()
+    else:
+        print(BOLD("📋 VERSIONES ACTUALES DE CACHÉ:"))
+    for grupo in grupos if not manifiesto else []:
         var = grupo["variable"]
         val = versiones_vars.get(var, "—") if var else "—"
         afectada = grupo["nombre_resuelto"] in caches_afectadas
@@ -452,11 +905,16 @@ def imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, h
     necesita_accion = bool(caches_afectadas or nuevos_sin_cache or huerfanos)
     if necesita_accion:
         print(BOLD("📝 PRÓXIMOS PASOS SUGERIDOS:"))
-        if caches_afectadas:
+        if manifiesto:
+            print("  1. Regenerar el manifiesto: python .agents/skills/sw-updater/scripts/generar-manifiesto.py")
+            print("     (actualiza las huellas y agrega los archivos nuevos a su grupo; el SW nuevo baja solo lo que cambió)")
+            if huerfanos:
+                print("  2. Huérfanos: --podar los saca del manifiesto (no usarlo si se suben aparte, como los videos)")
+        elif caches_afectadas:
             print(f"  1. Incrementar la(s) versión(es) de caché afectadas en service-worker.js")
-        if nuevos_sin_cache:
+        if nuevos_sin_cache and not manifiesto:
             print(f"  {'2' if caches_afectadas else '1'}. Agregar los archivos nuevos a la caché correspondiente")
-        if huerfanos:
+        if huerfanos and not manifiesto:
             n = sum([1 for _ in [caches_afectadas, nuevos_sin_cache] if _]) + 1
             print(f"  {n}. Eliminar las entradas huérfanas del service-worker.js")
         print(f"  {'→'} Preguntar al usuario si también actualizar VERSION_APP")
@@ -481,6 +939,7 @@ Ejemplos:
   python analizar-sw.py --archivo historias/el-misterio-del-bosque-encantado/datos/escenas/NUEVA.json
   python analizar-sw.py --archivo img1.webp img2.webp json3.json
   python analizar-sw.py --sw ../otro-proyecto/service-worker.js
+  python analizar-sw.py --costo --limite-mb 20
         """
     )
     parser.add_argument(
@@ -494,6 +953,29 @@ Ejemplos:
         metavar="RUTA_SW",
         help="Ruta al service-worker.js (por defecto: auto-detecta en la raíz del repo)"
     )
+    parser.add_argument(
+        "--costo",
+        action="store_true",
+        help="Simular cuántos bytes y pedidos baja cada cliente en la próxima actualización "
+             "(por grupo, por modelo de invalidación y con la mejor partición de grupos)"
+    )
+    parser.add_argument(
+        "--escalon",
+        type=int,
+        metavar="PX",
+        help="Con --costo: simular un dispositivo de ese escalón de imágenes (default: sin escalón, originales)"
+    )
+    parser.add_argument(
+        "--escalones",
+        action="store_true",
+        help="Qué precachea un dispositivo de cada escalón de pantalla (variantes de imágenes)"
+    )
+    parser.add_argument(
+        "--limite-mb",
+        type=float,
+        metavar="MB",
+        help="Con --costo: salir con código 1 si la actualización baja más que esto por cliente"
+    )
 
     args = parser.parse_args()
 
@@ -506,10 +988,17 @@ Ejemplos:
 
     if not grupos:
         sys.exit("❌ No se pudieron extraer grupos de caché del service-worker.js. Verificá el formato.")
+    arbol = ArbolRutas(grupos)
+    todos_archivos_sw = {a for g in grupos for a in g["archivos"]}
+
+    if args.escalones:
+        imprimir_escalones(raiz, grupos)
+        return
 
     # Obtener archivos a analizar
     if args.archivo:
         # Modo manual: el usuario especificó los archivos
+        rama        = "main"  # Sin git no hay diff de rama que informar
         modificados = set()
         nuevos      = set()
         advertencias = []
@@ -517,13 +1006,11 @@ Ejemplos:
         for ruta_str in args.archivo:
             # Normalizar a forward slashes
             ruta_norm = ruta_str.replace("\\", "/")
-            ruta_abs  = raiz / ruta_norm
 
-            if not ruta_abs.exists():
+            if not existe_en_disco(raiz, ruta_norm):
                 advertencias.append(ruta_norm)
 
             # En modo manual: si el archivo YA está en el SW → modificado, sino → nuevo
-            todos_archivos_sw = {a for g in grupos for a in g["archivos"]}
             if ruta_norm in todos_archivos_sw:
                 modificados.add(ruta_norm)
             else:
@@ -538,11 +1025,73 @@ Ejemplos:
         # Modo git
         rama, modificados, nuevos = obtener_archivos_git(raiz)
 
+    # Historias empaquetadas: un JSON nuevo o modificado cambia el paquete
+    modificados, reempaquetar = agrupar_en_paquetes(raiz, modificados)
+    nuevos, reempaquetar_nuevos = agrupar_en_paquetes(raiz, nuevos)
+    reempaquetar |= reempaquetar_nuevos
+    modificados, resprites = agrupar_en_sprites(raiz, modificados)
+    nuevos, resprites_nuevos = agrupar_en_sprites(raiz, nuevos)
+    resprites |= resprites_nuevos
+    modificados |= {a for a in nuevos if a in todos_archivos_sw
+                    and (a.endswith(".jsonl") or "/audios/sprites/" in a)}
+    nuevos -= modificados
+
+    if reempaquetar:
+        print()
+        for historia_id in sorted(reempaquetar):
+            print(YELLOW(f"  📦 {historia_id} usa paquete de datos: volvé a empaquetarla antes de publicar "
+                         f"(python .agents/skills/build/scripts/empaquetar.py --historia {historia_id})"))
+
+    # Las variantes salen de las imágenes originales: si cambia una, hay que regenerarlas
+    for historia_id in sorted(historias_con_variantes(raiz, modificados | nuevos)):
+        print(YELLOW(f"  🖼️  {historia_id} tiene variantes de imágenes: regeneralas antes de publicar "
+                     f"(python .agents/skills/build/scripts/generar_variantes.py --historia {historia_id})"))
+
+    # Los efectos empaquetados solo llegan al SW dentro de su sprite
+    for historia_id in sorted(resprites):
+        print(YELLOW(f"  🔊 {historia_id} tiene sprites de efectos: volvé a generarlos antes de publicar "
+                     f"(python .agents/skills/build/scripts/empaquetar_sonidos.py --historia {historia_id})"))
+
+    # El catálogo copia datos (y el hash) de cada historia.json: si cambia uno, cambia el catálogo
+    cambia_config = reempaquetar or any(re.match(r'historias/[^/]+/historia\.json$', a) for a in modificados | nuevos)
+    if cambia_config and catalogo_generado(raiz):
+        if "biblioteca/historias.json" not in modificados:
+            print(YELLOW("  📚 Cambió un historia.json: regenerá el catálogo antes de publicar "
+                         "(python .agents/skills/build/scripts/generar_catalogo.py)"))
+        modificados.add("biblioteca/historias.json")
+        nuevos.discard("biblioteca/historias.json")
+
+    # Para los clientes cambia todo lo que difiere de lo publicado, aunque el manifiesto ya esté al día
+    cambios = modificados | nuevos
+
+    # Con manifiesto, lo que cuenta para el SW es la huella, no lo que diga git
+    manifiesto = any(g["huellas"] is not None for g in grupos)
+    if manifiesto:
+        desactualizados = huellas_desactualizadas(raiz, grupos)
+        if args.archivo:
+            desactualizados &= modificados | nuevos
+        modificados = {a for a in modificados if a not in todos_archivos_sw} | desactualizados
+        nuevos -= desactualizados
+        cambios |= desactualizados
+
+    if args.costo or args.limite_mb is not None:
+        simulacion = simular_costo(raiz, grupos, cambios, args.escalon, arbol)
+        imprimir_costo(simulacion, manifiesto)
+        if args.limite_mb is not None:
+            modelo = "por_archivo" if manifiesto else "todo"
+            total = simulacion["totales"][modelo]["bytes"] + simulacion["sw"]["bytes"]
+            if total > args.limite_mb * 1024 * 1024:
+                print(RED(f"❌ La actualización baja {formato_bytes(total)} por cliente "
+                          f"(límite: {args.limite_mb:g} MB)"))
+                sys.exit(1)
+        return
+
     # Detectar huérfanos
     huerfanos = detectar_huerfanos(grupos, raiz)
 
     # Imprimir reporte
-    imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, huerfanos, raiz, rama)
+    imprimir_reporte(version_app, versiones_vars, grupos, modificados, nuevos, huerfanos, raiz, rama,
+                     manifiesto=manifiesto, arbol=arbol)
 
 
 if __name__ == "__main__":
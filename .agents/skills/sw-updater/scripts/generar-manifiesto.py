@@ -0,0 +1,369 @@
+"""
+generar-manifiesto.py — Genera RUTAS_CACHE del service-worker.js desde el filesystem.
+
+Arma la matriz de cachés con cada archivo que tiene que estar offline y la huella
+de su contenido (sha256, 16 caracteres). El SW usa la huella como versión de
+cada archivo: al publicar, el SW nuevo baja solo los archivos cuya huella cambió
+y conserva el resto, en vez de tirar y volver a bajar grupos enteros como con las
+variables CACHE_X de antes.
+
+QUÉ ARCHIVOS ENTRAN (y en qué grupo):
+  - Los que ya están en un grupo del SW siguen en ese grupo (se leen con
+    parsear_sw() de analizar-sw.py, que entiende también el formato anterior).
+  - Los nuevos van por la heurística de siempre:
+        index.html, manifest.json, ./, biblioteca/*  → cache-biblioteca
+        css/*.css                                    → cache-css
+        js/challenges/*.js                           → cache-challenges
+        js/*.js                                      → cache-js
+        historias/{id}/historia.json y datos/*       → cache-{id-corto}-datos
+        historias/{id}/audios/*                      → cache-{id-corto}-audios
+        historias/{id}/imagenes/*                    → cache-{id-corto}-imagenes
+        historias/{id}/videos/*                      → cache-{id-corto}-videos
+  - En las historias empaquetadas, los JSON sueltos de datos/escenas y
+    datos/desafios no entran: va datos/paquete.jsonl.
+  - Los efectos de sonido empaquetados en sprites (empaquetar_sonidos.py en la
+    skill build) no entran: van audios/sprites/* y datos/sonidos.json.
+  - Las imágenes y audios de nivel 0 (niveles-precache.py: lo que bloquea las
+    primeras escenas y la pantalla de inicio) van a cache-{id-corto}-inicio, y
+    vuelven a su grupo cuando dejan de ser nivel 0. En las historias sin paquete,
+    los JSON de nodos lejanos van a cache-{id-corto}-datos-diferidos.
+  - Las variantes de imágenes (imagenes/variantes/{escalón}/..., ver
+    generar_variantes.py en la skill build) van al grupo de su original. El SW
+    precachea solo las del escalón del dispositivo (archivosDe() en el SW).
+
+PRIORIDAD: cada grupo lleva la prioridad del archivo más urgente que tiene (el
+nivel de niveles-precache.py). El SW se activa con los grupos de prioridad 0 y
+baja los demás en segundo plano, en orden de prioridad.
+  - Los archivos del SW que no están en disco (ej: videos que se suben aparte)
+    se conservan con la huella que tenían, o `null` si no tenían. --podar los saca.
+
+Solo reescribe el bloque entre `// MANIFIESTO:INICIO` y `// MANIFIESTO:FIN`.
+
+USO:
+  python generar-manifiesto.py                       # Regenerar el manifiesto
+  python generar-manifiesto.py --verificar           # Exit 1 si está desactualizado (no escribe)
+  python generar-manifiesto.py --podar               # Sacar las entradas que no existen en disco
+  python generar-manifiesto.py --origen sw-viejo.js  # Tomar los grupos de otro SW (migración)
+  python generar-manifiesto.py --saltos 2            # Nivel 0 hasta dos transiciones del inicio
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+MARCA_INICIO = '// MANIFIESTO:INICIO'
+MARCA_FIN = '// MANIFIESTO:FIN'
+
+# Extensiones de los recursos que se precachean
+EXTENSIONES = {'.html', '.css', '.js', '.json', '.jsonl', '.webp', '.png', '.jpg', '.jpeg', '.svg',
+               '.ico', '.woff2', '.mp3', '.ogg', '.wav', '.mp4', '.webm'}
+
+# Subcarpeta de una historia → tipo de grupo
+TIPOS_HISTORIA = {'datos': 'datos', 'audios': 'audios', 'imagenes': 'imagenes', 'videos': 'videos'}
+
+
+class ErrorManifiesto(Exception):
+    """El service-worker.js no tiene el bloque del manifiesto."""
+
+
+def _cargar_script(nombre):
+    """Importa un script hermano con guion en el nombre (el guion impide un import normal)."""
+    ruta = Path(__file__).resolve().parent / f'{nombre}.py'
+    spec = importlib.util.spec_from_file_location(nombre.replace('-', '_'), ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def huella(ruta):
+    """sha256 (16 caracteres) del contenido de un archivo, o None si no existe."""
+    try:
+        return hashlib.sha256(ruta.read_bytes()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+def ruta_en_disco(archivo):
+    """'./' es la raíz del sitio: el servidor responde index.html."""
+    return 'index.html' if archivo == './' else archivo
+
+
+def nombre_estable(nombre):
+    """Nombre del grupo sin la versión del formato anterior: cache-css-v10 → cache-css."""
+    return re.sub(r'-v(\d+|\$\{\w+\})$', '', nombre)
+
+
+def _listar(carpeta, raiz, recursivo=True):
+    if not carpeta.is_dir():
+        return []
+    rutas = carpeta.rglob('*') if recursivo else carpeta.iterdir()
+    return sorted(r.relative_to(raiz).as_posix() for r in rutas
+                  if r.is_file() and r.suffix.lower() in EXTENSIONES)
+
+
+def _leer_json(ruta):
+    try:
+        datos = json.loads(ruta.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return datos if isinstance(datos, dict) else None
+
+
+def _empaquetada(config):
+    return isinstance(config, dict) and isinstance(config.get('paquete'), dict)
+
+
+def _efectos_en_sprites(dir_historia, config):
+    """Rutas de los efectos que la historia reproduce desde sus sprites (datos/sonidos.json)."""
+    sonidos = config.get('sonidos') if isinstance(config, dict) else None
+    if not isinstance(sonidos, dict) or not sonidos.get('archivo'):
+        return set()
+    tabla = _leer_json(dir_historia / sonidos['archivo']) or {}
+    if tabla.get('version') != sonidos.get('version') or not isinstance(tabla.get('sonidos'), dict):
+        return set()  # Tabla vieja o rota: el motor usa los archivos sueltos
+    return {f'historias/{dir_historia.name}/audios/{nombre}' for nombre in tabla['sonidos']}
+
+
+def archivos_del_proyecto(raiz):
+    """
+    Archivos que la heurística manda a la caché.
+    Retorna (archivos, excluidos): los excluidos no entran aunque un grupo los liste
+    (los JSON sueltos de una historia empaquetada y los efectos que van en sprites).
+    """
+    archivos, excluidos = [], set()
+    if (raiz / 'index.html').exists():
+        archivos += ['./', 'index.html']
+    if (raiz / 'manifest.json').exists():
+        archivos.append('manifest.json')
+    archivos += _listar(raiz / 'biblioteca', raiz)
+    archivos += [a for a in _listar(raiz / 'css', raiz, recursivo=False) if a.endswith('.css')]
+    archivos += [a for a in _listar(raiz / 'js', raiz, recursivo=False) if a.endswith('.js')]
+    archivos += [a for a in _listar(raiz / 'js' / 'challenges', raiz) if a.endswith('.js')]
+
+    dir_historias = raiz / 'historias'
+    for dir_historia in sorted(dir_historias.iterdir()) if dir_historias.is_dir() else []:
+        if not (dir_historia / 'historia.json').exists():
+            continue
+        archivos.append(f'historias/{dir_historia.name}/historia.json')
+        config = _leer_json(dir_historia / 'historia.json')
+        sueltos = ()
+        if _empaquetada(config):
+            sueltos = (f'historias/{dir_historia.name}/datos/escenas/',
+                       f'historias/{dir_historia.name}/datos/desafios/')
+        en_sprites = _efectos_en_sprites(dir_historia, config)
+        for carpeta in TIPOS_HISTORIA:
+            for archivo in _listar(dir_historia / carpeta, raiz):
+                if archivo.startswith(sueltos) or archivo in en_sprites:
+                    excluidos.add(archivo)
+                else:
+                    archivos.append(archivo)
+    return archivos, excluidos
+
+
+def _siglas(historia_id):
+    return ''.join(p[0] for p in historia_id.split('-') if p)
+
+
+def _tipo_en_historia(archivo):
+    """(id de historia, tipo de grupo) de un archivo de historias/, o None."""
+    m = re.match(r'historias/([^/]+)/(?:(historia\.json)$|([^/]+)/)', archivo)
+    if not m:
+        return None
+    tipo = 'datos' if m.group(2) else TIPOS_HISTORIA.get(m.group(3))
+    return (m.group(1), tipo) if tipo else None
+
+
+def grupo_por_heuristica(archivo, prefijos, usados):
+    """
+    Grupo de un archivo que todavía no está en el SW.
+    `prefijos`: historia_id → prefijo de sus grupos (ej: 'cache-embe'); se completa al vuelo.
+    """
+    if archivo in ('./', 'index.html', 'manifest.json') or archivo.startswith('biblioteca/'):
+        return 'cache-biblioteca'
+    if archivo.startswith('css/'):
+        return 'cache-css'
+    if archivo.startswith('js/challenges/'):
+        return 'cache-challenges'
+    if archivo.startswith('js/'):
+        return 'cache-js'
+    historia = _tipo_en_historia(archivo)
+    if historia is None:
+        return None
+    historia_id, tipo = historia
+    if historia_id not in prefijos:
+        prefijo = f'cache-{_siglas(historia_id)}'
+        if prefijo in usados:
+            prefijo = f'cache-{historia_id}'
+        prefijos[historia_id] = prefijo
+        usados.add(prefijo)
+    return f'{prefijos[historia_id]}-{tipo}'
+
+
+def armar_grupos(raiz, grupos_origen, podar=False, saltos=None):
+    """
+    Grupos del manifiesto: lista de (nombre, prioridad, {archivo: huella}), en orden de prioridad.
+    Retorna (grupos, avisos).
+    """
+    niveles = _cargar_script('niveles-precache')
+    niveles_historias = niveles.niveles(raiz, niveles.SALTOS if saltos is None else saltos)
+    avisos = []
+    existentes, excluidos = archivos_del_proyecto(raiz)
+    en_disco = set(existentes)
+
+    # Pertenencia actual: archivo → grupo, y el prefijo de los grupos de cada historia
+    orden, pertenencia, huellas_previas, prefijos = [], {}, {}, {}
+    for grupo in grupos_origen:
+        nombre = nombre_estable(grupo['nombre_resuelto'])
+        if nombre not in orden:
+            orden.append(nombre)
+        for archivo in grupo['archivos']:
+            pertenencia.setdefault(archivo, nombre)
+            huellas_previas[archivo] = (grupo.get('huellas') or {}).get(archivo)
+            historia = _tipo_en_historia(archivo)
+            if historia and nombre.endswith(f'-{historia[1]}'):
+                prefijos.setdefault(historia[0], nombre[:-len(historia[1]) - 1])
+    usados = set(prefijos.values())
+
+    grupos = {nombre: {} for nombre in orden}
+    for archivo in list(pertenencia) + [a for a in existentes if a not in pertenencia]:
+        if archivo in excluidos:
+            continue
+        nombre = pertenencia.get(archivo) or grupo_por_heuristica(archivo, prefijos, usados)
+        if nombre is None:
+            continue
+        # Imágenes y audios de una historia: a -inicio si son nivel 0, y de vuelta a su grupo si no.
+        # Datos: los JSON sueltos de nodos lejanos (historias sin paquete) van a -datos-diferidos
+        historia = _tipo_en_historia(archivo)
+        if historia and historia[1] in ('imagenes', 'audios', 'datos'):
+            heuristico = grupo_por_heuristica(archivo, prefijos, usados)
+            nivel = niveles.nivel_de(archivo, niveles_historias)
+            if historia[1] == 'datos':
+                nombre = heuristico if nivel == 0 else f'{heuristico}-diferidos'
+            elif nivel == 0:
+                nombre = f'{heuristico[:-len(historia[1])]}inicio'
+            elif nombre.endswith('-inicio'):
+                nombre = heuristico
+        actual = huella(raiz / ruta_en_disco(archivo))
+        if actual is None and archivo not in en_disco:
+            if podar:
+                avisos.append(f'🗑️  {archivo}: no existe en disco, se saca del manifiesto')
+                continue
+            actual = huellas_previas.get(archivo)
+            avisos.append(f'⚠️  {archivo}: no existe en disco, queda con la huella '
+                          f'{"anterior" if actual else "null (se baja una vez)"}')
+        grupos.setdefault(nombre, {})[archivo] = actual
+
+    # Orden estable: ./ primero y el resto alfabético; los grupos vacíos no se escriben.
+    # Los grupos van por prioridad (sorted es estable: dentro de cada una, el orden de antes)
+    resultado = []
+    for nombre, archivos in grupos.items():
+        if archivos:
+            claves = sorted(archivos, key=lambda a: (a != './', a))
+            prioridad = min(niveles.nivel_de(a, niveles_historias) for a in claves)
+            resultado.append((nombre, prioridad, {a: archivos[a] for a in claves}))
+    resultado.sort(key=lambda grupo: grupo[1])
+    return resultado, avisos
+
+
+def renderizar(grupos, sangria):
+    """Bloque del manifiesto (entre las marcas) listo para insertar en el SW."""
+    s = sangria
+    lineas = [f'{s}{MARCA_INICIO} — generado por .agents/skills/sw-updater/scripts/generar-manifiesto.py',
+              f'{s}const RUTAS_CACHE = [']
+    for i, (nombre, prioridad, archivos) in enumerate(grupos):
+        lineas += [f'{s}    {{', f"{s}        nombre: '{nombre}',", f'{s}        prioridad: {prioridad},',
+                   f'{s}        archivos: {{']
+        entradas = [f"{s}            '{a}': " + (f"'{h}'" if h else 'null') for a, h in archivos.items()]
+        lineas.append(',\n'.join(entradas))
+        lineas += [f'{s}        }}', f'{s}    }}' + (',' if i < len(grupos) - 1 else '')]
+    lineas += [f'{s}];', f'{s}{MARCA_FIN}']
+    return '\n'.join(lineas)
+
+
+def reemplazar_bloque(contenido_sw, bloque):
+    """El SW con el bloque del manifiesto reemplazado."""
+    m = re.search(rf'^([ \t]*){re.escape(MARCA_INICIO)}.*?{re.escape(MARCA_FIN)}[^\n]*', contenido_sw,
+                  re.DOTALL | re.MULTILINE)
+    if not m:
+        raise ErrorManifiesto(f'no tiene el bloque {MARCA_INICIO} … {MARCA_FIN}')
+    return contenido_sw[:m.start()] + bloque + contenido_sw[m.end():]
+
+
+def _escribir(ruta, contenido):
+    """Escribe con reemplazo atómico: quien lea el archivo nunca ve uno a medio escribir."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_text(contenido, encoding='utf-8', newline='')
+    os.replace(temporal, ruta)
+
+
+def generar(ruta_sw, origen=None, podar=False, verificar=False, saltos=None):
+    """
+    Regenera (o solo verifica) el manifiesto de `ruta_sw`; los archivos se buscan al lado del SW.
+    Retorna (estado, pendiente, avisos).
+    """
+    raiz = ruta_sw.parent
+    contenido = ruta_sw.read_text(encoding='utf-8')
+    _, _, grupos_origen = _cargar_script('analizar-sw').parsear_sw(origen or ruta_sw)
+    grupos, avisos = armar_grupos(raiz, grupos_origen, podar, saltos)
+
+    m = re.search(rf'^([ \t]*){re.escape(MARCA_INICIO)}', contenido, re.MULTILINE)
+    if not m:
+        raise ErrorManifiesto(f'{ruta_sw.name} no tiene el bloque {MARCA_INICIO} … {MARCA_FIN}')
+    nuevo = reemplazar_bloque(contenido, renderizar(grupos, m.group(1)))
+
+    cantidad = sum(len(archivos) for _, _, archivos in grupos)
+    criticos = sum(len(archivos) for _, prioridad, archivos in grupos if prioridad == 0)
+    resumen = f'{cantidad} archivos en {len(grupos)} grupos ({criticos} antes de activar)'
+    if nuevo == contenido:
+        return f'✅ al día: {resumen}', False, avisos
+    if verificar:
+        return '❌ manifiesto desactualizado: correr generar-manifiesto.py', True, avisos
+    _escribir(ruta_sw, nuevo)
+    return f'🧾 manifiesto generado: {resumen}', False, avisos
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='generar-manifiesto.py',
+        description='Genera RUTAS_CACHE del service-worker.js con la huella de cada archivo.')
+    parser.add_argument('--sw', metavar='RUTA_SW', default=None,
+                        help='Ruta al service-worker.js (default: el de la raíz del proyecto)')
+    parser.add_argument('--origen', metavar='RUTA_SW', default=None,
+                        help='SW del que se toman los grupos actuales (para migrar desde un SW viejo)')
+    parser.add_argument('--podar', action='store_true',
+                        help='Sacar del manifiesto los archivos que no existen en disco')
+    parser.add_argument('--saltos', type=int, default=None, metavar='N',
+                        help='Transiciones desde escena_inicial cuyos recursos son nivel 0 '
+                             '(default: el de niveles-precache.py)')
+    parser.add_argument('--verificar', action='store_true',
+                        help='No escribir nada: salir con código 1 si el manifiesto está desactualizado')
+    args = parser.parse_args()
+
+    ruta_sw = Path(args.sw) if args.sw else Path(__file__).resolve().parents[4] / 'service-worker.js'
+    if not ruta_sw.exists():
+        print(f'  ❌ No se encontró el SW en: {ruta_sw}')
+        return 1
+    try:
+        estado, pendiente, avisos = generar(ruta_sw, Path(args.origen) if args.origen else None,
+                                            podar=args.podar, verificar=args.verificar, saltos=args.saltos)
+    except ErrorManifiesto as e:
+        print(f'  ❌ {e}')
+        return 1
+    for aviso in avisos:
+        print(f'  {aviso}')
+    print(f'  {ruta_sw.name}: {estado}')
+    return 1 if pendiente else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+niveles-precache.py — Ordena los recursos de cada historia en niveles de precarga.
+
+El SW se activa apenas tiene el nivel 0 y baja el resto en segundo plano, así que
+lo que espera la primera visita deja de crecer con el tamaño de la historia.
+Los niveles salen del grafo de la historia, recorrido en anchura desde
+`escena_inicial` (sin mirar condiciones: una opción condicional cuenta igual):
+
+  0  crítico   el JSON y las imágenes que bloquean la primera pintura (las mismas
+               reglas que ImagePreloader, ver recursos_de() en auditar.py) de los
+               nodos a --saltos o menos del inicio, y las imágenes de la pantalla
+               de inicio (portada, tarjeta, logo). La app (biblioteca, CSS, JS) y
+               los datos de la historia (historia.json, paquete) también son 0.
+  1  después   el resto: imágenes de nodos más lejanos, audios (no bloquean)
+               y lo que no se referencia desde el grafo.
+  2  opcional  videos: FondoHelper muestra la imagen de fondo hasta que el
+               video está listo.
+
+generar-manifiesto.py usa nivel_de() para armar los grupos del SW y su
+`prioridad`: los recursos de nivel 0 de una historia van a `cache-{id}-inicio`.
+Las variantes de una imagen (imagenes/variantes/{escalón}/..., ver
+generar_variantes.py en la skill build) tienen el nivel de la original.
+
+Uso:
+  python niveles-precache.py                 # Resumen por historia y nivel
+  python niveles-precache.py --saltos 2      # Nivel 0 hasta dos transiciones del inicio
+  python niveles-precache.py --json          # Nivel de cada archivo
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import re
+import sys
+from collections import deque
+from pathlib import Path
+
+# Forzar UTF-8 en stdout (Windows usa cp1252 por defecto)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+RAIZ = Path(__file__).resolve().parents[4]
+
+# Transiciones desde escena_inicial cuyos recursos bloqueantes son nivel 0.
+# Con 1 alcanza para jugar: mientras se lee una escena, #precargarSiguientes baja las opciones.
+SALTOS = 1
+
+NIVELES = {0: 'crítico', 1: 'después', 2: 'opcional'}
+
+# Campos de historia.json con imágenes de la pantalla de inicio
+IMAGENES_INICIO = ('portada', 'tarjeta', 'logo')
+
+# Tipo de nodo → carpeta dentro de datos/
+CARPETAS = {'escena': 'escenas', 'desafio': 'desafios'}
+
+# Variante de una imagen → la original (imagenes/variantes/640/fondos/x.webp → imagenes/fondos/x.webp)
+VARIANTE = re.compile(r'/imagenes/variantes/\d+/')
+
+
+def _cargar_auditar():
+    """Importa auditar.py de la skill code-auditor (recursos_de() resuelve rutas como ImagePreloader)."""
+    ruta = Path(__file__).resolve().parents[2] / 'code-auditor' / 'scripts' / 'auditar.py'
+    spec = importlib.util.spec_from_file_location('auditar', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _leer_json(ruta):
+    try:
+        datos = json.loads(ruta.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return datos if isinstance(datos, dict) else None
+
+
+def _destinos(tipo, datos):
+    """Destinos (tipo, id) de un nodo, sin mirar condiciones."""
+    if tipo == 'desafio':
+        for campo in ('resultado_exito', 'resultado_fallo'):
+            resultado = datos.get(campo)
+            if isinstance(resultado, dict) and resultado.get('target'):
+                yield 'escena', resultado['target']
+        return
+    opciones = datos.get('opciones')
+    for opcion in opciones if isinstance(opciones, list) else []:
+        if isinstance(opcion, dict) and opcion.get('target') and opcion.get('accion') != 'reiniciar':
+            yield opcion.get('tipo_target') or 'escena', opcion['target']
+
+
+def distancias(dir_historia, escena_inicial):
+    """Recorrido en anchura desde la escena inicial: {(tipo, id): (saltos, datos)}."""
+    vistos = {}
+    pendientes = deque([('escena', escena_inicial, 0)])
+    while pendientes:
+        tipo, id_nodo, saltos = pendientes.popleft()
+        if (tipo, id_nodo) in vistos or tipo not in CARPETAS:
+            continue
+        datos = _leer_json(dir_historia / 'datos' / CARPETAS[tipo] / f'{id_nodo}.json')
+        if datos is None:
+            continue  # Target roto: lo reporta auditar.py
+        vistos[(tipo, id_nodo)] = (saltos, datos)
+        for destino in _destinos(tipo, datos):
+            pendientes.append((*destino, saltos + 1))
+    return vistos
+
+
+def niveles_de_historia(raiz, dir_historia, saltos=SALTOS, recursos_de=None):
+    """Nivel de cada recurso que el grafo de una historia referencia: {ruta relativa: nivel}."""
+    config = _leer_json(dir_historia / 'historia.json') or {}
+    prefijo = dir_historia.relative_to(raiz).as_posix() + '/'
+    recursos_de = recursos_de or _cargar_auditar().recursos_de
+    niveles = {}
+
+    def anotar(rel, nivel):
+        niveles[rel] = min(nivel, niveles.get(rel, nivel))
+
+    for campo in IMAGENES_INICIO:
+        if isinstance(config.get(campo), str) and config[campo]:
+            anotar(prefijo + config[campo], 0)
+
+    escena_inicial = config.get('escena_inicial')
+    nodos = distancias(dir_historia, escena_inicial) if isinstance(escena_inicial, str) else {}
+    for (tipo, id_nodo), (distancia, datos) in nodos.items():
+        cerca = distancia <= saltos
+        anotar(f'{prefijo}datos/{CARPETAS[tipo]}/{id_nodo}.json', 0 if cerca else 1)
+        for rel, clase in recursos_de(datos, prefijo):
+            if clase == 'imagen':
+                anotar(rel, 0 if cerca else 1)
+            else:
+                anotar(rel, 2 if clase == 'video' else 1)
+    return niveles
+
+
+def niveles(raiz, saltos=SALTOS):
+    """Nivel de los recursos referenciados de todas las historias: {ruta relativa: nivel}."""
+    recursos_de = _cargar_auditar().recursos_de
+    resultado = {}
+    dir_historias = raiz / 'historias'
+    for dir_historia in sorted(dir_historias.iterdir()) if dir_historias.is_dir() else []:
+        if (dir_historia / 'historia.json').exists():
+            resultado.update(niveles_de_historia(raiz, dir_historia, saltos, recursos_de))
+    return resultado
+
+
+def nivel_de(archivo, niveles_historias):
+    """Nivel de cualquier archivo del manifiesto (los que el grafo no referencia van por carpeta)."""
+    archivo = VARIANTE.sub('/imagenes/', archivo, count=1)
+    if archivo in niveles_historias:
+        return niveles_historias[archivo]
+    partes = archivo.split('/')
+    if partes[0] != 'historias' or len(partes) < 3:
+        return 0  # La app: biblioteca, CSS, JS
+    if partes[2] == 'videos':
+        return 2
+    if partes[2] in ('historia.json', 'datos'):
+        return 0  # historia.json y el paquete (los JSON sueltos de nodos lejanos los marca el grafo)
+    return 1
+
+
+def _resumen(raiz, niveles_historias):
+    """Por historia y nivel: cantidad de archivos y bytes."""
+    resumen = {}
+    for rel, nivel in sorted(niveles_historias.items()):
+        historia = rel.split('/')[1]
+        ruta = raiz / rel
+        bytes_ = ruta.stat().st_size if ruta.is_file() else 0
+        fila = resumen.setdefault(historia, {n: {'archivos': 0, 'bytes': 0} for n in NIVELES})[nivel]
+        fila['archivos'] += 1
+        fila['bytes'] += bytes_
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='niveles-precache.py',
+        description='Ordena los recursos de cada historia en niveles de precarga según su grafo.')
+    parser.add_argument('--saltos', type=int, default=SALTOS, metavar='N',
+                        help=f'Transiciones desde escena_inicial que cuentan como nivel 0 (default: {SALTOS})')
+    parser.add_argument('--json', action='store_true', help='Nivel de cada archivo en JSON')
+    args = parser.parse_args()
+
+    niveles_historias = niveles(RAIZ, args.saltos)
+    if args.json:
+        print(json.dumps(niveles_historias, ensure_ascii=False, indent=2, sort_keys=True))
+        return 0
+
+    formato_bytes = _cargar_auditar().formato_bytes
+    for historia, filas in _resumen(RAIZ, niveles_historias).items():
+        print(f'\n  📖 {historia}  (nivel 0 hasta {args.saltos} salto(s) del inicio)')
+        total = sum(f['bytes'] for f in filas.values()) or 1
+        for nivel, fila in filas.items():
+            porcentaje = 100 * fila['bytes'] / total
+            print(f'     {nivel} {NIVELES[nivel]:9s} {fila["archivos"]:4d} archivos  '
+                  f'{formato_bytes(fila["bytes"]):>9s}  ({porcentaje:.0f}%)')
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,12 @@
+import { FeatureFlags } from './FeatureFlags.js';
+
 /**
- * AudioManager — Stub para sistema de audio futuro.
- * 
- * Interfaz completa, implementación vacía.
- * Se rellena cuando haya archivos de audio disponibles.
+ * AudioManager — Música de fondo y efectos de sonido.
+ *
+ * La música va con un <audio> en loop. Los efectos cortos de la historia, si
+ * están empaquetados en sprites (datos/sonidos.json, ver empaquetar_sonidos.py
+ * en la skill build), se bajan y decodifican una sola vez con Web Audio y cada
+ * efecto se reproduce como un tramo del buffer; los que no, desde su archivo.
  */
 export class AudioManager {
 
@@ -30,6 +34,18 @@ export class AudioManager {
     /** Ruta base para resolver archivos de audio */
     #rutaBase = '';
 
+    /**
+     * Sprites de efectos de la historia activa.
+     * `tramos` y `buffers` quedan en null hasta que cargan (o si fallan: se usan los archivos sueltos).
+     * @type {{url: string|null, version: string|null, base: string, cargando: Promise<void>|null,
+     *         tramos: Object<string, {sprite: number, inicio: number, duracion: number}>|null,
+     *         buffers: AudioBuffer[]|null}}
+     */
+    #sonidos = { url: null, version: null, base: '', cargando: null, tramos: null, buffers: null };
+
+    /** AudioContext de los sprites (se crea al cargar el primero) */
+    #contexto = null;
+
     /** true cuando el BGM fue pausado automáticamente por pérdida de visibilidad */
     #pausadoPorVisibilidad = false;
 
@@ -54,9 +70,57 @@ export class AudioManager {
     /**
      * Configura la ruta base de la historia activa.
      * @param {string} rutaBase
+     * @param {{archivo: string, version: string}|null} [sonidos] — Campo `sonidos` de historia.json
      */
-    setRutaBase(rutaBase) {
+    setRutaBase(rutaBase, sonidos = null) {
         this.#rutaBase = rutaBase;
+        this.#sonidos = {
+            url: sonidos?.archivo ? rutaBase + sonidos.archivo : null,
+            version: sonidos?.version ?? null,
+            base: rutaBase,
+            cargando: null,
+            tramos: null,
+            buffers: null
+        };
+    }
+
+    /**
+     * Baja y decodifica los sprites de efectos de la historia (una sola vez por historia).
+     * GameEngine lo llama al entrar a un desafío, así el primer efecto no espera la red.
+     * No falla: si algo sale mal, los efectos se reproducen desde sus archivos sueltos.
+     * @returns {Promise<void>}
+     */
+    prepararEfectos() {
+        const sonidos = this.#sonidos;
+        if (!sonidos.url || !FeatureFlags.spritesHabilitados) return Promise.resolve();
+        sonidos.cargando ??= this.#cargarSprites(sonidos);
+        return sonidos.cargando;
+    }
+
+    /**
+     * @param {object} sonidos — El #sonidos de la historia que pidió la carga
+     */
+    async #cargarSprites(sonidos) {
+        const Contexto = window.AudioContext ?? window.webkitAudioContext;
+        if (!Contexto) return;
+        try {
+            const respuesta = await fetch(sonidos.url);
+            if (!respuesta.ok) throw new Error(`HTTP ${respuesta.status}`);
+            const tabla = await respuesta.json();
+            if (tabla.version !== sonidos.version) {
+                throw new Error(`versión ${tabla.version}, historia.json espera ${sonidos.version}`);
+            }
+            this.#contexto ??= new Contexto();
+            const buffers = await Promise.all(tabla.sprites.map(async (ruta) => {
+                const sprite = await fetch(sonidos.base + ruta);
+                if (!sprite.ok) throw new Error(`HTTP ${sprite.status} en ${ruta}`);
+                return this.#contexto.decodeAudioData(await sprite.arrayBuffer());
+            }));
+            sonidos.tramos = tabla.sonidos;
+            sonidos.buffers = buffers;
+        } catch (e) {
+            console.warn('[AudioManager] Sprites de efectos no disponibles, se usan los archivos sueltos:', e);
+        }
     }
 
     /**
@@ -116,11 +180,46 @@ export class AudioManager {
     }
 
     /**
-     * Reproduce un efecto de sonido.
+     * Reproduce un efecto de sonido: el tramo de su sprite si está empaquetado, si no el archivo.
      * @param {string} archivo — Nombre del archivo del efecto de sonido
      */
     reproducirEfecto(archivo) {
         if (!archivo || this.#devSilenciado) return;
+        const sonidos = this.#sonidos;
+        // Si el sprite todavía está bajando se lo espera: llega antes que el archivo suelto
+        this.prepararEfectos().then(() => {
+            if (sonidos !== this.#sonidos || this.#devSilenciado) return;
+            const tramo = FeatureFlags.spritesHabilitados ? sonidos.tramos?.[archivo] : null;
+            if (tramo) {
+                this.#reproducirTramo(sonidos.buffers[tramo.sprite], tramo);
+            } else {
+                this.#reproducirArchivo(archivo);
+            }
+        });
+    }
+
+    /**
+     * @param {AudioBuffer} buffer — Sprite decodificado
+     * @param {{inicio: number, duracion: number}} tramo — En segundos
+     */
+    #reproducirTramo(buffer, tramo) {
+        const contexto = this.#contexto;
+        if (contexto.state === 'suspended') {
+            // Creado antes del primer toque: el efecto lo dispara un toque, así que ya se puede reanudar
+            contexto.resume().catch(() => { });
+        }
+        const fuente = contexto.createBufferSource();
+        fuente.buffer = buffer;
+        const volumen = contexto.createGain();
+        volumen.gain.value = this.#muteado ? 0 : this.#VOL_SFX;
+        fuente.connect(volumen).connect(contexto.destination);
+        fuente.start(0, tramo.inicio, tramo.duracion);
+    }
+
+    /**
+     * @param {string} archivo — Nombre del archivo del efecto de sonido
+     */
+    #reproducirArchivo(archivo) {
         const rutaCompleta = this.#rutaBase ? (this.#rutaBase + 'audios/' + archivo) : archivo;
         const sfx = new Audio(rutaCompleta);
         sfx.volume = this.#VOL_SFX;
@@ -21,7 +21,7 @@ export class BibliotecaManager {
     /** @type {HTMLElement} */
     #contenedorHistorias;
 
-    /** Cache de configs cargadas: Map<id, {config, ruta}> */
+    /** Cache de historia.json completos ya cargados: Map<id, {config, ruta}> */
     #historiasCache = new Map();
 
     /** @type {HTMLElement} */
@@ -73,13 +73,14 @@ export class BibliotecaManager {
             if (!respuesta.ok) throw new Error(`HTTP ${respuesta.status}`);
             const catalogo = await respuesta.json();
 
-            // Cargar cada historia.json
+            // Las entradas generadas (generar_catalogo.py) ya traen los datos de la tarjeta;
+            // las demás necesitan su historia.json antes de poder mostrarse
             const promesas = catalogo.historias.map(async (entrada) => {
+                if (entrada.archivos && entrada.titulo && entrada.tarjeta) {
+                    return { config: entrada, ruta: entrada.ruta };
+                }
                 try {
-                    const resp = await fetch(`${entrada.ruta}historia.json`);
-                    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
-                    const config = await resp.json();
-                    this.#historiasCache.set(config.id, { config, ruta: entrada.ruta });
+                    const config = await this.#cargarConfig(entrada.id, entrada.ruta);
                     return { config, ruta: entrada.ruta };
                 } catch (error) {
                     console.error(`[BibliotecaManager] Error cargando historia "${entrada.id}":`, error);
@@ -108,9 +109,26 @@ export class BibliotecaManager {
         if (this.#onMostrarBiblioteca) this.#onMostrarBiblioteca();
     }
 
+    /**
+     * Carga el historia.json completo de una historia (memoizado).
+     * @param {string} id
+     * @param {string} ruta — Ruta base de la historia
+     * @returns {Promise<object>}
+     */
+    async #cargarConfig(id, ruta) {
+        const cacheada = this.#historiasCache.get(id);
+        if (cacheada) return cacheada.config;
+
+        const resp = await fetch(`${ruta}historia.json`);
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        const config = await resp.json();
+        this.#historiasCache.set(id, { config, ruta });
+        return config;
+    }
+
     /**
      * Renderiza las tarjetas de historias disponibles.
-     * @param {Array<{config: object, ruta: string}>} historias
+     * @param {Array<{config: object, ruta: string}>} historias — `config` puede ser la entrada del catálogo
      */
     #renderizarTarjetas(historias) {
         this.#contenedorHistorias.innerHTML = '';
@@ -140,7 +158,7 @@ export class BibliotecaManager {
 
     /**
      * Maneja la selección de una historia.
-     * @param {object} config — Datos del historia.json
+     * @param {object} config — Datos del historia.json o entrada del catálogo (solo se usa el id)
      * @param {string} ruta — Ruta base de la historia
      */
     async #seleccionarHistoria(config, ruta) {
@@ -236,11 +254,20 @@ export class BibliotecaManager {
             console.warn('[BibliotecaManager] No se pudo entrar en pantalla completa:', err);
         }
 
+        // La tarjeta puede venir del catálogo: el motor necesita el historia.json completo
+        let configCompleta;
+        try {
+            configCompleta = await this.#cargarConfig(config.id, ruta);
+        } catch (error) {
+            console.error(`[BibliotecaManager] Error cargando historia "${config.id}":`, error);
+            return;
+        }
+
         // Ocultar biblioteca
         this.#pantallaEl.classList.add('oculto');
 
         // Delegar al GameEngine
-        await this.#engine.cargarHistoria(config, ruta, () => {
+        await this.#engine.cargarHistoria(configCompleta, ruta, () => {
             // Callback: volver a la biblioteca
             this.mostrar();
         }, resetear);
@@ -1,15 +1,45 @@
+import { FeatureFlags } from './FeatureFlags.js';
+
 /**
  * ContentLoader — Carga de JSONs bajo demanda con cache en memoria.
  * 
  * Centraliza todos los fetch() a escenas y desafíos.
  * Soporta rutas dinámicas por historia activa.
  * Una vez cargado un JSON, queda en cache y no se vuelve a pedir.
+ *
+ * Si la historia tiene paquete (campo `paquete` de historia.json, generado por
+ * .agents/skills/build/scripts/empaquetar.py), lee las escenas y desafíos de
+ * `datos/paquete.jsonl`: entero en un solo pedido si es chico, o por rangos
+ * (header Range) si es grande. Ante cualquier problema con el paquete vuelve
+ * a los JSON sueltos.
+ *
+ * Si además tiene mapa de precarga (campo `precarga`, generado por
+ * .agents/skills/build/scripts/generar_precarga.py), siguientesDe() dice qué
+ * JSON e imágenes conviene precargar desde cada escena o desafío.
  */
 export class ContentLoader {
 
     /** @type {Map<string, object>} Cache de contenido ya cargado */
     #cache = new Map();
 
+    /** Tamaño (bytes) hasta el que el paquete se baja entero; más grande, por rangos */
+    #MAX_PAQUETE_COMPLETO = 512 * 1024;
+
+    /**
+     * Paquete de la historia activa, o null si usa los JSON sueltos.
+     * @type {{url: string, version: string, bytes: number, bytesIndice: number,
+     *         indice: Promise<object>|null, cuerpo: Promise<ArrayBuffer>|null}|null}
+     */
+    #paquete = null;
+
+    /**
+     * Mapa de precarga de la historia activa, o null si no tiene.
+     * @type {{url: string, version: string, mapa: Promise<object|null>|null}|null}
+     */
+    #precarga = null;
+
+    #decodificador = new TextDecoder();
+
     /** Ruta base de la historia activa (ej: "historias/el-misterio-del-bosque-encantado/") */
     #rutaBaseHistoria = '';
 
@@ -23,12 +53,31 @@ export class ContentLoader {
      * Configura la ruta base de la historia activa.
      * Limpia la cache al cambiar de historia.
      * @param {string} rutaBase — Ruta base (ej: "historias/el-misterio-del-bosque-encantado/")
+     * @param {object|null} paquete — Campo `paquete` del historia.json (opcional)
+     * @param {object|null} precarga — Campo `precarga` del historia.json (opcional)
      */
-    setRutaBase(rutaBase) {
+    setRutaBase(rutaBase, paquete = null, precarga = null) {
         if (this.#rutaBaseHistoria !== rutaBase) {
             this.#cache.clear();
         }
         this.#rutaBaseHistoria = rutaBase;
+
+        const url = paquete ? rutaBase + paquete.archivo : null;
+        if (url !== this.#paquete?.url || paquete?.version !== this.#paquete?.version) {
+            this.#paquete = paquete ? {
+                url,
+                version: paquete.version,
+                bytes: paquete.bytes,
+                bytesIndice: paquete.bytes_indice,
+                indice: null,
+                cuerpo: null
+            } : null;
+        }
+
+        const urlPrecarga = precarga ? rutaBase + precarga.archivo : null;
+        if (urlPrecarga !== this.#precarga?.url || precarga?.version !== this.#precarga?.version) {
+            this.#precarga = precarga ? { url: urlPrecarga, version: precarga.version, mapa: null } : null;
+        }
     }
 
     /**
@@ -49,6 +98,14 @@ export class ContentLoader {
             throw new Error(`[ContentLoader] Tipo desconocido: "${tipo}"`);
         }
 
+        if (this.#paquete && FeatureFlags.paqueteHabilitado) {
+            const datos = await this.#cargarDelPaquete(clave);
+            if (datos) {
+                this.#cache.set(clave, datos);
+                return datos;
+            }
+        }
+
         const url = `${this.#rutaBaseHistoria}${rutaRelativa}${id}.json`;
 
         try {
@@ -65,6 +122,127 @@ export class ContentLoader {
         }
     }
 
+    /**
+     * Lee una entrada del paquete. Retorna null si no está o si el paquete no
+     * se pudo usar (en ese caso lo descarta y se vuelve a los JSON sueltos).
+     * @param {string} clave — "tipo:id"
+     * @returns {Promise<object|null>}
+     */
+    async #cargarDelPaquete(clave) {
+        const paquete = this.#paquete;
+        try {
+            if (!paquete.indice) {
+                paquete.indice = this.#leerPaquete(paquete, 0, paquete.bytesIndice).then(bytes => {
+                    const indice = JSON.parse(this.#decodificador.decode(bytes));
+                    if (indice.version !== paquete.version) {
+                        throw new Error(`versión ${indice.version}, historia.json espera ${paquete.version}`);
+                    }
+                    return indice;
+                });
+            }
+            const indice = await paquete.indice;
+            const entrada = indice.entradas[clave];
+            if (!entrada) return null;
+
+            const [inicio, largo] = entrada;
+            const bytes = await this.#leerPaquete(paquete, paquete.bytesIndice + inicio, largo);
+            return JSON.parse(this.#decodificador.decode(bytes));
+        } catch (error) {
+            console.warn(`[ContentLoader] Paquete inutilizable (${paquete.url}), se usan los JSON sueltos:`, error);
+            if (this.#paquete === paquete) {
+                this.#paquete = null;
+            }
+            return null;
+        }
+    }
+
+    /**
+     * Bytes [inicio, inicio + largo) del paquete. Si es chico lo baja entero una
+     * sola vez; si no, pide solo ese rango. Cuando el servidor ignora el Range
+     * (responde 200 con el archivo completo) se queda con el archivo entero.
+     * @returns {Promise<Uint8Array>}
+     */
+    async #leerPaquete(paquete, inicio, largo) {
+        if (!paquete.cuerpo && paquete.bytes <= this.#MAX_PAQUETE_COMPLETO) {
+            paquete.cuerpo = this.#pedirPaquete(paquete.url).then(r => r.arrayBuffer());
+        }
+
+        if (!paquete.cuerpo) {
+            const respuesta = await this.#pedirPaquete(paquete.url, {
+                headers: { Range: `bytes=${inicio}-${inicio + largo - 1}` }
+            });
+            if (respuesta.status === 206) {
+                return new Uint8Array(await respuesta.arrayBuffer());
+            }
+            paquete.cuerpo ??= respuesta.arrayBuffer();
+        }
+
+        const cuerpo = await paquete.cuerpo;
+        if (cuerpo.byteLength !== paquete.bytes) {
+            throw new Error(`tamaño ${cuerpo.byteLength}, historia.json espera ${paquete.bytes}`);
+        }
+        return new Uint8Array(cuerpo, inicio, largo);
+    }
+
+    async #pedirPaquete(url, opciones) {
+        const respuesta = await fetch(url, opciones);
+        if (!respuesta.ok) {
+            throw new Error(`HTTP ${respuesta.status} al cargar ${url}`);
+        }
+        return respuesta;
+    }
+
+    /**
+     * Qué precargar desde una escena o desafío según el mapa de precarga, de más
+     * a menos probable. Retorna null si la historia no tiene mapa, si el mapa no
+     * se pudo usar o si el nodo no está en él (el motor mira entonces un salto).
+     * @param {'escena'|'desafio'} tipo
+     * @param {string} id
+     * @returns {Promise<{nodos: Array<['escena'|'desafio', string]>, imagenes: string[]}|null>}
+     *          `imagenes` son rutas dentro de la historia (ImagePreloader.resolverImagen las resuelve)
+     */
+    async siguientesDe(tipo, id) {
+        const precarga = this.#precarga;
+        if (!precarga) return null;
+
+        if (!precarga.mapa) {
+            precarga.mapa = fetch(precarga.url)
+                .then(respuesta => {
+                    if (!respuesta.ok) {
+                        throw new Error(`HTTP ${respuesta.status} al cargar ${precarga.url}`);
+                    }
+                    return respuesta.json();
+                })
+                .then(mapa => {
+                    if (mapa.version !== precarga.version) {
+                        throw new Error(`versión ${mapa.version}, historia.json espera ${precarga.version}`);
+                    }
+                    return {
+                        ...mapa,
+                        posicion: new Map(mapa.nodos.map((clave, i) => [clave, i]))
+                    };
+                })
+                .catch(error => {
+                    console.warn(`[ContentLoader] Mapa de precarga inutilizable (${precarga.url}), se mira un salto:`, error);
+                    return null;
+                });
+        }
+
+        const mapa = await precarga.mapa;
+        const i = mapa?.posicion.get(`${tipo}:${id}`);
+        if (i === undefined) return null;
+
+        const [nodos, imagenes] = mapa.precarga[i];
+        return {
+            nodos: nodos.map(n => {
+                const clave = mapa.nodos[n];
+                const separador = clave.indexOf(':');
+                return [clave.slice(0, separador), clave.slice(separador + 1)];
+            }),
+            imagenes: imagenes.map(n => mapa.imagenes[n])
+        };
+    }
+
     /**
      * Atajo para cargar una escena.
      * @param {string} id 
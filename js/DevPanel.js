@@ -44,7 +44,10 @@ export class DevPanel {
         sinFullscreen: false,
         sinTransiciones: false,
         sinAudio: false,
-        sinVideos: false
+        sinVideos: false,
+        sinPaquete: false,
+        sinVariantes: false,
+        sinSprites: false
     };
 
     /** Referencia original a requestFullscreen para restaurar */
@@ -87,6 +90,9 @@ export class DevPanel {
         this.#restaurarTransiciones();
         this.#restaurarAudio();
         this.#restaurarVideos();
+        this.#restaurarPaquete();
+        this.#restaurarVariantes();
+        this.#restaurarSprites();
 
         // Remover elementos del DOM
         if (this.#panelEl) {
@@ -304,6 +310,27 @@ export class DevPanel {
                             <span class="dev-toggle-slider"></span>
                         </label>
                     </div>
+                    <div class="dev-toggle-fila">
+                        <span class="dev-toggle-label">Ignorar paquete de datos</span>
+                        <label class="dev-toggle">
+                            <input type="checkbox" id="dev-toggle-paquete">
+                            <span class="dev-toggle-slider"></span>
+                        </label>
+                    </div>
+                    <div class="dev-toggle-fila">
+                        <span class="dev-toggle-label">Imágenes originales (sin variantes)</span>
+                        <label class="dev-toggle">
+                            <input type="checkbox" id="dev-toggle-variantes">
+                            <span class="dev-toggle-slider"></span>
+                        </label>
+                    </div>
+                    <div class="dev-toggle-fila">
+                        <span class="dev-toggle-label">Efectos sueltos (sin sprites)</span>
+                        <label class="dev-toggle">
+                            <input type="checkbox" id="dev-toggle-sprites">
+                            <span class="dev-toggle-slider"></span>
+                        </label>
+                    </div>
                 </div>
             </div>
         `;
@@ -382,6 +409,24 @@ export class DevPanel {
             this.#aplicarToggleVideos();
             this.#persistirDevConfig();
         });
+
+        this.#panelEl.querySelector('#dev-toggle-paquete')?.addEventListener('change', (e) => {
+            this.#devConfig.sinPaquete = e.target.checked;
+            this.#aplicarTogglePaquete();
+            this.#persistirDevConfig();
+        });
+
+        this.#panelEl.querySelector('#dev-toggle-variantes')?.addEventListener('change', (e) => {
+            this.#devConfig.sinVariantes = e.target.checked;
+            this.#aplicarToggleVariantes();
+            this.#persistirDevConfig();
+        });
+
+        this.#panelEl.querySelector('#dev-toggle-sprites')?.addEventListener('change', (e) => {
+            this.#devConfig.sinSprites = e.target.checked;
+            this.#aplicarToggleSprites();
+            this.#persistirDevConfig();
+        });
     }
 
     #manejarAccion(accion, targetEl) {
@@ -761,11 +806,17 @@ export class DevPanel {
         const tTransiciones = this.#panelEl.querySelector('#dev-toggle-transiciones');
         const tAudio = this.#panelEl.querySelector('#dev-toggle-audio');
         const tVideos = this.#panelEl.querySelector('#dev-toggle-videos');
+        const tPaquete = this.#panelEl.querySelector('#dev-toggle-paquete');
+        const tVariantes = this.#panelEl.querySelector('#dev-toggle-variantes');
+        const tSprites = this.#panelEl.querySelector('#dev-toggle-sprites');
 
         if (tFullscreen) tFullscreen.checked = this.#devConfig.sinFullscreen;
         if (tTransiciones) tTransiciones.checked = this.#devConfig.sinTransiciones;
         if (tAudio) tAudio.checked = this.#devConfig.sinAudio;
         if (tVideos) tVideos.checked = this.#devConfig.sinVideos;
+        if (tPaquete) tPaquete.checked = this.#devConfig.sinPaquete;
+        if (tVariantes) tVariantes.checked = this.#devConfig.sinVariantes;
+        if (tSprites) tSprites.checked = this.#devConfig.sinSprites;
     }
 
     #aplicarDevConfig() {
@@ -773,6 +824,9 @@ export class DevPanel {
         this.#aplicarToggleTransiciones();
         this.#aplicarToggleAudio();
         this.#aplicarToggleVideos();
+        this.#aplicarTogglePaquete();
+        this.#aplicarToggleVariantes();
+        this.#aplicarToggleSprites();
     }
 
     #aplicarToggleVideos() {
@@ -783,6 +837,30 @@ export class DevPanel {
         FeatureFlags.videosHabilitados = true;
     }
 
+    #aplicarTogglePaquete() {
+        FeatureFlags.paqueteHabilitado = !this.#devConfig.sinPaquete;
+    }
+
+    #restaurarPaquete() {
+        FeatureFlags.paqueteHabilitado = true;
+    }
+
+    #aplicarToggleVariantes() {
+        FeatureFlags.variantesHabilitadas = !this.#devConfig.sinVariantes;
+    }
+
+    #restaurarVariantes() {
+        FeatureFlags.variantesHabilitadas = true;
+    }
+
+    #aplicarToggleSprites() {
+        FeatureFlags.spritesHabilitados = !this.#devConfig.sinSprites;
+    }
+
+    #restaurarSprites() {
+        FeatureFlags.spritesHabilitados = true;
+    }
+
     #aplicarToggleFullscreen() {
         if (this.#devConfig.sinFullscreen) {
             if (!this.#requestFullscreenOriginal) {
@@ -850,7 +928,10 @@ export class DevPanel {
                     sinFullscreen: datos.sinFullscreen ?? false,
                     sinTransiciones: datos.sinTransiciones ?? false,
                     sinAudio: datos.sinAudio ?? false,
-                    sinVideos: datos.sinVideos ?? false
+                    sinVideos: datos.sinVideos ?? false,
+                    sinPaquete: datos.sinPaquete ?? false,
+                    sinVariantes: datos.sinVariantes ?? false,
+                    sinSprites: datos.sinSprites ?? false
                 };
             }
         } catch (e) { /* no crítico */ }
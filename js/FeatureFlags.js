@@ -7,6 +7,9 @@
  *
  * Consumidores:
  *   - FondoHelper.js: consulta `videosHabilitados` antes de crear <video>
+ *   - ContentLoader.js: consulta `paqueteHabilitado` antes de leer del paquete de la historia
+ *   - ImagePreloader.js: consulta `variantesHabilitadas` antes de elegir una variante de imagen
+ *   - AudioManager.js: consulta `spritesHabilitados` antes de reproducir un efecto desde su sprite
  *
  * Productores:
  *   - DevPanel.js: setea los flags via toggles de "Configuración Dev"
@@ -17,5 +20,30 @@ export const FeatureFlags = {
      * Habilitado por defecto en producción.
      * @type {boolean}
      */
-    videosHabilitados: true
+    videosHabilitados: true,
+
+    /**
+     * Lee escenas y desafíos del paquete de la historia (datos/paquete.jsonl)
+     * cuando existe. Deshabilitado, se leen los JSON sueltos (útil mientras se
+     * editan escenas sin volver a empaquetar).
+     * Habilitado por defecto en producción.
+     * @type {boolean}
+     */
+    paqueteHabilitado: true,
+
+    /**
+     * Usa las variantes de imágenes del escalón de la pantalla (imagenes/variantes/)
+     * cuando la historia las tiene. Deshabilitado, se piden siempre las originales.
+     * Habilitado por defecto en producción.
+     * @type {boolean}
+     */
+    variantesHabilitadas: true,
+
+    /**
+     * Reproduce los efectos de sonido desde los sprites de la historia (audios/sprites/)
+     * cuando existen. Deshabilitado, cada efecto se pide a su archivo suelto.
+     * Habilitado por defecto en producción.
+     * @type {boolean}
+     */
+    spritesHabilitados: true
 };
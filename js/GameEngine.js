@@ -28,6 +28,9 @@ export class GameEngine {
     /** Flag para prevenir navegación múltiple simultánea */
     #navegando = false;
 
+    /** Se incrementa en cada navegación: la precarga de un nodo anterior deja de encolar imágenes */
+    #generacionPrecarga = 0;
+
     /** Callbacks registrados para cambio de escena/desafío */
     #onCambioEscenaCallbacks = [];
 
@@ -67,9 +70,9 @@ export class GameEngine {
         this.#onVolverBiblioteca = onVolverBiblioteca;
 
         // Configurar módulos con la ruta de la historia
-        this.#contentLoader.setRutaBase(rutaBase);
-        this.#preloader.setRutaBase(rutaBase);
-        this.#audioManager.setRutaBase(rutaBase);
+        this.#contentLoader.setRutaBase(rutaBase, configHistoria.paquete ?? null, configHistoria.precarga ?? null);
+        this.#preloader.setRutaBase(rutaBase, configHistoria.variantes ?? null);
+        this.#audioManager.setRutaBase(rutaBase, configHistoria.sonidos ?? null);
         this.#stateManager.setHistoriaActual(configHistoria.id);
 
         // Establecer logo de carga de esta historia
@@ -266,13 +269,15 @@ export class GameEngine {
      * @param {string} id — ID de la escena
      */
     async #cargarEscena(id) {
+        this.#generacionPrecarga++;
         try {
             this.#uiManager.mostrarCarga();
 
             // Cargar el JSON
             const datos = await this.#contentLoader.cargarEscena(id);
 
-            // Pre-cargar las imágenes de esta escena
+            // Pre-cargar las imágenes de esta escena (con la variante de esta pantalla, si hay)
+            await this.#preloader.variantesListas();
             const imagenes = this.#preloader.extraerImagenes(datos);
             await this.#preloader.precargar(imagenes);
 
@@ -303,7 +308,7 @@ export class GameEngine {
             }
 
             // Pre-cargar escenas siguientes (fire and forget)
-            this.#precargarSiguientes(datos.opciones);
+            this.#precargarSiguientes('escena', id, datos);
 
             this.#uiManager.ocultarCarga();
 
@@ -318,13 +323,18 @@ export class GameEngine {
      * @param {string} id — ID del desafío
      */
     async #cargarDesafio(id) {
+        this.#generacionPrecarga++;
         try {
             this.#uiManager.mostrarCarga();
 
             // Cargar el JSON
             const datos = await this.#contentLoader.cargarDesafio(id);
 
+            // Sprites de efectos: bajan y se decodifican mientras se precargan las imágenes
+            this.#audioManager.prepararEfectos();
+
             // Pre-cargar imágenes del desafío
+            await this.#preloader.variantesListas();
             const imagenes = this.#preloader.extraerImagenes(datos);
             await this.#preloader.precargar(imagenes);
 
@@ -340,6 +350,9 @@ export class GameEngine {
                 this.#audioManager.detenerFondo();
             }
 
+            // Pre-cargar las escenas de éxito y fallo mientras se juega (fire and forget)
+            this.#precargarSiguientes('desafio', id, datos);
+
             // Ejecutar el desafío
             const resultado = await this.#challengeManager.ejecutar(datos, this.#stateManager);
 
@@ -465,23 +478,41 @@ export class GameEngine {
     }
 
     /**
-     * Pre-carga las escenas/desafíos referenciadas en las opciones actuales.
-     * @param {Array} opciones
+     * Pre-carga lo que puede venir después de una escena o desafío.
+     * Con mapa de precarga (ver ContentLoader.siguientesDe) baja los JSON y las
+     * imágenes de varios saltos adelante, de más a menos probable. Sin mapa mira
+     * un salto: las opciones de la escena o los resultados del desafío.
+     * @param {'escena'|'desafio'} tipo
+     * @param {string} id
+     * @param {object} datos — Datos del nodo actual
      */
-    #precargarSiguientes(opciones) {
-        if (!opciones || opciones.length === 0) return;
+    async #precargarSiguientes(tipo, id, datos) {
+        const generacion = this.#generacionPrecarga;
+        const siguientes = await this.#contentLoader.siguientesDe(tipo, id);
+        if (generacion !== this.#generacionPrecarga) return;
+
+        if (siguientes) {
+            for (const [tipoNodo, idNodo] of siguientes.nodos) {
+                this.#contentLoader.precargar(tipoNodo, idNodo);
+            }
+            const imagenes = siguientes.imagenes.map(ruta => this.#preloader.resolverImagen(ruta));
+            this.#preloader.precargarEnOrden(imagenes, () => generacion !== this.#generacionPrecarga);
+            return;
+        }
 
-        for (const opcion of opciones) {
-            if (!opcion.target) continue;
+        const destinos = tipo === 'desafio'
+            ? [datos.resultado_exito, datos.resultado_fallo].filter(Boolean).map(r => ['escena', r.target])
+            : (datos.opciones ?? []).map(o => [o.tipo_target || 'escena', o.target]);
 
-            const tipo = opcion.tipo_target || 'escena';
+        for (const [tipoDestino, target] of destinos) {
+            if (!target) continue;
 
             // Pre-cargar el JSON
-            this.#contentLoader.precargar(tipo, opcion.target);
+            this.#contentLoader.precargar(tipoDestino, target);
 
             // Pre-cargar las imágenes del siguiente contenido (async)
-            this.#contentLoader.cargar(tipo, opcion.target).then(datos => {
-                const imagenes = this.#preloader.extraerImagenes(datos);
+            this.#contentLoader.cargar(tipoDestino, target).then(datosDestino => {
+                const imagenes = this.#preloader.extraerImagenes(datosDestino);
                 this.#preloader.precargar(imagenes);
             }).catch(() => {
                 // No es crítico si falla la precarga
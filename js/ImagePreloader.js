@@ -1,35 +1,142 @@
+import { FeatureFlags } from './FeatureFlags.js';
+
+/**
+ * Anchos del escenario 16:9 (px físicos) para los que hay variantes.
+ * Tienen que coincidir con ESCALONES de generar_variantes.py.
+ */
+export const ESCALONES_IMAGENES = [640, 1280, 1920];
+
+/** Clave de localStorage con el escalón elegido en la primera visita */
+const CLAVE_ESCALON = 'biblioteca.escalon';
+
+/**
+ * Escalón para la pantalla y la red de ahora: el menor que cubre el escenario a la
+ * densidad de la pantalla (hasta 2x; 1x con ahorro de datos o red 2G/3G), o null
+ * si la pantalla es más grande que todos (se usan las originales).
+ * @returns {number|null}
+ */
+function elegirEscalon() {
+    const conexion = navigator.connection;
+    const ahorro = conexion?.saveData || /2g|3g/.test(conexion?.effectiveType ?? '');
+    const densidad = ahorro ? 1 : Math.min(window.devicePixelRatio || 1, 2);
+    // El juego es apaisado: el lado largo de la pantalla es el ancho
+    const largo = Math.max(screen.width, screen.height);
+    const corto = Math.min(screen.width, screen.height);
+    const ancho = Math.min(largo, corto * 16 / 9) * densidad;
+    return ESCALONES_IMAGENES.find(escalon => escalon >= ancho) ?? null;
+}
+
+/**
+ * Escalón de imágenes de este dispositivo. Se elige en la primera visita
+ * (elegirEscalon) y queda guardado: la red cambia de un día a otro, y main.js
+ * registra el Service Worker con el escalón en la URL (otra URL instala un
+ * worker nuevo, vuelve a precachear y recarga la página). Así el SW y
+ * ImagePreloader eligen siempre las mismas imágenes. Sin localStorage se
+ * elige en cada visita.
+ * @returns {number|null}
+ */
+export function escalonDePantalla() {
+    try {
+        const guardado = localStorage.getItem(CLAVE_ESCALON);
+        if (guardado === 'original') return null;
+        // Un escalón que ya no existe (cambiaron ESCALONES_IMAGENES) se vuelve a elegir
+        if (ESCALONES_IMAGENES.includes(Number(guardado))) return Number(guardado);
+    } catch (e) { /* localStorage no disponible */ }
+
+    const escalon = elegirEscalon();
+    try {
+        localStorage.setItem(CLAVE_ESCALON, escalon ?? 'original');
+    } catch (e) { /* no crítico */ }
+    return escalon;
+}
+
 /**
  * ImagePreloader — Precarga de imágenes pesadas.
  * 
  * Usa new Image() para forzar la descarga anticipada.
  * Soporta rutas dinámicas por historia activa.
+ *
+ * Si la historia tiene variantes (campo `variantes` de historia.json, generado por
+ * .agents/skills/build/scripts/generar_variantes.py), resolverRuta() devuelve la
+ * variante del escalón de esta pantalla (escalonDePantalla) en vez de la original.
  */
 export class ImagePreloader {
 
     /** Ruta base de la historia activa */
     #rutaBaseHistoria = '';
 
-    /** Rutas relativas dentro de cada historia */
+    /** Rutas relativas dentro de cada historia (las de imágenes, dentro de imagenes/) */
     #rutasRelativas = {
-        fondos: 'imagenes/fondos/',
-        personajes: 'imagenes/personajes/',
-        objetos: 'imagenes/objetos/',
+        imagenes: 'imagenes/',
+        variantes: 'imagenes/variantes/',
+        fondos: 'fondos/',
+        personajes: 'personajes/',
+        objetos: 'objetos/',
         videos: 'videos/'
     };
 
+    /** Escalón de esta pantalla (ver escalonDePantalla) */
+    #escalon = escalonDePantalla();
+
+    /**
+     * Variantes de la historia activa, o null si usa las originales.
+     * `imagenes` se completa al leer datos/variantes.json; hasta entonces (o si
+     * falla) resolverRuta() devuelve las originales.
+     * @type {{url: string, version: string, imagenes: object|null}|null}
+     */
+    #variantes = null;
+
+    /** Se resuelve cuando las variantes de la historia activa están listas (o no hay) */
+    #variantesListas = Promise.resolve();
+
     /** Set de URLs ya precargadas (evita trabajo duplicado) */
     #precargadas = new Set();
 
+    /** Imágenes que precargarEnOrden() pide a la vez */
+    #SIMULTANEAS = 4;
+
     /**
      * Configura la ruta base de la historia activa.
      * Limpia las precargadas al cambiar de historia.
      * @param {string} rutaBase — Ruta base (ej: "historias/el-misterio-del-bosque-encantado/")
+     * @param {object|null} variantes — Campo `variantes` del historia.json (opcional)
      */
-    setRutaBase(rutaBase) {
+    setRutaBase(rutaBase, variantes = null) {
         if (this.#rutaBaseHistoria !== rutaBase) {
             this.#precargadas.clear();
         }
         this.#rutaBaseHistoria = rutaBase;
+
+        const url = variantes ? rutaBase + variantes.archivo : null;
+        if (url === this.#variantes?.url && variantes?.version === this.#variantes?.version) return;
+
+        const actual = this.#variantes = variantes ? { url, version: variantes.version, imagenes: null } : null;
+        this.#variantesListas = !actual ? Promise.resolve() : fetch(url)
+            .then(respuesta => {
+                if (!respuesta.ok) {
+                    throw new Error(`HTTP ${respuesta.status} al cargar ${url}`);
+                }
+                return respuesta.json();
+            })
+            .then(manifiesto => {
+                if (manifiesto.version !== actual.version) {
+                    throw new Error(`versión ${manifiesto.version}, historia.json espera ${actual.version}`);
+                }
+                actual.imagenes = manifiesto.imagenes;
+            })
+            .catch(error => {
+                console.warn(`[ImagePreloader] Variantes inutilizables (${url}), se usan las originales:`, error);
+            });
+    }
+
+    /**
+     * Espera a que las variantes de la historia activa estén listas. Hay que
+     * esperarla antes de resolver rutas: si no, la misma imagen se pediría una vez
+     * como original y otra como variante.
+     * @returns {Promise<void>}
+     */
+    variantesListas() {
+        return this.#variantesListas;
     }
 
     /**
@@ -40,21 +147,48 @@ export class ImagePreloader {
      * @returns {string} Ruta relativa completa
      */
     resolverRuta(nombre, tipo = 'fondo', id = null) {
-        const base = this.#rutaBaseHistoria;
+        let ruta;
 
         if (tipo === 'personaje') {
             if (!id) {
                 console.warn(`[ImagePreloader] resolverRuta: tipo "personaje" requiere un id. Imagen: ${nombre}`);
             }
-            return base + this.#rutasRelativas.personajes + (id ?? '') + '/' + nombre;
+            ruta = this.#rutasRelativas.personajes + (id ?? '') + '/' + nombre;
+        } else if (tipo === 'objeto') {
+            ruta = this.#rutasRelativas.objetos + nombre;
+        } else {
+            // fondo (default) y cualquier otro tipo desconocido
+            ruta = this.#rutasRelativas.fondos + nombre;
         }
 
-        if (tipo === 'objeto') {
-            return base + this.#rutasRelativas.objetos + nombre;
+        return this.#elegirVariante(ruta);
+    }
+
+    /**
+     * Resuelve una imagen dada por su ruta dentro de la historia (ej: las del mapa
+     * de precarga: "imagenes/fondos/bosque.webp"), eligiendo la variante igual que resolverRuta().
+     * @param {string} rutaEnHistoria
+     * @returns {string} Ruta relativa completa
+     */
+    resolverImagen(rutaEnHistoria) {
+        const { imagenes } = this.#rutasRelativas;
+        if (!rutaEnHistoria.startsWith(imagenes)) {
+            return this.#rutaBaseHistoria + rutaEnHistoria;
         }
+        return this.#elegirVariante(rutaEnHistoria.slice(imagenes.length));
+    }
 
-        // fondo (default) y cualquier otro tipo desconocido
-        return base + this.#rutasRelativas.fondos + nombre;
+    /**
+     * Variante del escalón de esta pantalla si la imagen la tiene, sino la original.
+     * @param {string} ruta — Ruta dentro de imagenes/ (ej: "fondos/bosque.webp")
+     * @returns {string}
+     */
+    #elegirVariante(ruta) {
+        const variantes = this.#variantes?.imagenes?.[ruta]?.variantes;
+        if (variantes?.[this.#escalon] && FeatureFlags.variantesHabilitadas) {
+            return this.#rutaBaseHistoria + this.#rutasRelativas.variantes + this.#escalon + '/' + ruta;
+        }
+        return this.#rutaBaseHistoria + this.#rutasRelativas.imagenes + ruta;
     }
 
     /**
@@ -105,6 +239,20 @@ export class ImagePreloader {
         await Promise.all(promesas);
     }
 
+    /**
+     * Precarga URLs de a #SIMULTANEAS, en el orden dado (las más urgentes primero),
+     * así no compiten todas a la vez con las de la próxima pantalla.
+     * @param {string[]} urls — URLs completas, de más a menos urgente
+     * @param {function} [cancelada] — Si retorna true, no se pide el resto
+     * @returns {Promise<void>}
+     */
+    async precargarEnOrden(urls, cancelada = () => false) {
+        const pendientes = urls.filter(url => !this.#precargadas.has(url));
+        for (let i = 0; i < pendientes.length && !cancelada(); i += this.#SIMULTANEAS) {
+            await this.precargar(pendientes.slice(i, i + this.#SIMULTANEAS));
+        }
+    }
+
     /**
      * Extrae las URLs de imágenes de los datos de una escena o desafío.
      * @param {object} datos — Datos JSON de la escena/desafío
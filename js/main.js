@@ -6,7 +6,7 @@
  */
 import { ContentLoader } from './ContentLoader.js';
 import { StateManager } from './StateManager.js';
-import { ImagePreloader } from './ImagePreloader.js';
+import { ImagePreloader, escalonDePantalla } from './ImagePreloader.js';
 import { SceneRenderer } from './SceneRenderer.js';
 import { ChallengeManager } from './ChallengeManager.js';
 import { UIManager } from './UIManager.js';
@@ -115,7 +115,9 @@ document.addEventListener('DOMContentLoaded', () => {
     if ('serviceWorker' in navigator) {
         let isFirstInstall = true;
 
-        navigator.serviceWorker.register('service-worker.js')
+        // El SW precachea las variantes de imágenes del escalón de esta pantalla (las mismas que pide ImagePreloader)
+        const escalon = escalonDePantalla();
+        navigator.serviceWorker.register(escalon ? `service-worker.js?escalon=${escalon}` : 'service-worker.js')
             .then(registration => {
                 // Si ya había un controlador al registrar, no es la primera instalación
                 if (navigator.serviceWorker.controller) {
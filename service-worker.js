@@ -3,269 +3,536 @@
     // Versión general de la aplicación 
     const VERSION_APP = "1.2.1";
 
-    // Versiones de caché
-    const CACHE_BIBLIOTECA = '5',
-        CACHE_CSS = '10',
-        CACHE_JS = '10',
-        CACHE_CHALLENGES = '4',
-        CACHE_EMBE_IMAGENES = '3',
-        CACHE_EMBE_AUDIOS = '1',
-        CACHE_EMBE_VIDEOS = '3',
-        CACHE_EMBE_DATOS = '7',
-        CACHE_FONTS = '1';
+    // Versión de la caché de fuentes (se llena al vuelo, no está en el manifiesto)
+    const CACHE_FONTS = '1';
 
     const NOMBRE_CACHE_FONTS = `cache-fonts-v${CACHE_FONTS}`;
 
-    // Ruta de El Misterio del Bosque Encantado
-    const RUTA_EMBE = 'historias/el-misterio-del-bosque-encantado';
-
-    // Matriz de cachés y sus archivos
+    // Matriz de cachés y sus archivos, con la huella (sha256, 16 caracteres) del contenido
+    // de cada uno. Al publicar, el SW nuevo baja solo los archivos cuya huella cambió.
+    // `null` = el archivo no estaba en disco al generar: se baja una vez y no se actualiza.
+    // `prioridad` 0 = lo que hace falta para jugar (la app y el comienzo de cada historia):
+    // el SW se activa con eso y baja el resto en segundo plano.
+    // MANIFIESTO:INICIO — generado por .agents/skills/sw-updater/scripts/generar-manifiesto.py
     const RUTAS_CACHE = [
         {
-            nombre: `cache-biblioteca-v${CACHE_BIBLIOTECA}`,
-            archivos: [
-                './',
-                'index.html',
-                'manifest.json',
-                'biblioteca/historias.json',
-                'biblioteca/imagenes/fondo.webp',
-                'biblioteca/imagenes/ogimage.jpg',
-                'biblioteca/imagenes/iconos/favicon.png',
-                'biblioteca/imagenes/iconos/icono_192.png',
-                'biblioteca/imagenes/iconos/icono_180.png',
-                'biblioteca/imagenes/iconos/icono_m_192.png',
-                'biblioteca/imagenes/iconos/icono.png',
-                'biblioteca/imagenes/iconos/icono_m.png',
-                'css/biblioteca.css',
-                'js/BibliotecaManager.js'
-            ],
-            version: CACHE_BIBLIOTECA
+            nombre: 'cache-biblioteca',
+            prioridad: 0,
+            archivos: {
+                './': '6199e81bb36fd0d5',
+                'biblioteca/historias.json': '8fb0c7a7b104463b',
+                'biblioteca/imagenes/fondo.webp': '7a29deee6254e0be',
+                'biblioteca/imagenes/iconos/favicon.png': 'a7c2799df8e1ae75',
+                'biblioteca/imagenes/iconos/icono.png': '365639a83a30749c',
+                'biblioteca/imagenes/iconos/icono_180.png': '4c056483188cf4a9',
+                'biblioteca/imagenes/iconos/icono_192.png': '9b5c5e1f3844b819',
+                'biblioteca/imagenes/iconos/icono_m.png': '0ffced1a40d07a27',
+                'biblioteca/imagenes/iconos/icono_m_192.png': 'a20b7d0ea9c79954',
+                'biblioteca/imagenes/juego_biblioteca.webp': '82b3b7cc1d0bc2dc',
+                'biblioteca/imagenes/ogimage.jpg': '52fce7aff4f39438',
+                'css/biblioteca.css': '6609cba4e9f6f02d',
+                'index.html': '6199e81bb36fd0d5',
+                'js/BibliotecaManager.js': '60dafe08e023d35e',
+                'manifest.json': 'd31f22893cace78e'
+            }
+        },
+        {
+            nombre: 'cache-css',
+            prioridad: 0,
+            archivos: {
+                'css/animaciones.css': '15d6a6a69ff565f2',
+                'css/desafios.css': '5e8aae475429e908',
+                'css/dev-panel.css': 'abd6e9f048bd9c04',
+                'css/escena.css': 'e0c338a672508f68',
+                'css/inicio.css': 'b8aeaa32f8c69d15',
+                'css/layout.css': '4cba511123e9cacd',
+                'css/reset.css': '5429fa41830434cd',
+                'css/ui.css': '957952379aee0572',
+                'css/variables.css': '1c1a051e9c805cdb'
+            }
         },
         {
-            nombre: `cache-css-v${CACHE_CSS}`,
-            archivos: [
-                'css/animaciones.css',
-                'css/desafios.css',
-                'css/dev-panel.css',
-                'css/escena.css',
-                'css/inicio.css',
-                'css/layout.css',
-                'css/reset.css',
-                'css/ui.css',
-                'css/variables.css'
-            ],
-            version: CACHE_CSS
+            nombre: 'cache-js',
+            prioridad: 0,
+            archivos: {
+                'js/AudioManager.js': '9f7559002f94ec4a',
+                'js/ChallengeManager.js': '125052db66b354ee',
+                'js/ContentLoader.js': '08d6778b948179ce',
+                'js/DevPanel.js': 'cae2251a5454d5c0',
+                'js/EffectsRenderer.js': '4b6deece04a5b4f1',
+                'js/FeatureFlags.js': '752736e4473c54cf',
+                'js/FondoHelper.js': 'd8d26350ec3206a4',
+                'js/GameEngine.js': '6766f3274c44bb2c',
+                'js/ImagePreloader.js': '116a5e5cb91d6572',
+                'js/SceneRenderer.js': 'c4c1d6c1f01ca3a7',
+                'js/StateManager.js': 'd51ebadb0a780f3f',
+                'js/UIManager.js': 'cbd9bb6e1368613b',
+                'js/main.js': 'fd40e644dbeeb9ed'
+            }
         },
         {
-            nombre: `cache-js-v${CACHE_JS}`,
-            archivos: [
-                'js/AudioManager.js',
-                'js/ChallengeManager.js',
-                'js/ContentLoader.js',
-                'js/DevPanel.js',
-                'js/EffectsRenderer.js',
-                'js/FeatureFlags.js',
-                'js/FondoHelper.js',
-                'js/GameEngine.js',
-                'js/ImagePreloader.js',
-                'js/main.js',
-                'js/SceneRenderer.js',
-                'js/StateManager.js',
-                'js/UIManager.js'
-            ],
-            version: CACHE_JS
+            nombre: 'cache-challenges',
+            prioridad: 0,
+            archivos: {
+                'js/challenges/ClicksHandler.js': 'fc76d382b5c96e1b',
+                'js/challenges/ObservacionHandler.js': 'd2b42ca37c8d81ba',
+                'js/challenges/PreguntaRealHandler.js': '27982596c014c220'
+            }
         },
         {
-            nombre: `cache-challenges-v${CACHE_CHALLENGES}`,
-            archivos: [
-                'js/challenges/ClicksHandler.js',
-                'js/challenges/ObservacionHandler.js',
-                'js/challenges/PreguntaRealHandler.js'
-            ],
-            version: CACHE_CHALLENGES
+            nombre: 'cache-embe-datos',
+            prioridad: 0,
+            archivos: {
+                'historias/el-misterio-del-bosque-encantado/datos/paquete.jsonl': 'cfbf43c7f5cc94d8',
+                'historias/el-misterio-del-bosque-encantado/datos/precarga.json': '1eedabd68607b244',
+                'historias/el-misterio-del-bosque-encantado/datos/sonidos.json': '7465ee1bc364dbb7',
+                'historias/el-misterio-del-bosque-encantado/datos/variantes.json': 'b96a45f5479faace',
+                'historias/el-misterio-del-bosque-encantado/historia.json': 'e80e24f1cb8d8323'
+            }
         },
         {
-            nombre: `cache-embe-datos-v${CACHE_EMBE_DATOS}`,
-            archivos: [
-                RUTA_EMBE + '/historia.json',
-                RUTA_EMBE + '/datos/desafios/DESAFIO_ACERTIJO_DUENDE.json',
-                RUTA_EMBE + '/datos/desafios/DESAFIO_BUSCAR_HONGO.json',
-                RUTA_EMBE + '/datos/desafios/DESAFIO_INICIAL.json',
-                RUTA_EMBE + '/datos/desafios/DESAFIO_LANZAR_PIEDRA.json',
-                RUTA_EMBE + '/datos/escenas/CAMINO_CASA_BRUJA.json',
-                RUTA_EMBE + '/datos/escenas/CAMINO_SECRETO_CASA_BRUJA.json',
-                RUTA_EMBE + '/datos/escenas/CASA_BRUJA_EXTERIOR.json',
-                RUTA_EMBE + '/datos/escenas/DECISION_FINAL.json',
-                RUTA_EMBE + '/datos/escenas/ENCUENTRO_PADRES.json',
-                RUTA_EMBE + '/datos/escenas/ENCUENTRO_TIO_PIER.json',
-                RUTA_EMBE + '/datos/escenas/ENCUENTRO_TIO_PIER_2.json',
-                RUTA_EMBE + '/datos/escenas/ENTRADA_BOSQUE.json',
-                RUTA_EMBE + '/datos/escenas/FINAL_BUENO.json',
-                RUTA_EMBE + '/datos/escenas/FINAL_CORTO_1.json',
-                RUTA_EMBE + '/datos/escenas/FINAL_CORTO_2.json',
-                RUTA_EMBE + '/datos/escenas/FINAL_MALO.json',
-                RUTA_EMBE + '/datos/escenas/FINAL_SECRETO.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_AYUDA_INDI.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_CHARCO.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_COSQUILLAS.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_NO_AYUDA_INDI.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_PISTAS.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_PREGUNTAR.json',
-                RUTA_EMBE + '/datos/escenas/HABLAR_CON_ROMI.json',
-                RUTA_EMBE + '/datos/escenas/INICIO.json',
-                RUTA_EMBE + '/datos/escenas/INTERIOR_CASA_BRUJA.json',
-                RUTA_EMBE + '/datos/escenas/RIO_DUENDE.json',
-                RUTA_EMBE + '/datos/escenas/RIO_DUENDE_FALLO.json',
-                RUTA_EMBE + '/datos/escenas/RIO_DUENDE_RECOMPENSA.json',
-                RUTA_EMBE + '/datos/escenas/RIO_HABLAR_DUENDE.json',
-                RUTA_EMBE + '/datos/escenas/RIO_HABLAR_DUENDE_2.json',
-                RUTA_EMBE + '/datos/escenas/RIO_PUENTE_MAGICO.json',
-                RUTA_EMBE + '/datos/escenas/RIO_SAPO.json',
-                RUTA_EMBE + '/datos/escenas/TIO_PIER_RECOMPENSA.json',
-                RUTA_EMBE + '/datos/escenas/FLORES_CHARCO_VISION.json',
-                RUTA_EMBE + '/datos/escenas/ZONA_FLORES.json',
-                RUTA_EMBE + '/datos/escenas/ZONA_RIO.json'
-            ],
-            version: CACHE_EMBE_DATOS
+            nombre: 'cache-embe-inicio',
+            prioridad: 0,
+            archivos: {
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/cuarto_iru.webp': '9d9cbe23a17ad5a5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/cuarto_iru_normal.webp': 'c6846c735b3cc490',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/entrada_bosque.webp': 'dc2371dc668bf0d0',
+                'historias/el-misterio-del-bosque-encantado/imagenes/logo/logo_s.webp': 'b54ecd41a91eae5e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/fin.webp': 'd0d9b5c3a8a4cb41',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/irupe/irupe.webp': '99957804d8e0d250',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/irupe/irupe_normal.webp': 'a10a9c8d07931263',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/mama_papa/mama_papa.webp': '4a1f9ef331b5c1df',
+                'historias/el-misterio-del-bosque-encantado/imagenes/tarjeta/tarjeta.webp': '013a0676f30257df',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/cuarto_iru.webp': '36afabf48ea434c3',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/cuarto_iru_normal.webp': 'a6fc2b391c178fef',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/entrada_bosque.webp': '63938e3baaefc046',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/fin.webp': '37204c272c5cc179',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/irupe/irupe.webp': '03eb829559a34c63',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/irupe/irupe_normal.webp': 'a8f4a2f53ad1c5ba',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/mama_papa/mama_papa.webp': '0f3ab66280bf6a05',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/fin.webp': '4d9dd1d16f455b85',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/irupe/irupe.webp': '94470d8a6e6cabde',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/irupe/irupe_normal.webp': 'a7de517a5ddd9036',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/mama_papa/mama_papa.webp': '1e4440579891f87d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/cuarto_iru.webp': '24f4d86cefb932cb',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/cuarto_iru_normal.webp': '4e4084b9b2f19a70',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/entrada_bosque.webp': '2717e74487ce3578',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/fin.webp': '2b0e2106562f6860',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/irupe/irupe.webp': '6bb677d40aeb1811',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/irupe/irupe_normal.webp': 'af613a95e6abd52f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/mama_papa/mama_papa.webp': '6788097fdaf1988f'
+            }
         },
         {
-            nombre: `cache-embe-audios-v${CACHE_EMBE_AUDIOS}`,
-            archivos: [
-                RUTA_EMBE + '/audios/aventuras.mp3',
-                RUTA_EMBE + '/audios/boing.mp3',
-                RUTA_EMBE + '/audios/bosque.mp3',
-                RUTA_EMBE + '/audios/celebracion.mp3',
-                RUTA_EMBE + '/audios/el_misterio_del_bosque_encantado.mp3',
-                RUTA_EMBE + '/audios/exploracion.mp3',
-                RUTA_EMBE + '/audios/magico.mp3',
-                RUTA_EMBE + '/audios/piedra.mp3',
-                RUTA_EMBE + '/audios/piedra_agua.mp3',
-                RUTA_EMBE + '/audios/plop.mp3',
-                RUTA_EMBE + '/audios/respuesta_correcta.mp3',
-                RUTA_EMBE + '/audios/respuesta_incorrecta.mp3',
-                RUTA_EMBE + '/audios/risa_hongo.mp3',
-                RUTA_EMBE + '/audios/suspenso.mp3',
-                RUTA_EMBE + '/audios/triste.mp3',
-                RUTA_EMBE + '/audios/uiii.mp3'
-            ],
-            version: CACHE_EMBE_AUDIOS
+            nombre: 'cache-embe-audios',
+            prioridad: 1,
+            archivos: {
+                'historias/el-misterio-del-bosque-encantado/audios/aventuras.mp3': '971608ee11bfa9ee',
+                'historias/el-misterio-del-bosque-encantado/audios/bosque.mp3': '966d24be7cccde64',
+                'historias/el-misterio-del-bosque-encantado/audios/celebracion.mp3': '3e54349c792df0e2',
+                'historias/el-misterio-del-bosque-encantado/audios/el_misterio_del_bosque_encantado.mp3': 'ae7e88847ec34220',
+                'historias/el-misterio-del-bosque-encantado/audios/exploracion.mp3': '3073b99eabfc192c',
+                'historias/el-misterio-del-bosque-encantado/audios/magico.mp3': 'fd509bf483324338',
+                'historias/el-misterio-del-bosque-encantado/audios/sprites/sonidos_24000.mp3': '393b7b69029fa59b',
+                'historias/el-misterio-del-bosque-encantado/audios/sprites/sonidos_44100.mp3': '614053b9289558db',
+                'historias/el-misterio-del-bosque-encantado/audios/sprites/sonidos_48000.mp3': '7d057207103f200b',
+                'historias/el-misterio-del-bosque-encantado/audios/suspenso.mp3': 'f465fa1c3c478b16',
+                'historias/el-misterio-del-bosque-encantado/audios/triste.mp3': '6cd8dc788ece7f7c'
+            }
         },
         {
-            nombre: `cache-embe-imagenes-v${CACHE_EMBE_IMAGENES}`,
-            archivos: [
-                RUTA_EMBE + '/imagenes/fondos/bosque_animales_sin_color.webp',
-                RUTA_EMBE + '/imagenes/fondos/bosque_charco.webp',
-                RUTA_EMBE + '/imagenes/fondos/bosque_flores.webp',
-                RUTA_EMBE + '/imagenes/fondos/bosque_general.webp',
-                RUTA_EMBE + '/imagenes/fondos/bosque_hongos_magicos.webp',
-                RUTA_EMBE + '/imagenes/fondos/camino_secreto.webp',
-                RUTA_EMBE + '/imagenes/fondos/casa_bruja.webp',
-                RUTA_EMBE + '/imagenes/fondos/cuarto_iru.webp',
-                RUTA_EMBE + '/imagenes/fondos/cuarto_iru_normal.webp',
-                RUTA_EMBE + '/imagenes/fondos/entrada_bosque.webp',
-                RUTA_EMBE + '/imagenes/fondos/final_bosque_con_color.webp',
-                RUTA_EMBE + '/imagenes/fondos/final_secreto_transformacion.webp',
-                RUTA_EMBE + '/imagenes/fondos/interior_casa_bruja.webp',
-                RUTA_EMBE + '/imagenes/fondos/rio_duende_hada.webp',
-                RUTA_EMBE + '/imagenes/fondos/rio_puente_magico.webp',
-                RUTA_EMBE + '/imagenes/fondos/rio_sapo.webp',
-                RUTA_EMBE + '/imagenes/fondos/rio_sin_puente_magico.webp',
-                RUTA_EMBE + '/imagenes/fondos/vision_bruja_charco.webp',
-                RUTA_EMBE + '/imagenes/fondos/zona_rio.webp',
-                RUTA_EMBE + '/imagenes/logo/logo.png',
-                RUTA_EMBE + '/imagenes/logo/logo_s.png',
-                RUTA_EMBE + '/imagenes/logo/logo_s.webp',
-                RUTA_EMBE + '/imagenes/objetos/fin.webp',
-                RUTA_EMBE + '/imagenes/objetos/flor_de_luz.webp',
-                RUTA_EMBE + '/imagenes/objetos/hongo_que_no_rie.webp',
-                RUTA_EMBE + '/imagenes/objetos/hongo_que_no_rie_2.webp',
-                RUTA_EMBE + '/imagenes/objetos/hongo_que_rie.webp',
-                RUTA_EMBE + '/imagenes/objetos/hongo_que_rie_2.webp',
-                RUTA_EMBE + '/imagenes/objetos/piedra_magica.webp',
-                RUTA_EMBE + '/imagenes/personajes/abuela_tere/abuela_tere.webp',
-                RUTA_EMBE + '/imagenes/personajes/ardilla_gris/ardilla_gris.webp',
-                RUTA_EMBE + '/imagenes/personajes/bruja_romi/bruja_romi_feliz.webp',
-                RUTA_EMBE + '/imagenes/personajes/bruja_romi/bruja_romi_sentada.webp',
-                RUTA_EMBE + '/imagenes/personajes/bruja_romi/bruja_romi_triste.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo_enojado.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo_espaldas.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo_saludando.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo_serio.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo_serio_2.webp',
-                RUTA_EMBE + '/imagenes/personajes/duende_milo/duende_milo_sospecha.webp',
-                RUTA_EMBE + '/imagenes/personajes/hada_jazmin/hada_jazmin.webp',
-                RUTA_EMBE + '/imagenes/personajes/hada_jazmin/hada_jazmin_espaldas.webp',
-                RUTA_EMBE + '/imagenes/personajes/indira/indira.webp',
-                RUTA_EMBE + '/imagenes/personajes/indira/indira_caminando.webp',
-                RUTA_EMBE + '/imagenes/personajes/indira/indira_espaldas_1.webp',
-                RUTA_EMBE + '/imagenes/personajes/indira/indira_espaldas_2.webp',
-                RUTA_EMBE + '/imagenes/personajes/indira/indira_tropieza.webp',
-                RUTA_EMBE + '/imagenes/personajes/irupe/irupe.webp',
-                RUTA_EMBE + '/imagenes/personajes/irupe/irupe_caminando.webp',
-                RUTA_EMBE + '/imagenes/personajes/irupe/irupe_espaldas_1.webp',
-                RUTA_EMBE + '/imagenes/personajes/irupe/irupe_espaldas_2.webp',
-                RUTA_EMBE + '/imagenes/personajes/irupe/irupe_normal.webp',
-                RUTA_EMBE + '/imagenes/personajes/mama_papa/mama_papa.webp',
-                RUTA_EMBE + '/imagenes/personajes/nuria/nuria.webp',
-                RUTA_EMBE + '/imagenes/personajes/nuria/nuria_caminando.webp',
-                RUTA_EMBE + '/imagenes/personajes/nuria/nuria_espaldas_1.webp',
-                RUTA_EMBE + '/imagenes/personajes/nuria/nuria_espaldas_2.webp',
-                RUTA_EMBE + '/imagenes/personajes/nuria/nuria_espaldas_3.webp',
-                RUTA_EMBE + '/imagenes/personajes/sapo_blanco/sapo_blanco.webp',
-                RUTA_EMBE + '/imagenes/personajes/tio_pier/tio_pier.webp',
-                RUTA_EMBE + '/imagenes/personajes/tio_pier/tio_pier_pensativo.webp',
-                RUTA_EMBE + '/imagenes/personajes/tio_pier/tio_pier_flor_de_luz.webp',
-                RUTA_EMBE + '/imagenes/personajes/tio_pier/tio_pier_sentado.webp',
-                RUTA_EMBE + '/imagenes/tarjeta/tarjeta.webp',
-                RUTA_EMBE + '/imagenes/objetos/video_bosque_hongos_magicos.webp',
-                RUTA_EMBE + '/imagenes/objetos/video_interior_casa_bruja.webp',
-                RUTA_EMBE + '/imagenes/objetos/video_rio_duende_hada.webp',
-                RUTA_EMBE + '/imagenes/objetos/video_zona_rio.webp'
-            ],
-            version: CACHE_EMBE_IMAGENES
+            nombre: 'cache-embe-imagenes',
+            prioridad: 1,
+            archivos: {
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/bosque_animales_sin_color.webp': '44503cb9a2550b85',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/bosque_charco.webp': 'dd91bf3388f53bc7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/bosque_flores.webp': '634d158a90e4be4f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/bosque_general.webp': '7bde1465cd45bc17',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/bosque_hongos_magicos.webp': '40d91808236e87a5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/camino_secreto.webp': 'cc2257782d2c3b2d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/casa_bruja.webp': 'e16d2296145aac81',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/final_bosque_con_color.webp': 'f0ca2de8c380c7b3',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/final_secreto_transformacion.webp': 'b96852e880bf2371',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/interior_casa_bruja.webp': '62c049f42b0c9453',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/rio_duende_hada.webp': 'e63d1426f939e378',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/rio_puente_magico.webp': '4ce4e1c596377e8a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/rio_sapo.webp': '0381a0dcf086a98b',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/rio_sin_puente_magico.webp': '288b495d17486b1b',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/vision_bruja_charco.webp': '34745cd96802f0f5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/fondos/zona_rio.webp': '4037b431532f2027',
+                'historias/el-misterio-del-bosque-encantado/imagenes/logo/logo.png': '84c8bd3957126c5b',
+                'historias/el-misterio-del-bosque-encantado/imagenes/logo/logo_s.png': '63aa24989ae0b28f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/flor_de_luz.webp': 'f81750eb283cc164',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/hongo_que_no_rie.webp': '042c072908e3708d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/hongo_que_no_rie_2.webp': '16a160353b61f772',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/hongo_que_rie.webp': '6b561a152a8f86e9',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/hongo_que_rie_2.webp': 'e9a9804baa592287',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/piedra_magica.webp': '7d630740af590674',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/video_bosque_charco.webp': 'a1824e546075e7cf',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/video_bosque_hongos_magicos.webp': '35f583b18f3f162c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/video_interior_casa_bruja.webp': '4b806788df801f0a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/video_rio_duende_hada.webp': 'd3577daf984e2bc1',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/video_rio_puente_magico.webp': '7babf546a4ba3154',
+                'historias/el-misterio-del-bosque-encantado/imagenes/objetos/video_zona_rio.webp': '2209b97e47383b00',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/abuela_tere/abuela_tere.webp': '388832cfdea6291e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/ardilla_gris/ardilla_gris.webp': 'c2b90b58b79d0288',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/bruja_romi/bruja_romi_feliz.webp': 'ba43001f6bb4b227',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/bruja_romi/bruja_romi_sentada.webp': '0f1306858e3de9d5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/bruja_romi/bruja_romi_triste.webp': '2062df71cd310edc',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo.webp': '26ab99037317003a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo_enojado.webp': 'cb1f35eb4da078ee',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo_espaldas.webp': 'a4fd714d4ef8821b',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo_saludando.webp': '6953e7e17b044ba9',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo_serio.webp': '06072b276a793a47',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo_serio_2.webp': '1393114d837efa7e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/duende_milo/duende_milo_sospecha.webp': 'c0437b7ef3e19576',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/hada_jazmin/hada_jazmin.webp': '23b8018243016e69',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/hada_jazmin/hada_jazmin_espaldas.webp': '0a4fedb3499118f7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/indira/indira.webp': '7dcfb72392d48f8a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/indira/indira_caminando.webp': '409436662f69440b',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/indira/indira_espaldas_1.webp': 'b39f5adbaceb2dbd',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/indira/indira_espaldas_2.webp': 'c74f08967d09b454',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/indira/indira_tropieza.webp': 'a9157661dbfee554',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/irupe/irupe_caminando.webp': 'cae718e027f72d53',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/irupe/irupe_espaldas_1.webp': '49db013ace0d204e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/irupe/irupe_espaldas_2.webp': '66d3300318da324a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/nuria/nuria.webp': 'c5f276aaffa84f1a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/nuria/nuria_caminando.webp': 'dcfb9d6e8f50d508',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/nuria/nuria_espaldas_1.webp': 'e624eb8c6dff50ab',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/nuria/nuria_espaldas_2.webp': '9ef7d6e734336281',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/nuria/nuria_espaldas_3.webp': '84d7795b798d7f23',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/sapo_blanco/sapo_blanco.webp': '3859d63c515457e0',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/tio_pier/tio_pier.webp': 'cef3e343505e79fd',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/tio_pier/tio_pier_flor_de_luz.webp': 'dfb1c78438755743',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/tio_pier/tio_pier_pensativo.webp': 'abf4e04d09dcab45',
+                'historias/el-misterio-del-bosque-encantado/imagenes/personajes/tio_pier/tio_pier_sentado.webp': 'd724152f0616f273',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/bosque_animales_sin_color.webp': 'dc94698a67474822',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/bosque_charco.webp': '65b51065e39a223e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/bosque_flores.webp': '57c8b6f4fbdc9f76',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/bosque_general.webp': 'c799c5b24c067200',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/bosque_hongos_magicos.webp': 'dc423212ffbf498d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/camino_secreto.webp': 'ccd8696e201cf384',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/casa_bruja.webp': '8d09a58176b4d710',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/final_bosque_con_color.webp': '642efead3163529f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/final_secreto_transformacion.webp': '26b164227cabe6e9',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/interior_casa_bruja.webp': '9e7e8a24d5c7e4a5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/rio_duende_hada.webp': 'b89e18e67f6541b2',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/rio_puente_magico.webp': '3ba213fc8714266a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/rio_sapo.webp': 'eb3049c099d7286f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/rio_sin_puente_magico.webp': '24b370799f823161',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/vision_bruja_charco.webp': 'b26fa2b0829433ef',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/fondos/zona_rio.webp': 'bc1418de9a942c71',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/flor_de_luz.webp': '6e6440a6105035ca',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/hongo_que_no_rie.webp': '56c0313dec82e978',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/hongo_que_no_rie_2.webp': '2a01cfa939cd7056',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/hongo_que_rie.webp': '189e969547df7182',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/hongo_que_rie_2.webp': '9ab865c1fae04a52',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/piedra_magica.webp': '15a9f5d238d1df16',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/video_bosque_charco.webp': 'b595057d5aed65d5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/video_bosque_hongos_magicos.webp': '05a9d127ef5da30d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/video_interior_casa_bruja.webp': 'c13f27ae4a6336ef',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/video_rio_duende_hada.webp': '270fbbb2670215a7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/video_rio_puente_magico.webp': '8db4dc03f928b776',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/objetos/video_zona_rio.webp': '1c3b104978f247e3',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/abuela_tere/abuela_tere.webp': '30f4d645b1a85166',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/ardilla_gris/ardilla_gris.webp': '08423668a2c8e4b5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/bruja_romi/bruja_romi_feliz.webp': '94b37bc88422cb43',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/bruja_romi/bruja_romi_sentada.webp': '27cf0ff874cf619f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/bruja_romi/bruja_romi_triste.webp': '0dc3527a887edca5',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo.webp': '50295669c273d15c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo_enojado.webp': 'e31733b1d36a2e19',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo_espaldas.webp': 'b284f45c5129a44e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo_saludando.webp': '0a2fdeb17b185b05',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo_serio.webp': 'b3a0c357e690dda6',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo_serio_2.webp': 'fc98a356b2b65aa7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/duende_milo/duende_milo_sospecha.webp': 'df36adf3810c6c23',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/hada_jazmin/hada_jazmin.webp': '7dbc0b2fc3cdf796',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/hada_jazmin/hada_jazmin_espaldas.webp': '010b912a3c8e3fe7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/indira/indira.webp': '3a2db66e54a3ab12',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/indira/indira_caminando.webp': '163f205522a3991e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/indira/indira_espaldas_1.webp': '3089e15bed828674',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/indira/indira_tropieza.webp': '695766f76dc8531b',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/irupe/irupe_caminando.webp': 'e182c06287022274',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/irupe/irupe_espaldas_1.webp': '925906e3dd5a01f7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/nuria/nuria.webp': '5ae3b8f9dfec2559',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/nuria/nuria_caminando.webp': '4b34880688e8c41c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/nuria/nuria_espaldas_1.webp': 'fa3d67e2e3f16229',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/nuria/nuria_espaldas_3.webp': 'a17e6c38f4f9562f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/sapo_blanco/sapo_blanco.webp': 'ec169ed9c0dad2d8',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/tio_pier/tio_pier.webp': 'a03faf147aeecf14',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/tio_pier/tio_pier_flor_de_luz.webp': 'b0dde4fbba97a485',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/tio_pier/tio_pier_pensativo.webp': '1a93aa81ddf87bb6',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1280/personajes/tio_pier/tio_pier_sentado.webp': 'c5d5500778917cb8',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/flor_de_luz.webp': '96ed0d8b1d2267a0',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/hongo_que_no_rie.webp': '9c47e1f1a65e60d9',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/hongo_que_no_rie_2.webp': 'e1f76d486e62da6d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/hongo_que_rie.webp': 'f41d1aeca5426387',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/hongo_que_rie_2.webp': '9f7accfce5408372',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/objetos/piedra_magica.webp': '6ecf1e75afbff323',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/abuela_tere/abuela_tere.webp': '7fe0e612256c6271',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/ardilla_gris/ardilla_gris.webp': '210b4946b9c115c8',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/bruja_romi/bruja_romi_feliz.webp': '2dafae2d446fb516',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/bruja_romi/bruja_romi_sentada.webp': 'bb7a93906d01ce52',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/bruja_romi/bruja_romi_triste.webp': 'b84c67201b6c9b4e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo.webp': '0e59e3c415c64d5a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo_enojado.webp': '5349aab8075b784f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo_espaldas.webp': 'f433a74877688f54',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo_saludando.webp': '5136af6ccea78c67',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo_serio.webp': 'f3e8f8284f8edd0a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo_serio_2.webp': 'f2dcb27b96cc3717',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/duende_milo/duende_milo_sospecha.webp': 'f9ecb829342c0155',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/hada_jazmin/hada_jazmin.webp': '01d8c2ba6fbbc329',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/hada_jazmin/hada_jazmin_espaldas.webp': 'f0a1a633d50744c9',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/indira/indira.webp': 'eeefc7df4e74f7ef',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/indira/indira_caminando.webp': '9edaf459137faa96',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/indira/indira_tropieza.webp': '8695a388311bcc9f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/irupe/irupe_caminando.webp': '2b2e96c1fd587a7a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/nuria/nuria.webp': 'e5f40125b0f92a5c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/nuria/nuria_caminando.webp': '85a5e69a7312bd84',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/nuria/nuria_espaldas_1.webp': '0b56be6985f3bd8e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/nuria/nuria_espaldas_3.webp': '212a999f694130ca',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/sapo_blanco/sapo_blanco.webp': '80a83d6732feaa97',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/tio_pier/tio_pier.webp': '971d77c0fc4e182e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/tio_pier/tio_pier_pensativo.webp': 'f71f8daa6540d84f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/1920/personajes/tio_pier/tio_pier_sentado.webp': '9a8f3a353dada99c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/bosque_animales_sin_color.webp': '5a29ae7bcd1a98e6',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/bosque_charco.webp': '5f75827f4a50c1a4',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/bosque_flores.webp': 'afe755b2d71e012c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/bosque_general.webp': '085b845acb5ecbd6',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/bosque_hongos_magicos.webp': 'd5ceaee2848bd2d7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/camino_secreto.webp': 'e9ac89864063cbc3',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/casa_bruja.webp': '7700cd0c94b9984d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/final_bosque_con_color.webp': '7fd5a40f15085130',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/final_secreto_transformacion.webp': 'e34af00704e6a071',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/interior_casa_bruja.webp': 'd88e4a5bf89005b1',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/rio_duende_hada.webp': 'db5281eda9a32e0e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/rio_puente_magico.webp': 'a8527524f12178a1',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/rio_sapo.webp': '5a8126f06f6c52f0',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/rio_sin_puente_magico.webp': '3228e960925cd9fa',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/vision_bruja_charco.webp': '7b54ee73a51750af',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/fondos/zona_rio.webp': '770bd777e40d8f22',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/flor_de_luz.webp': 'dc3270661e231db4',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/hongo_que_no_rie.webp': '5fb8346b15d9442f',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/hongo_que_no_rie_2.webp': '7723bc761942d6ed',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/hongo_que_rie.webp': '78144c8befba5596',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/hongo_que_rie_2.webp': '9ee5434dcc7d7c4c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/piedra_magica.webp': '56c77eee6812abcc',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/video_bosque_charco.webp': '024a0356e6fd3a80',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/video_bosque_hongos_magicos.webp': '036f06722cf81fd7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/video_interior_casa_bruja.webp': '41c228571431b115',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/video_rio_duende_hada.webp': '937369cd1dd06caf',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/video_rio_puente_magico.webp': 'b24f62e767d9f1a9',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/objetos/video_zona_rio.webp': '882ca818e065174e',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/abuela_tere/abuela_tere.webp': '2b067f921aa61c0a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/ardilla_gris/ardilla_gris.webp': '0e37750e42126545',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/bruja_romi/bruja_romi_feliz.webp': '296158ae67aae2ed',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/bruja_romi/bruja_romi_sentada.webp': '0d547cf03f2e5fca',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/bruja_romi/bruja_romi_triste.webp': '61342d017415a6a4',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo.webp': 'd5b505d1e07a5829',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo_enojado.webp': 'bd0cbfb9ad56a842',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo_espaldas.webp': '89653cef03f8fc04',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo_saludando.webp': 'd209510dac0dffb1',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo_serio.webp': '7989f55a5b086149',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo_serio_2.webp': '573757054c2062c3',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/duende_milo/duende_milo_sospecha.webp': '43dfcdcf29258f7d',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/hada_jazmin/hada_jazmin.webp': '076c1c90a46944d7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/hada_jazmin/hada_jazmin_espaldas.webp': 'e273195613431ede',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/indira/indira.webp': '40c1410fd4688535',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/indira/indira_caminando.webp': 'd8e9bc9ed90bb4f6',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/indira/indira_espaldas_1.webp': '3a2429f0556ef892',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/indira/indira_tropieza.webp': '0099f64bc54b1dcd',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/irupe/irupe_caminando.webp': 'e26eb6668a0571ab',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/irupe/irupe_espaldas_1.webp': '16974a5ccbcc0b19',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/nuria/nuria.webp': 'feb1cd9e17d8fd39',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/nuria/nuria_caminando.webp': '789e0b31b6f41a80',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/nuria/nuria_espaldas_1.webp': '1babcae3714d041c',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/nuria/nuria_espaldas_3.webp': '8d7a32c7c050a6d8',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/sapo_blanco/sapo_blanco.webp': 'fb8157f8ba81f861',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/tio_pier/tio_pier.webp': 'd340b5a5bbd5a3e7',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/tio_pier/tio_pier_flor_de_luz.webp': 'ccf0429398cd6917',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/tio_pier/tio_pier_pensativo.webp': '783f835d2bd3564a',
+                'historias/el-misterio-del-bosque-encantado/imagenes/variantes/640/personajes/tio_pier/tio_pier_sentado.webp': '2a883ca0a1546725'
+            }
         },
         {
-            nombre: `cache-embe-videos-v${CACHE_EMBE_VIDEOS}`,
-            archivos: [
-                RUTA_EMBE + '/videos/bosque_hongos_magicos_720.mp4',
-                RUTA_EMBE + '/videos/rio_duende_hada_720.mp4',
-                RUTA_EMBE + '/videos/interior_casa_bruja_720.mp4',
-                RUTA_EMBE + '/videos/zona_rio_720.mp4'
-            ],
-            version: CACHE_EMBE_VIDEOS
+            nombre: 'cache-embe-videos',
+            prioridad: 2,
+            archivos: {
+                'historias/el-misterio-del-bosque-encantado/videos/bosque_hongos_magicos_720.mp4': null,
+                'historias/el-misterio-del-bosque-encantado/videos/interior_casa_bruja_720.mp4': null,
+                'historias/el-misterio-del-bosque-encantado/videos/rio_duende_hada_720.mp4': null,
+                'historias/el-misterio-del-bosque-encantado/videos/zona_rio_720.mp4': null
+            }
         }
     ];
+    // MANIFIESTO:FIN
+
+    // Base del sitio: las rutas del manifiesto son relativas a la carpeta del SW
+    const BASE = new URL('./', self.location.href);
+
+    // Ruta del manifiesto → caché y clave. La clave lleva la huella (`ruta?v=huella`):
+    // el SW nuevo guarda sus versiones al lado de las del SW anterior sin pisarlas,
+    // y cada uno sirve las suyas hasta que el nuevo se activa
+    const ENTRADAS = new Map();
+    for (const grupo of RUTAS_CACHE) {
+        for (const [ruta, huella] of Object.entries(grupo.archivos)) {
+            const url = new URL(ruta, BASE);
+            if (huella) url.searchParams.set('v', huella);
+            ENTRADAS.set(ruta, { cache: grupo.nombre, clave: url.href, huella });
+        }
+    }
+
+    // Escalón de imágenes del dispositivo: main.js registra el SW con `?escalon=N` (ver
+    // escalonDePantalla en ImagePreloader.js). De cada imagen con variantes se precachea
+    // imagenes/variantes/{N}/... en lugar de la original; sin escalón, las originales
+    const ESCALON = Number(new URL(self.location.href).searchParams.get('escalon')) || null;
+    const VARIANTE = /\/imagenes\/variantes\/(\d+)\//;
+
+    /**
+     * Archivos de un grupo que le tocan a este dispositivo: las variantes de su escalón,
+     * y las originales que no tienen variante en ese escalón.
+     * @param {{archivos: Object<string, string|null>}} grupo
+     * @returns {string[]}
+     */
+    const archivosDe = (grupo) => Object.keys(grupo.archivos).filter(ruta => {
+        const variante = VARIANTE.exec(ruta);
+        if (variante) return Number(variante[1]) === ESCALON;
+        return !(ESCALON && ruta.includes('/imagenes/')
+            && ENTRADAS.has(ruta.replace('/imagenes/', `/imagenes/variantes/${ESCALON}/`)));
+    });
+
+    /**
+     * Ruta del manifiesto que corresponde a una URL ('./' para la raíz), o null si es de afuera.
+     * @param {string} href
+     * @returns {string|null}
+     */
+    const rutaDelManifiesto = (href) => {
+        const url = new URL(href);
+        if (url.origin !== BASE.origin || !url.pathname.startsWith(BASE.pathname)) return null;
+        return decodeURIComponent(url.pathname.slice(BASE.pathname.length)) || './';
+    };
+
+    /**
+     * Respuesta cacheada de una URL: la versión del manifiesto de este SW si la tiene,
+     * sino cualquier copia cacheada (sin mirar el query string).
+     * @param {string} href
+     * @returns {Promise<Response|undefined>}
+     */
+    const buscarEnCache = async (href) => {
+        const entrada = ENTRADAS.get(rutaDelManifiesto(href));
+        if (entrada) {
+            const cache = await caches.open(entrada.cache);
+            const respuesta = await cache.match(entrada.clave);
+            if (respuesta) return respuesta;
+        }
+        return caches.match(href, { ignoreSearch: true });
+    };
+
+    /**
+     * sha256 de una respuesta, en hexadecimal.
+     * @param {Response} respuesta
+     * @returns {Promise<string>}
+     */
+    const huellaDe = async (respuesta) => {
+        const digest = await crypto.subtle.digest('SHA-256', await respuesta.clone().arrayBuffer());
+        return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+    };
+
+    /**
+     * Migración desde los SW anteriores al manifiesto, que guardaban cada archivo sin huella
+     * (en cachés versionadas como `cache-css-v10`): si el contenido coincide, se reusa sin bajarlo.
+     * @param {string} ruta
+     * @param {string|null} huella
+     * @returns {Promise<Response|null>}
+     */
+    const reusarSinHuella = async (ruta, huella) => {
+        const respuesta = await caches.match(new URL(ruta, BASE).href);
+        if (!respuesta || !respuesta.ok) return null;
+        if (!huella) return respuesta;
+        return (await huellaDe(respuesta)).startsWith(huella) ? respuesta : null;
+    };
+
+    /**
+     * Pone en la caché del grupo los archivos (de este escalón) que todavía no tiene con su huella.
+     * Reusa la copia de otra caché si ya está (el archivo cambió de grupo) y sino la baja.
+     * @param {{nombre: string, archivos: Object<string, string|null>}} grupo
+     */
+    const precachear = async (grupo) => {
+        const cache = await caches.open(grupo.nombre);
+        const presentes = new Set((await cache.keys()).map(request => request.url));
+
+        for (const ruta of archivosDe(grupo)) {
+            const { clave, huella } = ENTRADAS.get(ruta);
+            // Misma huella que la versión cacheada: no se baja de nuevo
+            if (presentes.has(clave)) continue;
+
+            try {
+                // La huella en el query evita la caché HTTP del browser
+                const response = await caches.match(clave)
+                    ?? await reusarSinHuella(ruta, huella)
+                    ?? await fetch(new Request(clave, { cache: 'no-store' }));
+                if (response.ok) {
+                    await cache.put(clave, response);
+                } else {
+                    console.warn(`[Service Worker] Falló caché de: ${ruta}`);
+                }
+            } catch (error) {
+                console.error(`[Service Worker] Error al precachear ${ruta}:`, error);
+            }
+        }
+    };
+
+    /**
+     * Borra las cachés que no están en el manifiesto (incluye las versionadas de antes)
+     * y, en las que quedan, las versiones de archivos que ya no figuran.
+     */
+    const limpiarCaches = async () => {
+        const nombresValidos = RUTAS_CACHE.map(g => g.nombre);
+        nombresValidos.push(NOMBRE_CACHE_FONTS);
+        const nombresActuales = await caches.keys();
+
+        await Promise.all(
+            nombresActuales.map(nombre => {
+                if (!nombresValidos.includes(nombre)) {
+                    console.log(`[Service Worker] Borrando caché obsoleta: ${nombre}`);
+                    return caches.delete(nombre);
+                }
+            })
+        );
+
+        for (const grupo of RUTAS_CACHE) {
+            // Vigentes = las de este grupo (y este escalón): si un archivo cambió de grupo, la copia del anterior sobra
+            const clavesVigentes = new Set(archivosDe(grupo).map(ruta => ENTRADAS.get(ruta).clave));
+            const cache = await caches.open(grupo.nombre);
+            for (const request of await cache.keys()) {
+                if (!clavesVigentes.has(request.url)) await cache.delete(request);
+            }
+        }
+    };
 
-    // Instalación: Pre-caché de todos los recursos
+    // Precarga en segundo plano: se arranca al activar y cada fetch la mantiene viva
+    // (el browser puede frenar un SW ocioso; la próxima vez sigue desde lo que falta)
+    let completando = null;
+    const completarPrecache = () => {
+        completando ??= (async () => {
+            // RUTAS_CACHE ya viene ordenada por prioridad
+            for (const grupo of RUTAS_CACHE) {
+                if (grupo.prioridad > 0) await precachear(grupo);
+            }
+            // Recién ahora: hasta acá, las copias viejas cubren lo que todavía no se bajó.
+            // Si ya se está instalando un SW más nuevo, la limpieza le toca a él (sino borraríamos lo suyo)
+            const registro = self.registration;
+            if (!registro || !(registro.installing || registro.waiting)) await limpiarCaches();
+        })();
+        return completando;
+    };
+
+    // Instalación: Pre-caché de los grupos de prioridad 0 (el resto, después de activar)
     self.addEventListener('install', event => {
         event.waitUntil(
             (async () => {
                 for (const grupo of RUTAS_CACHE) {
-                    const cache = await caches.open(grupo.nombre);
-                    // Fetch forzando evasión de caché del navegador usando la versión
-                    const requests = grupo.archivos.map(archivo => {
-                        const url = new URL(archivo, self.location.href);
-                        url.searchParams.append('v', grupo.version);
-                        return new Request(url, { cache: 'no-store' }); // Asegura que se baje fresco
-                    });
-
-                    // Descargamos y metemos a la caché manualmente
-                    for (let i = 0; i < requests.length; i++) {
-                        try {
-                            const response = await fetch(requests[i]);
-                            if (response.ok) {
-                                // Guardamos en la caché usando la URL original (sin el ?v=X)
-                                // para que los match() más adelante coincidan exactamente
-                                // alternativamente podemos usar ignoreSearch: true
-                                await cache.put(grupo.archivos[i], response);
-                            } else {
-                                console.warn(`[Service Worker] Falló caché de: ${grupo.archivos[i]}`);
-                            }
-                        } catch (error) {
-                            console.error(`[Service Worker] Error al precachear ${grupo.archivos[i]}:`, error);
-                        }
-                    }
+                    if (!(grupo.prioridad > 0)) await precachear(grupo);
                 }
                 // Saltar espera
                 return self.skipWaiting();
@@ -273,25 +540,10 @@
         );
     });
 
-    // Activación: Limpieza y notificación a clientes
+    // Activación: notificación a clientes y precarga del resto en segundo plano
     self.addEventListener('activate', event => {
         event.waitUntil(
             (async () => {
-                // Obtener los nombres actuales de cachés válidas
-                const nombresValidos = RUTAS_CACHE.map(g => g.nombre);
-                nombresValidos.push(NOMBRE_CACHE_FONTS);
-                const nombresActuales = await caches.keys();
-
-                // Borrar cachés viejas
-                await Promise.all(
-                    nombresActuales.map(nombre => {
-                        if (!nombresValidos.includes(nombre)) {
-                            console.log(`[Service Worker] Borrando caché obsoleta: ${nombre}`);
-                            return caches.delete(nombre);
-                        }
-                    })
-                );
-
                 // Reclamar clientes
                 await self.clients.claim();
 
@@ -305,6 +557,8 @@
                 });
             })()
         );
+        // Sin esperarla: activate no termina hasta que se resuelve, y los fetch quedarían en cola
+        completarPrecache();
     });
 
     // Escuchar peticiones desde el cliente (js)
@@ -322,6 +576,9 @@
         // Ignorar peticiones que no son GET
         if (event.request.method !== 'GET') return;
 
+        // Mientras la app se usa, el SW sigue vivo hasta completar la precarga
+        event.waitUntil(completarPrecache());
+
         const url = new URL(event.request.url);
 
         // --- MANEJO ESPECIAL PARA GOOGLE FONTS (CORS / Opaque) ---
@@ -360,7 +617,7 @@
         if (rangeHeader) {
             event.respondWith((async () => {
                 // Buscar el archivo completo en caché (sin Range header)
-                const cachedFull = await caches.match(event.request.url, { ignoreSearch: true });
+                const cachedFull = await buscarEnCache(event.request.url);
                 if (!cachedFull) {
                     // No está en caché, intentar red
                     return fetch(event.request).catch(() => {
@@ -393,7 +650,7 @@
 
         // --- ESTRATEGIA NORMAL (APP CACHE FIRST) ---
         event.respondWith(
-            caches.match(event.request, { ignoreSearch: true }).then(cachedResponse => {
+            buscarEnCache(event.request.url).then(cachedResponse => {
                 // Return la respuesta en caché si existe, sino ir a la red
                 if (cachedResponse) {
                     return cachedResponse;